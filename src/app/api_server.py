@@ -0,0 +1,509 @@
+"""
+This module defines the `JobApiServer` class, an optional local HTTP/JSON
+service that lets other tools submit and monitor upscaling jobs.
+
+The server listens on localhost only and mirrors the jobs of an `UpscaleEngine`:
+- `GET /status` returns the overall progress of the engine.
+- `GET /jobs` lists all jobs; `GET /jobs/<id>` returns one job with its state,
+  progress, throughput, per-stage timings and error.
+- `POST /jobs` submits files, optionally with an output folder, a priority and
+  settings that override the application's current settings.
+- `DELETE /jobs/<id>` cancels a queued or running job.
+- `GET /events` streams job changes and progress as server-sent events.
+
+Requests are served on background threads. Anything that touches the engine is
+marshalled to the thread that owns it (the GUI thread), so the engine and its
+scheduler are never used concurrently.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Callable
+from PyQt6.QtCore import Qt, QObject, QThread, pyqtSignal
+from .scheduler import Job, DONE, FINAL_STATES
+from .outputs import OutputNamer
+
+API_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Number of events kept for clients that reconnect with `Last-Event-ID`
+EVENT_HISTORY = 1000
+# Seconds between keep-alive comments on an idle event stream
+HEARTBEAT_INTERVAL = 15.0
+# Seconds a request waits for the GUI thread before giving up
+CALL_TIMEOUT = 10.0
+MAX_BODY_SIZE = 1024 * 1024
+
+ALLOWED_HOSTS = ("127.0.0.1", "localhost", "[::1]")
+
+
+class ApiError(Exception):
+    """An error that is reported to the client with an HTTP status code."""
+
+    def __init__(self, status: int, message: str):
+        """Initializes the error with an HTTP status code and a message."""
+        super().__init__(message)
+        self.status = status
+
+
+class _Call:
+    """A function call marshalled to the server's thread, with its result."""
+
+    def __init__(self, fn: Callable, args: tuple):
+        """Initializes the call."""
+        self.fn = fn
+        self.args = args
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[Exception] = None
+
+
+class JobApiServer(QObject):
+    """Serves the jobs of an `UpscaleEngine` over HTTP on localhost."""
+
+    log = pyqtSignal(str)
+    _call_requested = pyqtSignal(object)
+
+    def __init__(
+        self,
+        engine,
+        settings_provider: Callable[[], Dict[str, Any]],
+        output_folder_provider: Optional[Callable[[], Optional[str]]] = None,
+        submit: Optional[Callable[..., Optional[str]]] = None,
+        port: int = DEFAULT_PORT,
+        parent: Optional[QObject] = None,
+        outputs: Optional[OutputNamer] = None,
+    ):
+        """
+        Initializes the server. It does not listen until `start` is called.
+
+        Args:
+            engine: The `UpscaleEngine` whose jobs are served.
+            settings_provider: Returns the current settings; submitted settings
+                override these.
+            output_folder_provider: Returns the output folder used when a
+                submission does not name one.
+            submit: Called as `submit(file_path, output_path, settings, priority)`
+                to queue a job, returning its id (or None if it was skipped).
+                Defaults to submitting directly to the engine.
+            port: The port to listen on, or 0 for any free port.
+            parent: The parent object.
+            outputs: Names the outputs of submitted files, so they do not
+                overwrite each other; shared with other job sources if given.
+        """
+        super().__init__(parent)
+        self.engine = engine
+        self.settings_provider = settings_provider
+        self.output_folder_provider = output_folder_provider or (lambda: None)
+        self.submit = submit or self._submit_to_engine
+        self.outputs = outputs or OutputNamer()
+        self.port = port
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._condition = threading.Condition()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._status: Dict[str, Any] = {"overall": 0, "elapsed": 0.0, "eta": None}
+        self._events = deque(maxlen=EVENT_HISTORY)
+        self._sequence = 0
+
+        self._call_requested.connect(self._run_call, Qt.ConnectionType.QueuedConnection)
+        engine.job_started.connect(self._on_job_started)
+        engine.job_waiting.connect(self._on_job_waiting)
+        engine.job_finished.connect(self._on_job_finished)
+        engine.progress.updated.connect(self._on_progress)
+
+    def start(self) -> int:
+        """
+        Starts listening on a background thread.
+
+        Returns:
+            The port the server listens on.
+        """
+        self._httpd = ThreadingHTTPServer((API_HOST, self.port), _ApiHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.api = self
+        self.port = self._httpd.server_address[1]
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="api-server", daemon=True
+        )
+        self._thread.start()
+        self.log.emit(f"HTTP API listening on http://{API_HOST}:{self.port}")
+        return self.port
+
+    def stop(self):
+        """Stops the server and ends all event streams."""
+        if self._httpd is None:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join(2)
+        self._httpd = None
+
+    # Engine observers (run on the server's thread)
+
+    def _record(self, job: Job) -> Dict[str, Any]:
+        """Creates or refreshes the record of a job from the scheduler."""
+        with self._condition:
+            record = self._jobs.setdefault(
+                job.job_id,
+                {
+                    "id": job.job_id,
+                    "file": job.file_path,
+                    "output": job.output_path,
+                    "submitted_at": time.time(),
+                    "percent": 0,
+                    "done": 0,
+                    "total": 0,
+                    "rate": 0.0,
+                    "eta": None,
+                },
+            )
+            record.update(
+                {
+                    "state": job.state,
+                    "priority": job.priority,
+                    "started_at": job.started_at,
+                    "finished_at": job.finished_at,
+                    "timings": dict(job.timings),
+                    "error": job.error,
+                    "waiting": job.waiting,
+                }
+            )
+            if job.state == DONE:
+                record["percent"] = 100
+            self._push_event("job", dict(record))
+            return dict(record)
+
+    def _on_job_started(self, job_id: str):
+        """Records the start of a job."""
+        job = self.engine.scheduler.get(job_id)
+        if job:
+            self._record(job)
+
+    def _on_job_waiting(self, job_id: str, reason: str):
+        """Records why a queued job is held back."""
+        job = self.engine.scheduler.get(job_id)
+        if job:
+            self._record(job)
+
+    def _on_job_finished(self, job_id: str, state: str):
+        """Records the final state of a job."""
+        job = self.engine.scheduler.get(job_id)
+        if job:
+            self._record(job)
+
+    def _on_progress(self, snapshot: Dict[str, Any]):
+        """Records a progress snapshot and streams it to event clients."""
+        jobs = {}
+        with self._condition:
+            for job_id, progress in snapshot["jobs"].items():
+                record = self._jobs.get(job_id)
+                if record is None:
+                    continue
+                record.update(
+                    {key: progress[key] for key in ("percent", "done", "total")}
+                )
+                record["rate"] = progress["rate"]
+                record["eta"] = progress["eta"]
+                worker = self.engine.workers.get(job_id)
+                if worker is not None:
+                    record["timings"] = dict(worker.stage_timings)
+                jobs[job_id] = {
+                    key: record[key]
+                    for key in ("percent", "done", "total", "rate", "eta", "timings")
+                }
+            self._status = {
+                "overall": snapshot["overall"],
+                "elapsed": snapshot["elapsed"],
+                "eta": snapshot["eta"],
+            }
+            self._push_event("progress", dict(self._status, jobs=jobs))
+
+    def _push_event(self, kind: str, data: Dict[str, Any]):
+        """Appends an event and wakes up the event streams. Requires the lock."""
+        self._sequence += 1
+        self._events.append((self._sequence, kind, data))
+        self._condition.notify_all()
+
+    # Calls from request threads
+
+    def call(self, fn: Callable, *args):
+        """Runs a function on the server's thread and returns its result."""
+        if QThread.currentThread() == self.thread():
+            return fn(*args)
+        call = _Call(fn, args)
+        self._call_requested.emit(call)
+        if not call.done.wait(CALL_TIMEOUT):
+            raise ApiError(503, "The application did not respond in time")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def _run_call(self, call: _Call):
+        """Runs a marshalled call."""
+        try:
+            call.result = call.fn(*call.args)
+        except Exception as e:
+            call.error = e
+        finally:
+            call.done.set()
+
+    def status(self) -> Dict[str, Any]:
+        """Returns the overall progress and the number of jobs in each state."""
+        with self._condition:
+            counts = {}
+            for record in self._jobs.values():
+                counts[record["state"]] = counts.get(record["state"], 0) + 1
+            return dict(self._status, running=self.engine.running, jobs=counts)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Returns the records of all jobs."""
+        with self._condition:
+            return [dict(record) for record in self._jobs.values()]
+
+    def get_job(self, job_id: str) -> Dict[str, Any]:
+        """Returns the record of a job."""
+        with self._condition:
+            record = self._jobs.get(job_id)
+            if record is None:
+                raise ApiError(404, f"Unknown job: {job_id}")
+            return dict(record)
+
+    def submit_jobs(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Validates a submission and queues its files.
+
+        Args:
+            payload: A JSON object with `files` (absolute paths) and optionally
+                `output_folder`, `priority` and `settings`.
+
+        Returns:
+            The records of the queued jobs; skipped files are reported with
+            `state` set to "skipped".
+        """
+        files = payload.get("files")
+        if isinstance(payload.get("file"), str):
+            files = [payload["file"]]
+        if not isinstance(files, list) or not files:
+            raise ApiError(400, "'files' must be a non-empty list of paths")
+        for file_path in files:
+            if not isinstance(file_path, str) or not os.path.isabs(file_path):
+                raise ApiError(400, f"Not an absolute path: {file_path!r}")
+            if not os.path.isfile(file_path):
+                raise ApiError(400, f"File not found: {file_path}")
+        priority = payload.get("priority", 0)
+        if not isinstance(priority, int):
+            raise ApiError(400, "'priority' must be an integer")
+        overrides = payload.get("settings", {})
+        if not isinstance(overrides, dict):
+            raise ApiError(400, "'settings' must be an object")
+        return self.call(
+            self._submit_files, files, payload.get("output_folder"), priority, overrides
+        )
+
+    def _submit_files(
+        self,
+        files: List[str],
+        output_folder: Optional[str],
+        priority: int,
+        overrides: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """Queues validated files. Runs on the server's thread."""
+        settings = self.settings_provider()
+        unknown = sorted(set(overrides) - set(settings))
+        if unknown:
+            raise ApiError(400, f"Unknown settings: {', '.join(unknown)}")
+        settings.update(overrides)
+        output_folder = output_folder or self.output_folder_provider()
+        if not output_folder:
+            raise ApiError(400, "'output_folder' is required")
+        os.makedirs(output_folder, exist_ok=True)
+
+        results = []
+        for file_path in files:
+            output_path = self.outputs.claim(file_path, output_folder, settings)
+            job_id = self.submit(file_path, output_path, settings, priority)
+            job = self.engine.scheduler.get(job_id) if job_id else None
+            if job is None:
+                results.append(
+                    {"file": file_path, "output": output_path, "state": "skipped"}
+                )
+                continue
+            results.append(self._record(job))
+            self.log.emit(f"API: queued {os.path.basename(file_path)}")
+        return results
+
+    def _submit_to_engine(
+        self,
+        file_path: str,
+        output_path: str,
+        settings: Dict[str, Any],
+        priority: int,
+    ) -> str:
+        """Queues a job directly on the engine and starts it if it is idle."""
+        if not self.engine.running:
+            self.engine.configure(settings)
+        job = self.engine.submit(file_path, output_path, settings, priority=priority)
+        if not self.engine.running:
+            self.engine.start()
+        return job.job_id
+
+    def cancel_job(self, job_id: str) -> Dict[str, Any]:
+        """Cancels a job and returns its record."""
+        record = self.get_job(job_id)
+        if record["state"] in FINAL_STATES:
+            raise ApiError(409, f"Job {job_id} has already finished")
+        if not self.call(self.engine.cancel, job_id):
+            raise ApiError(409, f"Job {job_id} cannot be cancelled")
+        return self.get_job(job_id)
+
+    def wait_events(self, after: int, timeout: float) -> Optional[List[tuple]]:
+        """
+        Waits for events newer than `after`.
+
+        Returns:
+            The new `(id, kind, data)` events (empty on timeout), or None once the
+            server is stopping.
+        """
+        with self._condition:
+            if self._running and self._sequence <= after:
+                self._condition.wait(timeout)
+            if not self._running:
+                return None
+            return [event for event in self._events if event[0] > after]
+
+    def last_event_id(self) -> int:
+        """Returns the id of the most recent event."""
+        with self._condition:
+            return self._sequence
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """Routes HTTP requests to the `JobApiServer`."""
+
+    server_version = "sharpify-api/1.0"
+
+    @property
+    def api(self) -> JobApiServer:
+        """The server this request belongs to."""
+        return self.server.api
+
+    def log_message(self, format, *args):
+        """Suppresses the default request logging to stderr."""
+
+    def _check_host(self):
+        """Rejects requests for other host names, e.g. from DNS rebinding pages."""
+        host = (self.headers.get("Host") or "").rsplit(":", 1)[0]
+        if host not in ALLOWED_HOSTS:
+            raise ApiError(403, "Forbidden host")
+
+    def _send_json(self, status: int, data: Any):
+        """Sends a JSON response."""
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        """Reads a JSON object from the request body."""
+        # Requiring JSON forces a CORS preflight for browser requests, so web
+        # pages cannot submit jobs
+        if self.headers.get_content_type() != "application/json":
+            raise ApiError(415, "Content-Type must be application/json")
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise ApiError(400, "Invalid Content-Length")
+        if length < 0:
+            raise ApiError(400, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise ApiError(413, "Request body too large")
+        try:
+            data = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ApiError(400, "Invalid JSON")
+        if not isinstance(data, dict):
+            raise ApiError(400, "Expected a JSON object")
+        return data
+
+    def _handle(self, method: str):
+        """Dispatches a request and converts errors into JSON responses."""
+        try:
+            self._check_host()
+            path = self.path.split("?", 1)[0].rstrip("/")
+            match = re.fullmatch(r"/jobs/([^/]+)", path)
+            if method == "GET" and path == "/status":
+                self._send_json(200, self.api.status())
+            elif method == "GET" and path == "/jobs":
+                self._send_json(200, {"jobs": self.api.list_jobs()})
+            elif method == "POST" and path == "/jobs":
+                self._send_json(201, {"jobs": self.api.submit_jobs(self._read_json())})
+            elif method == "GET" and match:
+                self._send_json(200, self.api.get_job(match.group(1)))
+            elif method == "DELETE" and match:
+                self._send_json(200, self.api.cancel_job(match.group(1)))
+            elif method == "GET" and path == "/events":
+                self._stream_events()
+            else:
+                raise ApiError(404, "Not found")
+        except ApiError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def _stream_events(self):
+        """Streams events until the client disconnects or the server stops."""
+        try:
+            after = int(self.headers.get("Last-Event-ID", ""))
+        except ValueError:
+            after = self.api.last_event_id()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        # Start with the current state of all jobs
+        self.wfile.write(self._format_event(after, "jobs", self.api.list_jobs()))
+        self.wfile.flush()
+        while True:
+            events = self.api.wait_events(after, HEARTBEAT_INTERVAL)
+            if events is None:
+                return
+            if not events:
+                self.wfile.write(b": keep-alive\n\n")
+            for event_id, kind, data in events:
+                self.wfile.write(self._format_event(event_id, kind, data))
+                after = event_id
+            self.wfile.flush()
+
+    @staticmethod
+    def _format_event(event_id: int, kind: str, data: Any) -> bytes:
+        """Formats a server-sent event."""
+        return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n".encode(
+            "utf-8"
+        )
+
+    def do_GET(self):
+        """Handles GET requests."""
+        self._handle("GET")
+
+    def do_POST(self):
+        """Handles POST requests."""
+        self._handle("POST")
+
+    def do_DELETE(self):
+        """Handles DELETE requests."""
+        self._handle("DELETE")
@@ -0,0 +1,85 @@
+"""
+This module plans the CPU execution mode, for machines without a usable GPU.
+
+Real-ESRGAN's ncnn builds run on the CPU with `-g -1`. A single process
+scales poorly across many cores, so in CPU mode the work is spread over
+several upscaler processes, each with a few threads (`-j load:proc:save`):
+- `plan_cpu` detects the cores available to this process and splits them
+  into processes and threads per process, unless either is configured.
+- The engine shares one set of process slots between all of a batch's
+  workers. Every Real-ESRGAN call, and every heavy FFmpeg step, holds a slot
+  while it runs, so the machine is never oversubscribed no matter how many
+  jobs are running.
+- FFmpeg steps get the same thread share as one upscaler process (`-threads`),
+  instead of starting a thread per core next to the upscalers.
+- Video frames are upscaled in parallel, one frame per process slot, so a
+  single video uses the whole machine too.
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# Processes used when neither processes nor threads are configured; beyond
+# this, the memory of more processes is better spent on threads
+MAX_AUTO_PROCESSES = 8
+
+
+class CpuPlan(NamedTuple):
+    """How the cores are split between upscaler processes."""
+
+    processes: int
+    threads: int
+
+
+def available_cores() -> int:
+    """Returns the number of cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def is_cpu_mode(settings: Dict[str, Any]) -> bool:
+    """Returns True if the settings select the CPU execution mode."""
+    return not settings.get("use_gpu", True)
+
+
+def plan_cpu(settings: Dict[str, Any], cores: Optional[int] = None) -> CpuPlan:
+    """
+    Splits the cores into upscaler processes and threads per process.
+
+    Args:
+        settings: The upscaling settings; `cpu_processes` and `cpu_threads`
+            override the automatic choice when non-zero.
+        cores: The number of cores, detected if not given.
+
+    Returns:
+        The plan. Processes times threads never exceeds the cores, unless
+        both were configured explicitly.
+    """
+    cores = cores or available_cores()
+    processes = max(0, int(settings.get("cpu_processes") or 0))
+    threads = max(0, int(settings.get("cpu_threads") or 0))
+    if not processes and not threads:
+        processes = min(cores, MAX_AUTO_PROCESSES)
+    if not processes:
+        processes = max(1, cores // threads)
+    if not threads:
+        threads = max(1, cores // processes)
+    return CpuPlan(processes, threads)
+
+
+def create_slots(plan: CpuPlan) -> threading.BoundedSemaphore:
+    """Creates the process slots shared by the workers of a batch."""
+    return threading.BoundedSemaphore(plan.processes)
+
+
+def upscaler_thread_args(plan: CpuPlan) -> List[str]:
+    """Returns the Real-ESRGAN arguments that limit a process to its threads."""
+    # One thread each for loading and saving, the share of cores for inference
+    return ["-j", f"1:{plan.threads}:1"]
+
+
+def ffmpeg_thread_args(plan: Optional[CpuPlan]) -> List[str]:
+    """Returns the FFmpeg arguments that limit it to one process' threads."""
+    return ["-threads", str(plan.threads)] if plan else []
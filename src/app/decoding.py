@@ -0,0 +1,221 @@
+"""
+This module chooses how FFmpeg decodes videos while their frames are extracted.
+
+On HEVC and 10-bit sources, decoding and the conversion of the decoded frames
+to RGB can take a large share of a job. The decoder configuration therefore:
+- Uses a hardware decoder (`-hwaccel`) when FFmpeg offers one that works on
+  this machine and decodes faster than the CPU.
+- Sets the number of decoder threads explicitly, if configured.
+- Converts frames to RGB with the fastest scaler flags. Only the conversion is
+  affected; resizes keep the flags of their own filters.
+
+Which hardware decoder to use is found out once per machine: `probe_decoder`
+times the decoding of a short generated clip with software decoding and with
+every hardware decoder FFmpeg reports. The result is cached in a JSON file
+together with the size and modification time of the FFmpeg executable, so a
+replaced FFmpeg is probed again. Machines without a working hardware decoder
+simply decode in software.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from PyQt6.QtCore import QStandardPaths
+from .media import get_ffmpeg_path
+
+DECODER_FILE = "decoder.json"
+
+HWACCEL_AUTO = "auto"
+HWACCEL_NONE = "none"
+# The hardware decoders that are tried, and offered in the settings
+HWACCEL_CANDIDATES = ("cuda", "qsv", "d3d11va", "dxva2", "videotoolbox", "vaapi")
+
+# Scaler flags of the conversion of decoded frames to RGB
+CONVERT_FLAGS = "fast_bilinear"
+
+# A hardware decoder is only chosen if it is this much faster than the CPU
+MIN_SPEEDUP = 1.1
+# The clip decoded by the probe
+SAMPLE_SIZE = "1920x1080"
+SAMPLE_SECONDS = 4
+
+_lock = threading.Lock()
+# The probed hardware decoder (or "") of every FFmpeg executable
+_probed: Dict[str, str] = {}
+
+
+def list_hwaccels(ffmpeg_path: Optional[str] = None) -> List[str]:
+    """Returns the hardware acceleration methods FFmpeg was built with."""
+    process = subprocess.run(
+        [ffmpeg_path or get_ffmpeg_path(), "-hide_banner", "-hwaccels"],
+        capture_output=True,
+        text=True,
+        errors="replace",
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+    )
+    if process.returncode != 0:
+        return []
+    lines = process.stdout.splitlines()
+    # The methods follow a "Hardware acceleration methods:" heading
+    return [line.strip() for line in lines[1:] if line.strip()]
+
+
+def decode_args(hwaccel: str = "", threads: int = 0) -> List[str]:
+    """
+    Returns the FFmpeg input options that configure the decoder.
+
+    Args:
+        hwaccel: The hardware decoder, or "" to decode in software.
+        threads: The number of decoder threads, or 0 to let FFmpeg decide.
+    """
+    args = []
+    if hwaccel:
+        args.extend(["-hwaccel", hwaccel])
+    if threads:
+        args.extend(["-threads", str(threads)])
+    return args
+
+
+def _make_sample(ffmpeg_path: str, path: str) -> bool:
+    """Encodes the clip the probe decodes, with the first encoder available."""
+    source = f"testsrc2=s={SAMPLE_SIZE}:r=30:d={SAMPLE_SECONDS}"
+    for encoder in (["libx264", "-preset", "ultrafast"], ["mpeg4"]):
+        process = subprocess.run(
+            [ffmpeg_path, "-v", "error", "-y", "-f", "lavfi", "-i", source]
+            + ["-c:v"]
+            + encoder
+            + ["-pix_fmt", "yuv420p", path],
+            capture_output=True,
+            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+        )
+        if process.returncode == 0:
+            return True
+    return False
+
+
+def _time_decode(ffmpeg_path: str, sample: str, hwaccel: str) -> Optional[float]:
+    """Times the decoding and RGB conversion of the sample, or returns None."""
+    cmd = [ffmpeg_path, "-v", "error"] + decode_args(hwaccel)
+    cmd += ["-i", sample, "-sws_flags", CONVERT_FLAGS, "-pix_fmt", "rgb24"]
+    cmd += ["-f", "null", "-"]
+    started = time.perf_counter()
+    process = subprocess.run(
+        cmd,
+        capture_output=True,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+    )
+    if process.returncode != 0:
+        return None
+    return time.perf_counter() - started
+
+
+def probe_decoder(ffmpeg_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Times software decoding and every available hardware decoder.
+
+    Returns:
+        A dictionary with the chosen `hwaccel` ("" for software decoding) and
+        the `timings` in seconds of every candidate ("software" included),
+        None for candidates that failed. `timings` is empty if FFmpeg could
+        not be run.
+    """
+    ffmpeg_path = ffmpeg_path or get_ffmpeg_path()
+    work_dir = tempfile.mkdtemp(prefix="anime_upscaler_decoder_")
+    try:
+        available = set(list_hwaccels(ffmpeg_path))
+        candidates = [name for name in HWACCEL_CANDIDATES if name in available]
+        sample = os.path.join(work_dir, "sample.mp4")
+        if not _make_sample(ffmpeg_path, sample):
+            return {"hwaccel": "", "timings": {}}
+        timings = {"software": _time_decode(ffmpeg_path, sample, "")}
+        for name in candidates:
+            timings[name] = _time_decode(ffmpeg_path, sample, name)
+    except OSError:
+        # FFmpeg could not be run; extraction will report that
+        return {"hwaccel": "", "timings": {}}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    best, best_time = "", timings["software"]
+    for name in candidates:
+        seconds = timings[name]
+        if seconds is None:
+            continue
+        if best_time is None or seconds * MIN_SPEEDUP < best_time:
+            best, best_time = name, seconds
+    return {"hwaccel": best, "timings": timings}
+
+
+def _executable_key(ffmpeg_path: str) -> Dict[str, Any]:
+    """Identifies an FFmpeg executable, so results of another one are ignored."""
+    path = os.path.abspath(ffmpeg_path)
+    try:
+        stat = os.stat(path)
+        return {"ffmpeg": path, "size": stat.st_size, "mtime": stat.st_mtime}
+    except OSError:
+        return {"ffmpeg": path}
+
+
+def load_decoder(cache_path: Optional[str], ffmpeg_path: str) -> Optional[Dict]:
+    """Returns the cached probe result for an FFmpeg executable, or None."""
+    if not cache_path:
+        return None
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("key") != _executable_key(ffmpeg_path):
+        return None
+    return data.get("result")
+
+
+def save_decoder(cache_path: Optional[str], ffmpeg_path: str, result: Dict):
+    """Caches the probe result for an FFmpeg executable."""
+    if not cache_path:
+        return
+    data = {"key": _executable_key(ffmpeg_path), "result": result}
+    try:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        temp_path = cache_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        # The probe is simply repeated next time
+        pass
+
+
+def default_cache_path() -> Optional[str]:
+    """Returns the path of the decoder cache in the application data folder."""
+    data_dir = QStandardPaths.writableLocation(
+        QStandardPaths.StandardLocation.AppDataLocation
+    )
+    return os.path.join(data_dir, DECODER_FILE) if data_dir else None
+
+
+def best_hwaccel(ffmpeg_path: str, cache_path: Optional[str] = None) -> str:
+    """
+    Returns the hardware decoder to use with an FFmpeg executable.
+
+    The decoder is probed the first time it is needed on a machine (see
+    `probe_decoder`); later calls use the cached result. Concurrent callers
+    wait for a running probe instead of probing again.
+
+    Returns:
+        The `-hwaccel` method, or "" to decode in software.
+    """
+    with _lock:
+        if ffmpeg_path not in _probed:
+            result = load_decoder(cache_path, ffmpeg_path)
+            if result is None:
+                result = probe_decoder(ffmpeg_path)
+                if result["timings"]:
+                    save_decoder(cache_path, ffmpeg_path, result)
+            _probed[ffmpeg_path] = result.get("hwaccel", "")
+        return _probed[ffmpeg_path]
@@ -0,0 +1,648 @@
+"""
+This module implements distributed video upscaling, which spreads the frames of
+a video across several machines through a shared directory (e.g. an NFS or SMB
+share mounted on every machine).
+
+It builds on the frame split of `UpscaleWorker._upscale_video`:
+- The coordinator (`DistributedUpscaleWorker`) extracts the frames into a job
+  directory on the share, publishes them in work units of a fixed number of
+  frames, waits for the units to be finished, and reassembles the video.
+- Any number of headless workers (`DistributedWorker`, started with
+  `python main.py --worker <shared folder>`) claim units, upscale their frames
+  with the same fallback chain as a local job, and report them as done.
+
+The queue (`WorkQueue`) is a set of directories holding one small JSON file per
+unit. A unit is claimed by atomically renaming its file from `pending` to
+`claimed`, which works on network file systems where SQLite's locking does not.
+A worker holds a lease on its unit by touching the claimed file regularly; the
+coordinator moves units whose lease has not been renewed for the lease timeout
+back to `pending`, so the frames of a dead worker are picked up by another one.
+Lease expiry is measured with the coordinator's own clock, so clock skew
+between machines does not matter.
+
+Layout of a job directory:
+- `job.json`: The job's settings, status and lease timeout.
+- `frames/`, `upscaled/`: The extracted and upscaled frames.
+- `units/pending|claimed|done|failed/<unit>.json`: The work units.
+- `units/reports/<unit>.json`: The outcomes of frames that needed a fallback.
+"""
+
+import os
+import json
+import time
+import shutil
+import socket
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from PyQt6.QtCore import Qt
+from .workers import (
+    UpscaleWorker,
+    FRAME_OK,
+    FRAME_DUPLICATED,
+    FRAME_DUPLICATED_NEXT,
+)
+
+JOB_FILE = "job.json"
+FRAMES_DIR = "frames"
+UPSCALED_DIR = "upscaled"
+UNITS_DIR = "units"
+
+PENDING = "pending"
+CLAIMED = "claimed"
+DONE = "done"
+FAILED = "failed"
+REPORTS = "reports"
+
+JOB_RUNNING = "running"
+JOB_FINISHED = "finished"
+JOB_CANCELLED = "cancelled"
+
+# Frames per work unit
+DEFAULT_UNIT_SIZE = 50
+# Seconds a claimed unit may go without a lease renewal before it is reclaimed
+DEFAULT_LEASE_TIMEOUT = 60
+# Claims of a unit (including reclaims) before it is given up
+DEFAULT_MAX_ATTEMPTS = 3
+# Seconds between checks of the queue by the coordinator
+COORDINATOR_POLL_INTERVAL = 0.5
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    """Atomically writes a JSON file, through a hidden temporary file next to it."""
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    """Reads a JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_job(job_dir: str) -> Optional[Dict[str, Any]]:
+    """Returns the description of a job, or None if it is missing or unreadable."""
+    try:
+        return _read_json(os.path.join(job_dir, JOB_FILE))
+    except (OSError, ValueError):
+        return None
+
+
+def write_job(job_dir: str, job: Dict[str, Any]):
+    """Writes the description of a job."""
+    _write_json(os.path.join(job_dir, JOB_FILE), job)
+
+
+class WorkQueue:
+    """A queue of work units stored as files in a shared directory."""
+
+    def __init__(self, root: str):
+        """
+        Initializes the queue, creating its directories if needed.
+
+        Args:
+            root: The directory holding the queue, usually `<job>/units`.
+        """
+        self.root = root
+        for state in (PENDING, CLAIMED, DONE, FAILED, REPORTS):
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+        # Claimed units as seen by the coordinator: id -> (mtime, seen since)
+        self._leases: Dict[str, Tuple[float, float]] = {}
+
+    def _path(self, state: str, unit_id: str) -> str:
+        """Returns the path of a unit's file in a state directory."""
+        return os.path.join(self.root, state, f"{unit_id}.json")
+
+    def units(self, state: str) -> List[str]:
+        """Returns the ids of the units in a state, in order."""
+        try:
+            names = os.listdir(os.path.join(self.root, state))
+        except FileNotFoundError:
+            return []
+        return sorted(
+            name[: -len(".json")]
+            for name in names
+            if name.endswith(".json") and not name.startswith(".")
+        )
+
+    def read(self, state: str, unit_id: str) -> Dict[str, Any]:
+        """Reads a unit in a state."""
+        return _read_json(self._path(state, unit_id))
+
+    def publish(self, unit_id: str, frames: List[str]):
+        """Adds a unit of frames to the pending units."""
+        _write_json(
+            self._path(PENDING, unit_id),
+            {"id": unit_id, "frames": frames, "attempts": 0, "worker": None},
+        )
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Claims the first pending unit.
+
+        Returns:
+            The claimed unit, or None if no unit is pending.
+        """
+        for unit_id in self.units(PENDING):
+            try:
+                os.rename(self._path(PENDING, unit_id), self._path(CLAIMED, unit_id))
+            except OSError:
+                # Claimed by another worker first
+                continue
+            try:
+                unit = self.read(CLAIMED, unit_id)
+                unit["worker"] = worker_id
+                # Rewriting the file also starts the lease
+                _write_json(self._path(CLAIMED, unit_id), unit)
+            except (OSError, ValueError):
+                continue
+            return unit
+        return None
+
+    def renew(self, unit_id: str) -> bool:
+        """
+        Renews the lease on a claimed unit.
+
+        Returns:
+            False if the unit is no longer claimed, i.e. the lease was lost.
+        """
+        try:
+            os.utime(self._path(CLAIMED, unit_id))
+            return True
+        except OSError:
+            return False
+
+    def write_report(self, unit_id: str, outcomes: Dict[str, str]):
+        """Records the outcomes of the frames of a unit that needed a fallback."""
+        _write_json(os.path.join(self.root, REPORTS, f"{unit_id}.json"), outcomes)
+
+    def reports(self) -> Dict[str, str]:
+        """Returns the recorded frame outcomes of all units."""
+        outcomes = {}
+        for name in os.listdir(os.path.join(self.root, REPORTS)):
+            if name.endswith(".json") and not name.startswith("."):
+                try:
+                    outcomes.update(_read_json(os.path.join(self.root, REPORTS, name)))
+                except (OSError, ValueError):
+                    pass
+        return outcomes
+
+    def complete(self, unit_id: str) -> bool:
+        """
+        Marks a claimed unit as done.
+
+        Returns:
+            False if the lease was lost and the unit is no longer claimed.
+        """
+        try:
+            os.rename(self._path(CLAIMED, unit_id), self._path(DONE, unit_id))
+            return True
+        except OSError:
+            return False
+
+    def release(
+        self,
+        unit_id: str,
+        error: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> Optional[str]:
+        """
+        Returns a claimed unit to the pending units.
+
+        Without an error, the claim does not count as an attempt (e.g. the worker
+        is shutting down). With an error, a unit that has used up its attempts is
+        moved to the failed units instead.
+
+        Returns:
+            The new state of the unit, or None if it was no longer claimed.
+        """
+        return self._return(unit_id, error, 1 if error else 0, max_attempts)
+
+    def reclaim_expired(
+        self,
+        lease_timeout: float,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        now: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Returns units whose lease expired to the pending units.
+
+        A lease has expired when the claimed file's modification time has not
+        changed for `lease_timeout` seconds of the caller's clock.
+
+        Returns:
+            The ids of the reclaimed units.
+        """
+        now = time.time() if now is None else now
+        claimed = self.units(CLAIMED)
+        for unit_id in list(self._leases):
+            if unit_id not in claimed:
+                del self._leases[unit_id]
+        reclaimed = []
+        for unit_id in claimed:
+            try:
+                mtime = os.stat(self._path(CLAIMED, unit_id)).st_mtime
+            except OSError:
+                continue
+            previous = self._leases.get(unit_id)
+            if previous is None or previous[0] != mtime:
+                self._leases[unit_id] = (mtime, now)
+            elif now - previous[1] >= lease_timeout:
+                del self._leases[unit_id]
+                if self._return(unit_id, "lease expired", 1, max_attempts):
+                    reclaimed.append(unit_id)
+        return reclaimed
+
+    def _return(
+        self, unit_id: str, error: Optional[str], attempts: int, max_attempts: int
+    ) -> Optional[str]:
+        """Moves a claimed unit back to pending (or to failed), counting an attempt."""
+        # Take the unit away from its worker first, so a late `complete` fails
+        # instead of racing with the rewrite below
+        hidden = os.path.join(self.root, CLAIMED, f".{unit_id}.{os.getpid()}.return")
+        try:
+            os.rename(self._path(CLAIMED, unit_id), hidden)
+        except OSError:
+            return None
+        try:
+            unit = _read_json(hidden)
+        except (OSError, ValueError):
+            unit = {"id": unit_id, "frames": [], "attempts": 0}
+        unit["attempts"] = unit.get("attempts", 0) + attempts
+        unit["worker"] = None
+        if error:
+            unit["error"] = error
+        state = FAILED if unit["attempts"] >= max_attempts else PENDING
+        _write_json(hidden, unit)
+        os.rename(hidden, self._path(state, unit_id))
+        return state
+
+
+class DistributedUpscaleWorker(UpscaleWorker):
+    """
+    Upscales a video by distributing its frames to workers on other machines.
+
+    Used by the engine instead of `UpscaleWorker` for videos when the
+    `distributed_dir` setting is set. Extraction and reassembly run locally;
+    the frames are upscaled by `DistributedWorker` processes.
+    """
+
+    # The frames are read by other machines over the network, where their size
+    # matters more than the time spent compressing them
+    frame_compression = None
+
+    def _create_work_dir(self) -> str:
+        """Creates the job directory in the shared folder."""
+        shared_dir = self.settings["distributed_dir"]
+        os.makedirs(shared_dir, exist_ok=True)
+        return tempfile.mkdtemp(prefix="job_", dir=shared_dir)
+
+    def _upscale_frames(self, frames_dir: str, upscaled_dir: str):
+        """
+        Publishes the frames as work units and waits until workers have upscaled them.
+
+        Units whose lease expires are reclaimed. Frames that are still missing
+        at the end, e.g. from units that failed on every attempt, are replaced
+        with a copy of the previous frame, as for a local job.
+        """
+        frame_files = sorted(f for f in os.listdir(frames_dir) if f.endswith(".png"))
+        if not frame_files:
+            raise RuntimeError("No frames were extracted from the video")
+
+        # The coordinator does not need Real-ESRGAN itself; without it (and
+        # without the batch's registry), the workers validate the model
+        if self.models is not None or self._find_realesrgan_executable():
+            self._ensure_model(self._find_realesrgan_executable())
+
+        job_dir = os.path.dirname(frames_dir)
+        unit_size = max(
+            1, self.settings.get("distributed_unit_size", DEFAULT_UNIT_SIZE)
+        )
+        lease_timeout = self.settings.get("distributed_lease", DEFAULT_LEASE_TIMEOUT)
+        queue = WorkQueue(os.path.join(job_dir, UNITS_DIR))
+        unit_frames = {}
+        for number, start in enumerate(range(0, len(frame_files), unit_size)):
+            unit_id = f"unit_{number:06d}"
+            unit_frames[unit_id] = frame_files[start : start + unit_size]
+            queue.publish(unit_id, unit_frames[unit_id])
+
+        job = {
+            "file": os.path.basename(self.file_path),
+            "coordinator": socket.gethostname(),
+            "created_at": time.time(),
+            # Workers use the model variant chosen for the target resolution
+            "settings": dict(self.settings, model=self.model, scale=self.scale),
+            "lease_timeout": lease_timeout,
+            "max_attempts": DEFAULT_MAX_ATTEMPTS,
+            "status": JOB_RUNNING,
+        }
+        # The job becomes visible to workers once all units are published
+        write_job(job_dir, job)
+        self.signals.log.emit(
+            f"Published {len(unit_frames)} work units ({len(frame_files)} frames) "
+            f"to {job_dir}; waiting for workers"
+        )
+
+        self.frame_report = {"total": len(frame_files), "frames": {}}
+        try:
+            while not self.is_cancelled:
+                for unit_id in queue.reclaim_expired(lease_timeout):
+                    self.signals.log.emit(
+                        f"Reclaimed {unit_id} from an unresponsive worker"
+                    )
+                done = queue.units(DONE)
+                failed = queue.units(FAILED)
+                finished_frames = sum(len(unit_frames[u]) for u in done)
+                latest = None
+                if done:
+                    latest = os.path.join(upscaled_dir, unit_frames[done[-1]][-1])
+                self._report_progress(finished_frames, len(frame_files), latest)
+                if len(done) + len(failed) == len(unit_frames):
+                    break
+                time.sleep(COORDINATOR_POLL_INTERVAL)
+        finally:
+            job["status"] = JOB_CANCELLED if self.is_cancelled else JOB_FINISHED
+            try:
+                write_job(job_dir, job)
+            except OSError:
+                pass
+        if self.is_cancelled:
+            return
+
+        for unit_id in failed:
+            unit = queue.read(FAILED, unit_id)
+            self.signals.log.emit(
+                f"Warning: {unit_id} failed on every attempt: {unit.get('error')}"
+            )
+        self.frame_report["frames"].update(queue.reports())
+        self._fill_missing_frames(frame_files, upscaled_dir)
+        if self.frame_report["frames"]:
+            self.signals.log.emit(self._format_frame_report())
+
+    def _fill_missing_frames(self, frame_files: List[str], upscaled_dir: str):
+        """
+        Replaces frames no worker delivered with a copy of the previous frame,
+        or of the next one for missing frames at the start of the video.
+
+        Raises:
+            RuntimeError: If no worker delivered a single frame.
+        """
+        previous_output = None
+        leading_missing: List[str] = []
+        for frame_file in frame_files:
+            output_path = os.path.join(upscaled_dir, frame_file)
+            if not os.path.isfile(output_path):
+                if previous_output:
+                    shutil.copyfile(previous_output, output_path)
+                    self.frame_report["frames"][frame_file] = FRAME_DUPLICATED
+                else:
+                    leading_missing.append(frame_file)
+                    continue
+            previous_output = output_path
+            for missing_file in leading_missing:
+                shutil.copyfile(output_path, os.path.join(upscaled_dir, missing_file))
+                self.frame_report["frames"][missing_file] = FRAME_DUPLICATED_NEXT
+            leading_missing = []
+        if leading_missing:
+            raise RuntimeError("No frame of the video could be upscaled")
+
+
+class DistributedWorker:
+    """
+    Claims work units from the jobs in a shared folder and upscales their frames.
+
+    The worker runs in the foreground until `stop` is called, e.g. from a signal
+    handler, and needs no Qt event loop.
+    """
+
+    def __init__(
+        self,
+        shared_dir: str,
+        worker_id: Optional[str] = None,
+        poll_interval: float = 2.0,
+        log: Optional[Callable[[str], None]] = None,
+        settings: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Initializes the worker.
+
+        Args:
+            shared_dir: The shared folder coordinators publish their jobs in.
+            worker_id: The name recorded in claimed units; defaults to the host
+                name and process id.
+            poll_interval: Seconds to wait before looking for work again when
+                no unit is pending.
+            log: Called with every log message; defaults to printing it.
+            settings: Settings of this machine that override the job's, e.g.
+                `use_gpu` and the CPU mode's process and thread counts.
+        """
+        self.shared_dir = shared_dir
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.log = log or (lambda message: print(message, flush=True))
+        self.settings = settings or {}
+        self._stop_event = threading.Event()
+        self._upscaler: Optional[UpscaleWorker] = None
+
+    def stop(self):
+        """Stops after releasing the current unit, without blocking."""
+        self._stop_event.set()
+        upscaler = self._upscaler
+        if upscaler is not None:
+            upscaler.cancel()
+
+    def run(self, stop_when_idle: bool = False) -> int:
+        """
+        Processes units until stopped.
+
+        Args:
+            stop_when_idle: Return as soon as no unit is pending, instead of
+                waiting for new work.
+
+        Returns:
+            The number of units completed.
+        """
+        self.log(f"Worker {self.worker_id} waiting for work in {self.shared_dir}")
+        completed = 0
+        while not self._stop_event.is_set():
+            claimed = self._claim()
+            if claimed is None:
+                if stop_when_idle:
+                    break
+                self._stop_event.wait(self.poll_interval)
+                continue
+            if self._process(*claimed):
+                completed += 1
+        return completed
+
+    def _jobs(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Returns the running jobs in the shared folder, oldest first."""
+        jobs = []
+        try:
+            names = os.listdir(self.shared_dir)
+        except OSError:
+            return []
+        for name in names:
+            job_dir = os.path.join(self.shared_dir, name)
+            job = read_job(job_dir)
+            if job is not None and job.get("status") == JOB_RUNNING:
+                jobs.append((job_dir, job))
+        return sorted(jobs, key=lambda item: item[1].get("created_at", 0))
+
+    def _claim(self) -> Optional[Tuple[str, Dict[str, Any], WorkQueue, Dict[str, Any]]]:
+        """Claims the next pending unit of any running job."""
+        for job_dir, job in self._jobs():
+            try:
+                queue = WorkQueue(os.path.join(job_dir, UNITS_DIR))
+                unit = queue.claim(self.worker_id)
+            except OSError:
+                # The job was finished and removed meanwhile
+                continue
+            if unit is not None:
+                return job_dir, job, queue, unit
+        return None
+
+    def _process(
+        self,
+        job_dir: str,
+        job: Dict[str, Any],
+        queue: WorkQueue,
+        unit: Dict[str, Any],
+    ) -> bool:
+        """
+        Upscales the frames of a claimed unit while keeping its lease alive.
+
+        Returns:
+            True if the unit was completed.
+        """
+        unit_id = unit["id"]
+        self.log(
+            f"Claimed {unit_id} of {job.get('file')} ({len(unit['frames'])} frames)"
+        )
+        upscaler = UpscaleWorker("", "", dict(job["settings"], **self.settings))
+        # The worker runs without a Qt event loop, so a queued connection would
+        # never deliver the messages of the frame threads
+        upscaler.signals.log.connect(self.log, Qt.ConnectionType.DirectConnection)
+        self._upscaler = upscaler
+
+        lease_lost = threading.Event()
+        finished = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._renew_lease,
+            args=(
+                queue,
+                unit_id,
+                job.get("lease_timeout", DEFAULT_LEASE_TIMEOUT) / 4,
+                finished,
+                lease_lost,
+                upscaler,
+            ),
+            daemon=True,
+        )
+        heartbeat.start()
+        outcomes = {}
+        error = None
+
+        def upscale(frame_file: str) -> Optional[str]:
+            if self._stop_event.is_set() or lease_lost.is_set():
+                return None
+            return self._upscale_frame(
+                upscaler,
+                realesrgan_path,
+                os.path.join(job_dir, FRAMES_DIR, frame_file),
+                os.path.join(job_dir, UPSCALED_DIR, frame_file),
+            )
+
+        # In CPU mode, the unit's frames are upscaled by several processes
+        parallel = upscaler.cpu_plan.processes if upscaler.cpu_plan else 1
+        try:
+            realesrgan_path = self._prepare_upscaler(upscaler)
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                frames = unit["frames"]
+                try:
+                    for frame_file, outcome in zip(
+                        frames, executor.map(upscale, frames)
+                    ):
+                        if outcome not in (None, FRAME_OK):
+                            outcomes[frame_file] = outcome
+                except Exception:
+                    # Skip the queued frames instead of waiting for them
+                    upscaler.cancel()
+                    raise
+        except Exception as e:
+            error = str(e)
+        finally:
+            finished.set()
+            heartbeat.join()
+            self._upscaler = None
+
+        if error and not lease_lost.is_set():
+            self.log(f"Error: {unit_id} failed: {error}")
+            queue.release(unit_id, error, job.get("max_attempts", DEFAULT_MAX_ATTEMPTS))
+            return False
+        if lease_lost.is_set():
+            self.log(f"Warning: Lost the lease on {unit_id}; it was reassigned")
+            return False
+        if self._stop_event.is_set():
+            queue.release(unit_id)
+            self.log(f"Released {unit_id}")
+            return False
+        try:
+            if outcomes:
+                queue.write_report(unit_id, outcomes)
+        except OSError:
+            pass
+        if not queue.complete(unit_id):
+            self.log(f"Warning: Lost the lease on {unit_id}; it was reassigned")
+            return False
+        self.log(f"✓ Completed {unit_id}")
+        return True
+
+    def _renew_lease(
+        self,
+        queue: WorkQueue,
+        unit_id: str,
+        interval: float,
+        finished: threading.Event,
+        lease_lost: threading.Event,
+        upscaler: UpscaleWorker,
+    ):
+        """Renews the lease on a unit until it is finished, stopping work if it is lost."""
+        while not finished.wait(interval):
+            if not queue.renew(unit_id):
+                lease_lost.set()
+                upscaler.cancel()
+                return
+
+    def _prepare_upscaler(self, upscaler: UpscaleWorker) -> str:
+        """
+        Finds Real-ESRGAN and resolves the job's model once per unit, before
+        its frames are upscaled in parallel.
+
+        Returns:
+            The path of the Real-ESRGAN executable.
+        """
+        realesrgan_path = upscaler._find_realesrgan_executable()
+        if not realesrgan_path:
+            raise FileNotFoundError("Real-ESRGAN executable not found")
+        upscaler._ensure_model(realesrgan_path)
+        return realesrgan_path
+
+    def _upscale_frame(
+        self,
+        upscaler: UpscaleWorker,
+        realesrgan_path: str,
+        input_path: str,
+        output_path: str,
+    ) -> str:
+        """
+        Upscales a single frame with the fallbacks of a local job.
+
+        Returns:
+            One of the `FRAME_*` outcome constants.
+        """
+        return upscaler._upscale_frame(realesrgan_path, input_path, output_path)
@@ -0,0 +1,168 @@
+"""
+This module defines the encoder settings of the output images.
+
+Real-ESRGAN writes JPEG, PNG and WebP itself, but without any control over the
+encoder. When the encoder settings ask for more, or for a format Real-ESRGAN
+cannot write, the upscaler writes a lossless PNG instead and FFmpeg encodes the
+output from it in a single pass, applying:
+- JPEG quality (1-100).
+- PNG compression level (0-9), which only trades file size for encode time.
+- WebP quality, lossless mode and compression effort (0-6).
+
+`benchmark_encoders` measures the file size and encode time of the presets of
+every format on a sample image, so those trade-offs can be compared.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from .media import get_ffmpeg_path
+
+# The formats Real-ESRGAN writes itself
+NATIVE_FORMATS = ("jpg", "png", "webp")
+OUTPUT_FORMATS = ("jpg", "png", "webp", "tiff", "bmp")
+
+# JPEG quality used when FFmpeg encodes a JPEG without a configured quality
+DEFAULT_JPEG_QUALITY = 95
+
+# (format, label, encoder settings) measured by `benchmark_encoders`
+ENCODER_PRESETS: List[Tuple[str, str, Dict[str, Any]]] = [
+    ("jpg", "quality 80", {"jpeg_quality": 80}),
+    ("jpg", "quality 90", {"jpeg_quality": 90}),
+    ("jpg", "quality 95", {"jpeg_quality": 95}),
+    ("png", "compression 1", {"png_compression": 1}),
+    ("png", "compression 6", {"png_compression": 6}),
+    ("png", "compression 9", {"png_compression": 9}),
+    ("webp", "quality 80", {"webp_quality": 80}),
+    ("webp", "quality 90, effort 6", {"webp_quality": 90, "webp_effort": 6}),
+    ("webp", "lossless", {"webp_lossless": True}),
+    ("tiff", "deflate", {}),
+]
+
+
+def output_format(path: str) -> str:
+    """Returns the image format of an output path from its extension."""
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return "jpg" if extension == "jpeg" else extension
+
+
+def needs_encoder(settings: Dict[str, Any]) -> bool:
+    """
+    Returns True if images must be encoded by FFmpeg rather than by Real-ESRGAN.
+
+    That is the case for formats Real-ESRGAN cannot write, and whenever an
+    encoder setting of the output format differs from its default.
+    """
+    fmt = settings.get("format", "jpg")
+    if fmt not in NATIVE_FORMATS:
+        return True
+    if fmt == "jpg":
+        return bool(settings.get("jpeg_quality"))
+    if fmt == "png":
+        return settings.get("png_compression", -1) >= 0
+    return bool(
+        settings.get("webp_quality")
+        or settings.get("webp_lossless")
+        or settings.get("webp_effort", -1) >= 0
+    )
+
+
+def jpeg_qscale(quality: int) -> int:
+    """Maps a JPEG quality of 1-100 to FFmpeg's quantizer scale (31-2)."""
+    quality = min(100, max(1, quality))
+    return round(2 + (100 - quality) * 29 / 99)
+
+
+def encoder_args(fmt: str, settings: Dict[str, Any]) -> List[str]:
+    """
+    Returns the FFmpeg output arguments that encode an image.
+
+    Args:
+        fmt: The output format, e.g. "jpg".
+        settings: The upscaling settings with the encoder settings.
+    """
+    if fmt == "jpg":
+        quality = settings.get("jpeg_quality") or DEFAULT_JPEG_QUALITY
+        return ["-q:v", str(jpeg_qscale(quality))]
+    if fmt == "png":
+        level = settings.get("png_compression", -1)
+        return ["-compression_level", str(level)] if level >= 0 else []
+    if fmt == "webp":
+        args = ["-c:v", "libwebp"]
+        if settings.get("webp_lossless"):
+            args.extend(["-lossless", "1"])
+        if settings.get("webp_quality"):
+            # In lossless mode, the quality sets how hard the encoder tries
+            args.extend(["-quality", str(settings["webp_quality"])])
+        if settings.get("webp_effort", -1) >= 0:
+            args.extend(["-compression_level", str(settings["webp_effort"])])
+        return args
+    if fmt == "tiff":
+        return ["-compression_algo", "deflate"]
+    return []
+
+
+def encode_command(
+    input_path: str,
+    output_path: str,
+    settings: Dict[str, Any],
+    height: Optional[int] = None,
+    ffmpeg_path: Optional[str] = None,
+) -> List[str]:
+    """
+    Builds the FFmpeg command that encodes an image into its output format.
+
+    Args:
+        input_path: The image to encode, usually a lossless PNG.
+        output_path: The output image; its extension selects the format.
+        settings: The upscaling settings with the encoder settings.
+        height: If given, the image is resized to this height while encoding.
+        ffmpeg_path: The FFmpeg executable, found if not given.
+    """
+    cmd = [ffmpeg_path or get_ffmpeg_path(), "-y", "-i", input_path]
+    if height:
+        cmd.extend(["-vf", f"scale=-1:{height}:flags=lanczos"])
+    cmd.extend(encoder_args(output_format(output_path), settings))
+    cmd.append(output_path)
+    return cmd
+
+
+def benchmark_encoders(
+    image_path: str,
+    presets: Optional[List[Tuple[str, str, Dict[str, Any]]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Encodes an image with every preset and measures the size and the time.
+
+    Args:
+        image_path: The sample image, ideally an upscaled output.
+        presets: The `(format, label, settings)` to measure; defaults to
+            `ENCODER_PRESETS`.
+
+    Returns:
+        One row per preset with its `format`, `label`, `size` in bytes and
+        encode `seconds`; `error` is set instead if FFmpeg failed.
+    """
+    rows = []
+    work_dir = tempfile.mkdtemp(prefix="anime_upscaler_encoders_")
+    try:
+        for index, (fmt, label, settings) in enumerate(presets or ENCODER_PRESETS):
+            output_path = os.path.join(work_dir, f"{index}.{fmt}")
+            cmd = encode_command(image_path, output_path, settings)
+            started = time.perf_counter()
+            process = subprocess.run(cmd, capture_output=True, text=True)
+            seconds = time.perf_counter() - started
+            row = {"format": fmt, "label": label}
+            if process.returncode != 0 or not os.path.exists(output_path):
+                lines = process.stderr.strip().splitlines()
+                row["error"] = lines[-1] if lines else "FFmpeg failed"
+            else:
+                row["size"] = os.path.getsize(output_path)
+                row["seconds"] = seconds
+            rows.append(row)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return rows
@@ -0,0 +1,570 @@
+"""
+This module defines the `UpscaleEngine` class, which runs batches of upscaling jobs.
+
+The engine ties the `JobScheduler` to a `QThreadPool` of `UpscaleWorker`s:
+- Files are submitted as `Job`s with an estimated cost (file size for images,
+  probed duration and resolution for videos) and resource footprint. Files
+  are probed on a background pool, so submitting never blocks the GUI; a job
+  is queued with a provisional estimate, which its probe replaces. Until
+  then, the job only starts while nothing else runs, since the governor
+  cannot size it yet.
+- Whenever a lane has a free slot, the scheduler picks the next job and the
+  engine starts a worker for it.
+- In image batch mode (`image_batch_size`), queued images with the same
+  settings join the started image in one `ImageBatchWorker`, which upscales
+  them all with a single Real-ESRGAN call; each still finishes as its own job.
+- Before a job starts, the `ResourceGovernor` checks that its memory and temp
+  disk footprint fits next to the running jobs and that the system load
+  allows another job; otherwise the job waits, with the reason reported
+  through `job_waiting`.
+- Worker signals are translated into per-job signals, so the GUI never needs to
+  know which worker belongs to which file.
+- Worker progress goes to a `ProgressAggregator`, which emits one combined
+  update for the whole batch at a fixed rate.
+- The installed models are indexed once per batch in a `ModelRegistry`, which
+  every worker validates its model against; the measured upscaling speed of
+  every finished job is recorded there for the automatic model selection.
+- In CPU mode, the image lane runs one job per upscaler process, and all
+  workers share one set of process slots (see the `cpu` module), so the
+  cores are never oversubscribed.
+- With a shared folder configured (`distributed_dir`), videos are run by a
+  `DistributedUpscaleWorker`, which has their frames upscaled by worker
+  processes on other machines.
+"""
+
+import os
+import time
+import itertools
+from functools import partial
+from typing import Dict, Any, List, Optional
+from PyQt6.QtCore import (
+    Qt,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    QStandardPaths,
+    QTimer,
+    pyqtSignal,
+)
+from PyQt6.QtGui import QImageReader
+from .scheduler import (
+    Job,
+    JobScheduler,
+    ORDER_FIFO,
+    QUEUED,
+    PAUSED,
+    RUNNING,
+    DONE,
+    FAILED,
+    CANCELLED,
+)
+from .workers import UpscaleWorker
+from .image_batch import ImageBatchWorker, can_batch
+from .distributed import DistributedUpscaleWorker
+from .media import is_video, probe_video
+from .models import ModelRegistry, SPEEDS_FILE, load_model_registry
+from .cpu import is_cpu_mode, plan_cpu, create_slots
+from .progress import ProgressAggregator
+from .governor import Footprint, ResourceGovernor, estimate_footprint
+
+# Milliseconds between admission checks while jobs wait for resources
+ADMISSION_RETRY_INTERVAL = 5000
+# Files probed at the same time; probing is mostly waiting for FFprobe
+PROBE_THREADS = 4
+# The waiting reason of a job whose probe has not arrived yet; it is brief and
+# not reported
+PROBE_PENDING = "Reading file details"
+
+
+def probe_file(file_path: str) -> Dict[str, Any]:
+    """
+    Reads the metadata used to estimate a job.
+
+    Returns:
+        The probed metadata of a video (see `media.probe_video`), or the
+        `width` and `height` of an image; empty if the file cannot be read.
+    """
+    if is_video(file_path):
+        try:
+            return probe_video(file_path)
+        except (OSError, RuntimeError, ValueError):
+            return {}
+    size = QImageReader(file_path).size()
+    if not size.isValid():
+        return {}
+    return {"width": size.width(), "height": size.height()}
+
+
+def estimate_cost(file_path: str, info: Optional[Dict[str, Any]] = None) -> float:
+    """
+    Estimates the relative processing cost of a file.
+
+    Videos are weighted by their probed pixel count over the whole duration; if
+    probing fails, or for images, the file size is used instead.
+
+    Args:
+        file_path: The path to the input file.
+        info: The metadata from `probe_file`, probed if not given.
+    """
+    try:
+        size = float(os.path.getsize(file_path))
+    except OSError:
+        size = 0.0
+    if is_video(file_path):
+        if info is None:
+            info = probe_file(file_path)
+        if info.get("frames") and info.get("width") and info.get("height"):
+            return float(info["frames"] * info["width"] * info["height"])
+        # Without probe data, assume a video costs far more than an image
+        return size * 100
+    return size
+
+
+def _batch_footprint(footprints: List[Footprint]) -> Footprint:
+    """
+    Combines the footprints of the images of a batch.
+
+    One image is upscaled at a time, and the batch's outputs stay in its temp
+    folder until they are moved.
+    """
+    return Footprint(max(f.memory for f in footprints), sum(f.disk for f in footprints))
+
+
+class _ProbeSignals(QObject):
+    """Defines the signals available from a probing task."""
+
+    done = pyqtSignal(str, object)
+
+
+class _ProbeTask(QRunnable):
+    """Probes a submitted file on a pool thread."""
+
+    def __init__(self, job_id: str, file_path: str):
+        """Initializes the task for the given job."""
+        super().__init__()
+        self.job_id = job_id
+        self.file_path = file_path
+        self.signals = _ProbeSignals()
+
+    def run(self):
+        """Probes the file."""
+        self.signals.done.emit(self.job_id, probe_file(self.file_path))
+
+
+class UpscaleEngine(QObject):
+    """
+    Runs queued upscaling jobs through a scheduler and a thread pool.
+
+    All signals are emitted on the GUI thread, except `log`, which is also
+    emitted directly from worker threads.
+    """
+
+    job_started = pyqtSignal(str)
+    job_waiting = pyqtSignal(str, str)
+    job_finished = pyqtSignal(str, str)
+    job_result = pyqtSignal(str, object)
+    log = pyqtSignal(str)
+    batch_finished = pyqtSignal()
+
+    def __init__(self, parent: Optional[QObject] = None):
+        """Initializes the engine with an empty scheduler and a thread pool."""
+        super().__init__(parent)
+        self.scheduler = JobScheduler()
+        self.thread_pool = QThreadPool()
+        self._probe_pool = QThreadPool(self)
+        self._probe_pool.setMaxThreadCount(PROBE_THREADS)
+        # The probing tasks that have not reported back, by job id
+        self._probes: Dict[str, _ProbeTask] = {}
+        self.workers: Dict[str, UpscaleWorker] = {}
+        # The job ids of each running image batch, by the id of its first job
+        self._batches: Dict[str, List[str]] = {}
+        self._ids = itertools.count(1)
+        self.running = False
+        self.progress = ProgressAggregator(parent=self)
+        self.governor = ResourceGovernor()
+        # The waiting reasons already reported, by job id
+        self._waiting: Dict[str, str] = {}
+        self._admission_timer = QTimer(self)
+        self._admission_timer.setSingleShot(True)
+        self._admission_timer.setInterval(ADMISSION_RETRY_INTERVAL)
+        self._admission_timer.timeout.connect(self.dispatch)
+        # The process slots shared by the workers in CPU mode, or None
+        self.cpu_slots = None
+        # The models of the current batch, indexed when it starts
+        self.models: Optional[ModelRegistry] = None
+        data_dir = QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.AppDataLocation
+        )
+        self.model_speeds_path = (
+            os.path.join(data_dir, SPEEDS_FILE) if data_dir else None
+        )
+
+    def configure(self, settings: Dict[str, Any]):
+        """Applies lane limits and ordering from the upscaling settings."""
+        self.scheduler.lane_limits = {
+            "image": max(1, int(settings.get("image_concurrency", 2))),
+            "video": max(1, int(settings.get("video_concurrency", 1))),
+        }
+        self.cpu_slots = None
+        if is_cpu_mode(settings):
+            plan = plan_cpu(settings)
+            # Images are upscaled by one process each, so one job per process
+            # keeps every core busy
+            self.scheduler.lane_limits["image"] = plan.processes
+            self.cpu_slots = create_slots(plan)
+        self.scheduler.order = settings.get("scheduling", ORDER_FIFO)
+        self.governor.configure(settings)
+        self.thread_pool.setMaxThreadCount(sum(self.scheduler.lane_limits.values()))
+
+    def submit(
+        self,
+        file_path: str,
+        output_path: str,
+        settings: Dict[str, Any],
+        priority: int = 0,
+    ) -> Job:
+        """
+        Queues a file for upscaling.
+
+        Args:
+            file_path: The path to the input file.
+            output_path: The path to the output file.
+            settings: A dictionary of upscaling settings.
+            priority: Jobs with a higher priority are started first.
+
+        Returns:
+            The queued job, with a provisional estimate until its file is probed.
+        """
+        job = Job(
+            str(next(self._ids)),
+            file_path,
+            output_path,
+            settings,
+            priority=priority,
+            cost=estimate_cost(file_path, {}),
+        )
+        job.footprint = estimate_footprint(file_path, settings, {})
+        self.scheduler.add(job)
+        task = _ProbeTask(job.job_id, file_path)
+        task.signals.done.connect(self._on_probed)
+        self._probes[job.job_id] = task
+        self._probe_pool.start(task)
+        if self.running:
+            self.progress.set_total(len(self.scheduler.jobs))
+            self.dispatch()
+        return job
+
+    def _on_probed(self, job_id: str, info: Dict[str, Any]):
+        """Replaces the provisional estimate of a job with one from its probe."""
+        self._probes.pop(job_id, None)
+        job = self.scheduler.get(job_id)
+        if job is None:
+            return
+        job.info = info
+        job.cost = estimate_cost(job.file_path, info)
+        # A batch's footprint is held by its first job (see `_take_batch`)
+        if job.batch_id is None:
+            job.footprint = estimate_footprint(job.file_path, job.settings, info)
+        self.dispatch()
+
+    def _admit(self, job: Job, running: List[Job]) -> Optional[str]:
+        """Admits a job through the governor once its file has been probed."""
+        if job.info is None and running:
+            return PROBE_PENDING
+        return self.governor.admit(job, running)
+
+    def start(self):
+        """Starts processing the queued jobs."""
+        self.running = True
+        self.models = load_model_registry(self.model_speeds_path)
+        self.progress.reset(len(self.scheduler.jobs))
+        self.dispatch()
+
+    def dispatch(self):
+        """Starts workers for every job that fits into a free lane slot."""
+        if not self.running:
+            return
+        for job in self.scheduler.next_jobs(self._admit):
+            batch = self._take_batch(job)
+            if len(batch) > 1:
+                self._start_batch(batch)
+            else:
+                self._start_worker(job)
+        self._report_waiting()
+        if self.scheduler.is_idle() and not self.workers:
+            self.running = False
+            self.progress.stop()
+            self.batch_finished.emit()
+
+    def _report_waiting(self):
+        """Reports jobs that the governor holds back and checks them again later."""
+        waiting = False
+        for job in self.scheduler.jobs.values():
+            if job.state != QUEUED or job.waiting in (None, PROBE_PENDING):
+                if self._waiting.pop(job.job_id, None) and job.state == QUEUED:
+                    self.job_waiting.emit(job.job_id, "")
+                continue
+            waiting = True
+            if self._waiting.get(job.job_id) != job.waiting:
+                self._waiting[job.job_id] = job.waiting
+                self.log.emit(f"⏳ {os.path.basename(job.file_path)}: {job.waiting}")
+                self.job_waiting.emit(job.job_id, job.waiting)
+        # Load and finished jobs free resources without a signal
+        if waiting and not self._admission_timer.isActive():
+            self._admission_timer.start()
+
+    def _start_worker(self, job: Job):
+        """Creates and starts a worker for a job."""
+        if job.settings.get("distributed_dir") and is_video(job.file_path):
+            worker_class = DistributedUpscaleWorker
+        else:
+            worker_class = UpscaleWorker
+        worker = worker_class(job.file_path, job.output_path, job.settings)
+        worker.models = self.models
+        if self.cpu_slots is not None and worker.cpu_plan:
+            worker.cpu_slots = self.cpu_slots
+        job_id = job.job_id
+        worker.signals.finished.connect(lambda: self._on_worker_finished(job_id))
+        worker.signals.error.connect(lambda msg: self._on_worker_error(job_id, msg))
+        worker.progress_callback = partial(self.progress.report, job_id)
+        worker.signals.result.connect(
+            lambda result: self.job_result.emit(job_id, result)
+        )
+        # Forward log messages from the worker thread without a queued event per
+        # message; receivers of `log` must be thread-safe (see `LogSink.write`)
+        worker.signals.log.connect(self.log, Qt.ConnectionType.DirectConnection)
+        self.workers[job_id] = worker
+        job.started_at = time.time()
+        self.progress.start_job(job_id, os.path.basename(job.file_path))
+        self.job_started.emit(job_id)
+        self.thread_pool.start(worker)
+
+    def _take_batch(self, job: Job) -> List[Job]:
+        """Adds the queued images that can share a started image's Real-ESRGAN call."""
+        size = job.settings.get("image_batch_size", 0)
+        if (
+            size < 2
+            or job.kind != "image"
+            or not can_batch(job.file_path, job.settings)
+        ):
+            return [job]
+        # The batch's footprint is held by its first job and grows with every
+        # member; members stop joining once it no longer fits next to the
+        # running jobs
+        others = [other for other in self.scheduler.running() if other is not job]
+        footprints = [job.footprint or Footprint(0, 0)]
+        full = False
+
+        def accept(other: Job) -> bool:
+            nonlocal full
+            if (
+                full
+                or other.settings != job.settings
+                or not can_batch(other.file_path, other.settings)
+            ):
+                return False
+            lead_footprint = job.footprint
+            job.footprint = _batch_footprint(
+                footprints + [other.footprint or Footprint(0, 0)]
+            )
+            if self.governor.admit(job, others):
+                job.footprint = lead_footprint
+                full = True
+                return False
+            footprints.append(other.footprint or Footprint(0, 0))
+            return True
+
+        batch = self.scheduler.take_batch(job, size, accept)
+        for member in batch[1:]:
+            member.footprint = None
+        return batch
+
+    def _start_batch(self, batch: List[Job]):
+        """Creates and starts one worker for an image batch."""
+        settings = batch[0].settings
+        worker = ImageBatchWorker(
+            [(job.file_path, job.output_path) for job in batch], settings
+        )
+        worker.models = self.models
+        if self.cpu_slots is not None and worker.cpu_plan:
+            worker.cpu_slots = self.cpu_slots
+        job_ids = [job.job_id for job in batch]
+        batch_id = job_ids[0]
+        self._batches[batch_id] = job_ids
+        worker.signals.file_finished.connect(
+            lambda index, error: self._on_batch_file_finished(job_ids[index], error)
+        )
+        worker.signals.finished.connect(
+            lambda: self._on_batch_finished(batch_id, worker)
+        )
+        worker.signals.error.connect(lambda msg: self._on_batch_error(batch_id, msg))
+        worker.progress_callback = partial(self.progress.report, batch_id)
+        worker.signals.log.connect(self.log, Qt.ConnectionType.DirectConnection)
+        started_at = time.time()
+        for job in batch:
+            self.workers[job.job_id] = worker
+            job.started_at = started_at
+        self.progress.start_job(
+            batch_id, f"Batch of {len(batch)} images", weight=len(batch)
+        )
+        for job_id in job_ids:
+            self.job_started.emit(job_id)
+        self.thread_pool.start(worker)
+
+    def _on_batch_file_finished(self, job_id: str, error: str):
+        """Records the outcome of one image of a batch."""
+        worker = self.workers.pop(job_id, None)
+        job = self.scheduler.get(job_id)
+        if worker is None or job is None:
+            # Cancelled on its own while the batch ran
+            return
+        if error:
+            job.error = error
+            self.log.emit(f"❌ Error: {error}")
+        self._finish_job(job, worker)
+        if not error:
+            self.job_result.emit(job_id, job.output_path)
+
+    def _on_batch_error(self, batch_id: str, error_message: str):
+        """Records an error that stopped a whole image batch."""
+        self.log.emit(f"❌ Error: {error_message}")
+        for job_id in self._batches.get(batch_id, []):
+            job = self.scheduler.get(job_id)
+            if job and job_id in self.workers and not job.error:
+                job.error = error_message
+
+    def _on_batch_finished(self, batch_id: str, worker: ImageBatchWorker):
+        """Records the images a batch did not finish and starts the next jobs."""
+        job_ids = self._batches.pop(batch_id, [])
+        for job_id in job_ids:
+            self.workers.pop(job_id, None)
+        self.progress.finish_job(batch_id)
+        done = 0
+        for job_id in job_ids:
+            job = self.scheduler.get(job_id)
+            if job is None:
+                continue
+            if job.state == RUNNING:
+                if not worker.is_cancelled and not job.error:
+                    job.error = "Image batch error: the image was not upscaled"
+                self._finish_job(job, worker)
+            done += job.state == DONE
+        if done and self.models is not None:
+            self.models.record_speed(
+                worker.model,
+                worker.stage_timings.get("upscale", 0),
+                worker.upscaled_pixels,
+            )
+        self.dispatch()
+
+    def _on_worker_error(self, job_id: str, error_message: str):
+        """Records the error reported by a job's worker."""
+        job = self.scheduler.get(job_id)
+        if job and not job.error:
+            job.error = error_message
+        self.log.emit(f"❌ Error: {error_message}")
+
+    def _on_worker_finished(self, job_id: str):
+        """Records the final state of a job and starts the next ones."""
+        worker = self.workers.pop(job_id, None)
+        self.progress.finish_job(job_id)
+        job = self.scheduler.get(job_id)
+        if job is None:
+            return
+        state = self._finish_job(job, worker)
+        if state == DONE and worker is not None and self.models is not None:
+            self.models.record_speed(
+                worker.model, job.timings.get("upscale", 0), worker.upscaled_pixels
+            )
+        self.dispatch()
+
+    def _finish_job(self, job: Job, worker: Optional[UpscaleWorker]) -> str:
+        """Records the final state of a job from its worker and returns it."""
+        job.finished_at = time.time()
+        if isinstance(worker, ImageBatchWorker):
+            # The images of a batch share its time evenly
+            job.timings = {
+                stage: seconds / len(worker.items)
+                for stage, seconds in worker.stage_timings.items()
+            }
+        elif worker is not None:
+            job.timings = dict(worker.stage_timings)
+        if worker is not None and worker.is_cancelled:
+            state = CANCELLED
+        elif job.error:
+            state = FAILED
+        else:
+            state = DONE
+        self.scheduler.finish(job.job_id, state, job.error)
+        self.job_finished.emit(job.job_id, state)
+        return state
+
+    def set_priority(self, job_id: str, priority: int):
+        """Changes the priority of a queued job."""
+        self.scheduler.set_priority(job_id, priority)
+
+    def pause(self, job_id: str) -> bool:
+        """Holds back a queued job until it is resumed."""
+        return self.scheduler.pause(job_id)
+
+    def resume(self, job_id: str) -> bool:
+        """Returns a paused job to the queue."""
+        resumed = self.scheduler.resume(job_id)
+        if resumed:
+            self.dispatch()
+        return resumed
+
+    def reorder(self, job_ids: List[str]):
+        """Sets the queue order of jobs to the order of `job_ids`."""
+        self.scheduler.reorder(job_ids)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a single job without blocking.
+
+        Returns:
+            True if the job was waiting or running and is being cancelled.
+        """
+        job = self.scheduler.get(job_id)
+        if job is None:
+            return False
+        if job.state in (QUEUED, PAUSED):
+            self.scheduler.finish(job_id, CANCELLED)
+            # Jobs that never started still count towards the overall progress
+            self.progress.finish_job(job_id)
+            self.job_finished.emit(job_id, CANCELLED)
+            self.dispatch()
+            return True
+        worker = self.workers.get(job_id)
+        if worker is None:
+            return False
+        if isinstance(worker, ImageBatchWorker):
+            job_ids = self._batches.get(job.batch_id, [])
+            others = [i for i in job_ids if i != job_id and self.workers.get(i)]
+            if others:
+                # The rest of the batch keeps running; this image's output is
+                # discarded
+                worker.skip(job_ids.index(job_id))
+                self.workers.pop(job_id)
+                self.scheduler.finish(job_id, CANCELLED)
+                self.job_finished.emit(job_id, CANCELLED)
+                return True
+        worker.cancel()
+        return True
+
+    def cancel_all(self):
+        """
+        Cancels all pending jobs and the workers that are still running.
+
+        This never blocks: `batch_finished` is emitted once the cancelled
+        workers have exited, or right away if none were running.
+        """
+        for job_id in self.scheduler.cancel_pending():
+            self.progress.finish_job(job_id)
+        for worker in list(self.workers.values()):
+            worker.cancel()
+        self.dispatch()
+
+    def clear(self):
+        """Forgets all jobs. Only valid while no batch is running."""
+        self.scheduler = JobScheduler(self.scheduler.lane_limits, self.scheduler.order)
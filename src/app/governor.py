@@ -0,0 +1,243 @@
+"""
+This module defines the `ResourceGovernor`, which decides whether a job may start
+without exhausting the machine.
+
+Lane limits bound how many jobs run at once, but not what they need: a 4K video
+extracts and upscales far more frames than a 480p one. The governor therefore:
+- Estimates the RAM and temp disk footprint of every job from its probed
+  metadata (`estimate_footprint`), when the job is submitted.
+- Admits a job only while the footprints of the running jobs plus its own stay
+  under the memory and temp disk limits. The limits default to a share of the
+  physical RAM and of the free temp space at the start of the batch.
+- Holds back new starts while the system load per core is above a limit.
+
+A job that is held back keeps its place in its lane and is given the reason,
+e.g. "waiting for memory", so operators can see why it is not running. When
+nothing is running, the next job is always admitted, so a job that exceeds the
+limits on its own still runs, just alone. Like the scheduler, the governor has
+no Qt dependency of its own.
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from .media import is_video
+from .scaling import model_scale
+from .cpu import available_cores, is_cpu_mode, plan_cpu
+
+# PNG-compressed RGB frames take about half their raw size
+PNG_RATIO = 0.5
+# Memory of a Real-ESRGAN process besides its images: runtime and model
+PROCESS_MEMORY = 256 * 1024 * 1024
+# Inference buffers per pixel of a tile (feature maps of 64 float channels,
+# several alive at a time)
+TILE_MEMORY_PER_PIXEL = 1024
+DEFAULT_TILE = 512
+
+# Shares of the physical RAM and of the free temp space used when no limit is set
+DEFAULT_MEMORY_SHARE = 0.75
+DEFAULT_DISK_SHARE = 0.9
+# Load average per core above which no new jobs are started; 0 disables it
+DEFAULT_MAX_LOAD = 1.5
+
+GB = 1024**3
+
+
+class Footprint(NamedTuple):
+    """The estimated peak resources of a job, in bytes."""
+
+    memory: int
+    disk: int
+
+
+def _process_memory(pixels: int, scale: int, tile: int) -> int:
+    """Estimates the memory of one Real-ESRGAN process upscaling an image."""
+    images = pixels * 3 * (1 + scale * scale)
+    return PROCESS_MEMORY + images + tile * tile * TILE_MEMORY_PER_PIXEL
+
+
+def estimate_footprint(
+    file_path: str,
+    settings: Dict[str, Any],
+    info: Optional[Dict[str, Any]] = None,
+) -> Footprint:
+    """
+    Estimates the peak RAM and temp disk use of a job.
+
+    The native scale of the selected model is assumed; with a target
+    resolution, the job may end up using a smaller variant.
+
+    Args:
+        file_path: The path to the input file.
+        settings: The upscaling settings of the job.
+        info: The metadata of the file (see `engine.probe_file`): `width` and
+            `height`, and `frames` for videos.
+
+    Returns:
+        The footprint; zero for what cannot be estimated.
+    """
+    scale = settings.get("scale") or model_scale(settings.get("model", ""))
+    tile = settings.get("tile_size") or DEFAULT_TILE
+    if not info or not info.get("width") or not info.get("height"):
+        return Footprint(PROCESS_MEMORY, 0)
+    width, height = info["width"], info["height"]
+    pixels = width * height
+    if is_video(file_path):
+        parallel = plan_cpu(settings).processes if is_cpu_mode(settings) else 1
+        memory = _process_memory(pixels, scale, tile) * parallel
+        disk = 0
+        if not settings.get("distributed_dir"):
+            # The extracted and the upscaled frames are kept until reassembly;
+            # the extracted frames are stored uncompressed
+            frame = pixels * 3 * (1 + scale * scale * PNG_RATIO)
+            disk = int(info.get("frames", 0) * frame)
+        return Footprint(memory, disk)
+
+    threshold = settings.get("tiling_threshold", 16)
+    if threshold and pixels > threshold * 1_000_000:
+        # Tiled: a raw copy of the source on disk (RGBA if it may have
+        # transparency), a few tiles and one band of output rows in memory
+        # (see the `tiling` module)
+        tile = settings.get("tiling_tile_size", DEFAULT_TILE)
+        workers = settings.get("tiling_workers", 2)
+        band = width * scale * tile * scale * 4
+        memory = _process_memory(tile * tile, scale, tile) * workers + band
+        disk = int(pixels * 4 + pixels * scale * scale * 4 * PNG_RATIO)
+        return Footprint(memory, disk)
+    disk = 0
+    if settings.get("target_height"):
+        # Upscaled losslessly into the temp folder before the final resize
+        disk = int(pixels * scale * scale * 3 * PNG_RATIO)
+    return Footprint(_process_memory(pixels, scale, tile), disk)
+
+
+def physical_memory() -> int:
+    """Returns the physical RAM in bytes, or 0 if it cannot be determined."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        pass
+    if os.name == "nt":
+        import ctypes
+
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+    return 0
+
+
+def load_per_core() -> Optional[float]:
+    """Returns the 1-minute load average per core, or None where unsupported."""
+    try:
+        return os.getloadavg()[0] / available_cores()
+    except (AttributeError, OSError):
+        return None
+
+
+def _gb(size: float) -> str:
+    """Formats a size in bytes as gigabytes."""
+    return f"{size / GB:.1f} GB"
+
+
+class ResourceGovernor:
+    """Admits jobs while their estimated footprints fit the resource limits."""
+
+    def __init__(
+        self,
+        memory_probe: Callable[[], int] = physical_memory,
+        disk_probe: Optional[Callable[[], int]] = None,
+        load_probe: Callable[[], Optional[float]] = load_per_core,
+    ):
+        """
+        Initializes the governor without limits.
+
+        Args:
+            memory_probe: Returns the physical RAM in bytes.
+            disk_probe: Returns the free temp space in bytes; defaults to the
+                free space of the system's temp folder.
+            load_probe: Returns the current load per core, or None.
+        """
+        self.memory_probe = memory_probe
+        self.disk_probe = disk_probe or (
+            lambda: shutil.disk_usage(tempfile.gettempdir()).free
+        )
+        self.load_probe = load_probe
+        # Limits in bytes and load per core; 0 means unlimited
+        self.max_memory = 0
+        self.max_disk = 0
+        self.max_load = 0.0
+
+    def configure(self, settings: Dict[str, Any]):
+        """
+        Sets the limits for a batch from the upscaling settings.
+
+        Unset memory and disk limits are derived from the physical RAM and
+        the free temp space, which are measured now, before the batch writes
+        any frames.
+        """
+        memory_gb = settings.get("max_memory_gb", 0)
+        disk_gb = settings.get("max_temp_disk_gb", 0)
+        self.max_memory = int(memory_gb * GB) or int(
+            self.memory_probe() * DEFAULT_MEMORY_SHARE
+        )
+        try:
+            free_disk = self.disk_probe()
+        except OSError:
+            free_disk = 0
+        self.max_disk = int(disk_gb * GB) or int(free_disk * DEFAULT_DISK_SHARE)
+        self.max_load = float(settings.get("max_load", DEFAULT_MAX_LOAD))
+
+    def admit(self, job, running: List) -> Optional[str]:
+        """
+        Decides whether a job may start next to the running jobs.
+
+        Args:
+            job: The job, with its estimated `footprint` (or None).
+            running: The jobs that are running now.
+
+        Returns:
+            None to start the job, otherwise the reason it has to wait.
+        """
+        if not running:
+            return None
+        footprint = job.footprint or Footprint(0, 0)
+        used = [other.footprint for other in running if other.footprint]
+        if self.max_memory:
+            reserved = sum(f.memory for f in used)
+            if reserved + footprint.memory > self.max_memory:
+                return (
+                    f"Waiting for memory: needs ~{_gb(footprint.memory)}, "
+                    f"{_gb(max(0, self.max_memory - reserved))} of the "
+                    f"{_gb(self.max_memory)} limit left"
+                )
+        if self.max_disk:
+            reserved = sum(f.disk for f in used)
+            if reserved + footprint.disk > self.max_disk:
+                return (
+                    f"Waiting for temp disk space: needs ~{_gb(footprint.disk)}, "
+                    f"{_gb(max(0, self.max_disk - reserved))} of the "
+                    f"{_gb(self.max_disk)} limit left"
+                )
+        if self.max_load:
+            load = self.load_probe()
+            if load is not None and load > self.max_load:
+                return (
+                    f"Waiting for system load: {load:.2f} per core "
+                    f"(limit {self.max_load:.2f})"
+                )
+        return None
@@ -0,0 +1,198 @@
+"""
+This module defines the `HeadlessRunner` class, which runs the upscaler
+without a GUI.
+
+The runner owns an `UpscaleEngine` and feeds it from:
+- A `FolderWatcher`: every file that has finished being written into the
+  watched folder is queued as a job, and moved or tagged once processed.
+- A `JobApiServer`: jobs submitted over the local HTTP API.
+
+The engine's lanes bound how many jobs run at the same time. Log messages go
+through a `LogSink` and are printed to the console (and written to the log
+file, if enabled).
+
+It is started from the command line with `python main.py --watch <folder>
+--output <folder>` and/or `python main.py --serve`, and runs until interrupted.
+"""
+
+import os
+import sys
+import signal
+from typing import Dict, Any, Optional
+from PyQt6.QtCore import Qt, QObject, QCoreApplication, QTimer
+from .engine import UpscaleEngine
+from .watcher import FolderWatcher
+from .api_server import JobApiServer
+from .log_sink import LogSink
+from .incremental import check_output
+from .scheduler import DONE, FAILED
+from .outputs import OutputNamer
+
+
+class HeadlessRunner(QObject):
+    """Upscales files from a watched folder and the HTTP API until it is stopped."""
+
+    def __init__(
+        self,
+        watch_folder: Optional[str],
+        output_folder: Optional[str],
+        settings: Dict[str, Any],
+        use_notifications: bool = True,
+        log_file: Optional[str] = None,
+        api_port: Optional[int] = None,
+        parent: Optional[QObject] = None,
+    ):
+        """
+        Initializes the runner.
+
+        Args:
+            watch_folder: The folder to watch for new files, or None.
+            output_folder: The folder upscaled files are written to (the default
+                for API submissions).
+            settings: A dictionary of upscaling settings, including `watch_action`
+                and `watch_settle`.
+            use_notifications: Use file system notifications in addition to polling.
+            log_file: Path of the rotating log file, or None to log to the console only.
+            api_port: The port of the HTTP API, or None to not serve it.
+            parent: The parent object.
+        """
+        super().__init__(parent)
+        self.output_folder = output_folder
+        self.settings = settings
+        self.stopping = False
+        self.log_sink = LogSink(log_file, parent=self)
+        self.log_sink.flushed.connect(self._print)
+
+        self.engine = UpscaleEngine(self)
+        self.engine.configure(settings)
+        self.engine.log.connect(self.log_sink.write, Qt.ConnectionType.DirectConnection)
+        self.engine.job_finished.connect(self.on_job_finished)
+        self.engine.batch_finished.connect(self.on_batch_finished)
+
+        # Names the outputs of watched and submitted files
+        self.outputs = OutputNamer()
+        self.watcher = None
+        if watch_folder:
+            self.watcher = FolderWatcher(
+                watch_folder,
+                action=settings.get("watch_action", "move"),
+                settle_time=settings.get("watch_settle", 5),
+                exclude=[output_folder],
+                use_notifications=use_notifications,
+                parent=self,
+            )
+            self.watcher.file_ready.connect(self.on_file_ready)
+            self.watcher.log.connect(self.log_sink.write)
+
+        self.api = None
+        if api_port is not None:
+            self.api = JobApiServer(
+                self.engine,
+                lambda: dict(self.settings),
+                lambda: self.output_folder,
+                port=api_port,
+                parent=self,
+                outputs=self.outputs,
+            )
+            self.api.log.connect(self.log_sink.write)
+
+    def _print(self, text: str):
+        """Prints a flushed block of log lines to the console."""
+        print(text, flush=True)
+
+    def start(self):
+        """Starts watching the folder and serving the API."""
+        if self.output_folder:
+            os.makedirs(self.output_folder, exist_ok=True)
+        if self.api:
+            self.api.start()
+        if self.watcher:
+            self.log_sink.write(
+                f"Watching {self.watcher.folder} (output: {self.output_folder}, "
+                f"inputs are {'moved' if self.watcher.action == 'move' else 'tagged'} "
+                "when processed)"
+            )
+            self.watcher.start()
+
+    def on_file_ready(self, file_path: str):
+        """Queues a file that has finished being written."""
+        output_path = self.outputs.claim(
+            file_path, self.output_folder, self.settings, self.watcher.folder
+        )
+        if self.settings.get("incremental"):
+            try:
+                up_to_date = check_output(file_path, output_path, self.settings) is None
+            except OSError:
+                up_to_date = False
+            if up_to_date:
+                self.log_sink.write(f"Skipped up-to-date file: {file_path}")
+                self.watcher.mark_processed(file_path, True)
+                return
+        self.log_sink.write(f"Queued: {file_path}")
+        if not self.engine.running:
+            self.engine.configure(self.settings)
+        self.engine.submit(file_path, output_path, self.settings)
+        if not self.engine.running:
+            self.engine.start()
+
+    def on_job_finished(self, job_id: str, state: str):
+        """Moves or tags the input of a finished job."""
+        job = self.engine.scheduler.get(job_id)
+        if self.watcher is None or job is None or state not in (DONE, FAILED):
+            return
+        new_path = self.watcher.mark_processed(job.file_path, state == DONE)
+        if new_path:
+            self.log_sink.write(f"Moved input to {new_path}")
+
+    def on_batch_finished(self):
+        """Quits once the last running job has exited after a stop request."""
+        if self.stopping:
+            if self.api:
+                self.api.stop()
+            self.log_sink.flush()
+            QCoreApplication.quit()
+
+    def stop(self):
+        """Stops watching and cancels the running jobs without blocking."""
+        if self.stopping:
+            return
+        self.stopping = True
+        self.log_sink.write("Stopping...")
+        if self.watcher:
+            self.watcher.stop()
+        if self.engine.running:
+            self.engine.cancel_all()
+        else:
+            self.on_batch_finished()
+
+
+def run_headless(
+    watch_folder: Optional[str],
+    output_folder: Optional[str],
+    settings: Dict[str, Any],
+    use_notifications: bool = True,
+    log_file: Optional[str] = None,
+    api_port: Optional[int] = None,
+) -> int:
+    """
+    Runs the headless mode until interrupted with Ctrl+C or SIGTERM.
+
+    A `QCoreApplication` must already exist.
+
+    Returns:
+        The process exit code.
+    """
+    runner = HeadlessRunner(
+        watch_folder, output_folder, settings, use_notifications, log_file, api_port
+    )
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *args: runner.stop())
+    # Wake the event loop regularly so Python can run the signal handlers
+    wakeup = QTimer()
+    wakeup.timeout.connect(lambda: None)
+    wakeup.start(200)
+    runner.start()
+    code = QCoreApplication.exec()
+    runner.log_sink.close()
+    sys.stdout.flush()
+    return code
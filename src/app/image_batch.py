@@ -0,0 +1,209 @@
+"""
+This module implements the image batch mode, which upscales many stills with a
+single Real-ESRGAN invocation.
+
+Starting Real-ESRGAN loads the model and initializes the GPU, which for small
+images takes far longer than the upscaling itself. In batch mode, the engine
+groups queued images that share their settings, and an `ImageBatchWorker`:
+- Stages the group in a temporary directory, as symlinks where possible (hard
+  links or copies otherwise), under unique numbered names so files with the
+  same name from different folders do not collide.
+- Upscales the whole directory with one Real-ESRGAN call, reporting progress
+  as the outputs appear.
+- Moves every output to its job's output path (through its partial path, see
+  the `outputs` module) and reports the outcome of each file separately, so
+  the queue shows per-file status as usual.
+
+Images that need their own processing path (tiled large images, or a target
+resolution) are never batched.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+from PyQt6.QtCore import pyqtSignal
+from .media import is_video
+from .incremental import write_record
+from .outputs import discard_output, prepare_output, publish_output
+from .encoding import needs_encoder
+from .tiling import needs_tiling
+from .workers import UpscaleWorker, WorkerSignals
+
+# Seconds between counting the finished outputs of a running batch
+PROGRESS_INTERVAL = 0.5
+
+
+def can_batch(file_path: str, settings: Dict[str, Any]) -> bool:
+    """Returns True if an image can be upscaled as part of a batch."""
+    if is_video(file_path) or settings.get("target_height"):
+        return False
+    return needs_tiling(file_path, settings) is None
+
+
+def stage_file(source: str, staged_path: str):
+    """Places a source file in a staging directory without copying it if possible."""
+    source = os.path.abspath(source)
+    try:
+        os.symlink(source, staged_path)
+        return
+    except (OSError, NotImplementedError):
+        # Symlinks need extra privileges on Windows
+        pass
+    try:
+        os.link(source, staged_path)
+    except OSError:
+        shutil.copy2(source, staged_path)
+
+
+class ImageBatchSignals(WorkerSignals):
+    """The worker signals, plus the outcome of each file of the batch."""
+
+    # The index of the file in the batch, and its error ("" on success)
+    file_finished = pyqtSignal(int, str)
+
+
+class ImageBatchWorker(UpscaleWorker):
+    """
+    A worker that upscales a group of images with one Real-ESRGAN call.
+
+    All images share the same settings. `signals.file_finished` is emitted once
+    for every file that was processed, before `signals.finished`; files without
+    an outcome when the worker finishes were not upscaled.
+    """
+
+    def __init__(self, items: List[Tuple[str, str]], settings: Dict[str, Any]):
+        """
+        Initializes the worker.
+
+        Args:
+            items: The `(file_path, output_path)` of every image in the batch.
+            settings: A dictionary of upscaling settings.
+        """
+        super().__init__(items[0][0], items[0][1], settings)
+        self.signals = ImageBatchSignals()
+        self.items = items
+        # Indexes of files cancelled individually; their outputs are discarded
+        self.skipped = set()
+
+    def run(self):
+        """The main entry point for the worker thread."""
+        try:
+            self._upscale_batch()
+        except Exception as e:
+            if self.is_cancelled:
+                self._log_cancelled()
+            else:
+                self.signals.error.emit(f"Image batch error: {str(e)}")
+        finally:
+            self.signals.finished.emit()
+
+    def _log_cancelled(self):
+        """Logs that the batch stopped because it was cancelled."""
+        self.signals.log.emit(f"Cancelled: batch of {len(self.items)} images")
+
+    def skip(self, index: int):
+        """Discards the output of one file of the batch."""
+        self.skipped.add(index)
+
+    def _upscale_batch(self):
+        """Stages, upscales and delivers the images of the batch."""
+        realesrgan_path = self._find_realesrgan_executable()
+        if not realesrgan_path:
+            raise FileNotFoundError(
+                "Real-ESRGAN executable not found. Please install Real-ESRGAN."
+            )
+        self._ensure_model(realesrgan_path)
+        # With encoder settings, the outputs are encoded from lossless PNGs
+        encode = needs_encoder(self.settings)
+        output_format = "png" if encode else self.settings.get("format", "jpg")
+
+        work_dir = tempfile.mkdtemp(prefix="anime_upscaler_batch_")
+        try:
+            input_dir = os.path.join(work_dir, "input")
+            output_dir = os.path.join(work_dir, "output")
+            os.makedirs(input_dir)
+            os.makedirs(output_dir)
+            staged_names = []
+            for index, (file_path, _) in enumerate(self.items):
+                name = f"{index:06d}"
+                extension = os.path.splitext(file_path)[1].lower()
+                stage_file(file_path, os.path.join(input_dir, name + extension))
+                staged_names.append(name)
+                self.upscaled_pixels += self._image_pixels(file_path)
+
+            cmd = self._image_upscale_command(
+                realesrgan_path, input_dir, output_dir, output_format
+            )
+            self.signals.log.emit(f"Processing a batch of {len(self.items)} images")
+            self.signals.log.emit(f"Command: {' '.join(cmd)}")
+            with self._stage("upscale"), self._cpu_slot(), self._watch_outputs(
+                output_dir
+            ):
+                process = self._run_process(cmd)
+            if self.is_cancelled:
+                self._log_cancelled()
+                return
+
+            for index, name in enumerate(staged_names):
+                upscaled = os.path.join(output_dir, f"{name}.{output_format}")
+                self.signals.file_finished.emit(
+                    index, self._deliver(index, upscaled, process.stderr, encode)
+                )
+            self._report_progress(len(self.items), len(self.items))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _deliver(self, index: int, upscaled: str, stderr: str, encode: bool) -> str:
+        """
+        Moves (or encodes) the output of one file to its output path.
+
+        Returns:
+            The error of the file, or "" if it was delivered.
+        """
+        file_path, output_path = self.items[index]
+        if index in self.skipped:
+            return ""
+        if not os.path.exists(upscaled):
+            return f"Image upscaling error: no output for {file_path}: {stderr}"
+        try:
+            partial = prepare_output(output_path)
+            if encode:
+                self._convert_image(upscaled, partial, encode=True)
+            else:
+                shutil.move(upscaled, partial)
+            self._copy_metadata(file_path, partial)
+            publish_output(output_path)
+        except (OSError, RuntimeError) as e:
+            discard_output(output_path)
+            return f"Image upscaling error: could not write {output_path}: {str(e)}"
+        try:
+            write_record(file_path, output_path, self.settings)
+        except OSError as e:
+            self.signals.log.emit(f"Warning: Could not write output record: {str(e)}")
+        self.signals.log.emit(f"✓ Completed: {os.path.basename(output_path)}")
+        return ""
+
+    @contextmanager
+    def _watch_outputs(self, output_dir: str) -> Iterator[None]:
+        """Reports progress from the outputs appearing while the batch runs."""
+        stopped = threading.Event()
+        total = len(self.items)
+
+        def watch():
+            while not stopped.wait(PROGRESS_INTERVAL):
+                try:
+                    done = len(os.listdir(output_dir))
+                except OSError:
+                    continue
+                self._report_progress(min(done, total), total)
+
+        thread = threading.Thread(target=watch, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
@@ -0,0 +1,143 @@
+"""
+This module implements the incremental mode, which skips files whose upscaled
+output is already up to date.
+
+Next to every finished output, the worker writes a small sidecar record
+(`<output>.sharpify.json`) describing what the output was made from:
+- The source path, size and modification time (and optionally a content hash).
+- The hash of the settings that affect the output (see `manifest.settings_hash`).
+- The size of the output itself, to detect outputs that were replaced or truncated.
+
+Before a batch starts, every file is compared against its record, so repeated
+runs over the same folders only process new and changed files.
+"""
+
+import os
+import json
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple
+from .manifest import settings_hash
+
+SIDECAR_SUFFIX = ".sharpify.json"
+
+COMPARE_MTIME = "mtime"
+COMPARE_HASH = "hash"
+
+# Reasons a file needs processing
+REASON_NEW = "no output yet"
+REASON_NO_RECORD = "output has no record"
+REASON_OUTPUT_CHANGED = "output was modified"
+REASON_SOURCE_CHANGED = "source changed"
+REASON_SETTINGS_CHANGED = "settings changed"
+
+
+def sidecar_path(output_path: str) -> str:
+    """Returns the path of the sidecar record of an output file."""
+    return output_path + SIDECAR_SUFFIX
+
+
+def file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Returns the SHA-256 hash of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_record(file_path: str, output_path: str, settings: Dict[str, Any]):
+    """
+    Writes the sidecar record of a finished output.
+
+    Args:
+        file_path: The path to the source file.
+        output_path: The path to the finished output file.
+        settings: The settings the output was produced with.
+    """
+    stat = os.stat(file_path)
+    record = {
+        "source": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "settings_hash": settings_hash(settings),
+        "output_size": os.path.getsize(output_path),
+    }
+    if settings.get("incremental_compare") == COMPARE_HASH:
+        record["sha256"] = file_hash(file_path)
+    temp_path = sidecar_path(output_path) + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+    os.replace(temp_path, sidecar_path(output_path))
+
+
+def read_record(output_path: str) -> Optional[Dict[str, Any]]:
+    """Returns the sidecar record of an output file, or None if there is none."""
+    try:
+        with open(sidecar_path(output_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def check_output(
+    file_path: str, output_path: str, settings: Dict[str, Any]
+) -> Optional[str]:
+    """
+    Checks whether the output of a file is up to date.
+
+    The source is compared by size and modification time. With content hash
+    comparison enabled, a source whose modification time changed but whose size
+    did not is hashed, so files that were only touched or copied are still skipped.
+
+    Returns:
+        None if the output is up to date, otherwise the reason it is not.
+    """
+    if not os.path.isfile(output_path):
+        return REASON_NEW
+    record = read_record(output_path)
+    if record is None:
+        return REASON_NO_RECORD
+    if os.path.getsize(output_path) != record.get("output_size"):
+        return REASON_OUTPUT_CHANGED
+    if record.get("settings_hash") != settings_hash(settings):
+        return REASON_SETTINGS_CHANGED
+    stat = os.stat(file_path)
+    if (
+        record.get("source") != os.path.abspath(file_path)
+        or record.get("size") != stat.st_size
+    ):
+        return REASON_SOURCE_CHANGED
+    if record.get("mtime") != stat.st_mtime:
+        if settings.get("incremental_compare") != COMPARE_HASH or record.get(
+            "sha256"
+        ) != file_hash(file_path):
+            return REASON_SOURCE_CHANGED
+    return None
+
+
+def plan_batch(
+    files: List[Tuple[str, str]], settings: Dict[str, Any]
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]], Dict[str, int]]:
+    """
+    Splits a batch into files to process and files that are up to date.
+
+    Args:
+        files: `(file_path, output_path)` pairs.
+        settings: The settings of the batch.
+
+    Returns:
+        A tuple of the pairs to process, the pairs to skip, and the number of
+        files to process for each reason.
+    """
+    process, skip, reasons = [], [], {}
+    for file_path, output_path in files:
+        try:
+            reason = check_output(file_path, output_path, settings)
+        except OSError:
+            reason = REASON_SOURCE_CHANGED
+        if reason is None:
+            skip.append((file_path, output_path))
+        else:
+            process.append((file_path, output_path))
+            reasons[reason] = reasons.get(reason, 0) + 1
+    return process, skip, reasons
@@ -0,0 +1,191 @@
+"""
+This module handles interlaced and telecined video sources.
+
+Older anime is often telecined: 23.976 progressive frames spread over 29.97
+interlaced frames with a 3:2 pulldown, so two of every five frames are combed
+mixtures of two film frames. Extracting those frames as they are makes the
+upscaler spend a fifth of its time on duplicates, sharpens the combing, and
+keeps the pulldown judder in the output. The field mode of a video selects a
+preprocessing stage that runs inside the FFmpeg extraction:
+- "ivtc": Inverse telecine. Field matching rebuilds the film frames, leftover
+  combed frames are deinterlaced, and the duplicates are decimated, which
+  restores 23.976 progressive frames and cuts the frame count by 20%.
+- "deinterlace": Deinterlaces every frame, for truly interlaced sources,
+  keeping one frame per interlaced frame.
+- "auto": Runs FFmpeg's interlace detection (`idet`) on a few short windows of
+  the video and picks "ivtc", "deinterlace" or no preprocessing.
+- "" (off): Frames are extracted unchanged.
+"""
+
+import re
+import subprocess
+from fractions import Fraction
+from typing import Callable, List, NamedTuple, Optional
+from .media import get_ffmpeg_path
+
+FIELD_OFF = ""
+FIELD_AUTO = "auto"
+FIELD_IVTC = "ivtc"
+FIELD_DEINTERLACE = "deinterlace"
+FIELD_MODES = (FIELD_OFF, FIELD_AUTO, FIELD_IVTC, FIELD_DEINTERLACE)
+
+# Field matching, a deinterlace of the frames it could not match, and the
+# removal of one duplicate in every five frames
+IVTC_FILTER = "fieldmatch=order=auto:combmatch=full,yadif=deint=interlaced,decimate"
+# One output frame per interlaced frame, rather than one per field
+DEINTERLACE_FILTER = "bwdif=mode=send_frame:deint=all"
+
+# The rate assumed for telecined sources whose rate cannot be probed
+NTSC_RATE = Fraction(30000, 1001)
+
+# Detection samples this many windows of consecutive frames
+SAMPLE_WINDOWS = 3
+SAMPLE_FRAMES = 120
+# Share of interlaced frames above which a video counts as interlaced
+INTERLACED_SHARE = 0.1
+# Share of frames with a repeated field above which an interlaced video counts
+# as telecined; a 3:2 pulldown repeats a field in two of every five frames
+REPEATED_SHARE = 0.15
+
+IDET_MULTI = re.compile(
+    r"Multi frame detection: TFF:\s*(\d+)\s+BFF:\s*(\d+)\s+"
+    r"Progressive:\s*(\d+)\s+Undetermined:\s*(\d+)"
+)
+IDET_REPEATED = re.compile(
+    r"Repeated Fields: Neither:\s*(\d+)\s+Top:\s*(\d+)\s+Bottom:\s*(\d+)"
+)
+
+
+class FieldStats(NamedTuple):
+    """The frame counts reported by FFmpeg's interlace detection."""
+
+    interlaced: int = 0
+    progressive: int = 0
+    undetermined: int = 0
+    # Frames with a field repeated from the previous frame
+    repeated: int = 0
+    frames: int = 0
+
+    def __add__(self, other: "FieldStats") -> "FieldStats":
+        return FieldStats(*(a + b for a, b in zip(self, other)))
+
+
+def parse_idet(stderr: str) -> FieldStats:
+    """
+    Reads the counts of FFmpeg's `idet` filter from its log output.
+
+    The filter logs its counts when it is closed; only the last report counts,
+    since FFmpeg may log an empty one while it sets up the filters.
+    """
+    multi = IDET_MULTI.findall(stderr)
+    repeated = IDET_REPEATED.findall(stderr)
+    if not multi:
+        return FieldStats()
+    tff, bff, progressive, undetermined = (int(n) for n in multi[-1])
+    neither, top, bottom = (int(n) for n in repeated[-1]) if repeated else (0, 0, 0)
+    return FieldStats(
+        interlaced=tff + bff,
+        progressive=progressive,
+        undetermined=undetermined,
+        repeated=top + bottom,
+        frames=neither + top + bottom,
+    )
+
+
+def classify_fields(stats: FieldStats) -> str:
+    """Returns the field mode that suits a video with the detected counts."""
+    determined = stats.interlaced + stats.progressive
+    if not determined or stats.interlaced / determined < INTERLACED_SHARE:
+        return FIELD_OFF
+    if stats.frames and stats.repeated / stats.frames >= REPEATED_SHARE:
+        return FIELD_IVTC
+    return FIELD_DEINTERLACE
+
+
+def idet_command(
+    video_path: str, start: float, frames: int, ffmpeg_path: Optional[str] = None
+) -> List[str]:
+    """Builds the FFmpeg command that runs the interlace detection on a window."""
+    cmd = [ffmpeg_path or get_ffmpeg_path(), "-hide_banner"]
+    if start:
+        cmd.extend(["-ss", f"{start:.3f}"])
+    return cmd + [
+        "-i",
+        video_path,
+        "-an",
+        "-frames:v",
+        str(frames),
+        "-vf",
+        "idet",
+        "-f",
+        "null",
+        "-",
+    ]
+
+
+def _run_command(cmd: List[str]) -> subprocess.CompletedProcess:
+    """Runs a command and captures its output."""
+    return subprocess.run(cmd, capture_output=True, text=True, errors="replace")
+
+
+def detect_field_mode(
+    video_path: str,
+    duration: float = 0.0,
+    ffmpeg_path: Optional[str] = None,
+    run: Optional[Callable[[List[str]], subprocess.CompletedProcess]] = None,
+) -> str:
+    """
+    Detects whether a video is progressive, telecined or interlaced.
+
+    Args:
+        video_path: The path to the video file.
+        duration: The duration of the video in seconds. Windows are spread
+            over the video if it is known; otherwise only its start is sampled.
+        ffmpeg_path: The FFmpeg executable, found if not given.
+        run: Runs a command and returns its completed process; by default,
+            the command is run with `subprocess.run`.
+
+    Returns:
+        FIELD_IVTC, FIELD_DEINTERLACE, or FIELD_OFF for progressive videos
+        and videos the detection failed on.
+    """
+    run = run or _run_command
+    if duration:
+        starts = [
+            duration * (i + 1) / (SAMPLE_WINDOWS + 1) for i in range(SAMPLE_WINDOWS)
+        ]
+    else:
+        starts = [0.0]
+    stats = FieldStats()
+    for start in starts:
+        process = run(idet_command(video_path, start, SAMPLE_FRAMES, ffmpeg_path))
+        if process.returncode == 0:
+            stats += parse_idet(process.stderr)
+    return classify_fields(stats)
+
+
+def field_filter(mode: str) -> Optional[str]:
+    """Returns the FFmpeg filter of a detected (not "auto") field mode."""
+    return {FIELD_IVTC: IVTC_FILTER, FIELD_DEINTERLACE: DEINTERLACE_FILTER}.get(mode)
+
+
+def filtered_rate(mode: str, source_fps: float) -> Optional[Fraction]:
+    """
+    Returns the frame rate of a video after its field filter.
+
+    Args:
+        mode: The detected field mode.
+        source_fps: The probed frame rate of the source, or 0 if unknown.
+
+    Returns:
+        The rate, or None if the source rate is unknown and cannot be assumed.
+    """
+    if source_fps:
+        rate = Fraction(source_fps).limit_denominator(1001)
+    elif mode == FIELD_IVTC:
+        # Telecine produces NTSC video
+        rate = NTSC_RATE
+    else:
+        return None
+    # Decimation drops one frame in five
+    return rate * 4 / 5 if mode == FIELD_IVTC else rate
@@ -0,0 +1,169 @@
+"""
+This module defines the `LogSink` class, a buffered log pipeline for the GUI.
+
+Writing every message straight into the log widget gets slow as the document
+grows, and with several jobs logging per frame the event loop saturates. The
+sink instead:
+- Accepts messages from any thread and only appends them to an in-memory buffer.
+- Flushes the buffer on a timer, emitting one coalesced block of text per tick.
+- Keeps a bounded history (ring buffer) for re-rendering at a different level.
+- Optionally streams every message to a rotating log file on disk.
+"""
+
+import os
+import time
+import logging
+import logging.handlers
+import threading
+from collections import deque
+from typing import Optional, List
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+LEVEL_NAMES = {DEBUG: "Debug", INFO: "Info", WARNING: "Warning", ERROR: "Error"}
+
+
+def infer_level(message: str) -> int:
+    """Infers the level of a message from the prefixes used throughout the app."""
+    if message.startswith(("❌", "Error")):
+        return ERROR
+    if message.startswith("Warning"):
+        return WARNING
+    if message.startswith("Command:"):
+        return DEBUG
+    return INFO
+
+
+class LogSink(QObject):
+    """Buffers log messages from any thread and flushes them to the UI on a timer."""
+
+    flushed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        log_file: Optional[str] = None,
+        flush_interval: int = 100,
+        max_lines: int = 5000,
+        parent: Optional[QObject] = None,
+    ):
+        """
+        Initializes the sink.
+
+        Args:
+            log_file: Path of the rotating log file, or None to keep logs in memory only.
+            flush_interval: Milliseconds between flushes to the UI.
+            max_lines: Number of lines kept in the on-screen history.
+            parent: The parent object.
+        """
+        super().__init__(parent)
+        self.level = INFO
+        self.log_file = log_file
+        self._pending: List[tuple] = []
+        self._history = deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        self._logger = None
+        self._handler = None
+        if log_file:
+            self._logger = self._create_file_logger(log_file)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(flush_interval)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start()
+
+    def _create_file_logger(self, log_file: str) -> logging.Logger:
+        """Creates a logger that writes to a size-rotated file."""
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        logger = logging.getLogger(f"sharpify.log_sink.{id(self)}")
+        logger.setLevel(DEBUG)
+        logger.propagate = False
+        self._handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8"
+        )
+        self._handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)-7s %(message)s")
+        )
+        logger.addHandler(self._handler)
+        return logger
+
+    def write(self, message: str, level: Optional[int] = None):
+        """
+        Queues a message for display. Safe to call from any thread.
+
+        Args:
+            message: The message to log.
+            level: The log level, inferred from the message if not given.
+        """
+        if level is None:
+            level = infer_level(message)
+        line = f"[{time.strftime('%H:%M:%S')}] {message}"
+        with self._lock:
+            self._pending.append((level, line))
+        if self._logger:
+            self._logger.log(level, message)
+
+    def flush(self):
+        """Moves queued messages into the history and emits the visible ones."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self._history.extend(pending)
+        visible = [line for level, line in pending if level >= self.level]
+        if visible:
+            self.flushed.emit("\n".join(visible))
+
+    def set_level(self, level: int) -> str:
+        """
+        Changes the minimum level shown in the UI.
+
+        Returns:
+            The retained history rendered at the new level.
+        """
+        self.flush()
+        self.level = level
+        return self.render()
+
+    def render(self) -> str:
+        """Returns the retained history at the current level."""
+        return "\n".join(line for level, line in self._history if level >= self.level)
+
+    def clear(self):
+        """Clears the on-screen history. The log file is left untouched."""
+        with self._lock:
+            self._pending = []
+        self._history.clear()
+
+    def save_to(self, filename: str):
+        """
+        Saves the full log to a file.
+
+        With file logging enabled, this is the complete session log including
+        rotated backups, oldest first; otherwise the retained history is saved.
+        """
+        self.flush()
+        if not self._logger:
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write("\n".join(line for _, line in self._history))
+            return
+        self._handler.flush()
+        backups = self._handler.backupCount
+        sources = [f"{self.log_file}.{i}" for i in range(backups, 0, -1)]
+        sources.append(self.log_file)
+        with open(filename, "w", encoding="utf-8") as out:
+            for source in sources:
+                if os.path.isfile(source):
+                    with open(source, "r", encoding="utf-8") as f:
+                        out.write(f.read())
+
+    def close(self):
+        """Stops flushing and closes the log file."""
+        self._timer.stop()
+        if self._logger:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._logger = None
@@ -4,15 +4,18 @@ This module defines the main application window for the Anime-Media-Upscaler.
 It includes the main window class `AnimeUpscalerGUI`, which is responsible for:
 - Initializing the user interface (UI) components.
 - Handling user interactions, such as adding files, selecting settings, and starting the upscaling process.
-- Managing the upscaling process by creating and running worker threads.
+- Managing the upscaling process by queueing jobs on the `UpscaleEngine`.
 - Displaying progress and log information to the user.
+- Looking for the external tools in the background at startup and showing the
+  result in the status bar.
 - Saving and loading application settings.
 """
 
 import os
 import time
+import sqlite3
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from PyQt6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -21,7 +24,7 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QLabel,
     QProgressBar,
-    QTextEdit,
+    QPlainTextEdit,
     QFileDialog,
     QComboBox,
     QGroupBox,
@@ -30,29 +33,130 @@ from PyQt6.QtWidgets import (
     QSplitter,
     QFormLayout,
     QMessageBox,
+    QMenu,
 )
-from PyQt6.QtCore import Qt, QSettings, QThreadPool
-from PyQt6.QtGui import QIcon, QFont, QDragEnterEvent, QDropEvent, QAction, QKeySequence
-from .settings_dialog import SettingsDialog
-from .workers import UpscaleWorker
-from .ui_utils import format_time, get_files_from_directory, check_dependencies
+from PyQt6.QtCore import Qt, QCoreApplication, QSettings, QStandardPaths, QTimer
+from PyQt6.QtGui import (
+    QIcon,
+    QFont,
+    QDragEnterEvent,
+    QDropEvent,
+    QAction,
+    QKeySequence,
+    QColor,
+    QImage,
+    QPixmap,
+)
+from .engine import UpscaleEngine
+from .log_sink import LogSink, LEVEL_NAMES, INFO
+from .thumbnails import ThumbnailLoader
+from .incremental import plan_batch, check_output
+from .manifest import (
+    BatchManifest,
+    BATCH_COMPLETED,
+    BATCH_STOPPED,
+    BATCH_RESUMED,
+    BATCH_ABANDONED,
+)
+from .media import is_video
+from .models import AUTO_MODEL, DEFAULT_MODEL
+from .outputs import OutputNamer
+from .scheduler import QUEUED, PAUSED, RUNNING, DONE, FAILED, CANCELLED
+from .ui_utils import (
+    format_time,
+    get_files_from_directory,
+    check_dependencies,
+    read_advanced_settings,
+    DependencyChecker,
+)
+
+# Item data roles used to attach scheduling information to file list entries
+JOB_ID_ROLE = Qt.ItemDataRole.UserRole
+PRIORITY_ROLE = Qt.ItemDataRole.UserRole + 1
+PAUSED_ROLE = Qt.ItemDataRole.UserRole + 2
+OUTPUT_ROLE = Qt.ItemDataRole.UserRole + 3
+# The folder an entry was added from, which the mirror output layout keeps
+ROOT_ROLE = Qt.ItemDataRole.UserRole + 4
+
+# The models offered in the quick settings, as (label, model) pairs; "auto" uses
+# the model type and scale from the advanced settings
+QUICK_MODELS = [
+    ("Anime Image/Video 4x", "realesr-animevideov3-x4"),
+    ("General Image/Video 4x", "realesrgan-x4plus"),
+    ("Anime Photos 4x", "realesrgan-x4plus-anime"),
+    ("Fastest Installed (Auto)", AUTO_MODEL),
+]
+
+STATE_COLORS = {
+    QUEUED: "#ffffff",
+    PAUSED: "#888888",
+    RUNNING: "#2196F3",
+    DONE: "#4CAF50",
+    FAILED: "#f44336",
+    CANCELLED: "#ff9800",
+}
 
 
 class AnimeUpscalerGUI(QMainWindow):
     """Main application window for the Anime-Media-Upscaler."""
 
-    def __init__(self):
-        """Initializes the main window, settings, thread pool, and UI."""
+    def __init__(self, offer_resume: bool = True):
+        """
+        Initializes the main window, settings, thread pool, and UI.
+
+        Args:
+            offer_resume: Whether to offer resuming an interrupted batch once
+                the window is shown.
+        """
         super().__init__()
         self.settings = QSettings("AnimeUpscaler", "Settings")
-        self.thread_pool = QThreadPool()
-        self.thread_pool.setMaxThreadCount(2)  # Allow up to 2 concurrent workers
-        self.current_workers = []
+        data_dir = QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.AppDataLocation
+        )
+        log_file = None
+        if self.settings.value("advanced_log_to_file", True, bool):
+            log_file = os.path.join(data_dir, "logs", "upscaler.log")
+        self.log_sink = LogSink(log_file, parent=self)
+        try:
+            self.manifest = BatchManifest(os.path.join(data_dir, "batches.db"))
+        except (OSError, sqlite3.Error) as e:
+            self.manifest = None
+            self.log_sink.write(f"Warning: Batch manifest unavailable: {e}")
+        self.batch_id = None
+        self.manifest_items = {}
+        self.engine = UpscaleEngine(self)
+        self.engine.job_started.connect(self.on_job_started)
+        self.engine.job_waiting.connect(self.on_job_waiting)
+        self.engine.job_finished.connect(self.on_file_finished)
+        self.engine.progress.updated.connect(self.update_progress)
+        self.engine.log.connect(self.log_sink.write, Qt.ConnectionType.DirectConnection)
+        self.engine.batch_finished.connect(self.processing_completed)
+        self.thumbnails = ThumbnailLoader(parent=self)
+        self.thumbnails.loaded.connect(self.show_thumbnail)
+        self.preview_path = None
+        self.job_items = {}
+        self.watcher = None
+        self.watched_files = set()
+        self.api_server = None
         self.output_folder = None
+        # Hands out the output paths of every batch and of API jobs
+        self.output_namer = OutputNamer()
+        # Set once the window was closed while jobs were still running
+        self.closing = False
+
+        # The last dependency check result that was logged
+        self.logged_dependencies = None
 
         self.init_ui()
         self.load_settings()
-        check_dependencies()
+        # Look for the tools, start the API and offer to resume once the window
+        # is shown, so none of them hold up the first paint
+        self.dependencies = DependencyChecker(self)
+        self.dependencies.finished.connect(self.on_dependencies_checked)
+        QTimer.singleShot(0, self.dependencies.start)
+        QTimer.singleShot(0, self.update_api_server)
+        if offer_resume:
+            QTimer.singleShot(0, self.offer_resume)
 
     def init_ui(self):
         """Initializes the main user interface components."""
@@ -82,6 +186,8 @@ class AnimeUpscalerGUI(QMainWindow):
 
         self.create_menu_bar()
         self.statusBar().showMessage("Ready")
+        self.dependency_label = QLabel("Checking tools...")
+        self.statusBar().addPermanentWidget(self.dependency_label)
         self.apply_modern_style()
 
     def create_left_panel(self) -> QWidget:
@@ -95,6 +201,11 @@ class AnimeUpscalerGUI(QMainWindow):
         self.file_list = QListWidget()
         self.file_list.setDragDropMode(QListWidget.DragDropMode.InternalMove)
         self.file_list.setAlternatingRowColors(True)
+        self.file_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.file_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.file_list.customContextMenuRequested.connect(self.show_file_menu)
+        self.file_list.model().rowsMoved.connect(self.on_queue_reordered)
+        self.file_list.currentItemChanged.connect(self.preview_item)
         file_layout.addWidget(self.file_list)
 
         file_buttons = QHBoxLayout()
@@ -125,8 +236,10 @@ class AnimeUpscalerGUI(QMainWindow):
         quick_group = QGroupBox("Quick Settings")
         quick_layout = QFormLayout(quick_group)
         self.model_combo = QComboBox()
-        self.model_combo.addItems(
-            ["Anime Image/Video 4x", "General Image/Video 4x", "Anime Photos 4x"]
+        for label, model in QUICK_MODELS:
+            self.model_combo.addItem(label, model)
+        self.select_quick_model(
+            self.settings.value("advanced_model", DEFAULT_MODEL, str)
         )
         quick_layout.addRow("Model:", self.model_combo)
         layout.addWidget(quick_group)
@@ -136,6 +249,13 @@ class AnimeUpscalerGUI(QMainWindow):
         self.settings_btn = QPushButton("Advanced Settings")
         self.settings_btn.clicked.connect(self.show_settings)
         control_layout.addWidget(self.settings_btn)
+        self.preview_btn = QPushButton("Preview Selected")
+        self.preview_btn.setToolTip(
+            "Upscale a short clip or a few sample frames to check the settings\n"
+            "and estimate how long the full job will take"
+        )
+        self.preview_btn.clicked.connect(self.show_preview)
+        control_layout.addWidget(self.preview_btn)
         self.start_btn = QPushButton("Start Upscaling")
         self.start_btn.clicked.connect(self.start_upscaling)
         self.start_btn.setStyleSheet(
@@ -179,10 +299,11 @@ class AnimeUpscalerGUI(QMainWindow):
         self.overall_progress.setTextVisible(True)
         progress_layout.addWidget(QLabel("Overall Progress:"))
         progress_layout.addWidget(self.overall_progress)
-        self.current_progress = QProgressBar()
-        self.current_progress.setTextVisible(True)
-        progress_layout.addWidget(QLabel("Current File:"))
-        progress_layout.addWidget(self.current_progress)
+        progress_layout.addWidget(QLabel("Active Files:"))
+        # One row per running job, created and removed by `update_progress`
+        self.job_progress_layout = QFormLayout()
+        self.job_progress_bars = {}
+        progress_layout.addLayout(self.job_progress_layout)
         self.status_label = QLabel("Ready to start")
         self.status_label.setStyleSheet("font-weight: bold; color: #2196F3;")
         progress_layout.addWidget(self.status_label)
@@ -190,21 +311,43 @@ class AnimeUpscalerGUI(QMainWindow):
         progress_layout.addWidget(self.time_label)
         layout.addWidget(progress_group)
 
+        # Preview group
+        preview_group = QGroupBox("Preview")
+        preview_layout = QVBoxLayout(preview_group)
+        self.preview_label = QLabel("Finished images and frames are shown here")
+        self.preview_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_label.setMinimumHeight(180)
+        preview_layout.addWidget(self.preview_label)
+        self.preview_caption = QLabel("")
+        self.preview_caption.setStyleSheet("color: gray;")
+        preview_layout.addWidget(self.preview_caption)
+        layout.addWidget(preview_group)
+
         # Processing log group
         log_group = QGroupBox("Processing Log")
         log_layout = QVBoxLayout(log_group)
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setFont(QFont("Consolas", 9))
+        # Cap the on-screen history; the full log goes to the log file
+        self.log_text.setMaximumBlockCount(5000)
+        self.log_sink.flushed.connect(self.append_log_text)
         log_layout.addWidget(self.log_text)
         log_buttons = QHBoxLayout()
         clear_log_btn = QPushButton("Clear Log")
-        clear_log_btn.clicked.connect(self.log_text.clear)
+        clear_log_btn.clicked.connect(self.clear_log)
         log_buttons.addWidget(clear_log_btn)
         save_log_btn = QPushButton("Save Log")
         save_log_btn.clicked.connect(self.save_log)
         log_buttons.addWidget(save_log_btn)
         log_buttons.addStretch()
+        log_buttons.addWidget(QLabel("Show:"))
+        self.log_level_combo = QComboBox()
+        for level, name in LEVEL_NAMES.items():
+            self.log_level_combo.addItem(name, level)
+        self.log_level_combo.setCurrentIndex(self.log_level_combo.findData(INFO))
+        self.log_level_combo.currentIndexChanged.connect(self.change_log_level)
+        log_buttons.addWidget(self.log_level_combo)
         log_layout.addLayout(log_buttons)
         layout.addWidget(log_group)
         return panel
@@ -233,6 +376,17 @@ class AnimeUpscalerGUI(QMainWindow):
         settings_action = QAction("Settings...", self)
         settings_action.triggered.connect(self.show_settings)
         tools_menu.addAction(settings_action)
+        preview_action = QAction("Preview Selected File...", self)
+        preview_action.triggered.connect(self.show_preview)
+        tools_menu.addAction(preview_action)
+        dry_run_action = QAction("Dry Run (Incremental)...", self)
+        dry_run_action.triggered.connect(self.show_dry_run)
+        tools_menu.addAction(dry_run_action)
+        tools_menu.addSeparator()
+        self.watch_action = QAction("Watch Folder...", self)
+        self.watch_action.setCheckable(True)
+        self.watch_action.toggled.connect(self.toggle_watch)
+        tools_menu.addAction(self.watch_action)
 
         # Help menu
         help_menu = menubar.addMenu("Help")
@@ -270,7 +424,7 @@ class AnimeUpscalerGUI(QMainWindow):
                 border: 1px solid #555555; border-radius: 4px; text-align: center;
             }
             QProgressBar::chunk { background-color: #0078d4; border-radius: 3px; }
-            QTextEdit {
+            QTextEdit, QPlainTextEdit {
                 background-color: #1e1e1e; border: 1px solid #555555;
                 border-radius: 4px; color: #ffffff;
             }
@@ -292,7 +446,7 @@ class AnimeUpscalerGUI(QMainWindow):
             if os.path.isfile(file_path):
                 files.append(file_path)
             elif os.path.isdir(file_path):
-                files.extend(get_files_from_directory(file_path))
+                self.add_files_to_list(get_files_from_directory(file_path), file_path)
         self.add_files_to_list(files)
 
     def add_files(self):
@@ -312,24 +466,37 @@ class AnimeUpscalerGUI(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, "Select Folder")
         if folder:
             files = get_files_from_directory(folder)
-            self.add_files_to_list(files)
+            self.add_files_to_list(files, folder)
 
-    def add_files_to_list(self, files):
-        """Adds a list of files to the file list widget, avoiding duplicates."""
+    def add_files_to_list(self, files, root: str = None):
+        """
+        Adds a list of files to the file list widget, avoiding duplicates.
+
+        Args:
+            files: The paths of the files.
+            root: The folder the files were found in, if they were added as a folder.
+        """
         added_count = 0
         for file_path in files:
             existing_items = [
                 self.file_list.item(i).text() for i in range(self.file_list.count())
             ]
             if file_path not in existing_items:
-                self.file_list.addItem(QListWidgetItem(file_path))
+                item = QListWidgetItem(file_path)
+                item.setData(ROOT_ROLE, root)
+                self.file_list.addItem(item)
                 added_count += 1
+                if self.engine.running:
+                    # Files added during a batch join the running queue
+                    self.total_files += 1
+                    self.queue_item(item)
         if added_count > 0:
             self.log(f"Added {added_count} files to processing queue")
 
     def clear_files(self):
         """Clears all files from the file list."""
         self.file_list.clear()
+        self.job_items = {}
         self.log("Cleared all files from queue")
 
     def select_output_folder(self):
@@ -343,40 +510,45 @@ class AnimeUpscalerGUI(QMainWindow):
 
     def show_settings(self):
         """Shows the advanced settings dialog."""
+        from .settings_dialog import SettingsDialog
+
         dialog = SettingsDialog(self)
         current_settings = self.get_current_settings()
         dialog.set_settings(current_settings)
         if dialog.exec():
             new_settings = dialog.get_settings()
             self.save_advanced_settings(new_settings)
-            model_map_reverse = {
-                "realesr-animevideov3-x4": "Anime Image/Video 4x",
-                "realesrgan-x4plus": "General Image/Video 4x",
-                "realesrgan-x4plus-anime": "Anime Photos 4x",
-            }
-            quick_model = model_map_reverse.get(
-                new_settings["model"], "Anime Image/Video 4x"
-            )
-            self.model_combo.setCurrentText(quick_model)
+            self.select_quick_model(new_settings["model"])
+            self.update_api_server()
             self.log("Settings updated")
 
+    def show_preview(self):
+        """Shows the preview dialog for the selected (or first) file in the list."""
+        item = self.file_list.currentItem() or self.file_list.item(0)
+        if item is None:
+            QMessageBox.warning(self, "Warning", "Please add files to preview")
+            return
+        from .preview_dialog import PreviewDialog
+
+        dialog = PreviewDialog(item.text(), self.get_current_settings(), self)
+        dialog.log.connect(self.log)
+        dialog.exec()
+
+    def select_quick_model(self, model: str):
+        """Selects a model in the quick settings, adding it if it has no entry."""
+        index = self.model_combo.findData(model)
+        if index < 0:
+            self.model_combo.addItem(model, model)
+            index = self.model_combo.count() - 1
+        self.model_combo.setCurrentIndex(index)
+
     def get_current_settings(self) -> Dict[str, Any]:
         """Returns the current upscaling settings."""
-        model_map = {
-            "Anime Image/Video 4x": "realesr-animevideov3-x4",
-            "General Image/Video 4x": "realesrgan-x4plus",
-            "Anime Photos 4x": "realesrgan-x4plus-anime",
-        }
-        return {
-            "model": model_map.get(
-                self.model_combo.currentText(), "realesr-animevideov3-x4"
-            ),
-            "use_gpu": self.settings.value("advanced_use_gpu", True, bool),
-            "tile_size": self.settings.value("advanced_tile_size", 400, int),
-            "fps": self.settings.value("advanced_fps", 24, int),
-            "quality": self.settings.value("advanced_quality", 18, int),
-            "format": self.settings.value("advanced_format", "jpg", str),
-        }
+        settings = read_advanced_settings(self.settings)
+        settings["model"] = self.model_combo.currentData() or DEFAULT_MODEL
+        if settings["model"] != AUTO_MODEL:
+            settings["model_type"], settings["scale"] = "", 0
+        return settings
 
     def save_advanced_settings(self, settings: Dict[str, Any]):
         """Saves the advanced settings."""
@@ -384,6 +556,34 @@ class AnimeUpscalerGUI(QMainWindow):
             self.settings.setValue(f"advanced_{key}", value)
         self.settings.sync()
 
+    def on_dependencies_checked(self, errors):
+        """Shows the outcome of a dependency check in the status bar."""
+        if errors:
+            self.dependency_label.setText("⚠ Tools missing")
+            self.dependency_label.setStyleSheet("color: #f44336;")
+            self.dependency_label.setToolTip("\n".join(errors))
+        else:
+            self.dependency_label.setText("✓ Tools ready")
+            self.dependency_label.setStyleSheet("color: #4CAF50;")
+            self.dependency_label.setToolTip("FFmpeg and Real-ESRGAN were found")
+        if errors != self.logged_dependencies:
+            self.logged_dependencies = errors
+            for error in errors:
+                self.log(f"❌ Error: {error}")
+            if not errors:
+                self.log("Dependencies found")
+
+    def ensure_dependencies(self) -> bool:
+        """
+        Verifies that the tools are available, showing an error if they are not.
+
+        A successful background check is reused; otherwise the tools are looked
+        for again, since they may have been installed in the meantime.
+        """
+        if self.dependencies.missing != []:
+            self.dependencies.check_now()
+        return check_dependencies(self.dependencies.missing)
+
     def start_upscaling(self):
         """Starts the upscaling process for all files in the list."""
         if self.file_list.count() == 0:
@@ -392,134 +592,609 @@ class AnimeUpscalerGUI(QMainWindow):
         if not self.output_folder:
             QMessageBox.warning(self, "Warning", "Please select an output folder")
             return
-        if not check_dependencies():
+        if not self.ensure_dependencies():
             return
+        self.run_batch(self.get_current_settings())
+
+    def run_batch(self, settings: Dict[str, Any], items=None):
+        """
+        Queues files with the given settings and starts the engine.
+
+        Args:
+            settings: A dictionary of upscaling settings.
+            items: The file list entries to queue; defaults to the whole list.
+        """
+        self.batch_settings = settings
+        self.engine.clear()
+        self.engine.configure(self.batch_settings)
+        self.job_items = {}
+        self.manifest_items = {}
+        self.batch_id = self.record_batch(
+            "create_batch", self.output_folder or "", self.batch_settings
+        )
+        if items is None:
+            items = [self.file_list.item(i) for i in range(self.file_list.count())]
+        self.name_outputs(items, settings)
+        self.skipped_files = 0
+        if settings.get("incremental"):
+            items, skipped, _ = self.plan_incremental(items, settings)
+            for item in skipped:
+                item.setData(JOB_ID_ROLE, None)
+                item.setForeground(QColor(STATE_COLORS[DONE]))
+                item.setToolTip("Status: Up to date (skipped)")
+            self.skipped_files = len(skipped)
+            if skipped:
+                self.log(f"Incremental mode: skipping {len(skipped)} up-to-date files")
+        for item in items:
+            self.queue_item(item)
 
         # Reset progress and timers
         self.overall_progress.setValue(0)
-        self.current_progress.setValue(0)
         self.processed_files = 0
-        self.total_files = self.file_list.count()
+        self.total_files = len(items)
         self.start_time = time.time()
+        self.stop_requested = False
 
         # Update UI state
         self.start_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
+        self.clear_files_btn.setEnabled(False)
         self.status_label.setText("Processing...")
         self.status_label.setStyleSheet("font-weight: bold; color: #4CAF50;")
-        self.current_workers.clear()
-        self.process_next_file()
         self.log(f"Started processing {self.total_files} files")
+        self.engine.start()
 
-    def process_next_file(self):
-        """Processes the next file in the queue."""
-        if self.processed_files >= self.total_files:
-            self.processing_completed()
-            return
+    def plan_incremental(
+        self, items, settings: Dict[str, Any], namer: Optional[OutputNamer] = None
+    ):
+        """
+        Splits file list entries into those to process and those that are up to date.
+
+        The outputs are named by `namer`, or by the app's namer.
 
+        Returns:
+            A tuple of the entries to process, the entries to skip, and the number
+            of files to process for each reason.
+        """
+        pairs = [
+            (item.text(), self.item_output_path(item, settings, namer))
+            for item in items
+        ]
+        process, _, reasons = plan_batch(pairs, settings)
+        to_process = {file_path for file_path, _ in process}
+        return (
+            [item for item in items if item.text() in to_process],
+            [item for item in items if item.text() not in to_process],
+            reasons,
+        )
+
+    def show_dry_run(self):
+        """Shows how many files the next batch would process in incremental mode."""
+        if self.file_list.count() == 0:
+            QMessageBox.warning(self, "Warning", "Please add files to process")
+            return
         if not self.output_folder:
-            self.log("Error: Output folder not set. Aborting.")
-            self.stop_processing()
+            QMessageBox.warning(self, "Warning", "Please select an output folder")
             return
+        settings = self.get_current_settings()
+        items = [self.file_list.item(i) for i in range(self.file_list.count())]
+        process, skipped, reasons = self.plan_incremental(
+            items, settings, self.name_outputs(items, settings)
+        )
+        summary = (
+            f"{len(process)} of {len(items)} files would be processed.\n"
+            f"{len(skipped)} files are up to date and would be skipped."
+        )
+        if reasons:
+            summary += "\n\nFiles to process:\n" + "\n".join(
+                f"• {reason}: {count}" for reason, count in reasons.items()
+            )
+        if not settings["incremental"]:
+            summary += (
+                "\n\nIncremental mode is turned off in the advanced settings, "
+                "so every file would currently be processed."
+            )
+        self.log(f"Dry run: {len(process)} files to process, {len(skipped)} up to date")
+        QMessageBox.information(self, "Dry Run", summary)
 
-        # Get file details and determine output path
-        file_path = self.file_list.item(self.processed_files).text()
-        file_name = Path(file_path).stem
-        file_ext = Path(file_path).suffix
-        if file_ext.lower() in [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv"]:
-            output_ext = file_ext
-        else:
-            output_ext = f".{self.get_current_settings()['format']}"
-
-        model_name = self.get_current_settings()["model"]
-        scale = "x4"
+    def name_outputs(self, items, settings: Dict[str, Any]) -> OutputNamer:
+        """
+        Names the outputs of file list entries, giving each its own output path.
 
-        output_filename = f"{file_name}_upscaled_{scale}{output_ext}"
-        output_path = os.path.join(self.output_folder, output_filename)
+        Recorded output paths (of resumed and API jobs) are kept; the others
+        are claimed in the sorted order of the files, so the same files always
+        get the same outputs. The outputs are claimed in the app's namer, so
+        they never collide with those of earlier batches or API jobs.
+        """
+        namer = self.output_namer
+        for item in items:
+            if item.data(OUTPUT_ROLE):
+                namer.reserve(item.data(OUTPUT_ROLE), item.text())
+        files = [
+            (item.text(), item.data(ROOT_ROLE))
+            for item in items
+            if not item.data(OUTPUT_ROLE)
+        ]
+        namer.plan(files, self.output_folder, settings)
+        return namer
 
-        # Create and start a worker thread
-        worker = UpscaleWorker(file_path, output_path, self.get_current_settings())
-        worker.signals.finished.connect(self.on_file_finished)
-        worker.signals.error.connect(self.on_error)
-        worker.signals.progress.connect(self.current_progress.setValue)
-        worker.signals.log.connect(self.log)
-        self.current_workers.append(worker)
-        self.thread_pool.start(worker)
+    def item_output_path(
+        self,
+        item: QListWidgetItem,
+        settings: Dict[str, Any],
+        namer: Optional[OutputNamer] = None,
+    ) -> str:
+        """Returns the output path of an entry, named by `namer` or the app's namer."""
+        return item.data(OUTPUT_ROLE) or (namer or self.output_namer).claim(
+            item.text(), self.output_folder, settings, item.data(ROOT_ROLE)
+        )
 
-    def on_file_finished(self):
-        """Handles the completion of a single file's processing."""
-        sender = self.sender()
-        worker_to_remove = None
-        for worker in self.current_workers:
-            if worker.signals == sender:
-                worker_to_remove = worker
-                break
-        if worker_to_remove:
-            self.current_workers.remove(worker_to_remove)
+    def queue_item(self, item: QListWidgetItem, settings: Dict[str, Any] = None):
+        """
+        Submits a file list entry to the engine as a job.
 
-        self.processed_files += 1
-        progress = int((self.processed_files / self.total_files) * 100)
-        self.overall_progress.setValue(progress)
-
-        # Update time estimates
-        if self.processed_files > 0:
-            elapsed = time.time() - self.start_time
-            avg_time = elapsed / self.processed_files
-            remaining = (self.total_files - self.processed_files) * avg_time
-            self.time_label.setText(
-                f"Elapsed: {format_time(elapsed)} | Remaining: {format_time(remaining)}"
+        Args:
+            item: The file list entry.
+            settings: The settings of the job; defaults to the batch settings.
+        """
+        settings = settings or self.batch_settings
+        file_path = item.text()
+        output_path = self.item_output_path(item, settings)
+        job = self.engine.submit(
+            file_path,
+            output_path,
+            settings,
+            priority=item.data(PRIORITY_ROLE) or 0,
+        )
+        if item.data(PAUSED_ROLE):
+            self.engine.pause(job.job_id)
+        item.setData(JOB_ID_ROLE, job.job_id)
+        self.job_items[job.job_id] = item
+        if self.batch_id is not None:
+            self.manifest_items[job.job_id] = self.record_batch(
+                "add_item",
+                self.batch_id,
+                file_path,
+                output_path,
+                settings,
+                job.state,
             )
+        self.update_item_state(item)
+
+    def on_job_started(self, job_id: str):
+        """Handles the start of a job."""
+        item = self.job_items.get(job_id)
+        if item:
+            self.update_item_state(item)
+            self.status_label.setText(f"Processing: {os.path.basename(item.text())}")
+        if job_id in self.manifest_items:
+            self.record_batch("mark_started", self.manifest_items[job_id], RUNNING)
 
-        self.current_progress.setValue(0)
-        self.process_next_file()
+    def on_job_waiting(self, job_id: str, reason: str):
+        """Shows why a queued job is held back, or that it no longer is."""
+        item = self.job_items.get(job_id)
+        if item:
+            self.update_item_state(item)
+            if reason:
+                self.status_label.setText(f"{os.path.basename(item.text())}: {reason}")
+
+    def update_progress(self, snapshot: Dict[str, Any]):
+        """Shows a combined progress snapshot from the engine's aggregator."""
+        jobs = snapshot["jobs"]
+        for job_id in list(self.job_progress_bars):
+            if job_id not in jobs:
+                self.job_progress_layout.removeRow(self.job_progress_bars.pop(job_id))
+        for job_id, job in jobs.items():
+            bar = self.job_progress_bars.get(job_id)
+            if bar is None:
+                bar = QProgressBar()
+                bar.setTextVisible(True)
+                self.job_progress_bars[job_id] = bar
+                self.job_progress_layout.addRow(job["label"], bar)
+            bar.setValue(job["percent"])
+            if job["rate"] and job["total"] > 1:
+                bar.setFormat(f"%p% ({job['rate']:.1f} frames/s)")
+
+        latest = snapshot.get("latest")
+        if latest and latest != self.preview_path:
+            self.request_preview(latest)
+
+        self.overall_progress.setValue(snapshot["overall"])
+        text = f"Elapsed: {format_time(snapshot['elapsed'])}"
+        if snapshot["eta"] is not None:
+            text += f" | Remaining: {format_time(snapshot['eta'])}"
+        self.time_label.setText(text)
+
+    def request_preview(self, path: str):
+        """Requests a thumbnail for the preview panel; it is decoded in the background."""
+        self.preview_path = path
+        self.thumbnails.request(path)
+
+    def show_thumbnail(self, path: str, image: QImage):
+        """Shows a decoded thumbnail if it is still the one that was requested."""
+        if path != self.preview_path:
+            return
+        self.preview_label.setPixmap(QPixmap.fromImage(image))
+        self.preview_caption.setText(os.path.basename(path))
+
+    def preview_item(self, item: QListWidgetItem, previous=None):
+        """Previews the output of a selected file, or the file itself."""
+        if item is None:
+            return
+        file_path = item.text()
+        job = self.engine.scheduler.get(item.data(JOB_ID_ROLE) or "")
+        if job:
+            output_path = job.output_path
+        elif self.output_folder or item.data(OUTPUT_ROLE):
+            output_path = self.item_output_path(item, self.get_current_settings())
+        else:
+            output_path = None
+        for path in (output_path, file_path):
+            if path and not is_video(path) and os.path.isfile(path):
+                self.request_preview(path)
+                return
 
-    def on_error(self, error_message: str):
-        """Handles errors reported by worker threads."""
-        self.log(f"❌ Error: {error_message}")
+    def on_file_finished(self, job_id: str, state: str):
+        """Handles the completion of a single file's processing."""
+        item = self.job_items.get(job_id)
+        if item:
+            self.update_item_state(item)
         self.processed_files += 1
-        self.process_next_file()
+        job = self.engine.scheduler.get(job_id)
+        if job_id in self.manifest_items:
+            self.record_batch(
+                "mark_finished", self.manifest_items[job_id], state, job.error
+            )
+        if job.file_path in self.watched_files and state in (DONE, FAILED):
+            self.watched_files.discard(job.file_path)
+            if self.watcher:
+                new_path = self.watcher.mark_processed(job.file_path, state == DONE)
+                if new_path and item:
+                    item.setText(new_path)
 
     def processing_completed(self):
         """Handles the completion of all processing."""
+        if self.closing:
+            # The batch stays unfinished in the manifest, so it can be resumed
+            self.shut_down()
+            QCoreApplication.quit()
+            return
         elapsed = time.time() - self.start_time
         self.start_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
+        self.clear_files_btn.setEnabled(True)
+        if self.batch_id is not None:
+            self.record_batch(
+                "finish_batch",
+                self.batch_id,
+                BATCH_STOPPED if self.stop_requested else BATCH_COMPLETED,
+            )
+            self.batch_id = None
+        if self.stop_requested:
+            for item in self.job_items.values():
+                self.update_item_state(item)
+            self.status_label.setText("Stopped")
+            self.status_label.setStyleSheet("font-weight: bold; color: #f44336;")
+            self.log("Processing stopped by user")
+            return
+        counts = self.engine.scheduler.counts()
         self.status_label.setText("Completed!")
         self.status_label.setStyleSheet("font-weight: bold; color: #4CAF50;")
         self.time_label.setText(f"Total time: {format_time(elapsed)}")
         self.log(f"✅ Processing completed! Total time: {format_time(elapsed)}")
-        QMessageBox.information(
+        summary = (
+            f"Successfully processed {counts.get(DONE, 0)} of {self.total_files} "
+            f"files in {format_time(elapsed)}"
+        )
+        if self.skipped_files:
+            summary += f"\n{self.skipped_files} up-to-date files were skipped"
+        if counts.get(FAILED):
+            summary += f"\n{counts[FAILED]} files failed"
+        if self.watcher:
+            # Keep watching without interrupting the operator after every arrival
+            self.status_label.setText("Watching for new files...")
+            self.log(summary.replace("\n", "; "))
+            return
+        QMessageBox.information(self, "Processing Complete", summary)
+
+    def toggle_watch(self, checked: bool):
+        """Starts or stops watching a folder for new files."""
+        if not checked:
+            if self.watcher:
+                self.watcher.stop()
+                self.watcher.deleteLater()
+                self.watcher = None
+                self.statusBar().showMessage("Ready")
+                self.log("Stopped watching folder")
+            return
+        if not self.output_folder:
+            QMessageBox.warning(self, "Warning", "Please select an output folder")
+            self.watch_action.setChecked(False)
+            return
+        folder = QFileDialog.getExistingDirectory(
+            self, "Select Folder to Watch", self.settings.value("watch_folder", "")
+        )
+        if not folder or not self.ensure_dependencies():
+            self.watch_action.setChecked(False)
+            return
+        self.settings.setValue("watch_folder", folder)
+        settings = self.get_current_settings()
+        from .watcher import FolderWatcher
+
+        self.watcher = FolderWatcher(
+            folder,
+            action=settings["watch_action"],
+            settle_time=settings["watch_settle"],
+            exclude=[self.output_folder],
+            parent=self,
+        )
+        self.watcher.file_ready.connect(self.on_watch_file)
+        self.watcher.log.connect(self.log)
+        self.watcher.start()
+        self.statusBar().showMessage(f"Watching: {folder}")
+        self.log(f"Watching folder: {folder}")
+
+    def on_watch_file(self, file_path: str):
+        """Queues a file that has finished being written into the watched folder."""
+        settings = self.batch_settings if self.engine.running else None
+        settings = settings or self.get_current_settings()
+        if settings.get("incremental"):
+            output_path = self.output_namer.claim(
+                file_path, self.output_folder, settings, self.watcher.folder
+            )
+            try:
+                up_to_date = check_output(file_path, output_path, settings) is None
+            except OSError:
+                up_to_date = False
+            if up_to_date:
+                self.log(
+                    f"Watch folder: skipped up-to-date {os.path.basename(file_path)}"
+                )
+                self.watcher.mark_processed(file_path, True)
+                return
+        items = self.file_list.findItems(file_path, Qt.MatchFlag.MatchExactly)
+        if items:
+            item = items[0]
+        else:
+            item = QListWidgetItem(file_path)
+            item.setData(ROOT_ROLE, self.watcher.folder)
+            self.file_list.addItem(item)
+        self.watched_files.add(file_path)
+        self.log(f"Watch folder: queued {os.path.basename(file_path)}")
+        if self.engine.running:
+            self.total_files += 1
+            self.queue_item(item)
+        else:
+            self.run_batch(settings, [item])
+
+    def update_api_server(self):
+        """Starts, restarts or stops the local HTTP API to match the settings."""
+        settings = self.get_current_settings()
+        port = settings["api_port"] if settings["api_enabled"] else None
+        if self.api_server and self.api_server.port == port:
+            return
+        if self.api_server:
+            self.api_server.stop()
+            self.api_server.deleteLater()
+            self.api_server = None
+            self.log("HTTP API stopped")
+        if port is None:
+            return
+        from .api_server import JobApiServer
+
+        server = JobApiServer(
+            self.engine,
+            self.get_current_settings,
+            lambda: self.output_folder,
+            outputs=self.output_namer,
+            submit=self.submit_api_job,
+            port=port,
+            parent=self,
+        )
+        server.log.connect(self.log)
+        try:
+            server.start()
+        except OSError as e:
+            self.log(f"❌ Error: Could not start the HTTP API on port {port}: {e}")
+            server.deleteLater()
+            return
+        self.api_server = server
+
+    def submit_api_job(
+        self,
+        file_path: str,
+        output_path: str,
+        settings: Dict[str, Any],
+        priority: int,
+    ):
+        """
+        Adds a job submitted through the HTTP API to the file list and queues it.
+
+        Returns:
+            The id of the job, or None if it was skipped as up to date.
+        """
+        item = QListWidgetItem(file_path)
+        item.setData(OUTPUT_ROLE, output_path)
+        item.setData(PRIORITY_ROLE, priority)
+        self.file_list.addItem(item)
+        if self.engine.running:
+            self.total_files += 1
+            self.queue_item(item, settings)
+        else:
+            self.run_batch(settings, [item])
+        return item.data(JOB_ID_ROLE)
+
+    def record_batch(self, method: str, *args):
+        """
+        Calls a `BatchManifest` method, disabling the manifest if the database fails.
+
+        A broken manifest must never interrupt a running batch, so errors are
+        only logged.
+        """
+        if self.manifest is None:
+            return None
+        try:
+            return getattr(self.manifest, method)(*args)
+        except sqlite3.Error as e:
+            self.log(f"Warning: Batch manifest disabled after an error: {e}")
+            self.manifest = None
+            self.batch_id = None
+            return None
+
+    def offer_resume(self):
+        """Offers to resume a batch that was interrupted by a crash or by closing the app."""
+        if self.manifest is None:
+            return
+        batch = self.record_batch("interrupted_batch")
+        if batch is None:
+            return
+        items = self.manifest.items(batch["id"])
+        finished = [item for item in items if self.manifest.is_complete(item)]
+        remaining = [
+            item
+            for item in items
+            if item not in finished and os.path.isfile(item["input_path"])
+        ]
+        if not remaining:
+            self.record_batch("finish_batch", batch["id"], BATCH_COMPLETED)
+            return
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(batch["created_at"]))
+        answer = QMessageBox.question(
             self,
-            "Processing Complete",
-            f"Successfully processed {self.total_files} files in {format_time(elapsed)}",
+            "Resume Batch",
+            f"A batch of {len(items)} files started on {started} did not finish.\n"
+            f"{len(finished)} files were completed.\n\n"
+            f"Resume the remaining {len(remaining)} files?",
         )
+        if answer != QMessageBox.StandardButton.Yes:
+            self.record_batch("finish_batch", batch["id"], BATCH_ABANDONED)
+            return
+        self.record_batch("finish_batch", batch["id"], BATCH_RESUMED)
+
+        if batch["output_folder"]:
+            self.output_folder = batch["output_folder"]
+            os.makedirs(self.output_folder, exist_ok=True)
+            self.output_path_label.setText(self.output_folder)
+            self.output_path_label.setStyleSheet("color: white;")
+        self.file_list.clear()
+        self.job_items = {}
+        for entry in remaining:
+            # Keep the recorded output path, which may differ from the output folder
+            item = QListWidgetItem(entry["input_path"])
+            item.setData(OUTPUT_ROLE, entry["output_path"])
+            self.file_list.addItem(item)
+        self.log(f"Resuming batch: skipped {len(finished)} completed files")
+        if self.ensure_dependencies():
+            self.run_batch(batch["settings"])
 
     def stop_processing(self):
-        """Stops all active processing threads."""
-        for worker in self.current_workers:
-            worker.cancel()
-        self.thread_pool.waitForDone(5000)  # Wait up to 5 seconds for threads to finish
-        self.start_btn.setEnabled(True)
+        """
+        Stops all active processing without blocking the UI.
+
+        Workers are cancelled asynchronously; `processing_completed` restores the
+        controls once the last one has exited.
+        """
+        self.stop_requested = True
+        if self.watcher:
+            self.watch_action.setChecked(False)
         self.stop_btn.setEnabled(False)
-        self.status_label.setText("Stopped")
-        self.status_label.setStyleSheet("font-weight: bold; color: #f44336;")
-        self.log("Processing stopped by user")
+        self.status_label.setText("Stopping...")
+        self.status_label.setStyleSheet("font-weight: bold; color: #ff9800;")
+        self.engine.cancel_all()
+
+    def update_item_state(self, item: QListWidgetItem):
+        """Shows the scheduling state of a file in the list."""
+        job = self.engine.scheduler.get(item.data(JOB_ID_ROLE) or "")
+        priority = item.data(PRIORITY_ROLE) or 0
+        if job and item.data(JOB_ID_ROLE):
+            state = job.state
+        else:
+            state = PAUSED if item.data(PAUSED_ROLE) else QUEUED
+        item.setForeground(QColor(STATE_COLORS.get(state, "#ffffff")))
+        tooltip = f"Status: {state.capitalize()}"
+        if priority:
+            tooltip += f" | Priority: {priority:+d}"
+        if job and job.state == QUEUED and job.waiting:
+            tooltip += f"\n{job.waiting}"
+        if job and job.error:
+            tooltip += f"\n{job.error}"
+        item.setToolTip(tooltip)
+
+    def show_file_menu(self, pos):
+        """Shows the context menu for scheduling the selected files."""
+        items = self.file_list.selectedItems()
+        if not items:
+            return
+        menu = QMenu(self)
+        raise_action = menu.addAction("Raise Priority")
+        lower_action = menu.addAction("Lower Priority")
+        top_action = menu.addAction("Move to Top")
+        menu.addSeparator()
+        pause_action = menu.addAction("Pause")
+        resume_action = menu.addAction("Resume")
+        action = menu.exec(self.file_list.viewport().mapToGlobal(pos))
+        if action is None:
+            return
+        if action == top_action:
+            for row, item in enumerate(items):
+                self.file_list.takeItem(self.file_list.row(item))
+                self.file_list.insertItem(row, item)
+            self.on_queue_reordered()
+            return
+        for item in items:
+            job_id = item.data(JOB_ID_ROLE)
+            if action in (raise_action, lower_action):
+                delta = 1 if action == raise_action else -1
+                priority = (item.data(PRIORITY_ROLE) or 0) + delta
+                item.setData(PRIORITY_ROLE, priority)
+                if job_id:
+                    self.engine.set_priority(job_id, priority)
+            elif action == pause_action:
+                item.setData(PAUSED_ROLE, True)
+                if job_id:
+                    self.engine.pause(job_id)
+            elif action == resume_action:
+                item.setData(PAUSED_ROLE, False)
+                if job_id:
+                    self.engine.resume(job_id)
+            self.update_item_state(item)
+
+    def on_queue_reordered(self, *args):
+        """Applies the order of the file list to the queued jobs."""
+        job_ids = [
+            self.file_list.item(i).data(JOB_ID_ROLE)
+            for i in range(self.file_list.count())
+        ]
+        self.engine.reorder([job_id for job_id in job_ids if job_id])
 
     def log(self, message: str):
-        """Adds a message to the log widget with a timestamp."""
-        timestamp = time.strftime("%H:%M:%S")
-        self.log_text.append(f"[{timestamp}] {message}")
+        """Queues a message for the log; it is timestamped and shown on the next flush."""
+        self.log_sink.write(message)
+
+    def append_log_text(self, text: str):
+        """Appends a flushed block of log lines to the log widget."""
+        self.log_text.appendPlainText(text)
+        self.log_text.ensureCursorVisible()
+
+    def change_log_level(self):
+        """Re-renders the log history at the selected level."""
+        level = self.log_level_combo.currentData()
+        self.log_text.setPlainText(self.log_sink.set_level(level))
         self.log_text.ensureCursorVisible()
 
+    def clear_log(self):
+        """Clears the log widget and its history."""
+        self.log_sink.clear()
+        self.log_text.clear()
+
     def save_log(self):
-        """Saves the current log to a text file."""
+        """Saves the full session log to a text file."""
         filename, _ = QFileDialog.getSaveFileName(
             self, "Save Log", "upscaler_log.txt", "Text Files (*.txt)"
         )
         if filename:
             try:
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write(self.log_text.toPlainText())
+                self.log_sink.save_to(filename)
                 self.log(f"Log saved to: {filename}")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to save log: {str(e)}")
@@ -560,8 +1235,31 @@ class AnimeUpscalerGUI(QMainWindow):
             self.restoreGeometry(geometry)
 
     def closeEvent(self, event):
-        """Saves settings and stops processing on application close."""
+        """
+        Saves settings and stops processing on application close.
+
+        Running jobs are cancelled without blocking: the window is hidden and
+        `processing_completed` quits once the last worker has exited.
+        """
+        if self.closing:
+            event.ignore()
+            return
         self.settings.setValue("geometry", self.saveGeometry())
-        if self.stop_btn.isEnabled():
+        if self.watcher:
+            self.watcher.stop()
+        if self.api_server:
+            self.api_server.stop()
+        if self.engine.running:
+            self.closing = True
             self.stop_processing()
+            self.hide()
+            event.ignore()
+            return
+        self.shut_down()
         event.accept()
+
+    def shut_down(self):
+        """Flushes the log and closes the manifest before the app exits."""
+        self.log_sink.close()
+        if self.manifest:
+            self.manifest.close()
@@ -0,0 +1,243 @@
+"""
+This module defines the `BatchManifest` class, a durable on-disk record of
+upscaling batches.
+
+The queue itself only lives in memory, so without a manifest a crash or an
+accidental close loses every record of what was already finished. The manifest
+is a small SQLite database that records, for every batch:
+- The output folder and the settings the batch was started with.
+- Every input file with its settings hash, status, output path, timings and error.
+
+Every update is committed immediately, so the manifest survives a crash at any
+point. On the next launch, an interrupted batch can be resumed; items whose
+outputs already exist and still match the recorded size are skipped.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from typing import Dict, Any, List, Optional
+from .scheduler import DONE
+
+# Settings that change the produced output; other settings (concurrency,
+# logging, retries) only change how the output is produced
+OUTPUT_SETTINGS = ("model", "fps", "quality", "format")
+# Output settings added later; they only count when set, so records written
+# before they existed stay valid
+OPTIONAL_OUTPUT_SETTINGS = (
+    "target_height",
+    "pre_downscale",
+    "model_type",
+    "scale",
+    "jpeg_quality",
+    "webp_quality",
+    "webp_lossless",
+    "field_mode",
+    "png_compression",
+    "webp_effort",
+    "copy_metadata",
+)
+# The values that leave an optional output setting unset, where that is not
+# a false value: -1 selects the encoder's default, and metadata used to be
+# dropped before it could be copied, so only turning copying off counts
+UNSET_OUTPUT_SETTINGS = {
+    "png_compression": -1,
+    "webp_effort": -1,
+    "copy_metadata": True,
+}
+
+BATCH_RUNNING = "running"
+BATCH_COMPLETED = "completed"
+BATCH_STOPPED = "stopped"
+BATCH_RESUMED = "resumed"
+BATCH_ABANDONED = "abandoned"
+
+# Number of finished batches kept in the manifest
+MAX_BATCHES = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    output_folder TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id INTEGER NOT NULL REFERENCES batches(id) ON DELETE CASCADE,
+    input_path TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    settings_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    output_size INTEGER,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS items_batch ON items(batch_id);
+"""
+
+
+def _is_set(key: str, value: Any) -> bool:
+    """Returns True if an optional output setting has a value of its own."""
+    if key in UNSET_OUTPUT_SETTINGS:
+        return value is not None and value != UNSET_OUTPUT_SETTINGS[key]
+    return bool(value)
+
+
+def settings_hash(settings: Dict[str, Any]) -> str:
+    """Returns a short hash of the settings that affect the produced output."""
+    relevant = {key: settings.get(key) for key in OUTPUT_SETTINGS}
+    relevant.update(
+        {
+            key: settings[key]
+            for key in OPTIONAL_OUTPUT_SETTINGS
+            if _is_set(key, settings.get(key))
+        }
+    )
+    data = json.dumps(relevant, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+class BatchManifest:
+    """Records batches and their items in an SQLite database."""
+
+    def __init__(self, path: str):
+        """
+        Opens (or creates) the manifest database.
+
+        Args:
+            path: The path to the database file, or ":memory:".
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA foreign_keys = ON")
+        # WAL keeps every committed update even if the app is killed mid-batch
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def create_batch(self, output_folder: str, settings: Dict[str, Any]) -> int:
+        """
+        Records a new batch and prunes old finished ones.
+
+        Returns:
+            The id of the new batch.
+        """
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO batches (created_at, output_folder, settings, status) "
+                "VALUES (?, ?, ?, ?)",
+                (time.time(), output_folder, json.dumps(settings), BATCH_RUNNING),
+            )
+            self._db.execute(
+                "DELETE FROM batches WHERE status != ? AND id NOT IN "
+                "(SELECT id FROM batches ORDER BY id DESC LIMIT ?)",
+                (BATCH_RUNNING, MAX_BATCHES),
+            )
+        return cursor.lastrowid
+
+    def finish_batch(self, batch_id: int, status: str):
+        """Records the final status of a batch."""
+        with self._db:
+            self._db.execute(
+                "UPDATE batches SET status = ? WHERE id = ?", (status, batch_id)
+            )
+
+    def add_item(
+        self,
+        batch_id: int,
+        input_path: str,
+        output_path: str,
+        settings: Dict[str, Any],
+        status: str,
+    ) -> int:
+        """
+        Records a file queued in a batch.
+
+        Returns:
+            The id of the new item.
+        """
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO items (batch_id, input_path, output_path, "
+                "settings_hash, status) VALUES (?, ?, ?, ?, ?)",
+                (batch_id, input_path, output_path, settings_hash(settings), status),
+            )
+        return cursor.lastrowid
+
+    def mark_started(self, item_id: int, status: str):
+        """Records the start of an item."""
+        with self._db:
+            self._db.execute(
+                "UPDATE items SET status = ?, started_at = ? WHERE id = ?",
+                (status, time.time(), item_id),
+            )
+
+    def mark_finished(self, item_id: int, status: str, error: Optional[str] = None):
+        """Records the final status of an item and the size of its output."""
+        row = self._db.execute(
+            "SELECT output_path FROM items WHERE id = ?", (item_id,)
+        ).fetchone()
+        output_size = None
+        if row is not None and os.path.isfile(row["output_path"]):
+            output_size = os.path.getsize(row["output_path"])
+        with self._db:
+            self._db.execute(
+                "UPDATE items SET status = ?, finished_at = ?, output_size = ?, "
+                "error = ? WHERE id = ?",
+                (status, time.time(), output_size, error, item_id),
+            )
+
+    def interrupted_batch(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns the most recent batch that never finished, if any.
+
+        Returns:
+            A dictionary with `id`, `created_at`, `output_folder` and `settings`,
+            or None.
+        """
+        row = self._db.execute(
+            "SELECT * FROM batches WHERE status = ? ORDER BY id DESC LIMIT 1",
+            (BATCH_RUNNING,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "created_at": row["created_at"],
+            "output_folder": row["output_folder"],
+            "settings": json.loads(row["settings"]),
+        }
+
+    def items(self, batch_id: int) -> List[Dict[str, Any]]:
+        """Returns the items of a batch in queue order."""
+        rows = self._db.execute(
+            "SELECT * FROM items WHERE batch_id = ? ORDER BY id", (batch_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def is_complete(self, item: Dict[str, Any]) -> bool:
+        """
+        Checks whether an item's output can be kept when resuming.
+
+        The item must have finished successfully and its output must still exist
+        with the size recorded at that time, which rules out outputs that were
+        deleted, replaced or only partially written.
+        """
+        if item["status"] != DONE or item["output_size"] is None:
+            return False
+        try:
+            return os.path.getsize(item["output_path"]) == item["output_size"]
+        except OSError:
+            return False
+
+    def close(self):
+        """Closes the database."""
+        self._db.close()
@@ -0,0 +1,112 @@
+"""
+This module provides helpers for locating the FFmpeg toolchain and probing media files.
+
+It includes functions for:
+- Locating the FFmpeg and FFprobe executables (bundled `bin` folder first, then PATH).
+- Probing a video's duration, frame rate, frame count and resolution with FFprobe.
+- Classifying file paths as images or videos by extension.
+"""
+
+import os
+import json
+import shutil
+import subprocess
+from typing import Dict, Any, Optional
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".webp")
+
+
+def is_video(file_path: str) -> bool:
+    """Returns True if the path has a supported video extension."""
+    return file_path.lower().endswith(VIDEO_EXTENSIONS)
+
+
+def _find_tool(name: str) -> Optional[str]:
+    """Finds a toolchain executable in the bundled `bin` folder or on PATH."""
+    bin_tool = os.path.join("bin", f"{name}.exe" if os.name == "nt" else name)
+    if os.path.isfile(bin_tool):
+        return bin_tool
+    return shutil.which(name)
+
+
+def get_ffmpeg_path() -> str:
+    """Gets the path to the FFmpeg executable."""
+    ffmpeg_path = _find_tool("ffmpeg")
+    if ffmpeg_path:
+        return ffmpeg_path
+    raise FileNotFoundError(
+        "FFmpeg not found. Please ensure ffmpeg is in the bin folder or in PATH."
+    )
+
+
+def get_ffprobe_path() -> str:
+    """Gets the path to the FFprobe executable."""
+    ffprobe_path = _find_tool("ffprobe")
+    if ffprobe_path:
+        return ffprobe_path
+    raise FileNotFoundError(
+        "FFprobe not found. Please ensure ffprobe is in the bin folder or in PATH."
+    )
+
+
+def _parse_rate(rate: str) -> float:
+    """Parses an FFprobe rational such as '24000/1001' into a float."""
+    try:
+        if "/" in rate:
+            num, den = rate.split("/", 1)
+            return float(num) / float(den) if float(den) else 0.0
+        return float(rate)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def probe_video(video_path: str) -> Dict[str, Any]:
+    """
+    Probes a video file with FFprobe.
+
+    Args:
+        video_path: The path to the video file.
+
+    Returns:
+        A dictionary with `duration` (seconds), `fps`, `frames`, `width`,
+        `height` and `has_audio`. Unknown values are reported as 0.
+    """
+    cmd = [
+        get_ffprobe_path(),
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration:stream=codec_type,width,height,avg_frame_rate,"
+        "r_frame_rate,nb_frames",
+        "-of",
+        "json",
+        video_path,
+    ]
+    process = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Probing failed: {process.stderr}")
+
+    data = json.loads(process.stdout or "{}")
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    duration = float(data.get("format", {}).get("duration") or 0.0)
+    fps = _parse_rate(video.get("avg_frame_rate", "")) or _parse_rate(
+        video.get("r_frame_rate", "")
+    )
+    frames = int(video.get("nb_frames") or 0)
+    if not frames and duration and fps:
+        frames = int(round(duration * fps))
+    return {
+        "duration": duration,
+        "fps": fps,
+        "frames": frames,
+        "width": int(video.get("width") or 0),
+        "height": int(video.get("height") or 0),
+        "has_audio": any(s.get("codec_type") == "audio" for s in streams),
+    }
@@ -0,0 +1,316 @@
+"""
+This module copies image metadata, i.e. the EXIF data and the ICC color
+profile, from a source image to its upscaled output.
+
+Real-ESRGAN and FFmpeg drop both when they write an image. Rather than decoding
+and re-encoding the output, the metadata is spliced into the encoded file:
+- JPEG: an APP1 `Exif` segment and APP2 `ICC_PROFILE` segments after the
+  JFIF header.
+- PNG: `eXIf` and `iCCP` chunks after the `IHDR` chunk.
+- WebP: `EXIF` and `ICCP` chunks, converting a simple file to the extended
+  (`VP8X`) layout the chunks require.
+
+Formats are detected from the file contents. Metadata the output already has
+is kept, and sources in other formats have nothing to copy.
+"""
+
+import os
+import struct
+import zlib
+from typing import List, NamedTuple, Optional, Tuple
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+EXIF_HEADER = b"Exif\x00\x00"
+ICC_HEADER = b"ICC_PROFILE\x00"
+# The largest payload of a JPEG segment, and of one ICC_PROFILE segment
+JPEG_SEGMENT_MAX = 65533
+ICC_CHUNK_MAX = JPEG_SEGMENT_MAX - len(ICC_HEADER) - 2
+
+# Flags of the WebP VP8X chunk
+WEBP_ICC = 0x20
+WEBP_ALPHA = 0x10
+WEBP_EXIF = 0x08
+
+
+class ImageMetadata(NamedTuple):
+    """The metadata of an image."""
+
+    # TIFF-structured EXIF data, without the JPEG "Exif" header
+    exif: Optional[bytes] = None
+    icc: Optional[bytes] = None
+
+
+def _image_type(data: bytes) -> Optional[str]:
+    """Returns "jpeg", "png" or "webp" from the start of a file, or None."""
+    if data.startswith(b"\xff\xd8"):
+        return "jpeg"
+    if data.startswith(PNG_SIGNATURE):
+        return "png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def read_metadata(path: str) -> ImageMetadata:
+    """Reads the EXIF data and ICC profile of a JPEG, PNG or WebP image."""
+    with open(path, "rb") as f:
+        data = f.read()
+    readers = {"jpeg": _read_jpeg, "png": _read_png, "webp": _read_webp}
+    reader = readers.get(_image_type(data))
+    if reader is None:
+        return ImageMetadata()
+    try:
+        return reader(data)
+    except (IndexError, ValueError, struct.error, zlib.error):
+        # A damaged header has no metadata worth copying
+        return ImageMetadata()
+
+
+def write_metadata(path: str, metadata: ImageMetadata) -> bool:
+    """
+    Adds metadata to a JPEG, PNG or WebP image in place.
+
+    Returns:
+        True if the file was changed.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    writers = {"jpeg": _write_jpeg, "png": _write_png, "webp": _write_webp}
+    writer = writers.get(_image_type(data))
+    if writer is None or not (metadata.exif or metadata.icc):
+        return False
+    try:
+        updated = writer(data, metadata)
+    except (IndexError, ValueError, struct.error, zlib.error):
+        return False
+    if updated == data:
+        return False
+    temp_path = path + ".meta.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(updated)
+    os.replace(temp_path, path)
+    return True
+
+
+def copy_metadata(source_path: str, output_path: str) -> bool:
+    """
+    Copies the EXIF data and ICC profile of a source image to its output.
+
+    Returns:
+        True if the output was changed.
+    """
+    return write_metadata(output_path, read_metadata(source_path))
+
+
+# JPEG
+
+
+def _jpeg_segments(data: bytes) -> Tuple[List[Tuple[int, bytes]], int]:
+    """
+    Splits the header of a JPEG file into its marker segments.
+
+    Returns:
+        The `(marker, payload)` of every segment before the image data, and
+        the offset at which the image data (start of scan) begins.
+    """
+    segments = []
+    offset = 2
+    while offset + 4 <= len(data) and data[offset] == 0xFF:
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Fill byte
+            offset += 1
+            continue
+        if marker == 0xDA:
+            break
+        length = struct.unpack(">H", data[offset + 2 : offset + 4])[0]
+        segments.append((marker, data[offset + 4 : offset + 2 + length]))
+        offset += 2 + length
+    return segments, offset
+
+
+def _read_jpeg(data: bytes) -> ImageMetadata:
+    """Reads the metadata of a JPEG file."""
+    exif = None
+    icc_chunks = []
+    for marker, payload in _jpeg_segments(data)[0]:
+        if marker == 0xE1 and payload.startswith(EXIF_HEADER) and exif is None:
+            exif = payload[len(EXIF_HEADER) :]
+        elif marker == 0xE2 and payload.startswith(ICC_HEADER):
+            sequence = payload[len(ICC_HEADER)]
+            icc_chunks.append((sequence, payload[len(ICC_HEADER) + 2 :]))
+    icc = b"".join(chunk for _, chunk in sorted(icc_chunks)) or None
+    return ImageMetadata(exif, icc)
+
+
+def _jpeg_segment(marker: int, payload: bytes) -> bytes:
+    """Encodes a JPEG marker segment."""
+    return bytes([0xFF, marker]) + struct.pack(">H", len(payload) + 2) + payload
+
+
+def _write_jpeg(data: bytes, metadata: ImageMetadata) -> bytes:
+    """Returns a JPEG file with the metadata it does not have yet."""
+    segments, _ = _jpeg_segments(data)
+    existing = _read_jpeg(data)
+    added = b""
+    exif_payload = metadata.exif and EXIF_HEADER + metadata.exif
+    if exif_payload and not existing.exif and len(exif_payload) <= JPEG_SEGMENT_MAX:
+        added += _jpeg_segment(0xE1, exif_payload)
+    if metadata.icc and not existing.icc:
+        chunks = [
+            metadata.icc[start : start + ICC_CHUNK_MAX]
+            for start in range(0, len(metadata.icc), ICC_CHUNK_MAX)
+        ]
+        if len(chunks) <= 255:
+            for sequence, chunk in enumerate(chunks, 1):
+                payload = ICC_HEADER + bytes([sequence, len(chunks)]) + chunk
+                added += _jpeg_segment(0xE2, payload)
+    if not added:
+        return data
+    # Insert after the JFIF (APP0) segment, which has to come first
+    offset = 2
+    if segments and segments[0][0] == 0xE0:
+        offset += 4 + len(segments[0][1])
+    return data[:offset] + added + data[offset:]
+
+
+# PNG
+
+
+def _png_chunks(data: bytes) -> List[Tuple[bytes, bytes]]:
+    """Splits a PNG file into its `(type, data)` chunks."""
+    chunks = []
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[offset : offset + 8])
+        chunks.append((kind, data[offset + 8 : offset + 8 + length]))
+        offset += 12 + length
+    return chunks
+
+
+def _png_chunk(kind: bytes, payload: bytes) -> bytes:
+    """Encodes a PNG chunk."""
+    crc = zlib.crc32(kind + payload) & 0xFFFFFFFF
+    return struct.pack(">I", len(payload)) + kind + payload + struct.pack(">I", crc)
+
+
+def _read_png(data: bytes) -> ImageMetadata:
+    """Reads the metadata of a PNG file."""
+    exif = icc = None
+    for kind, payload in _png_chunks(data):
+        if kind == b"eXIf":
+            exif = payload
+        elif kind == b"iCCP":
+            # Profile name, a null byte, the compression method, the profile
+            name_end = payload.find(b"\x00")
+            try:
+                icc = zlib.decompress(payload[name_end + 2 :])
+            except zlib.error:
+                icc = None
+    return ImageMetadata(exif, icc)
+
+
+def _write_png(data: bytes, metadata: ImageMetadata) -> bytes:
+    """Returns a PNG file with the metadata it does not have yet."""
+    chunks = _png_chunks(data)
+    existing = _read_png(data)
+    added = []
+    if metadata.icc and not existing.icc:
+        payload = b"ICC profile\x00\x00" + zlib.compress(metadata.icc)
+        added.append((b"iCCP", payload))
+        # An ICC profile replaces the sRGB chunk
+        chunks = [chunk for chunk in chunks if chunk[0] != b"sRGB"]
+    if metadata.exif and not existing.exif:
+        added.append((b"eXIf", metadata.exif))
+    if not added or not chunks or chunks[0][0] != b"IHDR":
+        return data
+    chunks = chunks[:1] + added + chunks[1:]
+    return PNG_SIGNATURE + b"".join(_png_chunk(*chunk) for chunk in chunks)
+
+
+# WebP
+
+
+def _webp_chunks(data: bytes) -> List[Tuple[bytes, bytes]]:
+    """Splits a WebP file into its `(fourcc, data)` chunks."""
+    chunks = []
+    offset = 12
+    while offset + 8 <= len(data):
+        kind, length = struct.unpack("<4sI", data[offset : offset + 8])
+        chunks.append((kind, data[offset + 8 : offset + 8 + length]))
+        # Chunks are padded to an even size
+        offset += 8 + length + (length & 1)
+    return chunks
+
+
+def _webp_chunk(kind: bytes, payload: bytes) -> bytes:
+    """Encodes a WebP chunk."""
+    padding = b"\x00" if len(payload) & 1 else b""
+    return kind + struct.pack("<I", len(payload)) + payload + padding
+
+
+def _read_webp(data: bytes) -> ImageMetadata:
+    """Reads the metadata of a WebP file."""
+    exif = icc = None
+    for kind, payload in _webp_chunks(data):
+        if kind == b"EXIF":
+            # Some writers keep the JPEG header
+            exif = (
+                payload[len(EXIF_HEADER) :]
+                if payload.startswith(EXIF_HEADER)
+                else payload
+            )
+        elif kind == b"ICCP":
+            icc = payload
+    return ImageMetadata(exif, icc)
+
+
+def _webp_canvas(chunks: List[Tuple[bytes, bytes]]) -> Optional[Tuple[int, int, bool]]:
+    """Returns the width, height and alpha of a simple (lossy or lossless) WebP."""
+    for kind, payload in chunks:
+        if kind == b"VP8L" and len(payload) >= 5 and payload[0] == 0x2F:
+            bits = int.from_bytes(payload[1:5], "little")
+            width = (bits & 0x3FFF) + 1
+            height = ((bits >> 14) & 0x3FFF) + 1
+            return width, height, bool((bits >> 28) & 1)
+        if kind == b"VP8 " and len(payload) >= 10 and payload[3:6] == b"\x9d\x01\x2a":
+            width = int.from_bytes(payload[6:8], "little") & 0x3FFF
+            height = int.from_bytes(payload[8:10], "little") & 0x3FFF
+            return width, height, False
+    return None
+
+
+def _write_webp(data: bytes, metadata: ImageMetadata) -> bytes:
+    """Returns a WebP file with the metadata it does not have yet."""
+    chunks = _webp_chunks(data)
+    existing = _read_webp(data)
+    icc = metadata.icc if metadata.icc and not existing.icc else None
+    exif = metadata.exif if metadata.exif and not existing.exif else None
+    if not icc and not exif:
+        return data
+    if chunks and chunks[0][0] == b"VP8X":
+        header = bytearray(chunks[0][1])
+        chunks = chunks[1:]
+    else:
+        canvas = _webp_canvas(chunks)
+        if canvas is None:
+            return data
+        width, height, alpha = canvas
+        header = bytearray(10)
+        header[0] = WEBP_ALPHA if alpha else 0
+        header[4:7] = (width - 1).to_bytes(3, "little")
+        header[7:10] = (height - 1).to_bytes(3, "little")
+    if icc:
+        header[0] |= WEBP_ICC
+    if exif:
+        header[0] |= WEBP_EXIF
+    # The ICC profile precedes the image data; EXIF and XMP follow it
+    leading = [(b"ICCP", icc)] if icc else [c for c in chunks if c[0] == b"ICCP"]
+    image = [c for c in chunks if c[0] not in (b"ICCP", b"EXIF", b"XMP ")]
+    trailing = [(b"EXIF", exif)] if exif else [c for c in chunks if c[0] == b"EXIF"]
+    trailing += [c for c in chunks if c[0] == b"XMP "]
+    body = b"WEBP" + b"".join(
+        _webp_chunk(kind, payload)
+        for kind, payload in [(b"VP8X", bytes(header))] + leading + image + trailing
+    )
+    return b"RIFF" + struct.pack("<I", len(body)) + body
@@ -0,0 +1,344 @@
+"""
+This module implements the registry of installed Real-ESRGAN models.
+
+The registry indexes the models directory once and records for every model:
+- Its native scale, read from the name (see `scaling.model_scale`).
+- Its type: `anime` for anime images, `video` for the anime video models, or
+  `general` for everything else.
+- Its measured speed in seconds per source megapixel, learned from finished
+  jobs and kept in a small JSON file between sessions.
+
+The engine creates one registry per batch (`load_model_registry`), so the
+requested model is validated once rather than for every file. Jobs can also
+request `"auto"` as their model, optionally with a `model_type` and a `scale`,
+to get the fastest installed model that matches, e.g. the fastest anime video
+model at 2x.
+"""
+
+import os
+import json
+import shutil
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from .scaling import model_scale
+
+DEFAULT_MODEL = "realesr-animevideov3-x4"
+# The model name that selects the fastest matching model
+AUTO_MODEL = "auto"
+
+MODEL_ANIME = "anime"
+MODEL_GENERAL = "general"
+MODEL_VIDEO = "video"
+MODEL_TYPES = (MODEL_ANIME, MODEL_GENERAL, MODEL_VIDEO)
+
+# Rough relative inference cost by network, used to rank models whose speed
+# has not been measured yet. The first matching name part wins.
+NOMINAL_COSTS = (
+    ("realesr-animevideov3", 1.0),  # compact VGG-style network
+    ("realesr-general", 1.0),
+    ("x4plus-anime", 3.0),  # RRDB network with 6 blocks
+    ("x4plus", 10.0),  # RRDB network with 23 blocks
+)
+DEFAULT_NOMINAL_COST = 10.0
+# Weight of a new measurement in the running average of a model's speed
+SPEED_SMOOTHING = 0.5
+
+SPEEDS_FILE = "model_speeds.json"
+
+
+class ModelInfo(NamedTuple):
+    """An installed model."""
+
+    name: str
+    scale: int
+    # One of MODEL_TYPES
+    kind: str
+    # Measured seconds per source megapixel, or None if not measured yet
+    speed: Optional[float]
+
+
+def model_type(model: str) -> str:
+    """Returns the type of a model, read from its name."""
+    if "animevideo" in model:
+        return MODEL_VIDEO
+    if "anime" in model:
+        return MODEL_ANIME
+    return MODEL_GENERAL
+
+
+def nominal_cost(model: str) -> float:
+    """Returns the rough relative inference cost of a model."""
+    for part, cost in NOMINAL_COSTS:
+        if part in model:
+            return cost
+    return DEFAULT_NOMINAL_COST
+
+
+def find_realesrgan_executable() -> Optional[str]:
+    """Finds the Real-ESRGAN executable."""
+    possible_names = [
+        "realesrgan-ncnn-vulkan",
+        "realesrgan-ncnn-vulkan.exe",
+        "realsr-esrgan",
+        "realsr-esrgan.exe",
+    ]
+    search_paths = [".", "bin", os.path.join(os.getcwd(), "bin")]
+    for path in search_paths:
+        for name in possible_names:
+            full_path = os.path.join(path, name)
+            if os.path.isfile(full_path):
+                return full_path
+    for name in possible_names:
+        if shutil.which(name):
+            return shutil.which(name)
+    return None
+
+
+def find_models_directory(realesrgan_path: str) -> Optional[str]:
+    """Finds the Real-ESRGAN models directory."""
+    exe_dir = os.path.dirname(realesrgan_path)
+    possible_dirs = [
+        os.path.join(exe_dir, "models"),
+        os.path.join(exe_dir, "..", "models"),
+        os.path.join(os.getcwd(), "models"),
+        os.path.join(os.getcwd(), "bin", "models"),
+    ]
+    for models_dir in possible_dirs:
+        if os.path.exists(models_dir) and os.path.isdir(models_dir):
+            return models_dir
+    return None
+
+
+def scan_models(models_dir: str) -> List[str]:
+    """Returns the names of the models with both a `.param` and a `.bin` file."""
+    if not os.path.exists(models_dir):
+        return []
+    models = []
+    for file in sorted(os.listdir(models_dir)):
+        if file.endswith(".param"):
+            model_name = file[: -len(".param")]
+            bin_file = os.path.join(models_dir, f"{model_name}.bin")
+            if os.path.exists(bin_file):
+                models.append(model_name)
+    return models
+
+
+def _describe_request(kind: Optional[str], scale: Optional[int]) -> str:
+    """Describes an automatic model request, e.g. "fastest video x2"."""
+    parts = ["fastest", kind or None, f"x{scale}" if scale else None]
+    return " ".join(filter(None, parts))
+
+
+class ModelRegistry:
+    """
+    The installed models, indexed once.
+
+    Safe to use from several worker threads at the same time.
+    """
+
+    def __init__(
+        self,
+        models_dir: str,
+        names: Optional[List[str]] = None,
+        speeds_path: Optional[str] = None,
+    ):
+        """
+        Indexes the models directory.
+
+        Args:
+            models_dir: The Real-ESRGAN models directory.
+            names: The installed model names, if already known; otherwise the
+                directory is scanned.
+            speeds_path: The JSON file measured speeds are loaded from and saved
+                to, or None to keep them in memory only.
+        """
+        self.models_dir = models_dir
+        self.speeds_path = speeds_path
+        self._lock = threading.Lock()
+        # The model chosen for each (model, kind, scale) request
+        self._resolved: Dict[Tuple, str] = {}
+        speeds = self._load_speeds()
+        if names is None:
+            names = scan_models(models_dir)
+        self.models: Dict[str, ModelInfo] = {
+            name: ModelInfo(name, model_scale(name), model_type(name), speeds.get(name))
+            for name in names
+        }
+
+    def _load_speeds(self) -> Dict[str, float]:
+        """Loads the measured speeds, ignoring a missing or damaged file."""
+        if not self.speeds_path:
+            return {}
+        try:
+            with open(self.speeds_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {
+            name: float(speed)
+            for name, speed in data.items()
+            if isinstance(speed, (int, float)) and speed > 0
+        }
+
+    def names(self) -> List[str]:
+        """Returns the names of the installed models."""
+        return list(self.models)
+
+    def get(self, name: str) -> Optional[ModelInfo]:
+        """Returns an installed model, or None."""
+        return self.models.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.models
+
+    def estimated_speed(self, info: ModelInfo) -> float:
+        """
+        Returns the measured speed of a model, or an estimate from its nominal cost.
+
+        The estimate is calibrated against the models that were measured, so
+        measured and unmeasured models can be ranked together.
+        """
+        if info.speed is not None:
+            return info.speed
+        ratios = [
+            model.speed / nominal_cost(model.name)
+            for model in self.models.values()
+            if model.speed is not None
+        ]
+        factor = sum(ratios) / len(ratios) if ratios else 1.0
+        return nominal_cost(info.name) * factor
+
+    def select(
+        self, kind: Optional[str] = None, scale: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Returns the fastest installed model of a type and scale.
+
+        Args:
+            kind: One of MODEL_TYPES, or None for any type.
+            scale: The native scale, or None for any scale.
+
+        Returns:
+            The model name, or None if no installed model matches.
+        """
+        candidates = [
+            info
+            for info in self.models.values()
+            if (not kind or info.kind == kind) and (not scale or info.scale == scale)
+        ]
+        if not candidates:
+            return None
+        return min(
+            candidates, key=lambda info: (self.estimated_speed(info), info.name)
+        ).name
+
+    def resolve(
+        self,
+        model: str,
+        kind: Optional[str] = None,
+        scale: Optional[int] = None,
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Validates a requested model, or selects one for `"auto"`.
+
+        A missing model is replaced by the fastest installed model of the same
+        type and scale, or failing that, of the same scale or any model. The
+        result is cached, so every request is only checked once per registry
+        and a batch consistently uses the same model.
+
+        Args:
+            model: The requested model name, or `"auto"`.
+            kind: For `"auto"`, the requested model type, or None for any.
+            scale: For `"auto"`, the requested native scale, or None for any.
+
+        Returns:
+            The model to use, and a note to log the first time the request was
+            changed (otherwise None).
+
+        Raises:
+            FileNotFoundError: If no models are installed.
+            ValueError: If no installed model matches an `"auto"` request.
+        """
+        key = (model, kind or None, scale or None)
+        with self._lock:
+            if key in self._resolved:
+                return self._resolved[key], None
+        if not self.models:
+            raise FileNotFoundError(f"No Real-ESRGAN models found in {self.models_dir}")
+        note = None
+        if model == AUTO_MODEL:
+            name = self.select(kind, scale)
+            request = _describe_request(kind, scale)
+            if name is None:
+                raise ValueError(f"No installed model matches '{request}'")
+            note = f"Selected model '{name}' as the {request} model"
+        elif model in self.models:
+            name = model
+        else:
+            name = (
+                self.select(model_type(model), model_scale(model))
+                or self.select(scale=model_scale(model))
+                or self.select()
+            )
+            note = f"Model '{model}' not found, using '{name}' instead"
+        with self._lock:
+            self._resolved[key] = name
+        return name, note
+
+    def record_speed(self, name: str, seconds: float, pixels: int):
+        """
+        Records the measured upscaling speed of a model.
+
+        Args:
+            name: The model name.
+            seconds: The time spent upscaling.
+            pixels: The number of source pixels that were upscaled.
+        """
+        if name not in self.models or seconds <= 0 or pixels <= 0:
+            return
+        speed = seconds / (pixels / 1_000_000)
+        with self._lock:
+            info = self.models[name]
+            if info.speed is not None:
+                speed = info.speed + SPEED_SMOOTHING * (speed - info.speed)
+            self.models[name] = info._replace(speed=speed)
+            speeds = {
+                model.name: model.speed
+                for model in self.models.values()
+                if model.speed is not None
+            }
+        self._save_speeds(speeds)
+
+    def _save_speeds(self, speeds: Dict[str, float]):
+        """Merges the measured speeds into the speeds file, if there is one."""
+        if not self.speeds_path:
+            return
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(self.speeds_path) or ".", exist_ok=True)
+                saved = self._load_speeds()
+                saved.update(speeds)
+                temp_path = self.speeds_path + ".tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(saved, f, indent=2, sort_keys=True)
+                os.replace(temp_path, self.speeds_path)
+        except OSError:
+            # Speeds only improve the automatic selection; losing one is harmless
+            pass
+
+
+def load_model_registry(speeds_path: Optional[str] = None) -> Optional[ModelRegistry]:
+    """
+    Indexes the models next to the installed Real-ESRGAN executable.
+
+    Returns:
+        The registry, or None if Real-ESRGAN or its models directory is missing
+        (the workers report that for each file).
+    """
+    realesrgan_path = find_realesrgan_executable()
+    models_dir = realesrgan_path and find_models_directory(realesrgan_path)
+    if not models_dir:
+        return None
+    return ModelRegistry(models_dir, speeds_path=speeds_path)
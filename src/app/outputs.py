@@ -0,0 +1,201 @@
+"""
+This module decides where upscaled files are written, and writes them safely.
+
+- Naming: outputs are named `{stem}_upscaled_{scale}{ext}`. With the "mirror"
+  output layout, files that were added from a folder keep their place below
+  that folder inside the output folder; with the default "flat" layout, every
+  output is written to the output folder itself.
+- Collisions: an `OutputNamer` hands out output paths. Sources that would
+  share an output path (e.g. `a/ep01.mkv` and `b/ep01.mkv` in the flat layout)
+  get a numbered suffix (`_2`, `_3`, ...) in the sorted order of their paths,
+  so the same files are always named the same way. Outputs already on disk
+  whose sidecar record (see the `incremental` module) names another source
+  are taken too, so files from separate batches do not overwrite each other.
+- Atomic writes: a job writes its output to a hidden partial file next to it
+  (`.{name}.partial{ext}`) and renames it into place once it is complete. A
+  file at an output path is therefore always finished, which the resume and
+  incremental modes rely on. Partial files left by a crash are replaced when
+  the output is written again.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+from .incremental import read_record
+from .media import is_video
+from .scaling import output_suffix
+
+LAYOUT_FLAT = "flat"
+LAYOUT_MIRROR = "mirror"
+
+PARTIAL_MARKER = ".partial"
+
+
+def build_output_path(
+    file_path: str,
+    output_folder: str,
+    settings: Dict[str, Any],
+    source_root: Optional[str] = None,
+) -> str:
+    """
+    Builds the output path of an upscaled file.
+
+    Args:
+        file_path: The path to the input file.
+        output_folder: The folder the upscaled file is written to.
+        settings: A dictionary of upscaling settings.
+        source_root: The folder the input was added from, if any. With the
+            "mirror" `output_layout`, the output keeps the input's path below it.
+
+    Returns:
+        The output path, named `{stem}_upscaled_{scale}{ext}`, where the scale is
+        the model's scale (e.g. `x4`) or the target height (e.g. `1440p`).
+        Videos keep their container; images use the configured output format.
+    """
+    file_name = Path(file_path).stem
+    if is_video(file_path):
+        output_ext = Path(file_path).suffix
+    else:
+        output_ext = f".{settings.get('format', 'jpg')}"
+    scale = output_suffix(settings)
+    output_filename = f"{file_name}_upscaled_{scale}{output_ext}"
+    if source_root and settings.get("output_layout") == LAYOUT_MIRROR:
+        relative_dir = os.path.relpath(os.path.dirname(file_path), source_root)
+        # Inputs outside the folder are written to the output folder itself
+        if relative_dir != os.curdir and not relative_dir.startswith(os.pardir):
+            output_folder = os.path.join(output_folder, relative_dir)
+    return os.path.join(output_folder, output_filename)
+
+
+def _path_key(path: str) -> str:
+    """Returns a key under which paths to the same file compare equal."""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _taken_on_disk(output_path: str, source: str) -> bool:
+    """Returns True if an output on disk was made from another source."""
+    if not os.path.exists(output_path) and not os.path.exists(
+        partial_path(output_path)
+    ):
+        return False
+    record = read_record(output_path)
+    # Outputs without a record are assumed to be this source's own
+    if not record or not record.get("source"):
+        return False
+    return _path_key(record["source"]) != source
+
+
+class OutputNamer:
+    """
+    Hands out output paths, giving every source its own.
+
+    Output paths are claimed by sources; a source asking for a path claimed by
+    another source, or whose output on disk was made from another source,
+    gets the first free numbered variant of it instead. A namer is meant to
+    live as long as the app, so it is shared by every batch and job source,
+    and is safe to use from several threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # The source that claimed each output path, both as path keys
+        self._claimed: Dict[str, str] = {}
+
+    def claim(
+        self,
+        file_path: str,
+        output_folder: str,
+        settings: Dict[str, Any],
+        source_root: Optional[str] = None,
+    ) -> str:
+        """
+        Returns the output path of a source, resolving collisions.
+
+        The arguments are those of `build_output_path`. Claiming the same
+        output again for the same source returns the same path.
+        """
+        return self.reserve(
+            build_output_path(file_path, output_folder, settings, source_root),
+            file_path,
+        )
+
+    def reserve(self, output_path: str, file_path: str) -> str:
+        """Claims an output path, or its first free numbered variant, for a source."""
+        source = _path_key(file_path)
+        stem, ext = os.path.splitext(output_path)
+        candidate, number = output_path, 1
+        with self._lock:
+            while True:
+                key = _path_key(candidate)
+                owner = self._claimed.get(key)
+                if owner == source:
+                    break
+                if owner is None and not _taken_on_disk(candidate, source):
+                    self._claimed[key] = source
+                    break
+                number += 1
+                candidate = f"{stem}_{number}{ext}"
+        return candidate
+
+    def plan(
+        self,
+        files: Iterable[Tuple[str, Optional[str]]],
+        output_folder: str,
+        settings: Dict[str, Any],
+    ) -> Dict[str, str]:
+        """
+        Claims the outputs of a batch in the sorted order of the sources.
+
+        Args:
+            files: The `(file_path, source_root)` of every file of the batch.
+            output_folder: The folder the outputs are written to.
+            settings: A dictionary of upscaling settings.
+
+        Returns:
+            The output path of every file path.
+        """
+        return {
+            file_path: self.claim(file_path, output_folder, settings, source_root)
+            for file_path, source_root in sorted(files, key=lambda f: f[0])
+        }
+
+
+def partial_path(output_path: str) -> str:
+    """Returns the path an output is written to until it is complete."""
+    directory, name = os.path.split(output_path)
+    stem, ext = os.path.splitext(name)
+    # The extension is kept, since the tools choose the format from it
+    return os.path.join(directory, f".{stem}{PARTIAL_MARKER}{ext}")
+
+
+def is_partial(path: str) -> bool:
+    """Returns True for the partial file of an output that is being written."""
+    name = os.path.basename(path)
+    return name.startswith(".") and os.path.splitext(name)[0].endswith(PARTIAL_MARKER)
+
+
+def prepare_output(output_path: str) -> str:
+    """
+    Creates the folder of an output and returns the partial path to write to.
+
+    A partial file left behind by an interrupted job is removed first.
+    """
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    discard_output(output_path)
+    return partial_path(output_path)
+
+
+def publish_output(output_path: str):
+    """Moves a complete output from its partial path into place."""
+    os.replace(partial_path(output_path), output_path)
+
+
+def discard_output(output_path: str):
+    """Removes the partial file of an output that was not completed, if any."""
+    try:
+        os.remove(partial_path(output_path))
+    except OSError:
+        pass
@@ -0,0 +1,191 @@
+"""
+This module defines the `PreviewDialog` class, which lets users try the current
+settings on a small part of a file before committing to a full job.
+
+The dialog allows users to:
+- Upscale a short time range of a video, or a number of evenly spaced sample frames.
+- Compare the original and upscaled frames side by side.
+- See the measured time per frame and the projected duration of the full job.
+"""
+
+import os
+import shutil
+from typing import Dict, Any, Optional
+from PyQt6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QGroupBox,
+    QFormLayout,
+    QComboBox,
+    QSpinBox,
+    QDoubleSpinBox,
+    QPushButton,
+    QLabel,
+    QSlider,
+    QDialogButtonBox,
+)
+from PyQt6.QtCore import Qt, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QPixmap
+from .workers import PreviewWorker
+from .media import is_video
+from .ui_utils import format_time
+
+
+class PreviewDialog(QDialog):
+    """A dialog for previewing upscaling settings on a clip or sample frames."""
+
+    log = pyqtSignal(str)
+
+    def __init__(self, file_path: str, settings: Dict[str, Any], parent=None):
+        """
+        Initializes the preview dialog and its UI components.
+
+        Args:
+            file_path: The path to the file to preview.
+            settings: A dictionary of upscaling settings.
+            parent: The parent widget.
+        """
+        super().__init__(parent)
+        self.file_path = file_path
+        self.upscale_settings = settings
+        self.worker: Optional[PreviewWorker] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.setWindowTitle(f"Preview - {os.path.basename(file_path)}")
+        self.resize(900, 600)
+
+        layout = QVBoxLayout(self)
+
+        # Preview range settings
+        range_group = QGroupBox("Preview Range")
+        range_layout = QFormLayout(range_group)
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["Time Range", "Sample Frames"])
+        self.mode_combo.currentIndexChanged.connect(self.update_mode)
+        range_layout.addRow("Mode:", self.mode_combo)
+        self.start_spin = QDoubleSpinBox()
+        self.start_spin.setRange(0, 86400)
+        self.start_spin.setSuffix(" s")
+        range_layout.addRow("Start:", self.start_spin)
+        self.duration_spin = QDoubleSpinBox()
+        self.duration_spin.setRange(0.1, 600)
+        self.duration_spin.setValue(2.0)
+        self.duration_spin.setSuffix(" s")
+        range_layout.addRow("Duration:", self.duration_spin)
+        self.samples_spin = QSpinBox()
+        self.samples_spin.setRange(1, 100)
+        self.samples_spin.setValue(5)
+        range_layout.addRow("Sample Frames:", self.samples_spin)
+        self.run_btn = QPushButton("Run Preview")
+        self.run_btn.clicked.connect(self.run_preview)
+        range_layout.addRow(self.run_btn)
+        if not is_video(file_path):
+            self.mode_combo.setEnabled(False)
+            self.start_spin.setEnabled(False)
+            self.duration_spin.setEnabled(False)
+            self.samples_spin.setEnabled(False)
+        layout.addWidget(range_group)
+
+        # Before/after comparison
+        compare_group = QGroupBox("Comparison")
+        compare_layout = QVBoxLayout(compare_group)
+        images_layout = QHBoxLayout()
+        self.before_label = QLabel("Original")
+        self.after_label = QLabel("Upscaled")
+        for label in (self.before_label, self.after_label):
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            label.setMinimumSize(320, 240)
+            images_layout.addWidget(label)
+        compare_layout.addLayout(images_layout)
+        self.frame_slider = QSlider(Qt.Orientation.Horizontal)
+        self.frame_slider.setEnabled(False)
+        self.frame_slider.valueChanged.connect(self.show_frame)
+        compare_layout.addWidget(self.frame_slider)
+        self.timing_label = QLabel("Run a preview to measure the processing speed")
+        compare_layout.addWidget(self.timing_label)
+        layout.addWidget(compare_group)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.update_mode()
+
+    def update_mode(self):
+        """Enables the inputs that apply to the selected preview mode."""
+        range_mode = self.mode_combo.currentIndex() == 0
+        video = is_video(self.file_path)
+        self.start_spin.setEnabled(video and range_mode)
+        self.duration_spin.setEnabled(video and range_mode)
+        self.samples_spin.setEnabled(video and not range_mode)
+
+    def run_preview(self):
+        """Starts a preview worker for the selected range or sample frames."""
+        self.clear_result()
+        samples = self.samples_spin.value() if self.mode_combo.currentIndex() else 0
+        self.worker = PreviewWorker(
+            self.file_path,
+            self.upscale_settings,
+            start=self.start_spin.value(),
+            duration=self.duration_spin.value(),
+            samples=samples,
+        )
+        self.worker.signals.result.connect(self.on_result)
+        self.worker.signals.error.connect(self.on_error)
+        self.worker.signals.finished.connect(self.on_finished)
+        self.worker.signals.log.connect(self.log)
+        self.run_btn.setEnabled(False)
+        self.timing_label.setText("Processing preview...")
+        QThreadPool.globalInstance().start(self.worker)
+
+    def on_result(self, result: Dict[str, Any]):
+        """Displays the preview frames and the projected job duration."""
+        self.result = result
+        self.frame_slider.setRange(0, len(result["frames"]) - 1)
+        self.frame_slider.setEnabled(len(result["frames"]) > 1)
+        self.show_frame(0)
+        self.timing_label.setText(
+            f"{result['seconds_per_frame']:.2f} s/frame | "
+            f"{result['total_frames']} frames in full job | "
+            f"Projected upscaling time: {format_time(result['projected_seconds'])}"
+        )
+
+    def on_error(self, error_message: str):
+        """Shows an error reported by the preview worker."""
+        self.timing_label.setText(error_message)
+        self.log.emit(f"❌ Error: {error_message}")
+
+    def on_finished(self):
+        """Re-enables the preview controls once the worker is done."""
+        self.worker = None
+        self.run_btn.setEnabled(True)
+
+    def show_frame(self, index: int):
+        """Shows the original and upscaled versions of a preview frame."""
+        if not self.result or index >= len(self.result["frames"]):
+            return
+        before, after = self.result["frames"][index]
+        for label, path in ((self.before_label, before), (self.after_label, after)):
+            pixmap = QPixmap(path)
+            if pixmap.isNull():
+                label.setText(f"Missing: {os.path.basename(path)}")
+                continue
+            label.setPixmap(
+                pixmap.scaled(
+                    label.size(),
+                    Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation,
+                )
+            )
+
+    def clear_result(self):
+        """Removes the temporary files of the previous preview."""
+        if self.result:
+            shutil.rmtree(self.result["temp_dir"], ignore_errors=True)
+            self.result = None
+
+    def done(self, result: int):
+        """Cancels any running preview and cleans up before closing."""
+        if self.worker:
+            self.worker.cancel()
+        self.clear_result()
+        super().done(result)
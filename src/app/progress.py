@@ -0,0 +1,174 @@
+"""
+This module defines the `ProgressAggregator` class, which combines the progress
+of all running jobs into one periodic update for the GUI.
+
+Workers report progress through a plain, lock-protected method call instead of
+emitting a cross-thread signal per frame. The aggregator samples those reports
+at a fixed rate and emits a single snapshot containing:
+- Per-job progress and throughput (units per second).
+- Overall batch progress, elapsed time and estimated time remaining.
+- The most recently finished output (image or frame), for live previews.
+"""
+
+import time
+import threading
+from typing import Dict, Any, Optional
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# Weight of the newest sample in the per-job throughput moving average
+RATE_SMOOTHING = 0.3
+
+
+class ProgressAggregator(QObject):
+    """Samples per-job progress reports and emits combined snapshots on a timer."""
+
+    updated = pyqtSignal(object)
+
+    def __init__(self, interval: int = 250, parent: Optional[QObject] = None):
+        """
+        Initializes the aggregator.
+
+        Args:
+            interval: Milliseconds between snapshots.
+            parent: The parent object.
+        """
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._total_jobs = 0
+        self._completed_jobs = 0
+        self._started_at = time.time()
+        self._latest: Optional[str] = None
+        self._dirty = False
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.tick)
+
+    def reset(self, total_jobs: int = 0):
+        """Starts tracking a new batch and begins emitting snapshots."""
+        with self._lock:
+            self._jobs = {}
+            self._total_jobs = total_jobs
+            self._completed_jobs = 0
+            self._started_at = time.time()
+            self._latest = None
+            self._dirty = True
+        self._timer.start()
+
+    def stop(self):
+        """Emits a final snapshot and stops the timer."""
+        self.tick()
+        self._timer.stop()
+
+    def set_total(self, total_jobs: int):
+        """Updates the number of jobs in the batch."""
+        with self._lock:
+            self._total_jobs = total_jobs
+            self._dirty = True
+
+    def start_job(self, job_id: str, label: str, weight: int = 1):
+        """
+        Starts tracking a job.
+
+        Args:
+            job_id: The job to track.
+            label: The name shown for the job.
+            weight: The number of batch jobs the tracked job stands for, e.g.
+                the images of an image batch.
+        """
+        with self._lock:
+            self._jobs[job_id] = {
+                "label": label,
+                "weight": weight,
+                "done": 0,
+                "total": 0,
+                "rate": 0.0,
+                "sampled_done": 0,
+                "sampled_at": time.time(),
+            }
+            self._dirty = True
+
+    def report(self, job_id: str, done: int, total: int, latest: Optional[str] = None):
+        """
+        Records the progress of a job. Safe to call from any thread; never blocks
+        on the UI.
+
+        Args:
+            job_id: The job reporting progress.
+            done: Units of work completed (e.g. frames).
+            total: Total units of work.
+            latest: Path of the output (image or frame) that was just finished.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job["done"] = done
+                job["total"] = total
+                if latest:
+                    self._latest = latest
+                self._dirty = True
+
+    def finish_job(self, job_id: str):
+        """Stops tracking a job and counts the jobs it stands for as completed."""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            self._completed_jobs += job["weight"] if job else 1
+            self._dirty = True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the current progress of the batch.
+
+        Returns:
+            A dictionary with `jobs` (per-job `label`, `percent`, `done`, `total`,
+            `rate` and `eta`), `overall` (percent), `elapsed` and `eta` (seconds,
+            or None while unknown), and `latest` (the most recent output path).
+        """
+        now = time.time()
+        with self._lock:
+            jobs = {}
+            fraction_sum = 0.0
+            for job_id, job in self._jobs.items():
+                # Update the smoothed throughput from the progress since the last sample
+                interval = now - job["sampled_at"]
+                if interval > 0 and job["done"] >= job["sampled_done"]:
+                    rate = (job["done"] - job["sampled_done"]) / interval
+                    job["rate"] = (
+                        rate
+                        if not job["rate"]
+                        else RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * job["rate"]
+                    )
+                job["sampled_done"] = job["done"]
+                job["sampled_at"] = now
+
+                fraction = job["done"] / job["total"] if job["total"] else 0.0
+                fraction_sum += fraction * job["weight"]
+                remaining = job["total"] - job["done"]
+                jobs[job_id] = {
+                    "label": job["label"],
+                    "percent": int(fraction * 100),
+                    "done": job["done"],
+                    "total": job["total"],
+                    "rate": job["rate"],
+                    "eta": remaining / job["rate"] if job["rate"] else None,
+                }
+            total_jobs = max(self._total_jobs, 1)
+            overall = min(1.0, (self._completed_jobs + fraction_sum) / total_jobs)
+            elapsed = now - self._started_at
+            latest = self._latest
+            self._dirty = False
+        return {
+            "jobs": jobs,
+            "overall": int(overall * 100),
+            "elapsed": elapsed,
+            "eta": elapsed * (1 - overall) / overall if overall > 0 else None,
+            "latest": latest,
+        }
+
+    def tick(self):
+        """Emits a snapshot if anything changed, or while jobs are running."""
+        with self._lock:
+            changed = self._dirty or bool(self._jobs)
+        if changed:
+            self.updated.emit(self.snapshot())
@@ -0,0 +1,113 @@
+"""
+This module plans how a file is scaled to reach a target output resolution.
+
+Without a target, files are upscaled by the native scale of the selected model.
+With a target height (e.g. 1440 for 1440p), the planner:
+- Picks the smallest scale variant of the model (x2, x3 or x4, as far as they
+  are installed) that reaches the target, since inference cost grows with the
+  output size.
+- Optionally downscales over-sized sources first, so the model produces little
+  more than the target instead of pixels that are thrown away afterwards.
+- Leaves the remaining difference to a final resize, which is done by FFmpeg
+  while encoding the output rather than as a separate pass.
+"""
+
+import math
+import re
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# Model names ending in a scale suffix, e.g. "realesr-animevideov3-x2"
+_SCALE_SUFFIX = re.compile(r"^(.*-x)(\d+)$")
+# The scale anywhere in a model name, e.g. "realesrgan-x4plus"
+_SCALE_IN_NAME = re.compile(r"x(\d+)")
+
+DEFAULT_SCALE = 4
+
+
+class ScalePlan(NamedTuple):
+    """How a file is scaled to its target height."""
+
+    # The model variant and the scale it upscales by
+    model: str
+    scale: int
+    # The height the source is downscaled to before upscaling, or None
+    input_height: Optional[int]
+    # The height the upscaled result is resized to while encoding, or None
+    output_height: Optional[int]
+
+
+def model_scale(model: str) -> int:
+    """Returns the native scale of a model, read from its name."""
+    matches = _SCALE_IN_NAME.findall(model or "")
+    return int(matches[-1]) if matches else DEFAULT_SCALE
+
+
+def scale_variants(model: str, available: List[str]) -> Dict[int, str]:
+    """
+    Returns the installed scale variants of a model.
+
+    Args:
+        model: The selected model, e.g. "realesr-animevideov3-x4".
+        available: The names of the installed models.
+
+    Returns:
+        A dictionary mapping each available scale to its model name; models
+        without variants only map their native scale to themselves.
+    """
+    match = _SCALE_SUFFIX.match(model)
+    if not match:
+        return {model_scale(model): model}
+    variants = {
+        int(_SCALE_SUFFIX.match(name).group(2)): name
+        for name in available
+        if _SCALE_SUFFIX.match(name)
+        and _SCALE_SUFFIX.match(name).group(1) == match.group(1)
+    }
+    variants.setdefault(int(match.group(2)), model)
+    return variants
+
+
+def _even(value: float) -> int:
+    """Rounds a size up to the next even number, as required by most video codecs."""
+    value = math.ceil(value)
+    return value + value % 2
+
+
+def plan_scale(
+    height: int,
+    target_height: int,
+    variants: Dict[int, str],
+    pre_downscale: bool = False,
+) -> ScalePlan:
+    """
+    Plans the cheapest way to scale a source to a target height.
+
+    Args:
+        height: The height of the source.
+        target_height: The height of the output.
+        variants: The available scales and their models (see `scale_variants`).
+        pre_downscale: Downscale sources that would overshoot the target.
+
+    Returns:
+        The plan.
+    """
+    scales = sorted(variants)
+    scale = next((s for s in scales if height * s >= target_height), scales[-1])
+    input_height = None
+    if pre_downscale and height * scale > target_height:
+        input_height = _even(target_height / scale)
+        if input_height >= height:
+            input_height = None
+    upscaled_height = (input_height or height) * scale
+    output_height = target_height if upscaled_height != target_height else None
+    return ScalePlan(variants[scale], scale, input_height, output_height)
+
+
+def output_suffix(settings: Dict[str, Any]) -> str:
+    """Returns the scale part of output file names, e.g. "x2" or "1440p"."""
+    if settings.get("target_height"):
+        return f"{settings['target_height']}p"
+    if settings.get("model") == "auto" and settings.get("scale"):
+        # The model is selected per batch, but always with the requested scale
+        return f"x{settings['scale']}"
+    return f"x{model_scale(settings.get('model', ''))}"
@@ -0,0 +1,262 @@
+"""
+This module defines the `Job` and `JobScheduler` classes, which decide the order
+in which queued files are processed.
+
+The scheduler keeps separate lanes for image and video work, each with its own
+concurrency limit, so a long video never blocks quick images behind it. Within a
+lane, jobs are ordered by:
+- Priority (higher first), which operators can change while the batch runs.
+- Estimated cost (shortest job first), when that ordering is enabled.
+- Queue position, which operators can change by reordering the file list.
+
+Individual jobs can be paused and resumed; a batch is not finished while
+paused jobs remain. An admission check (see the `governor` module) can hold
+back the next job of a lane, e.g. while memory is short; the job records why
+it is waiting and keeps its place. Queued images can join a running image
+job's batch (see the `image_batch` module); a batch takes a single slot of its
+lane. The scheduler is plain Python and has no Qt dependency; `UpscaleEngine`
+drives it from the GUI thread.
+"""
+
+import itertools
+from typing import Dict, Any, List, Optional, Callable
+from .media import is_video
+
+QUEUED = "queued"
+PAUSED = "paused"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+ORDER_FIFO = "fifo"
+ORDER_SHORTEST = "shortest"
+
+
+class Job:
+    """A single file queued for upscaling."""
+
+    def __init__(
+        self,
+        job_id: str,
+        file_path: str,
+        output_path: str,
+        settings: Dict[str, Any],
+        priority: int = 0,
+        cost: float = 0.0,
+    ):
+        """
+        Initializes the job.
+
+        Args:
+            job_id: A unique identifier for the job.
+            file_path: The path to the input file.
+            output_path: The path to the output file.
+            settings: A dictionary of upscaling settings.
+            priority: Jobs with a higher priority are started first.
+            cost: The estimated processing cost, used for shortest-job-first ordering.
+        """
+        self.job_id = job_id
+        self.file_path = file_path
+        self.output_path = output_path
+        self.settings = settings
+        self.priority = priority
+        self.cost = cost
+        self.kind = "video" if is_video(file_path) else "image"
+        self.state = QUEUED
+        self.error: Optional[str] = None
+        self.position = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Seconds spent in each processing stage, filled in when the job finishes
+        self.timings: Dict[str, float] = {}
+        # The estimated resources of the job (see `governor.estimate_footprint`)
+        self.footprint = None
+        # Why the queued job is held back by the admission check, if it is
+        self.waiting: Optional[str] = None
+        # The id of the job leading the image batch this job runs in, if any
+        self.batch_id: Optional[str] = None
+        # The probed metadata of the file (see `engine.probe_file`), or None
+        # while it is being probed
+        self.info: Optional[Dict[str, Any]] = None
+
+
+class JobScheduler:
+    """Orders queued jobs into per-kind lanes with independent concurrency limits."""
+
+    def __init__(
+        self, lane_limits: Optional[Dict[str, int]] = None, order: str = ORDER_FIFO
+    ):
+        """
+        Initializes the scheduler.
+
+        Args:
+            lane_limits: Maximum number of concurrently running jobs per lane
+                (`"image"` and `"video"`).
+            order: `ORDER_FIFO` to keep queue order, or `ORDER_SHORTEST` to start
+                the cheapest jobs first.
+        """
+        self.lane_limits = {"image": 2, "video": 1}
+        self.lane_limits.update(lane_limits or {})
+        self.order = order
+        self.jobs: Dict[str, Job] = {}
+        self._positions = itertools.count()
+
+    def add(self, job: Job) -> Job:
+        """Adds a job to the end of the queue."""
+        job.position = next(self._positions)
+        self.jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Returns the job with the given id, if any."""
+        return self.jobs.get(job_id)
+
+    def set_priority(self, job_id: str, priority: int):
+        """Changes the priority of a job."""
+        self.jobs[job_id].priority = priority
+
+    def pause(self, job_id: str) -> bool:
+        """Holds back a queued job until it is resumed."""
+        job = self.jobs[job_id]
+        if job.state == QUEUED:
+            job.state = PAUSED
+            return True
+        return False
+
+    def resume(self, job_id: str) -> bool:
+        """Returns a paused job to the queue."""
+        job = self.jobs[job_id]
+        if job.state == PAUSED:
+            job.state = QUEUED
+            return True
+        return False
+
+    def reorder(self, job_ids: List[str]):
+        """Sets the queue position of jobs to the order of `job_ids`."""
+        for job_id in job_ids:
+            if job_id in self.jobs:
+                self.jobs[job_id].position = next(self._positions)
+
+    def _sort_key(self, job: Job):
+        """Returns the ordering key of a job within its lane."""
+        cost = job.cost if self.order == ORDER_SHORTEST else 0.0
+        return (-job.priority, cost, job.position)
+
+    def running(self, kind: Optional[str] = None) -> List[Job]:
+        """Returns the running jobs, optionally limited to one lane."""
+        return [
+            job
+            for job in self.jobs.values()
+            if job.state == RUNNING and (kind is None or job.kind == kind)
+        ]
+
+    def slots_used(self, kind: str) -> int:
+        """Returns the number of slots taken in a lane; a batch takes one slot."""
+        return len({job.batch_id or job.job_id for job in self.running(kind)})
+
+    def next_jobs(
+        self, admit: Optional[Callable[[Job, List[Job]], Optional[str]]] = None
+    ) -> List[Job]:
+        """
+        Picks the jobs to start now and marks them as running.
+
+        Args:
+            admit: Called as `admit(job, running_jobs)` before a job is started;
+                returns None to start it, or the reason it has to wait. A job
+                that has to wait also holds back the jobs behind it in its
+                lane, so large jobs are not starved by smaller ones.
+
+        Returns:
+            The jobs that fit into the free slots of their lanes, in start order.
+        """
+        started = []
+        for job in self.jobs.values():
+            if job.state == QUEUED:
+                job.waiting = None
+        for kind, limit in self.lane_limits.items():
+            free = limit - self.slots_used(kind)
+            if free <= 0:
+                continue
+            candidates = sorted(
+                (
+                    job
+                    for job in self.jobs.values()
+                    if job.state == QUEUED and job.kind == kind
+                ),
+                key=self._sort_key,
+            )
+            for job in candidates[:free]:
+                if admit:
+                    job.waiting = admit(job, self.running())
+                if job.waiting:
+                    break
+                job.state = RUNNING
+                started.append(job)
+        return started
+
+    def take_batch(
+        self, job: Job, size: int, accept: Callable[[Job], bool]
+    ) -> List[Job]:
+        """
+        Adds queued jobs of the same lane to the batch of a started job.
+
+        Args:
+            job: The started job that leads the batch.
+            size: The maximum number of jobs in the batch, including `job`.
+            accept: Returns True for the queued jobs that may join the batch.
+
+        Returns:
+            The jobs of the batch, starting with `job`, all marked as running.
+        """
+        batch = [job]
+        for other in sorted(self.jobs.values(), key=self._sort_key):
+            if len(batch) >= size:
+                break
+            if other.state == QUEUED and other.kind == job.kind and accept(other):
+                batch.append(other)
+        for member in batch:
+            member.state = RUNNING
+            member.waiting = None
+            member.batch_id = job.job_id
+        return batch
+
+    def finish(self, job_id: str, state: str, error: Optional[str] = None):
+        """Records the final state of a job."""
+        job = self.jobs[job_id]
+        job.state = state
+        job.error = error
+
+    def cancel_pending(self) -> List[str]:
+        """
+        Cancels all jobs that have not started yet.
+
+        Returns:
+            The ids of the cancelled jobs.
+        """
+        cancelled = []
+        for job in self.jobs.values():
+            if job.state in (QUEUED, PAUSED):
+                job.state = CANCELLED
+                cancelled.append(job.job_id)
+        return cancelled
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of jobs in each state."""
+        counts = {}
+        for job in self.jobs.values():
+            counts[job.state] = counts.get(job.state, 0) + 1
+        return counts
+
+    def is_idle(self) -> bool:
+        """
+        Returns True when no job is running or waiting to run.
+
+        Paused jobs count as waiting: they keep the batch open until they are
+        resumed or cancelled.
+        """
+        return not any(
+            job.state in (QUEUED, PAUSED, RUNNING) for job in self.jobs.values()
+        )
@@ -3,10 +3,27 @@ This module defines the `SettingsDialog` class, which provides a dialog window
 for configuring advanced upscaling settings.
 
 The dialog allows users to adjust settings such as:
-- The AI model to use for upscaling.
-- Performance settings, including GPU acceleration and tile size.
-- Video processing settings, such as output FPS and quality.
-- The output format for upscaled images.
+- The AI model to use for upscaling, or "auto" to use the fastest installed
+  model of a type and scale.
+- Performance settings, including GPU acceleration and tile size, or the
+  number of processes and threads of the CPU mode.
+- Large images, i.e. when images are upscaled in tiles and stitched together.
+- Video processing settings, such as output FPS, quality, the handling of
+  interlaced sources and how videos are decoded.
+- The output size, i.e. an optional target resolution.
+- The output format for upscaled images, its encoder settings, whether the
+  source's metadata is copied, and whether outputs mirror the source folders.
+- Batch scheduling, including per-lane concurrency, job ordering and the
+  image batch mode.
+- Resource limits, i.e. how much memory and temp disk space running jobs may
+  use and the system load above which no new jobs start.
+- Incremental mode, which skips files whose output is up to date.
+- The watch folder, i.e. what happens to processed inputs and how long new
+  files must settle.
+- Logging to a rotating file on disk.
+- The local HTTP job API.
+- Distributed rendering, i.e. the shared folder video frames are published in
+  for worker processes on other machines.
 """
 
 from PyQt6.QtWidgets import (
@@ -17,9 +34,27 @@ from PyQt6.QtWidgets import (
     QComboBox,
     QCheckBox,
     QSpinBox,
+    QDoubleSpinBox,
+    QLineEdit,
+    QPushButton,
+    QHBoxLayout,
+    QFileDialog,
     QDialogButtonBox,
 )
 from typing import Dict, Any
+from .cpu import available_cores
+from .encoding import OUTPUT_FORMATS
+from .decoding import HWACCEL_AUTO, HWACCEL_CANDIDATES, HWACCEL_NONE
+from .interlace import FIELD_AUTO, FIELD_DEINTERLACE, FIELD_IVTC, FIELD_OFF
+from .models import AUTO_MODEL, DEFAULT_MODEL, MODEL_TYPES, load_model_registry
+from .outputs import LAYOUT_FLAT, LAYOUT_MIRROR
+
+# The models offered even when they are not installed
+STANDARD_MODELS = [
+    "realesr-animevideov3-x4",
+    "realesrgan-x4plus",
+    "realesrgan-x4plus-anime",
+]
 
 
 class SettingsDialog(QDialog):
@@ -30,7 +65,7 @@ class SettingsDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Advanced Settings")
         self.setModal(True)
-        self.resize(400, 500)
+        self.resize(400, 1160)
 
         layout = QVBoxLayout(self)
 
@@ -38,10 +73,27 @@ class SettingsDialog(QDialog):
         model_group = QGroupBox("AI Model Settings")
         model_layout = QFormLayout(model_group)
         self.model_combo = QComboBox()
-        self.model_combo.addItems(
-            ["realesr-animevideov3-x4", "realesrgan-x4plus", "realesrgan-x4plus-anime"]
+        registry = load_model_registry()
+        installed = registry.names() if registry else []
+        self.model_combo.addItem(AUTO_MODEL)
+        self.model_combo.addItems(sorted(set(STANDARD_MODELS + installed)))
+        self.model_combo.setToolTip(
+            "The Real-ESRGAN model. 'auto' uses the fastest installed model of\n"
+            "the selected type and scale, based on the measured speed of earlier jobs."
         )
+        self.model_combo.currentTextChanged.connect(self.update_auto_options)
         model_layout.addRow("Model:", self.model_combo)
+        self.model_type_combo = QComboBox()
+        self.model_type_combo.addItem("Any", "")
+        for kind in MODEL_TYPES:
+            self.model_type_combo.addItem(kind.capitalize(), kind)
+        model_layout.addRow("Model Type:", self.model_type_combo)
+        self.model_scale_combo = QComboBox()
+        self.model_scale_combo.addItem("Any", 0)
+        for scale in (2, 3, 4):
+            self.model_scale_combo.addItem(f"{scale}x", scale)
+        model_layout.addRow("Model Scale:", self.model_scale_combo)
+        self.update_auto_options(self.model_combo.currentText())
 
         # Performance Settings
         perf_group = QGroupBox("Performance Settings")
@@ -52,6 +104,26 @@ class SettingsDialog(QDialog):
             "Enable GPU processing for faster upscaling (requires compatible graphics card)"
         )
         perf_layout.addRow(self.gpu_check)
+        cores = available_cores()
+        self.cpu_processes_spin = QSpinBox()
+        self.cpu_processes_spin.setRange(0, 256)
+        self.cpu_processes_spin.setSpecialValueText("Auto")
+        self.cpu_processes_spin.setToolTip(
+            "Without GPU acceleration, the number of Real-ESRGAN processes that\n"
+            f"run at the same time ({cores} cores detected). Auto splits the cores\n"
+            "between processes and threads."
+        )
+        perf_layout.addRow("CPU Processes:", self.cpu_processes_spin)
+        self.cpu_threads_spin = QSpinBox()
+        self.cpu_threads_spin.setRange(0, 256)
+        self.cpu_threads_spin.setSpecialValueText("Auto")
+        self.cpu_threads_spin.setToolTip(
+            "Without GPU acceleration, the threads of each Real-ESRGAN process\n"
+            "(and of FFmpeg). Auto uses the cores divided by the processes."
+        )
+        perf_layout.addRow("Threads per Process:", self.cpu_threads_spin)
+        self.gpu_check.toggled.connect(self.update_cpu_options)
+        self.update_cpu_options(self.gpu_check.isChecked())
         self.tile_spin = QSpinBox()
         self.tile_spin.setRange(0, 2048)
         self.tile_spin.setValue(400)
@@ -64,13 +136,43 @@ class SettingsDialog(QDialog):
         )
         perf_layout.addRow("Tile Size (GPU Memory):", self.tile_spin)
 
+        # Large Image Settings
+        large_group = QGroupBox("Large Images")
+        large_layout = QFormLayout(large_group)
+        self.tiling_threshold_spin = QSpinBox()
+        self.tiling_threshold_spin.setRange(0, 1000)
+        self.tiling_threshold_spin.setValue(16)
+        self.tiling_threshold_spin.setSuffix(" MP")
+        self.tiling_threshold_spin.setSpecialValueText("Off")
+        self.tiling_threshold_spin.setToolTip(
+            "Images larger than this are cut into overlapping tiles, upscaled\n"
+            "tile by tile and stitched back together, so memory use depends on\n"
+            "the tile size instead of the image size"
+        )
+        large_layout.addRow("Tile Images Above:", self.tiling_threshold_spin)
+        self.tiling_tile_spin = QSpinBox()
+        self.tiling_tile_spin.setRange(128, 4096)
+        self.tiling_tile_spin.setSingleStep(64)
+        self.tiling_tile_spin.setValue(512)
+        self.tiling_tile_spin.setSuffix(" px")
+        large_layout.addRow("Image Tile Size:", self.tiling_tile_spin)
+        self.tiling_workers_spin = QSpinBox()
+        self.tiling_workers_spin.setRange(1, 16)
+        self.tiling_workers_spin.setValue(2)
+        self.tiling_workers_spin.setToolTip("Number of tiles upscaled at the same time")
+        large_layout.addRow("Parallel Tiles:", self.tiling_workers_spin)
+
         # Video Processing Settings
         video_group = QGroupBox("Video Processing Settings")
         video_layout = QFormLayout(video_group)
         self.fps_spin = QSpinBox()
-        self.fps_spin.setRange(1, 120)
-        self.fps_spin.setValue(24)
-        self.fps_spin.setToolTip("Output video framerate (frames per second)")
+        self.fps_spin.setRange(0, 120)
+        self.fps_spin.setValue(0)
+        self.fps_spin.setSpecialValueText("Same as Source")
+        self.fps_spin.setToolTip(
+            "Output video framerate (frames per second); by default, videos\n"
+            "keep the frame rate of their source"
+        )
         video_layout.addRow("Output FPS:", self.fps_spin)
         self.quality_spin = QSpinBox()
         self.quality_spin.setRange(0, 51)
@@ -83,24 +185,321 @@ class SettingsDialog(QDialog):
             "• 29+: Lower quality (smaller files)"
         )
         video_layout.addRow("Video Quality (CRF):", self.quality_spin)
+        self.retries_spin = QSpinBox()
+        self.retries_spin.setRange(0, 10)
+        self.retries_spin.setValue(2)
+        self.retries_spin.setToolTip(
+            "How often a failed frame is retried before falling back to a\n"
+            "smaller tile size, CPU mode, and finally a plain resized copy"
+        )
+        video_layout.addRow("Frame Retries:", self.retries_spin)
+        self.field_mode_combo = QComboBox()
+        self.field_mode_combo.addItem("Off", FIELD_OFF)
+        self.field_mode_combo.addItem("Auto-Detect", FIELD_AUTO)
+        self.field_mode_combo.addItem("Inverse Telecine", FIELD_IVTC)
+        self.field_mode_combo.addItem("Deinterlace", FIELD_DEINTERLACE)
+        self.field_mode_combo.setToolTip(
+            "Restores progressive frames while they are extracted:\n"
+            "• Inverse Telecine: Rebuilds the 23.976 fps film frames of telecined\n"
+            "  29.97 fps sources, dropping the 20% duplicate frames\n"
+            "• Deinterlace: Deinterlaces every frame of interlaced sources\n"
+            "• Auto-Detect: Samples the video and picks one of the above,\n"
+            "  or nothing for progressive sources\n"
+            "Videos are then reassembled at the restored frame rate."
+        )
+        video_layout.addRow("Interlacing:", self.field_mode_combo)
+        self.hwaccel_combo = QComboBox()
+        self.hwaccel_combo.addItem("Auto", HWACCEL_AUTO)
+        self.hwaccel_combo.addItem("Off", HWACCEL_NONE)
+        for name in HWACCEL_CANDIDATES:
+            self.hwaccel_combo.addItem(name, name)
+        self.hwaccel_combo.setToolTip(
+            "The hardware decoder FFmpeg uses to extract video frames.\n"
+            "Auto measures the decoders FFmpeg offers once on this machine and\n"
+            "uses the fastest, or decodes in software if none is faster.\n"
+            "Videos a hardware decoder cannot handle are decoded in software."
+        )
+        video_layout.addRow("Hardware Decoding:", self.hwaccel_combo)
+        self.decode_threads_spin = QSpinBox()
+        self.decode_threads_spin.setRange(0, 256)
+        self.decode_threads_spin.setSpecialValueText("Auto")
+        self.decode_threads_spin.setToolTip(
+            "Threads FFmpeg decodes videos with. Auto lets FFmpeg decide;\n"
+            "without GPU acceleration, the Threads per Process are used."
+        )
+        video_layout.addRow("Decoder Threads:", self.decode_threads_spin)
+
+        # Output Size Settings
+        size_group = QGroupBox("Output Size")
+        size_layout = QFormLayout(size_group)
+        self.target_combo = QComboBox()
+        self.target_combo.addItem("Model Scale", 0)
+        for height in (720, 1080, 1440, 2160, 4320):
+            self.target_combo.addItem(f"{height}p", height)
+        self.target_combo.setToolTip(
+            "Output height. With a target, the smallest model scale that reaches\n"
+            "it (x2, x3 or x4, if installed) is used, and the result is resized\n"
+            "to the exact height while it is encoded."
+        )
+        size_layout.addRow("Target Resolution:", self.target_combo)
+        self.pre_downscale_check = QCheckBox("Downscale Over-Sized Sources First")
+        self.pre_downscale_check.setToolTip(
+            "Shrink sources that would overshoot the target before upscaling.\n"
+            "Much faster, at the cost of some source detail."
+        )
+        size_layout.addRow(self.pre_downscale_check)
 
         # Output Format Settings
         output_group = QGroupBox("Output Format Settings")
         output_layout = QFormLayout(output_group)
         self.format_combo = QComboBox()
-        self.format_combo.addItems(["jpg", "png", "webp"])
+        self.format_combo.addItems(list(OUTPUT_FORMATS))
         self.format_combo.setToolTip(
             "Output format for images:\n"
             "• JPG: Smaller files, good for photos\n"
             "• PNG: Lossless, larger files, supports transparency\n"
-            "• WebP: Modern format, good compression"
+            "• WebP: Modern format, good compression\n"
+            "• TIFF / BMP: Lossless, for editing tools (encoded by FFmpeg)"
         )
         output_layout.addRow("Image Format:", self.format_combo)
+        self.jpeg_quality_spin = QSpinBox()
+        self.jpeg_quality_spin.setRange(0, 100)
+        self.jpeg_quality_spin.setSpecialValueText("Default")
+        self.jpeg_quality_spin.setToolTip(
+            "JPEG quality (1-100). Any value other than Default encodes the\n"
+            "output with FFmpeg from a lossless upscale."
+        )
+        output_layout.addRow("JPEG Quality:", self.jpeg_quality_spin)
+        self.png_compression_spin = QSpinBox()
+        self.png_compression_spin.setRange(-1, 9)
+        self.png_compression_spin.setValue(-1)
+        self.png_compression_spin.setSpecialValueText("Default")
+        self.png_compression_spin.setToolTip(
+            "PNG compression level (0-9). Higher levels make smaller files but\n"
+            "take longer to encode; the image is the same."
+        )
+        output_layout.addRow("PNG Compression:", self.png_compression_spin)
+        self.webp_quality_spin = QSpinBox()
+        self.webp_quality_spin.setRange(0, 100)
+        self.webp_quality_spin.setSpecialValueText("Default")
+        self.webp_quality_spin.setToolTip(
+            "WebP quality (1-100); in lossless mode, how hard the encoder tries"
+        )
+        output_layout.addRow("WebP Quality:", self.webp_quality_spin)
+        self.webp_effort_spin = QSpinBox()
+        self.webp_effort_spin.setRange(-1, 6)
+        self.webp_effort_spin.setValue(-1)
+        self.webp_effort_spin.setSpecialValueText("Default")
+        self.webp_effort_spin.setToolTip(
+            "WebP compression effort (0-6): slower encoding for smaller files"
+        )
+        output_layout.addRow("WebP Effort:", self.webp_effort_spin)
+        self.webp_lossless_check = QCheckBox("Lossless WebP")
+        output_layout.addRow(self.webp_lossless_check)
+        self.copy_metadata_check = QCheckBox("Copy Metadata (EXIF, ICC Profile)")
+        self.copy_metadata_check.setChecked(True)
+        self.copy_metadata_check.setToolTip(
+            "Copy the source's EXIF data and color profile to JPG, PNG and WebP\n"
+            "outputs, without re-encoding them"
+        )
+        output_layout.addRow(self.copy_metadata_check)
+        self.output_layout_combo = QComboBox()
+        self.output_layout_combo.addItem("One Folder", LAYOUT_FLAT)
+        self.output_layout_combo.addItem("Mirror Source Folders", LAYOUT_MIRROR)
+        self.output_layout_combo.setToolTip(
+            "Where outputs are written inside the output folder:\n"
+            "• One Folder: All outputs side by side; files with the same name\n"
+            "  get a numbered suffix (_2, _3, ...)\n"
+            "• Mirror Source Folders: Files added as a folder keep their\n"
+            "  subfolders below it"
+        )
+        output_layout.addRow("Output Layout:", self.output_layout_combo)
+        self.format_combo.currentTextChanged.connect(self.update_format_options)
+        self.update_format_options(self.format_combo.currentText())
+
+        # Scheduling Settings
+        schedule_group = QGroupBox("Scheduling Settings")
+        schedule_layout = QFormLayout(schedule_group)
+        self.image_concurrency_spin = QSpinBox()
+        self.image_concurrency_spin.setRange(1, 16)
+        self.image_concurrency_spin.setValue(2)
+        self.image_concurrency_spin.setToolTip(
+            "Number of images processed at the same time"
+        )
+        schedule_layout.addRow("Concurrent Images:", self.image_concurrency_spin)
+        self.video_concurrency_spin = QSpinBox()
+        self.video_concurrency_spin.setRange(1, 8)
+        self.video_concurrency_spin.setValue(1)
+        self.video_concurrency_spin.setToolTip(
+            "Number of videos processed at the same time.\n"
+            "Videos run in their own lane, so they never block queued images."
+        )
+        schedule_layout.addRow("Concurrent Videos:", self.video_concurrency_spin)
+        self.scheduling_combo = QComboBox()
+        self.scheduling_combo.addItem("Queue Order", "fifo")
+        self.scheduling_combo.addItem("Shortest First", "shortest")
+        self.scheduling_combo.setToolTip(
+            "Order of jobs within each lane:\n"
+            "• Queue Order: Process files in list order\n"
+            "• Shortest First: Start small images and short videos first"
+        )
+        schedule_layout.addRow("Job Order:", self.scheduling_combo)
+        self.image_batch_spin = QSpinBox()
+        self.image_batch_spin.setRange(1, 10000)
+        self.image_batch_spin.setValue(1)
+        self.image_batch_spin.setSpecialValueText("Off")
+        self.image_batch_spin.setToolTip(
+            "Queued images with the same settings are upscaled together, up to\n"
+            "this many per Real-ESRGAN call, which saves the startup time of\n"
+            "every call. Much faster for many small images."
+        )
+        schedule_layout.addRow("Images per Batch:", self.image_batch_spin)
+
+        # Resource Limits
+        limits_group = QGroupBox("Resource Limits")
+        limits_layout = QFormLayout(limits_group)
+        self.max_memory_spin = QSpinBox()
+        self.max_memory_spin.setRange(0, 4096)
+        self.max_memory_spin.setSuffix(" GB")
+        self.max_memory_spin.setSpecialValueText("Auto")
+        self.max_memory_spin.setToolTip(
+            "Jobs only start while the estimated memory of all running jobs\n"
+            "stays below this. Auto uses 75% of the physical memory."
+        )
+        limits_layout.addRow("Max Memory:", self.max_memory_spin)
+        self.max_disk_spin = QSpinBox()
+        self.max_disk_spin.setRange(0, 100000)
+        self.max_disk_spin.setSuffix(" GB")
+        self.max_disk_spin.setSpecialValueText("Auto")
+        self.max_disk_spin.setToolTip(
+            "Jobs only start while the estimated temp files (e.g. video frames)\n"
+            "of all running jobs stay below this. Auto uses 90% of the free\n"
+            "temp space."
+        )
+        limits_layout.addRow("Max Temp Disk:", self.max_disk_spin)
+        self.max_load_spin = QDoubleSpinBox()
+        self.max_load_spin.setRange(0.0, 16.0)
+        self.max_load_spin.setSingleStep(0.25)
+        self.max_load_spin.setValue(1.5)
+        self.max_load_spin.setSpecialValueText("Off")
+        self.max_load_spin.setToolTip(
+            "No new jobs start while the system load per core is above this"
+        )
+        limits_layout.addRow("Max Load per Core:", self.max_load_spin)
+
+        # Incremental Mode Settings
+        incremental_group = QGroupBox("Incremental Mode")
+        incremental_layout = QFormLayout(incremental_group)
+        self.incremental_check = QCheckBox("Skip Up-to-Date Files")
+        self.incremental_check.setChecked(False)
+        self.incremental_check.setToolTip(
+            "Skip files whose output already exists and was made from the same\n"
+            "source file with the same settings"
+        )
+        incremental_layout.addRow(self.incremental_check)
+        self.compare_combo = QComboBox()
+        self.compare_combo.addItem("Size and Modification Time", "mtime")
+        self.compare_combo.addItem("Content Hash", "hash")
+        self.compare_combo.setToolTip(
+            "How changed source files are detected:\n"
+            "• Size and Modification Time: Fastest\n"
+            "• Content Hash: Also skips files that were only touched or copied"
+        )
+        incremental_layout.addRow("Compare By:", self.compare_combo)
+
+        # Watch Folder Settings
+        watch_group = QGroupBox("Watch Folder")
+        watch_layout = QFormLayout(watch_group)
+        self.watch_action_combo = QComboBox()
+        self.watch_action_combo.addItem("Move to Subfolder", "move")
+        self.watch_action_combo.addItem("Tag in Place", "tag")
+        self.watch_action_combo.setToolTip(
+            "What happens to inputs after processing:\n"
+            "• Move to Subfolder: Move into 'processed' (or 'failed') in the watched folder\n"
+            "• Tag in Place: Leave them and record them as processed"
+        )
+        watch_layout.addRow("Processed Inputs:", self.watch_action_combo)
+        self.watch_settle_spin = QSpinBox()
+        self.watch_settle_spin.setRange(1, 600)
+        self.watch_settle_spin.setValue(5)
+        self.watch_settle_spin.setSuffix(" s")
+        self.watch_settle_spin.setToolTip(
+            "How long a new file's size must stay unchanged before it is\n"
+            "considered completely written and queued"
+        )
+        watch_layout.addRow("Settle Time:", self.watch_settle_spin)
+
+        # Logging Settings
+        logging_group = QGroupBox("Logging Settings")
+        logging_layout = QFormLayout(logging_group)
+        self.log_file_check = QCheckBox("Write Log File")
+        self.log_file_check.setChecked(True)
+        self.log_file_check.setToolTip(
+            "Stream the full log to a rotating file in the application data folder.\n"
+            "'Save Log' exports this file. Takes effect after a restart."
+        )
+        logging_layout.addRow(self.log_file_check)
+
+        # HTTP API Settings
+        api_group = QGroupBox("HTTP API")
+        api_layout = QFormLayout(api_group)
+        self.api_check = QCheckBox("Enable Local HTTP API")
+        self.api_check.setChecked(False)
+        self.api_check.setToolTip(
+            "Accept job submissions and serve job status and progress over\n"
+            "HTTP/JSON. Only reachable from this computer (127.0.0.1)."
+        )
+        api_layout.addRow(self.api_check)
+        self.api_port_spin = QSpinBox()
+        self.api_port_spin.setRange(1024, 65535)
+        self.api_port_spin.setValue(8765)
+        api_layout.addRow("Port:", self.api_port_spin)
+
+        # Distributed Rendering Settings
+        distributed_group = QGroupBox("Distributed Rendering")
+        distributed_layout = QFormLayout(distributed_group)
+        shared_row = QHBoxLayout()
+        self.distributed_dir_edit = QLineEdit()
+        self.distributed_dir_edit.setPlaceholderText("Off (upscale locally)")
+        self.distributed_dir_edit.setToolTip(
+            "A folder shared with other machines. Video frames are published\n"
+            "there and upscaled by workers started with:\n"
+            "python main.py --worker <shared folder>"
+        )
+        shared_row.addWidget(self.distributed_dir_edit)
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self.browse_distributed_dir)
+        shared_row.addWidget(browse_button)
+        distributed_layout.addRow("Shared Folder:", shared_row)
+        self.unit_size_spin = QSpinBox()
+        self.unit_size_spin.setRange(1, 1000)
+        self.unit_size_spin.setValue(50)
+        self.unit_size_spin.setSuffix(" frames")
+        self.unit_size_spin.setToolTip("Number of frames a worker claims at a time")
+        distributed_layout.addRow("Work Unit Size:", self.unit_size_spin)
+        self.lease_spin = QSpinBox()
+        self.lease_spin.setRange(10, 3600)
+        self.lease_spin.setValue(60)
+        self.lease_spin.setSuffix(" s")
+        self.lease_spin.setToolTip(
+            "How long a worker may go without checking in before its\n"
+            "work unit is handed to another worker"
+        )
+        distributed_layout.addRow("Lease Timeout:", self.lease_spin)
 
         layout.addWidget(model_group)
         layout.addWidget(perf_group)
+        layout.addWidget(large_group)
         layout.addWidget(video_group)
+        layout.addWidget(size_group)
         layout.addWidget(output_group)
+        layout.addWidget(schedule_group)
+        layout.addWidget(limits_group)
+        layout.addWidget(incremental_group)
+        layout.addWidget(watch_group)
+        layout.addWidget(logging_group)
+        layout.addWidget(api_group)
+        layout.addWidget(distributed_group)
 
         # Dialog buttons
         buttons = QDialogButtonBox(
@@ -112,22 +511,161 @@ class SettingsDialog(QDialog):
 
     def get_settings(self) -> Dict[str, Any]:
         """Returns the current settings from the dialog's UI components."""
+        auto = self.model_combo.currentText() == AUTO_MODEL
         return {
             "model": self.model_combo.currentText(),
+            # The type and scale only apply to the automatic selection
+            "model_type": self.model_type_combo.currentData() if auto else "",
+            "scale": self.model_scale_combo.currentData() if auto else 0,
             "use_gpu": self.gpu_check.isChecked(),
+            "cpu_processes": self.cpu_processes_spin.value(),
+            "cpu_threads": self.cpu_threads_spin.value(),
             "tile_size": self.tile_spin.value() if self.tile_spin.value() > 0 else None,
+            "tiling_threshold": self.tiling_threshold_spin.value(),
+            "tiling_tile_size": self.tiling_tile_spin.value(),
+            "tiling_workers": self.tiling_workers_spin.value(),
             "fps": self.fps_spin.value(),
             "quality": self.quality_spin.value(),
+            "frame_retries": self.retries_spin.value(),
+            "field_mode": self.field_mode_combo.currentData(),
+            "hwaccel": self.hwaccel_combo.currentData(),
+            "decode_threads": self.decode_threads_spin.value(),
             "format": self.format_combo.currentText(),
+            "jpeg_quality": self.jpeg_quality_spin.value(),
+            "png_compression": self.png_compression_spin.value(),
+            "webp_quality": self.webp_quality_spin.value(),
+            "webp_effort": self.webp_effort_spin.value(),
+            "webp_lossless": self.webp_lossless_check.isChecked(),
+            "copy_metadata": self.copy_metadata_check.isChecked(),
+            "output_layout": self.output_layout_combo.currentData(),
+            "target_height": self.target_combo.currentData(),
+            "pre_downscale": self.pre_downscale_check.isChecked(),
+            "image_concurrency": self.image_concurrency_spin.value(),
+            "video_concurrency": self.video_concurrency_spin.value(),
+            "scheduling": self.scheduling_combo.currentData(),
+            "image_batch_size": self.image_batch_spin.value(),
+            "max_memory_gb": self.max_memory_spin.value(),
+            "max_temp_disk_gb": self.max_disk_spin.value(),
+            "max_load": self.max_load_spin.value(),
+            "incremental": self.incremental_check.isChecked(),
+            "incremental_compare": self.compare_combo.currentData(),
+            "watch_action": self.watch_action_combo.currentData(),
+            "watch_settle": self.watch_settle_spin.value(),
+            "log_to_file": self.log_file_check.isChecked(),
+            "api_enabled": self.api_check.isChecked(),
+            "api_port": self.api_port_spin.value(),
+            "distributed_dir": self.distributed_dir_edit.text().strip(),
+            "distributed_unit_size": self.unit_size_spin.value(),
+            "distributed_lease": self.lease_spin.value(),
         }
 
     def set_settings(self, settings: Dict[str, Any]):
         """Sets the dialog's UI components based on the provided settings."""
-        self.model_combo.setCurrentText(
-            settings.get("model", "realesr-animevideov3-x4")
+        model = settings.get("model", DEFAULT_MODEL)
+        if self.model_combo.findText(model) < 0:
+            self.model_combo.addItem(model)
+        self.model_combo.setCurrentText(model)
+        self.model_type_combo.setCurrentIndex(
+            max(0, self.model_type_combo.findData(settings.get("model_type", "")))
+        )
+        self.model_scale_combo.setCurrentIndex(
+            max(0, self.model_scale_combo.findData(settings.get("scale", 0)))
         )
         self.gpu_check.setChecked(settings.get("use_gpu", True))
+        self.cpu_processes_spin.setValue(settings.get("cpu_processes", 0))
+        self.cpu_threads_spin.setValue(settings.get("cpu_threads", 0))
         self.tile_spin.setValue(settings.get("tile_size", 400) or 0)
-        self.fps_spin.setValue(settings.get("fps", 24))
+        self.tiling_threshold_spin.setValue(settings.get("tiling_threshold", 16))
+        self.tiling_tile_spin.setValue(settings.get("tiling_tile_size", 512))
+        self.tiling_workers_spin.setValue(settings.get("tiling_workers", 2))
+        self.fps_spin.setValue(settings.get("fps", 0))
         self.quality_spin.setValue(settings.get("quality", 18))
+        self.retries_spin.setValue(settings.get("frame_retries", 2))
+        self.field_mode_combo.setCurrentIndex(
+            max(
+                0, self.field_mode_combo.findData(settings.get("field_mode", FIELD_OFF))
+            )
+        )
+        self.hwaccel_combo.setCurrentIndex(
+            max(0, self.hwaccel_combo.findData(settings.get("hwaccel", HWACCEL_AUTO)))
+        )
+        self.decode_threads_spin.setValue(settings.get("decode_threads", 0))
         self.format_combo.setCurrentText(settings.get("format", "jpg"))
+        self.jpeg_quality_spin.setValue(settings.get("jpeg_quality", 0))
+        self.png_compression_spin.setValue(settings.get("png_compression", -1))
+        self.webp_quality_spin.setValue(settings.get("webp_quality", 0))
+        self.webp_effort_spin.setValue(settings.get("webp_effort", -1))
+        self.webp_lossless_check.setChecked(settings.get("webp_lossless", False))
+        self.copy_metadata_check.setChecked(settings.get("copy_metadata", True))
+        self.output_layout_combo.setCurrentIndex(
+            max(
+                0,
+                self.output_layout_combo.findData(
+                    settings.get("output_layout", LAYOUT_FLAT)
+                ),
+            )
+        )
+        self.target_combo.setCurrentIndex(
+            max(0, self.target_combo.findData(settings.get("target_height", 0)))
+        )
+        self.pre_downscale_check.setChecked(settings.get("pre_downscale", False))
+        self.image_concurrency_spin.setValue(settings.get("image_concurrency", 2))
+        self.video_concurrency_spin.setValue(settings.get("video_concurrency", 1))
+        self.log_file_check.setChecked(settings.get("log_to_file", True))
+        self.api_check.setChecked(settings.get("api_enabled", False))
+        self.api_port_spin.setValue(settings.get("api_port", 8765))
+        self.distributed_dir_edit.setText(settings.get("distributed_dir", ""))
+        self.unit_size_spin.setValue(settings.get("distributed_unit_size", 50))
+        self.lease_spin.setValue(settings.get("distributed_lease", 60))
+        self.incremental_check.setChecked(settings.get("incremental", False))
+        self.watch_action_combo.setCurrentIndex(
+            max(
+                0,
+                self.watch_action_combo.findData(settings.get("watch_action", "move")),
+            )
+        )
+        self.watch_settle_spin.setValue(settings.get("watch_settle", 5))
+        self.compare_combo.setCurrentIndex(
+            max(
+                0,
+                self.compare_combo.findData(
+                    settings.get("incremental_compare", "mtime")
+                ),
+            )
+        )
+        self.scheduling_combo.setCurrentIndex(
+            max(0, self.scheduling_combo.findData(settings.get("scheduling", "fifo")))
+        )
+        self.image_batch_spin.setValue(settings.get("image_batch_size", 1))
+        self.max_memory_spin.setValue(settings.get("max_memory_gb", 0))
+        self.max_disk_spin.setValue(settings.get("max_temp_disk_gb", 0))
+        self.max_load_spin.setValue(settings.get("max_load", 1.5))
+
+    def update_cpu_options(self, use_gpu: bool):
+        """Enables the process and thread counts only for the CPU mode."""
+        self.cpu_processes_spin.setEnabled(not use_gpu)
+        self.cpu_threads_spin.setEnabled(not use_gpu)
+
+    def update_format_options(self, fmt: str):
+        """Enables only the encoder settings of the selected format."""
+        self.jpeg_quality_spin.setEnabled(fmt == "jpg")
+        self.png_compression_spin.setEnabled(fmt == "png")
+        for widget in (
+            self.webp_quality_spin,
+            self.webp_effort_spin,
+            self.webp_lossless_check,
+        ):
+            widget.setEnabled(fmt == "webp")
+
+    def update_auto_options(self, model: str):
+        """Enables the model type and scale only for automatic model selection."""
+        self.model_type_combo.setEnabled(model == AUTO_MODEL)
+        self.model_scale_combo.setEnabled(model == AUTO_MODEL)
+
+    def browse_distributed_dir(self):
+        """Opens a dialog to select the shared folder for distributed rendering."""
+        folder = QFileDialog.getExistingDirectory(
+            self, "Select Shared Folder", self.distributed_dir_edit.text()
+        )
+        if folder:
+            self.distributed_dir_edit.setText(folder)
@@ -0,0 +1,132 @@
+"""
+This module defines the `ThumbnailLoader` class, which decodes preview
+thumbnails of upscaled images off the GUI thread.
+
+Upscaled outputs are often 4K or larger, so decoding them at full resolution on
+the GUI thread would stall the UI. The loader instead:
+- Decodes images on a background thread, asking the image reader to downscale
+  while decoding where the format supports it (e.g. JPEG).
+- Keeps the most recent thumbnails in a small LRU cache keyed by path and
+  modification time, so re-selecting a file is instant and changed files reload.
+- Loads only the newest request when requests arrive faster than decoding, so a
+  stream of finished frames never builds up a backlog.
+"""
+
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+
+
+class _ThumbnailSignals(QObject):
+    """Defines the signals available from a thumbnail decoding task."""
+
+    done = pyqtSignal(str, float, QImage)
+
+
+class _ThumbnailTask(QRunnable):
+    """Decodes a single image into a thumbnail on a pool thread."""
+
+    def __init__(self, path: str, mtime: float, max_size: QSize):
+        """Initializes the task for the given image and bounding size."""
+        super().__init__()
+        self.path = path
+        self.mtime = mtime
+        self.max_size = max_size
+        self.signals = _ThumbnailSignals()
+
+    def run(self):
+        """Decodes and downscales the image."""
+        reader = QImageReader(self.path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        if size.isValid():
+            # Let the decoder scale down while reading instead of afterwards
+            reader.setScaledSize(
+                size.scaled(self.max_size, Qt.AspectRatioMode.KeepAspectRatio)
+            )
+        image = reader.read()
+        if not image.isNull() and (
+            image.width() > self.max_size.width()
+            or image.height() > self.max_size.height()
+        ):
+            image = image.scaled(
+                self.max_size,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+        self.signals.done.emit(self.path, self.mtime, image)
+
+
+class ThumbnailLoader(QObject):
+    """Loads thumbnails in the background and caches the most recent ones."""
+
+    loaded = pyqtSignal(str, QImage)
+
+    def __init__(
+        self,
+        max_size: QSize = QSize(480, 270),
+        cache_size: int = 64,
+        parent: Optional[QObject] = None,
+    ):
+        """
+        Initializes the loader.
+
+        Args:
+            max_size: The bounding box thumbnails are scaled into.
+            cache_size: Number of thumbnails kept in the LRU cache.
+            parent: The parent object.
+        """
+        super().__init__(parent)
+        self.max_size = max_size
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, float], QImage]" = OrderedDict()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._tasks = {}
+        self._in_flight: Optional[str] = None
+        self._pending: Optional[str] = None
+
+    def request(self, path: str):
+        """
+        Requests the thumbnail of an image; `loaded` is emitted when it is ready.
+
+        Cached thumbnails are emitted immediately. While another image is being
+        decoded, only the most recent request is remembered.
+        """
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return
+        image = self._cache.get((path, mtime))
+        if image is not None:
+            self._cache.move_to_end((path, mtime))
+            self.loaded.emit(path, image)
+            return
+        if self._in_flight:
+            self._pending = path
+            return
+        self._start(path, mtime)
+
+    def _start(self, path: str, mtime: float):
+        """Starts decoding an image on the loader's thread pool."""
+        task = _ThumbnailTask(path, mtime, self.max_size)
+        task.signals.done.connect(self._on_done)
+        self._tasks[path] = task
+        self._in_flight = path
+        self._pool.start(task)
+
+    def _on_done(self, path: str, mtime: float, image: QImage):
+        """Caches a decoded thumbnail and starts the pending request, if any."""
+        self._tasks.pop(path, None)
+        self._in_flight = None
+        if not image.isNull():
+            self._cache[(path, mtime)] = image
+            self._cache.move_to_end((path, mtime))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self.loaded.emit(path, image)
+        if self._pending:
+            pending, self._pending = self._pending, None
+            self.request(pending)
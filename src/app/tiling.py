@@ -0,0 +1,325 @@
+"""
+This module implements the tiling of very large images, so they can be upscaled
+with memory proportional to the tile size instead of the image size.
+
+Real-ESRGAN's own `-t` option only tiles the GPU work; the whole input and
+output image are still held in memory. For inputs above the tiling threshold,
+`UpscaleWorker` instead:
+- Decodes the source once into a raw RGB file on disk (RGBA if the image may
+  have transparency, see `has_alpha`) and reads overlapping tiles from it
+  with seeks (`tile_starts`, `read_tile`).
+- Upscales the tiles of one tile row at a time, several in parallel.
+- Blends the tiles back together with `TileStitcher`, which cross-fades every
+  tile into its left and top neighbours over their overlap with a linear ramp,
+  so no seams are visible. Transparency is cross-faded like the colours.
+- Streams each finished band of rows into the output with `PngStreamWriter`,
+  so the full output image never exists in memory.
+"""
+
+import os
+import zlib
+import struct
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import (
+    QImage,
+    QImageReader,
+    QPainter,
+    QPixelFormat,
+    QLinearGradient,
+    QColor,
+)
+
+# Tile size and overlap in source pixels
+DEFAULT_TILE_SIZE = 512
+DEFAULT_OVERLAP = 32
+# Images with more megapixels than this are tiled
+DEFAULT_THRESHOLD = 16
+
+
+def needs_tiling(file_path: str, settings: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """
+    Checks whether an image is large enough to be upscaled in tiles.
+
+    Only the image header is read.
+
+    Returns:
+        The `(width, height)` of the image if it should be tiled, otherwise None.
+    """
+    threshold = settings.get("tiling_threshold", DEFAULT_THRESHOLD)
+    if not threshold:
+        return None
+    size = QImageReader(file_path).size()
+    if not size.isValid() or size.width() * size.height() <= threshold * 1_000_000:
+        return None
+    return size.width(), size.height()
+
+
+def has_alpha(file_path: str) -> bool:
+    """
+    Checks whether an image may have an alpha channel, from its header.
+
+    Images whose header does not tell (e.g. WebP) and palette images, which
+    can mark colours transparent, are assumed to have one.
+    """
+    image_format = QImageReader(file_path).imageFormat()
+    if image_format in (
+        QImage.Format.Format_Invalid,
+        QImage.Format.Format_Indexed8,
+        QImage.Format.Format_Mono,
+        QImage.Format.Format_MonoLSB,
+    ):
+        return True
+    alpha_usage = QImage.toPixelFormat(image_format).alphaUsage()
+    return alpha_usage == QPixelFormat.AlphaUsage.UsesAlpha
+
+
+def tile_starts(length: int, tile: int, overlap: int) -> List[int]:
+    """
+    Returns the start positions of overlapping tiles covering a length.
+
+    Every tile has the full tile size (unless the length is smaller); the last
+    tile is moved back to end at the edge, so it may overlap its neighbour by
+    more than `overlap`.
+    """
+    if length <= tile:
+        return [0]
+    step = max(1, tile - overlap)
+    starts = list(range(0, length - tile, step))
+    starts.append(length - tile)
+    return starts
+
+
+def read_tile(
+    source: BinaryIO,
+    image_width: int,
+    x: int,
+    y: int,
+    width: int,
+    height: int,
+    channels: int = 3,
+) -> bytes:
+    """Reads a rectangle of RGB24, or RGBA with 4 channels, from a raw image file."""
+    rows = []
+    for row in range(y, y + height):
+        source.seek((row * image_width + x) * channels)
+        rows.append(source.read(width * channels))
+    return b"".join(rows)
+
+
+def save_tile(data: bytes, width: int, height: int, path: str, channels: int = 3):
+    """Saves RGB24 (or RGBA with 4 channels) pixels as a PNG file."""
+    if channels == 4:
+        image_format = QImage.Format.Format_RGBA8888
+    else:
+        image_format = QImage.Format.Format_RGB888
+    image = QImage(data, width, height, width * channels, image_format)
+    if not image.save(path, "PNG"):
+        raise OSError(f"Could not write tile {path}")
+
+
+class PngStreamWriter:
+    """Writes an 8-bit RGB or RGBA PNG file row by row."""
+
+    # Compressed bytes collected before an IDAT chunk is written
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, path: str, width: int, height: int, alpha: bool = False):
+        """
+        Creates the file and writes the PNG header.
+
+        Args:
+            path: The path of the PNG file.
+            width: The image width in pixels.
+            height: The number of rows that will be written.
+            alpha: Whether rows are RGBA instead of RGB.
+        """
+        self.path = path
+        self.width = width
+        self.height = height
+        self.alpha = alpha
+        self.rows_written = 0
+        self._file = open(path, "wb")
+        self._compressor = zlib.compressobj(6)
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        # 8 bits per channel, color type 2 (RGB) or 6 (RGBA), no interlacing
+        color_type = 6 if alpha else 2
+        self._write_chunk(
+            b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+        )
+
+    def _write_chunk(self, kind: bytes, data: bytes):
+        """Writes a PNG chunk with its length and checksum."""
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(kind)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def _add(self, compressed: bytes):
+        """Collects compressed data and writes it once a chunk is full."""
+        if compressed:
+            self._pending.append(compressed)
+            self._pending_size += len(compressed)
+        if self._pending_size >= self.CHUNK_SIZE:
+            self._write_chunk(b"IDAT", b"".join(self._pending))
+            self._pending, self._pending_size = [], 0
+
+    def write_row(self, row: bytes):
+        """Writes one row of `width * 3` bytes of RGB, or `width * 4` of RGBA."""
+        # Each row is prefixed with its filter type; 0 means unfiltered
+        self._add(self._compressor.compress(b"\x00" + bytes(row)))
+        self.rows_written += 1
+
+    def close(self):
+        """Finishes the file; raises ValueError if rows are missing."""
+        if self._file.closed:
+            return
+        try:
+            self._add(self._compressor.flush())
+            if self._pending:
+                self._write_chunk(b"IDAT", b"".join(self._pending))
+            self._write_chunk(b"IEND", b"")
+        finally:
+            self._file.close()
+        if self.rows_written != self.height:
+            raise ValueError(
+                f"Expected {self.height} rows, got {self.rows_written} in {self.path}"
+            )
+
+    def abort(self):
+        """Closes and removes an unfinished file."""
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def feather(image: QImage, left: int, top: int) -> QImage:
+    """
+    Returns a premultiplied tile with a linear fade-in over its left and top overlap.
+
+    Added to its already placed neighbours faded out by the same amount, the
+    tile cross-fades into them instead of leaving a hard seam.
+    """
+    tile = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+    if not left and not top:
+        return tile
+    painter = QPainter(tile)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_DestinationIn)
+    if left > 0:
+        painter.fillRect(0, 0, left, tile.height(), _ramp(left, 0))
+    if top > 0:
+        painter.fillRect(0, 0, tile.width(), top, _ramp(0, top))
+    painter.end()
+    return tile
+
+
+def _ramp(dx: int, dy: int) -> QLinearGradient:
+    """Returns an alpha gradient from transparent to opaque over (dx, dy)."""
+    gradient = QLinearGradient(0, 0, dx, dy)
+    gradient.setColorAt(0, QColor(0, 0, 0, 0))
+    gradient.setColorAt(1, QColor(0, 0, 0, 255))
+    return gradient
+
+
+class TileStitcher:
+    """
+    Blends rows of upscaled tiles and streams the finished rows to a writer.
+
+    Only the current band of rows (one tile row high) is kept in memory; the
+    rows it shares with the next tile row are carried over until that row has
+    been blended in.
+    """
+
+    def __init__(self, writer: PngStreamWriter, width: int, height: int):
+        """
+        Initializes the stitcher.
+
+        Args:
+            writer: The writer that receives the finished rows.
+            width: The output width in pixels.
+            height: The output height in pixels.
+        """
+        self.writer = writer
+        self.width = width
+        self.height = height
+        self.rows_done = 0
+        # Blended rows from `rows_done` on that overlap the next tile row
+        self._carry: Optional[QImage] = None
+
+    def add_row(self, top: int, tiles: List[Tuple[int, QImage]], next_top: int):
+        """
+        Blends a row of tiles and writes the rows no later tile row overlaps.
+
+        Args:
+            top: The output y coordinate of the tile row; rows above it must
+                already be finished.
+            tiles: `(x, image)` pairs in output coordinates, left to right.
+            next_top: The output y coordinate of the next tile row, or the
+                output height for the last row.
+        """
+        if top != self.rows_done:
+            raise ValueError(f"Tile row at {top} does not follow row {self.rows_done}")
+        bottom = max(top + image.height() for _, image in tiles)
+        band = QImage(
+            self.width, bottom - top, QImage.Format.Format_ARGB32_Premultiplied
+        )
+        band.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(band)
+        top_overlap = 0
+        if self._carry is not None:
+            painter.drawImage(0, 0, self._carry)
+            top_overlap = self._carry.height()
+        previous_right = None
+        for x, image in tiles:
+            left_overlap = previous_right - x if previous_right is not None else 0
+            # Fade out what is already there by the tile's ramp, then add the
+            # faded in tile; unlike drawing the tile over it, this also
+            # cross-fades partly transparent pixels
+            ramp = QImage(image.size(), QImage.Format.Format_ARGB32_Premultiplied)
+            ramp.fill(Qt.GlobalColor.white)
+            painter.setCompositionMode(
+                QPainter.CompositionMode.CompositionMode_DestinationOut
+            )
+            painter.drawImage(x, 0, feather(ramp, left_overlap, top_overlap))
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Plus)
+            painter.drawImage(x, 0, feather(image, left_overlap, top_overlap))
+            previous_right = x + image.width()
+        painter.end()
+
+        finished = min(next_top, self.height) - top
+        self._write_rows(band, finished)
+        self.rows_done += finished
+        if finished < band.height():
+            self._carry = band.copy(0, finished, self.width, band.height() - finished)
+        else:
+            self._carry = None
+
+    def _write_rows(self, band: QImage, count: int):
+        """Writes the first rows of a band to the writer."""
+        if count <= 0:
+            return
+        if self.writer.alpha:
+            row_format, channels = QImage.Format.Format_RGBA8888, 4
+        else:
+            row_format, channels = QImage.Format.Format_RGB888, 3
+        rows = band.copy(0, 0, self.width, count).convertToFormat(row_format)
+        bits = rows.constBits()
+        bits.setsize(rows.sizeInBytes())
+        data = memoryview(bits)
+        stride = rows.bytesPerLine()
+        row_size = self.width * channels
+        for y in range(count):
+            self.writer.write_row(data[y * stride : y * stride + row_size])
@@ -4,14 +4,18 @@ This module provides utility functions for the user interface.
 It includes functions for:
 - Formatting time durations into a human-readable string.
 - Recursively collecting all supported media files from a given directory.
-- Verifying that all required external dependencies (FFmpeg, Real-ESRGAN) are available.
+- Reading the saved advanced settings, shared by the GUI and headless mode.
+- Verifying that all required external dependencies (FFmpeg, Real-ESRGAN) are available,
+  either directly or, with a `DependencyChecker`, on a background thread so
+  the window is not held up at startup.
 """
 
 import os
 import shutil
 from pathlib import Path
-from typing import List
-from PyQt6.QtWidgets import QMessageBox
+from typing import List, Dict, Any, Optional
+from PyQt6.QtCore import QObject, QRunnable, QSettings, QThreadPool, pyqtSignal
+from .outputs import is_partial
 
 
 def format_time(seconds: float) -> str:
@@ -65,17 +69,81 @@ def get_files_from_directory(directory: str) -> List[str]:
     # Walk through the directory and collect files with supported extensions
     for root, _, filenames in os.walk(directory):
         for filename in filenames:
+            if is_partial(filename):
+                # An output that is still being written
+                continue
             if Path(filename).suffix.lower() in supported_extensions:
                 files.append(os.path.join(root, filename))
     return files
 
 
-def check_dependencies() -> bool:
+def read_advanced_settings(settings: QSettings) -> Dict[str, Any]:
     """
-    Verifies that all required external dependencies (FFmpeg, Real-ESRGAN) are available.
+    Reads the advanced upscaling settings saved by the settings dialog.
+
+    Args:
+        settings: The application's settings store.
 
     Returns:
-        True if all dependencies are found, False otherwise.
+        A dictionary of upscaling settings, using the default model.
+    """
+    return {
+        "model": settings.value("advanced_model", "realesr-animevideov3-x4", str),
+        "model_type": settings.value("advanced_model_type", "", str),
+        "scale": settings.value("advanced_scale", 0, int),
+        "use_gpu": settings.value("advanced_use_gpu", True, bool),
+        "cpu_processes": settings.value("advanced_cpu_processes", 0, int),
+        "cpu_threads": settings.value("advanced_cpu_threads", 0, int),
+        "tile_size": settings.value("advanced_tile_size", 400, int),
+        "target_height": settings.value("advanced_target_height", 0, int),
+        "pre_downscale": settings.value("advanced_pre_downscale", False, bool),
+        "tiling_threshold": settings.value("advanced_tiling_threshold", 16, int),
+        "tiling_tile_size": settings.value("advanced_tiling_tile_size", 512, int),
+        "tiling_workers": settings.value("advanced_tiling_workers", 2, int),
+        "fps": settings.value("advanced_fps", 0, int),
+        "quality": settings.value("advanced_quality", 18, int),
+        "frame_retries": settings.value("advanced_frame_retries", 2, int),
+        "field_mode": settings.value("advanced_field_mode", "", str),
+        "hwaccel": settings.value("advanced_hwaccel", "auto", str),
+        "decode_threads": settings.value("advanced_decode_threads", 0, int),
+        "format": settings.value("advanced_format", "jpg", str),
+        "output_layout": settings.value("advanced_output_layout", "flat", str),
+        "jpeg_quality": settings.value("advanced_jpeg_quality", 0, int),
+        "png_compression": settings.value("advanced_png_compression", -1, int),
+        "webp_quality": settings.value("advanced_webp_quality", 0, int),
+        "webp_effort": settings.value("advanced_webp_effort", -1, int),
+        "webp_lossless": settings.value("advanced_webp_lossless", False, bool),
+        "copy_metadata": settings.value("advanced_copy_metadata", True, bool),
+        "image_concurrency": settings.value("advanced_image_concurrency", 2, int),
+        "video_concurrency": settings.value("advanced_video_concurrency", 1, int),
+        "scheduling": settings.value("advanced_scheduling", "fifo", str),
+        "image_batch_size": settings.value("advanced_image_batch_size", 1, int),
+        "max_memory_gb": settings.value("advanced_max_memory_gb", 0, int),
+        "max_temp_disk_gb": settings.value("advanced_max_temp_disk_gb", 0, int),
+        "max_load": settings.value("advanced_max_load", 1.5, float),
+        "log_to_file": settings.value("advanced_log_to_file", True, bool),
+        "incremental": settings.value("advanced_incremental", False, bool),
+        "incremental_compare": settings.value(
+            "advanced_incremental_compare", "mtime", str
+        ),
+        "watch_action": settings.value("advanced_watch_action", "move", str),
+        "watch_settle": settings.value("advanced_watch_settle", 5, int),
+        "api_enabled": settings.value("advanced_api_enabled", False, bool),
+        "api_port": settings.value("advanced_api_port", 8765, int),
+        "distributed_dir": settings.value("advanced_distributed_dir", "", str),
+        "distributed_unit_size": settings.value(
+            "advanced_distributed_unit_size", 50, int
+        ),
+        "distributed_lease": settings.value("advanced_distributed_lease", 60, int),
+    }
+
+
+def find_missing_dependencies() -> List[str]:
+    """
+    Checks which required external dependencies (FFmpeg, Real-ESRGAN) are missing.
+
+    Returns:
+        A list of error messages, empty if all dependencies are found.
     """
     errors = []
 
@@ -112,9 +180,27 @@ def check_dependencies() -> bool:
                 break
     if not realesrgan_found:
         errors.append("Real-ESRGAN executable not found. Please install Real-ESRGAN.")
+    return errors
+
+
+def check_dependencies(errors: Optional[List[str]] = None) -> bool:
+    """
+    Verifies that all required external dependencies (FFmpeg, Real-ESRGAN) are available.
+
+    Args:
+        errors: The result of an earlier `find_missing_dependencies` call; the
+            dependencies are looked for if not given.
+
+    Returns:
+        True if all dependencies are found, False otherwise.
+    """
+    if errors is None:
+        errors = find_missing_dependencies()
 
     # If there are errors, show a message box
     if errors:
+        from PyQt6.QtWidgets import QMessageBox
+
         error_msg = "Missing dependencies:\n\n" + "\n".join(
             f"• {error}" for error in errors
         )
@@ -122,3 +208,64 @@ def check_dependencies() -> bool:
         QMessageBox.critical(None, "Dependency Error", error_msg)
         return False
     return True
+
+
+class _DependencySignals(QObject):
+    """Defines the signals available from a dependency check task."""
+
+    done = pyqtSignal(list)
+
+
+class _DependencyTask(QRunnable):
+    """Looks for the external dependencies on a pool thread."""
+
+    def __init__(self):
+        """Initializes the task."""
+        super().__init__()
+        self.signals = _DependencySignals()
+
+    def run(self):
+        """Runs the check."""
+        self.signals.done.emit(find_missing_dependencies())
+
+
+class DependencyChecker(QObject):
+    """
+    Looks for the external dependencies without blocking the GUI thread.
+
+    The search scans folders and the PATH, which can take a noticeable time
+    (e.g. with network drives on the PATH), so it runs in the background while
+    the window is shown. `missing` holds the last result, or None while the
+    first check is running.
+    """
+
+    finished = pyqtSignal(list)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        """Initializes the checker."""
+        super().__init__(parent)
+        self.missing: Optional[List[str]] = None
+        self._task: Optional[_DependencyTask] = None
+
+    def start(self):
+        """Starts a background check; `finished` is emitted with the missing tools."""
+        if self._task:
+            return
+        self._task = _DependencyTask()
+        self._task.signals.done.connect(self._on_done)
+        QThreadPool.globalInstance().start(self._task)
+
+    def check_now(self) -> List[str]:
+        """Checks on the calling thread, e.g. when the tools are needed right away."""
+        self._store(find_missing_dependencies())
+        return self.missing
+
+    def _on_done(self, errors: List[str]):
+        """Handles the result of the background check."""
+        self._task = None
+        self._store(errors)
+
+    def _store(self, errors: List[str]):
+        """Stores and announces the result of a check."""
+        self.missing = errors
+        self.finished.emit(errors)
@@ -0,0 +1,233 @@
+"""
+This module defines the `FolderWatcher` class, which turns a "hot folder" into a
+stream of files ready for upscaling.
+
+Files dropped into the watched folder are picked up as follows:
+- Directory change notifications (inotify on Linux, the native API elsewhere)
+  trigger an immediate scan; a periodic rescan catches anything the
+  notifications miss, e.g. on network shares, and is the only mechanism when
+  notifications are unavailable.
+- Only supported media files are considered (see `get_files_from_directory`).
+- A file is reported once its size and modification time have stayed the same
+  for the settle time, so files that are still being copied are never queued.
+- Processed inputs are moved to a `processed` (or `failed`) subfolder, or
+  tagged in place in a small state file, so they are not picked up again.
+"""
+
+import os
+import json
+import time
+import shutil
+from typing import Dict, List, Optional, Tuple
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+from .ui_utils import get_files_from_directory
+
+ACTION_MOVE = "move"
+ACTION_TAG = "tag"
+
+PROCESSED_DIR = "processed"
+FAILED_DIR = "failed"
+STATE_FILE = ".sharpify-processed.json"
+
+
+class FolderWatcher(QObject):
+    """Watches a folder and reports new files once they have finished being written."""
+
+    file_ready = pyqtSignal(str)
+    log = pyqtSignal(str)
+
+    def __init__(
+        self,
+        folder: str,
+        action: str = ACTION_MOVE,
+        settle_time: float = 5.0,
+        poll_interval: int = 1000,
+        rescan_interval: float = 10.0,
+        exclude: Optional[List[str]] = None,
+        use_notifications: bool = True,
+        parent: Optional[QObject] = None,
+    ):
+        """
+        Initializes the watcher.
+
+        Args:
+            folder: The folder to watch, including its subfolders.
+            action: `ACTION_MOVE` to move processed inputs into subfolders, or
+                `ACTION_TAG` to leave them in place and record them in a state file.
+            settle_time: Seconds a file's size must stay unchanged before it is reported.
+            poll_interval: Milliseconds between checks of files that are still settling.
+            rescan_interval: Seconds between full rescans when no change was notified.
+            exclude: Folders below `folder` that are never scanned, e.g. the output folder.
+            use_notifications: Use file system notifications in addition to polling.
+            parent: The parent object.
+        """
+        super().__init__(parent)
+        self.folder = os.path.abspath(folder)
+        self.action = action
+        self.settle_time = settle_time
+        self.rescan_interval = rescan_interval
+        self.exclude = [
+            os.path.abspath(path)
+            for path in (exclude or [])
+            + [
+                os.path.join(folder, PROCESSED_DIR),
+                os.path.join(folder, FAILED_DIR),
+            ]
+        ]
+        self.state_path = os.path.join(self.folder, STATE_FILE)
+        self._state: Dict[str, Dict[str, float]] = self._load_state()
+        # Files still being written: path -> (size, mtime, unchanged since)
+        self._settling: Dict[str, Tuple[int, float, float]] = {}
+        # Files reported and not yet marked as processed
+        self._reported = set()
+        self._dirty = True
+        self._last_scan = 0.0
+
+        self._notifier = None
+        if use_notifications:
+            self._notifier = QFileSystemWatcher(self)
+            self._notifier.directoryChanged.connect(self._on_directory_changed)
+        self._timer = QTimer(self)
+        self._timer.setInterval(poll_interval)
+        self._timer.timeout.connect(self.poll)
+
+    def start(self):
+        """Starts watching; files already in the folder are picked up as well."""
+        os.makedirs(self.folder, exist_ok=True)
+        if self._notifier is not None and not self._notifier.addPath(self.folder):
+            self.log.emit(
+                "Warning: File system notifications unavailable, polling only"
+            )
+            self._notifier = None
+        self._dirty = True
+        self._timer.start()
+        self.poll()
+
+    def stop(self):
+        """Stops watching."""
+        self._timer.stop()
+        if self._notifier is not None and self._notifier.directories():
+            self._notifier.removePaths(self._notifier.directories())
+
+    def _on_directory_changed(self, path: str):
+        """Schedules a scan after a change notification."""
+        self._dirty = True
+
+    def _is_excluded(self, path: str) -> bool:
+        """Checks whether a path lies in an excluded folder."""
+        return any(
+            path == folder or path.startswith(folder + os.sep)
+            for folder in self.exclude
+        )
+
+    def poll(self):
+        """Scans the folder if needed and reports files that have settled."""
+        now = time.time()
+        rescan_due = now - self._last_scan >= (
+            self.rescan_interval if self._notifier is not None else 0
+        )
+        if not (self._dirty or self._settling or rescan_due):
+            return
+        self._dirty = False
+        self._last_scan = now
+        self._watch_subfolders()
+
+        for path in get_files_from_directory(self.folder):
+            path = os.path.abspath(path)
+            if path in self._reported or self._is_excluded(path):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Removed or renamed while scanning
+                self._settling.pop(path, None)
+                continue
+            if self._is_tagged(path, stat):
+                continue
+            previous = self._settling.get(path)
+            if previous is None or previous[:2] != (stat.st_size, stat.st_mtime):
+                self._settling[path] = (stat.st_size, stat.st_mtime, now)
+            elif now - previous[2] >= self.settle_time:
+                del self._settling[path]
+                self._reported.add(path)
+                self.file_ready.emit(path)
+
+        # Forget files that disappeared before they settled
+        for path in list(self._settling):
+            if not os.path.exists(path):
+                del self._settling[path]
+
+    def _watch_subfolders(self):
+        """Adds new subfolders to the change notifications."""
+        if self._notifier is None:
+            return
+        watched = set(self._notifier.directories())
+        for root, dirs, _ in os.walk(self.folder):
+            dirs[:] = [
+                name
+                for name in dirs
+                if not self._is_excluded(os.path.abspath(os.path.join(root, name)))
+            ]
+            if os.path.abspath(root) not in watched:
+                self._notifier.addPath(root)
+
+    def mark_processed(self, path: str, succeeded: bool) -> Optional[str]:
+        """
+        Moves or tags an input after it was processed, so it is not picked up again.
+
+        Failed inputs are not retried automatically; they are moved to the
+        `failed` subfolder, or tagged as failed in the state file.
+
+        Returns:
+            The new path of a moved input, or None if it was tagged in place.
+        """
+        path = os.path.abspath(path)
+        self._reported.discard(path)
+        try:
+            if self.action == ACTION_MOVE:
+                return self._move(path, PROCESSED_DIR if succeeded else FAILED_DIR)
+            stat = os.stat(path)
+            self._state[os.path.relpath(path, self.folder)] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "status": "done" if succeeded else "failed",
+            }
+            self._save_state()
+        except OSError as e:
+            self.log.emit(f"Warning: Could not mark {path} as processed: {str(e)}")
+        return None
+
+    def _move(self, path: str, subfolder: str) -> str:
+        """Moves a file into a subfolder, keeping its relative path and avoiding collisions."""
+        relative = os.path.relpath(path, self.folder)
+        target = os.path.join(self.folder, subfolder, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        stem, ext = os.path.splitext(target)
+        counter = 1
+        while os.path.exists(target):
+            target = f"{stem}_{counter}{ext}"
+            counter += 1
+        shutil.move(path, target)
+        return target
+
+    def _is_tagged(self, path: str, stat: os.stat_result) -> bool:
+        """Checks whether an unchanged file was already processed in tag mode."""
+        entry = self._state.get(os.path.relpath(path, self.folder))
+        return bool(
+            entry and (entry["size"], entry["mtime"]) == (stat.st_size, stat.st_mtime)
+        )
+
+    def _load_state(self) -> Dict[str, Dict[str, float]]:
+        """Loads the tag state file of the watched folder."""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        """Atomically writes the tag state file of the watched folder."""
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f)
+        os.replace(temp_path, self.state_path)
@@ -4,9 +4,23 @@ the upscaling process in a separate thread to avoid blocking the main UI.
 
 The `UpscaleWorker` class is a `QRunnable` that can be executed in a `QThreadPool`.
 It handles both image and video upscaling by:
-- Finding the Real-ESRGAN executable and models.
+- Finding the Real-ESRGAN executable, and validating the requested model (or
+  selecting one for "auto") against a `ModelRegistry`.
 - Constructing and running the appropriate command-line commands.
 - For videos, it extracts frames, upscales them individually, and then reassembles the video.
+  Frames are decoded with the hardware decoder and thread count chosen by the
+  `decoding` module.
+- In CPU mode (see the `cpu` module), upscaler and FFmpeg processes share a
+  limited number of process slots, and video frames are upscaled in parallel.
+- Very large images are upscaled in overlapping tiles and stitched back together
+  (see the `tiling` module).
+- Images are encoded with the configured encoder settings (see the `encoding`
+  module), and the source's EXIF data and ICC profile are copied to the output
+  (see the `metadata` module).
+- Telecined and interlaced videos can be restored to progressive frames while
+  they are extracted (see the `interlace` module).
+- Outputs are written under a partial name and renamed into place once they
+  are complete (see the `outputs` module).
 - Emitting signals to update the UI with progress, logs, and results.
 """
 
@@ -14,8 +28,107 @@ import os
 import subprocess
 import shutil
 import tempfile
-from typing import List, Optional, Dict, Any
-from PyQt6.QtCore import QObject, pyqtSignal, QRunnable
+import time
+import signal
+import threading
+from fractions import Fraction
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Callable, Iterator
+from PyQt6.QtCore import QObject, pyqtSignal, QRunnable, Qt
+from PyQt6.QtGui import QImage, QImageReader
+from .media import get_ffmpeg_path, is_video, probe_video
+from .incremental import write_record
+from .outputs import discard_output, partial_path, prepare_output, publish_output
+from .encoding import encode_command, needs_encoder
+from .decoding import (
+    CONVERT_FLAGS,
+    HWACCEL_AUTO,
+    HWACCEL_NONE,
+    best_hwaccel,
+    decode_args,
+    default_cache_path,
+)
+from .interlace import (
+    FIELD_AUTO,
+    FIELD_DEINTERLACE,
+    FIELD_IVTC,
+    FIELD_OFF,
+    detect_field_mode,
+    field_filter,
+    filtered_rate,
+)
+from .metadata import copy_metadata
+from .cpu import (
+    CpuPlan,
+    is_cpu_mode,
+    plan_cpu,
+    create_slots,
+    upscaler_thread_args,
+    ffmpeg_thread_args,
+)
+from .scaling import ScalePlan, model_scale, output_suffix, scale_variants, plan_scale
+from .models import (
+    DEFAULT_MODEL,
+    ModelRegistry,
+    find_realesrgan_executable,
+    find_models_directory,
+    scan_models,
+)
+from .tiling import (
+    DEFAULT_TILE_SIZE,
+    DEFAULT_OVERLAP,
+    needs_tiling,
+    has_alpha,
+    tile_starts,
+    read_tile,
+    save_tile,
+    PngStreamWriter,
+    TileStitcher,
+)
+
+# Outcomes of upscaling a single video frame
+FRAME_OK = "ok"
+FRAME_RETRIED = "succeeded after retry"
+FRAME_SMALLER_TILE = "succeeded with a smaller tile size"
+FRAME_CPU = "succeeded in CPU mode"
+FRAME_RESIZED = "was replaced with a plain resized copy"
+FRAME_DUPLICATED = "was replaced with a copy of the previous frame"
+FRAME_DUPLICATED_NEXT = "was replaced with a copy of the next frame"
+FRAME_LOST = "could not be recovered"
+
+# PNG compression level of extracted video frames. They are written once and
+# read once, by the upscaler, so they are stored uncompressed: FFmpeg encodes
+# them about ten times and the upscaler decodes them about five times faster,
+# for about twice the temp disk space
+FRAME_COMPRESSION = 0
+
+# Frame rate of videos whose rate is neither set nor known from probing
+DEFAULT_FPS = 24
+
+# Seconds a cancelled child process gets to exit before it is killed
+CANCEL_GRACE_PERIOD = 0.5
+
+
+def _signal_process_tree(process: subprocess.Popen, force: bool):
+    """
+    Terminates (or kills, if `force` is set) a child process and its group.
+
+    Children are started as process group leaders by `_run_process`, so on
+    POSIX systems the whole group is signalled, including anything FFmpeg or
+    Real-ESRGAN spawned.
+    """
+    try:
+        if os.name == "nt":
+            if force:
+                process.kill()
+            else:
+                process.send_signal(signal.CTRL_BREAK_EVENT)
+        else:
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError, OSError):
+        # The process has already exited
+        pass
 
 
 class WorkerSignals(QObject):
@@ -34,6 +147,9 @@ class UpscaleWorker(QRunnable):
     Inherits from QRunnable to allow for execution in a QThreadPool.
     """
 
+    # The PNG compression level of extracted frames, or None for FFmpeg's default
+    frame_compression: Optional[int] = FRAME_COMPRESSION
+
     def __init__(self, file_path: str, output_path: str, settings: Dict[str, Any]):
         """
         Initializes the worker.
@@ -50,14 +166,43 @@ class UpscaleWorker(QRunnable):
         self.signals = WorkerSignals()
         self.is_cancelled = False
         self.current_process = None
+        self._processes = set()
+        self._process_lock = threading.Lock()
+        # Called as progress_callback(done, total, latest_output) from the worker
+        # thread; when unset, progress is emitted as a percentage through
+        # signals.progress
+        self.progress_callback: Optional[Callable[..., None]] = None
+        self.frame_report: Dict[str, Any] = {"total": 0, "frames": {}}
+        # Seconds spent in each processing stage, e.g. "extract" or "upscale"
+        self.stage_timings: Dict[str, float] = {}
+        # The model variant and scale used; see `_ensure_model` and `_plan_scale`
+        self.model = settings.get("model", DEFAULT_MODEL)
+        self.scale = settings.get("scale") or model_scale(self.model)
+        self.scale_plan: Optional[ScalePlan] = None
+        # The field filter applied while extracting video frames, and the rate
+        # of the filtered frames; see `_choose_field_mode`
+        self.field_mode = FIELD_OFF
+        self.frame_rate: Optional[Fraction] = None
+        # The probed frame rate of the source video, if known
+        self.source_rate: Optional[Fraction] = None
+        # The batch's model registry, set by the engine; otherwise the worker
+        # indexes the models itself
+        self.models: Optional[ModelRegistry] = None
+        self._model_checked = False
+        # Source pixels run through the model, used to measure its speed
+        self.upscaled_pixels = 0
+        # In CPU mode, the split of the cores into processes and threads, and
+        # the process slots; the engine shares one set of slots per batch
+        self.cpu_plan: Optional[CpuPlan] = (
+            plan_cpu(settings) if is_cpu_mode(settings) else None
+        )
+        self.cpu_slots = create_slots(self.cpu_plan) if self.cpu_plan else None
 
     def run(self):
         """The main entry point for the worker thread."""
         try:
             # Determine whether to upscale an image or a video based on the file extension
-            if self.file_path.lower().endswith(
-                (".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv")
-            ):
+            if is_video(self.file_path):
                 self._upscale_video()
             else:
                 self._upscale_image()
@@ -67,7 +212,12 @@ class UpscaleWorker(QRunnable):
             self.signals.finished.emit()
 
     def _upscale_image(self):
-        """Upscales a single image using Real-ESRGAN."""
+        """
+        Upscales a single image using Real-ESRGAN.
+
+        The image is written to the partial path of the output and moved into
+        place once it is complete (see the `outputs` module).
+        """
         try:
             # Find the Real-ESRGAN executable
             realesrgan_path = self._find_realesrgan_executable()
@@ -76,135 +226,455 @@ class UpscaleWorker(QRunnable):
                     "Real-ESRGAN executable not found. Please install Real-ESRGAN."
                 )
 
-            # Find the models directory
-            models_dir = self._find_models_directory(realesrgan_path)
+            self._ensure_model(realesrgan_path)
+            size = QImageReader(self.file_path).size()
+            if size.isValid():
+                self._plan_scale(size.height())
+            plan = self.scale_plan
+            partial = prepare_output(self.output_path)
+            input_path, output_path = self.file_path, partial
+            output_height = plan.output_height if plan else None
+            encode = bool(output_height) or needs_encoder(self.settings)
+            work_dir = None
+            if encode or (plan and plan.input_height):
+                work_dir = tempfile.mkdtemp(prefix="anime_upscaler_")
+            try:
+                if plan and plan.input_height:
+                    input_path = os.path.join(work_dir, "source.png")
+                    self._convert_image(self.file_path, input_path, plan.input_height)
+                if encode:
+                    # Upscale losslessly; the resize and the encoding of the
+                    # output happen in one FFmpeg pass
+                    output_path = os.path.join(work_dir, "upscaled.png")
+
+                if plan and plan.input_height:
+                    self.upscaled_pixels = self._image_pixels(input_path)
+                elif size.isValid():
+                    self.upscaled_pixels = size.width() * size.height()
+                tiled_size = needs_tiling(input_path, self.settings)
+                if tiled_size:
+                    self.signals.log.emit(
+                        f"Processing in tiles: {os.path.basename(self.file_path)} "
+                        f"({tiled_size[0]}x{tiled_size[1]})"
+                    )
+                    with self._stage("upscale"):
+                        self._upscale_image_tiled(
+                            realesrgan_path, input_path, output_path, *tiled_size
+                        )
+                else:
+                    self._run_image_upscale(realesrgan_path, input_path, output_path)
+                if self.is_cancelled:
+                    return
+                if output_path != partial:
+                    self._convert_image(
+                        output_path, partial, output_height, encode=True
+                    )
+            finally:
+                if work_dir:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+
+            self._copy_metadata(self.file_path, partial)
+            publish_output(self.output_path)
+            self.signals.log.emit(f"✓ Completed: {os.path.basename(self.output_path)}")
+            self._report_progress(1, 1, self.output_path)
+            self._record_output()
+            self.signals.result.emit(self.output_path)
+
+        except Exception as e:
+            if self.is_cancelled:
+                self._log_cancelled()
+            else:
+                self.signals.error.emit(f"Image upscaling error: {str(e)}")
+        finally:
+            discard_output(self.output_path)
+
+    def _run_image_upscale(
+        self, realesrgan_path: str, input_path: str, output_path: str
+    ):
+        """Upscales a whole image with one Real-ESRGAN call."""
+        output_format = (
+            self.settings.get("format", "jpg")
+            if output_path == partial_path(self.output_path)
+            else "png"
+        )
+        cmd = self._image_upscale_command(
+            realesrgan_path, input_path, output_path, output_format
+        )
+        self.signals.log.emit(f"Processing: {os.path.basename(self.file_path)}")
+        self.signals.log.emit(f"Command: {' '.join(cmd)}")
+
+        # Run the Real-ESRGAN process
+        with self._stage("upscale"), self._cpu_slot():
+            process = self._run_process(cmd)
+        if self.is_cancelled:
+            return
+        if process.returncode != 0:
+            raise RuntimeError(f"Upscaling failed: {process.stderr}")
+
+    def _image_upscale_command(
+        self,
+        realesrgan_path: str,
+        input_path: str,
+        output_path: str,
+        output_format: str,
+    ) -> List[str]:
+        """
+        Builds the Real-ESRGAN command for an image, or a directory of images.
+
+        Args:
+            realesrgan_path: The path to the Real-ESRGAN executable.
+            input_path: The input image or directory.
+            output_path: The output image or directory.
+            output_format: The format of the output image(s).
+        """
+        cmd = [
+            realesrgan_path,
+            "-i",
+            input_path,
+            "-o",
+            output_path,
+            "-n",
+            self.model,
+            "-s",
+            str(self.scale),
+            "-f",
+            output_format,
+        ]
+
+        if self.cpu_plan:
+            # Real-ESRGAN's ncnn builds select the CPU with GPU id -1
+            cmd.extend(["-g", "-1"] + upscaler_thread_args(self.cpu_plan))
+        else:
+            cmd.extend(["-g", "0"])
+
+        if self.settings.get("tile_size"):
+            cmd.extend(["-t", str(self.settings["tile_size"])])
+        return cmd
+
+    def _ensure_model(self, realesrgan_path: Optional[str]):
+        """
+        Validates the requested model, or selects one for "auto", once per job.
+
+        Uses the batch's registry if the engine provided one; otherwise the
+        models directory next to the executable is indexed. Sets `self.model`
+        and `self.scale`.
+        """
+        if self._model_checked:
+            return
+        if self.models is None:
+            models_dir = realesrgan_path and self._find_models_directory(
+                realesrgan_path
+            )
             if not models_dir:
                 raise FileNotFoundError(
                     "Real-ESRGAN models directory not found. Please ensure models are installed."
                 )
+            self.models = ModelRegistry(
+                models_dir, self._get_available_models(models_dir)
+            )
+        model, note = self.models.resolve(
+            self.settings.get("model", DEFAULT_MODEL),
+            self.settings.get("model_type"),
+            self.settings.get("scale"),
+        )
+        if note:
+            self.signals.log.emit(note)
+        self.model, self.scale = model, model_scale(model)
+        self._model_checked = True
+        # Output names are chosen before the model is resolved; a target
+        # height is reached whatever the model's scale
+        suffix = output_suffix(self.settings)
+        if not self.settings.get("target_height") and suffix != f"x{self.scale}":
+            self.signals.log.emit(
+                f"Warning: '{model}' upscales x{self.scale}, but outputs are "
+                f"named {suffix}"
+            )
 
-            # Get the selected model and check if it exists
-            model_name = self.settings.get("model", "realesr-animevideov3-x4")
-            model_file = os.path.join(models_dir, f"{model_name}.param")
+    def _plan_scale(self, height: int, allow_pre_downscale: bool = True):
+        """
+        Chooses the model variant and the resizes for the target height, if one is set.
 
-            if not os.path.exists(model_file):
-                available_models = self._get_available_models(models_dir)
-                if available_models:
-                    requested_model = self.settings.get(
-                        "model", "realesr-animevideov3-x4"
-                    )
-                    if requested_model in available_models:
-                        model_name = requested_model
-                    else:
-                        model_name = available_models[0]
-                    self.signals.log.emit(
-                        f"Model '{self.settings.get('model')}' not found, using '{model_name}' instead"
-                    )
-                else:
-                    raise FileNotFoundError(
-                        f"No Real-ESRGAN models found in {models_dir}"
-                    )
+        The plan is stored in `self.scale_plan`, and `self.model` and
+        `self.scale` are updated to the chosen variant.
+        """
+        target_height = self.settings.get("target_height")
+        if not target_height or not height:
+            return
+        self._ensure_model(self._find_realesrgan_executable())
+        plan = plan_scale(
+            height,
+            target_height,
+            scale_variants(self.model, self.models.names()),
+            allow_pre_downscale and self.settings.get("pre_downscale", False),
+        )
+        self.scale_plan = plan
+        self.model, self.scale = plan.model, plan.scale
+        details = [f"{plan.model} (x{plan.scale})"]
+        if plan.input_height:
+            details.append(f"source downscaled to {plan.input_height}p first")
+        if plan.output_height:
+            details.append(f"resized to {plan.output_height}p while encoding")
+        self.signals.log.emit(
+            f"Target {target_height}p from {height}p: {', '.join(details)}"
+        )
 
-            # Construct the command to run Real-ESRGAN
-            cmd = [
-                realesrgan_path,
-                "-i",
-                self.file_path,
-                "-o",
-                self.output_path,
-                "-n",
-                model_name,
-                "-f",
-                self.settings.get("format", "jpg"),
-            ]
+    def _upscale_image_tiled(
+        self,
+        realesrgan_path: str,
+        source_path: str,
+        output_path: str,
+        width: int,
+        height: int,
+    ):
+        """
+        Upscales a very large image in overlapping tiles (see the `tiling` module).
 
-            if self.settings.get("use_gpu", True):
-                cmd.extend(["-g", "0"])
+        The tiles of each tile row are upscaled in parallel, blended into the
+        rows above, and the finished rows are streamed into a PNG file, which
+        is converted to the output format afterwards if needed.
+        """
+        tile_size = self.settings.get("tiling_tile_size", DEFAULT_TILE_SIZE)
+        workers = max(1, self.settings.get("tiling_workers", 2))
+        xs = tile_starts(width, tile_size, DEFAULT_OVERLAP)
+        ys = tile_starts(height, tile_size, DEFAULT_OVERLAP)
+        tile_width, tile_height = min(tile_size, width), min(tile_size, height)
 
-            if self.settings.get("tile_size"):
-                cmd.extend(["-t", str(self.settings["tile_size"])])
+        # Transparency is carried through the tiles as a fourth channel
+        channels = 4 if has_alpha(source_path) else 3
 
-            self.signals.log.emit(f"Processing: {os.path.basename(self.file_path)}")
-            self.signals.log.emit(f"Command: {' '.join(cmd)}")
+        temp_dir = tempfile.mkdtemp(prefix="anime_upscaler_tiles_")
+        writer = None
+        try:
+            raw_path = os.path.join(temp_dir, "source.rgb")
+            self._decode_raw(source_path, raw_path, width, height, channels)
+            if self.is_cancelled:
+                return
+            # PNG outputs are streamed in place; others are converted afterwards
+            stream_to_output = output_path.lower().endswith(".png")
+            if stream_to_output:
+                stitched_path = output_path + ".part"
+            else:
+                stitched_path = os.path.join(temp_dir, "stitched.png")
 
-            # Start the Real-ESRGAN process
-            self.current_process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+            self.signals.log.emit(
+                f"Upscaling {len(xs) * len(ys)} tiles of {tile_width}x{tile_height}..."
             )
+            stitcher = None
+            with open(raw_path, "rb") as source, ThreadPoolExecutor(workers) as pool:
+                for row, y in enumerate(ys):
+                    tiles = []
+                    for column, x in enumerate(xs):
+                        input_path = os.path.join(temp_dir, f"tile_{row}_{column}.png")
+                        save_tile(
+                            read_tile(
+                                source, width, x, y, tile_width, tile_height, channels
+                            ),
+                            tile_width,
+                            tile_height,
+                            input_path,
+                            channels,
+                        )
+                        tiles.append((x, input_path, input_path + ".out.png"))
+                    outcomes = list(
+                        pool.map(
+                            lambda tile: self._upscale_frame(
+                                realesrgan_path, tile[1], tile[2]
+                            ),
+                            tiles,
+                        )
+                    )
+                    if self.is_cancelled:
+                        return
 
-            stdout, stderr = self.current_process.communicate()
-            process = self.current_process
+                    images = []
+                    for (x, tile_input, tile_output), outcome in zip(tiles, outcomes):
+                        if outcome == FRAME_LOST:
+                            raise RuntimeError(f"Tile at {x},{y} could not be upscaled")
+                        if outcome != FRAME_OK:
+                            self.signals.log.emit(f"Warning: Tile at {x},{y} {outcome}")
+                        image = QImage(tile_output)
+                        if image.isNull():
+                            raise RuntimeError(
+                                f"Could not read upscaled tile {tile_output}"
+                            )
+                        images.append((x, image))
+                        os.remove(tile_input)
+                        os.remove(tile_output)
 
-            if process.returncode != 0:
-                raise RuntimeError(f"Upscaling failed: {stderr}")
+                    if stitcher is None:
+                        scale = max(1, round(images[0][1].width() / tile_width))
+                        writer = PngStreamWriter(
+                            stitched_path,
+                            width * scale,
+                            height * scale,
+                            alpha=channels == 4,
+                        )
+                        stitcher = TileStitcher(writer, width * scale, height * scale)
+                    tile_out = (tile_width * scale, tile_height * scale)
+                    scaled = []
+                    for x, image in images:
+                        if (image.width(), image.height()) != tile_out:
+                            # A fallback produced a tile of a different scale
+                            image = image.scaled(
+                                *tile_out,
+                                Qt.AspectRatioMode.IgnoreAspectRatio,
+                                Qt.TransformationMode.SmoothTransformation,
+                            )
+                        scaled.append((x * scale, image))
+                    next_top = ys[row + 1] if row + 1 < len(ys) else height
+                    stitcher.add_row(y * scale, scaled, next_top * scale)
+                    self._report_progress(row + 1, len(ys))
+            writer.close()
+            writer = None
 
-            self.signals.log.emit(f"✓ Completed: {os.path.basename(self.output_path)}")
-            self.signals.result.emit(self.output_path)
+            if stream_to_output:
+                os.replace(stitched_path, output_path)
+            else:
+                self._convert_image(
+                    stitched_path,
+                    output_path,
+                    encode=output_path == partial_path(self.output_path),
+                )
+        finally:
+            if writer is not None:
+                writer.abort()
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
-        except Exception as e:
-            self.signals.error.emit(f"Image upscaling error: {str(e)}")
+    def _decode_raw(
+        self, image_path: str, raw_path: str, width: int, height: int, channels: int = 3
+    ):
+        """Decodes an image into raw RGB24 (RGBA with 4 channels) pixels with FFmpeg."""
+        cmd = [
+            self._get_ffmpeg_path(),
+            "-y",
+            "-i",
+            image_path,
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgba" if channels == 4 else "rgb24",
+            raw_path,
+        ]
+        process = self._run_process(cmd)
+        if self.is_cancelled:
+            return
+        expected_size = width * height * channels
+        if process.returncode != 0 or os.path.getsize(raw_path) != expected_size:
+            raise RuntimeError(f"Could not decode {image_path}: {process.stderr}")
+
+    def _convert_image(
+        self,
+        input_path: str,
+        output_path: str,
+        height: Optional[int] = None,
+        encode: bool = False,
+    ):
+        """
+        Converts an image into the format of the output path with FFmpeg.
+
+        If `height` is given, the image is resized to it while encoding. With
+        `encode`, the output is a final output and gets the configured encoder
+        settings.
+        """
+        cmd = encode_command(
+            input_path,
+            output_path,
+            self.settings if encode else {},
+            height,
+            self._get_ffmpeg_path(),
+        )
+        process = self._run_process(cmd)
+        if process.returncode != 0 and not self.is_cancelled:
+            raise RuntimeError(f"Could not write {output_path}: {process.stderr}")
+
+    def _copy_metadata(self, source_path: str, output_path: str):
+        """Copies a source's EXIF data and ICC profile to its output, if enabled."""
+        if not self.settings.get("copy_metadata", True):
+            return
+        try:
+            copy_metadata(source_path, output_path)
+        except OSError as e:
+            self.signals.log.emit(f"Warning: Could not copy metadata: {str(e)}")
+
+    def _record_output(self):
+        """Writes the sidecar record used by the incremental mode to skip this file next time."""
+        try:
+            write_record(self.file_path, self.output_path, self.settings)
+        except OSError as e:
+            self.signals.log.emit(f"Warning: Could not write output record: {str(e)}")
+
+    def _image_pixels(self, image_path: str) -> int:
+        """Returns the pixel count of an image from its header, or 0."""
+        size = QImageReader(image_path).size()
+        return size.width() * size.height() if size.isValid() else 0
 
     def _find_models_directory(self, realesrgan_path: str) -> Optional[str]:
         """Finds the Real-ESRGAN models directory."""
-        exe_dir = os.path.dirname(realesrgan_path)
-        possible_dirs = [
-            os.path.join(exe_dir, "models"),
-            os.path.join(exe_dir, "..", "models"),
-            os.path.join(os.getcwd(), "models"),
-            os.path.join(os.getcwd(), "bin", "models"),
-        ]
-        for models_dir in possible_dirs:
-            if os.path.exists(models_dir) and os.path.isdir(models_dir):
-                return models_dir
-        return None
+        return find_models_directory(realesrgan_path)
 
     def _get_available_models(self, models_dir: str) -> List[str]:
         """Gets a list of available Real-ESRGAN models."""
-        if not os.path.exists(models_dir):
-            return []
-        models = []
-        for file in os.listdir(models_dir):
-            if file.endswith(".param"):
-                model_name = file.replace(".param", "")
-                bin_file = os.path.join(models_dir, f"{model_name}.bin")
-                if os.path.exists(bin_file):
-                    models.append(model_name)
-        return models
+        return scan_models(models_dir)
 
     def _upscale_video(self):
         """Upscales a video by extracting frames, upscaling them, and reassembling the video."""
         try:
             # Create temporary directories for frames and upscaled frames
-            temp_dir = tempfile.mkdtemp(prefix="anime_upscaler_")
+            temp_dir = self._create_work_dir()
             frames_dir = os.path.join(temp_dir, "frames")
             upscaled_dir = os.path.join(temp_dir, "upscaled")
             os.makedirs(frames_dir, exist_ok=True)
             os.makedirs(upscaled_dir, exist_ok=True)
 
             try:
+                info = {}
+                if (
+                    self.settings.get("target_height")
+                    or self.settings.get("field_mode")
+                    or not self.settings.get("fps")
+                ):
+                    info = self._probe_video()
+                # Plan the target resolution before extracting, so over-sized
+                # sources are downscaled while they are decoded
+                if self.settings.get("target_height"):
+                    self._plan_scale(info.get("height", 0))
+                self._choose_rate(info)
+
                 # Extract frames from the video
                 self.signals.log.emit("Extracting video frames...")
-                self._extract_frames(self.file_path, frames_dir)
+                with self._stage("extract"):
+                    self._extract_frames(self.file_path, frames_dir)
                 if self.is_cancelled:
+                    self._log_cancelled()
                     return
+                if self.settings.get("target_height") and self.scale_plan is None:
+                    # The video could not be probed; plan from the extracted frames
+                    first_frame = os.path.join(frames_dir, "frame_000001.png")
+                    self._plan_scale(
+                        QImageReader(first_frame).size().height(),
+                        allow_pre_downscale=False,
+                    )
 
                 # Upscale the extracted frames
                 self.signals.log.emit("Upscaling frames...")
-                self._upscale_frames(frames_dir, upscaled_dir)
+                with self._stage("upscale"):
+                    self._upscale_frames(frames_dir, upscaled_dir)
                 if self.is_cancelled:
+                    self._log_cancelled()
                     return
 
                 # Reassemble the video from the upscaled frames
                 self.signals.log.emit("Reassembling video...")
-                self._reassemble_video(upscaled_dir, self.output_path, self.file_path)
+                with self._stage("reassemble"):
+                    self._reassemble_video(
+                        upscaled_dir, prepare_output(self.output_path), self.file_path
+                    )
+                publish_output(self.output_path)
 
                 self.signals.log.emit(
                     f"✓ Video upscaling completed: {os.path.basename(self.output_path)}"
                 )
+                self._record_output()
                 self.signals.result.emit(self.output_path)
             finally:
                 # Clean up the temporary directories
@@ -215,32 +685,198 @@ class UpscaleWorker(QRunnable):
                         f"Warning: Could not clean up temporary files: {str(e)}"
                     )
         except Exception as e:
-            self.signals.error.emit(f"Video upscaling error: {str(e)}")
+            if self.is_cancelled:
+                self._log_cancelled()
+            else:
+                self.signals.error.emit(f"Video upscaling error: {str(e)}")
+        finally:
+            discard_output(self.output_path)
+
+    def _probe_video(self) -> Dict[str, Any]:
+        """Probes the video, returning an empty dictionary if that fails."""
+        try:
+            return probe_video(self.file_path)
+        except Exception as e:
+            self.signals.log.emit(f"Warning: Could not probe the video: {str(e)}")
+            return {}
+
+    def _choose_rate(self, info: Dict[str, Any]):
+        """
+        Chooses the field filter and the frame rate of the extraction.
+
+        The source's rate is taken from the probed `info`; see `_output_rate`.
+        """
+        if info.get("fps"):
+            self.source_rate = Fraction(info["fps"]).limit_denominator(1001)
+        self._choose_field_mode(info)
 
-    def _extract_frames(self, video_path: str, frames_dir: str):
-        """Extracts frames from a video using FFmpeg."""
+    def _output_frames(self, info: Dict[str, Any]) -> int:
+        """Returns the number of frames the probed video is extracted as."""
+        if not info.get("duration"):
+            return info.get("frames", 0)
+        return max(1, round(info["duration"] * Fraction(self._output_rate())))
+
+    def _choose_field_mode(self, info: Dict[str, Any]):
+        """
+        Chooses the field filter of the extraction from the `field_mode` setting.
+
+        "auto" runs the interlace detection first. The chosen mode is stored in
+        `self.field_mode`, and the rate of the filtered frames, which the video
+        is reassembled at, in `self.frame_rate`.
+        """
+        mode = self.settings.get("field_mode", FIELD_OFF)
+        if mode == FIELD_AUTO:
+            self.signals.log.emit("Detecting interlacing...")
+            with self._stage("detect"):
+                mode = detect_field_mode(
+                    self.file_path,
+                    info.get("duration", 0.0),
+                    self._get_ffmpeg_path(),
+                    self._run_process,
+                )
+            self.signals.log.emit(
+                {
+                    FIELD_IVTC: "Telecined source detected; applying inverse telecine",
+                    FIELD_DEINTERLACE: "Interlaced source detected; deinterlacing",
+                }.get(mode, "Progressive source detected")
+            )
+        if not field_filter(mode):
+            return
+        self.field_mode = mode
+        self.frame_rate = filtered_rate(mode, info.get("fps", 0.0))
+
+    def _create_work_dir(self) -> str:
+        """Creates the directory that holds a video's extracted and upscaled frames."""
+        return tempfile.mkdtemp(prefix="anime_upscaler_")
+
+    def _extract_frames(
+        self,
+        video_path: str,
+        frames_dir: str,
+        start: Optional[float] = None,
+        duration: Optional[float] = None,
+    ):
+        """
+        Extracts frames from a video using FFmpeg.
+
+        When `start` is given, FFmpeg seeks before opening the input (fast seek),
+        and `duration` limits extraction to a short range of the video. Sources
+        that the scale plan downscales are downscaled while being decoded, and
+        the field filter of `self.field_mode` (see the `interlace` module) is
+        applied first; without one, frames are sampled at the output frame
+        rate. Videos are decoded as configured by the `hwaccel` and
+        `decode_threads` settings (see the `decoding` module); if hardware
+        decoding fails, the video is decoded again in software.
+        """
         ffmpeg_path = self._get_ffmpeg_path()
-        cmd = [
-            ffmpeg_path,
-            "-i",
-            video_path,
-            "-q:v",
-            "1",
-            "-pix_fmt",
-            "rgb24",
-            os.path.join(frames_dir, "frame_%06d.png"),
-        ]
-        process = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-        )
+        hwaccel = self._hwaccel(ffmpeg_path) if is_video(video_path) else ""
+        input_args = []
+        if start:
+            input_args.extend(["-ss", f"{start:.3f}"])
+        if duration:
+            input_args.extend(["-t", f"{duration:.3f}"])
+        input_args += ["-i", video_path]
+        output_args = []
+        filters = []
+        if field_filter(self.field_mode):
+            # Drop or rebuild frames before anything else touches the fields;
+            # every remaining frame is written as it comes out of the filter
+            filters.append(field_filter(self.field_mode))
+            output_args.extend(["-fps_mode", "passthrough"])
+        else:
+            # Sample the video at the rate it is reassembled at, so the output
+            # keeps the source's duration and stays in sync with its audio,
+            # also for sources with a variable frame rate
+            filters.append(f"fps={self._output_rate()}")
+        if self.scale_plan and self.scale_plan.input_height:
+            filters.append(f"scale=-2:{self.scale_plan.input_height}:flags=area")
+        if filters:
+            output_args.extend(["-vf", ",".join(filters)])
+        output_args += ["-sws_flags", CONVERT_FLAGS, "-q:v", "1", "-pix_fmt", "rgb24"]
+        output_args += self._frame_png_args()
+        output_args.append(os.path.join(frames_dir, "frame_%06d.png"))
+        with self._cpu_slot():
+            cmd = [ffmpeg_path] + self._decode_args(hwaccel) + input_args
+            process = self._run_process(cmd + output_args)
+            if process.returncode != 0 and hwaccel and not self.is_cancelled:
+                # The hardware decoder may not support this source
+                self.signals.log.emit(
+                    f"Warning: Hardware decoding ({hwaccel}) failed, "
+                    "decoding in software"
+                )
+                for name in os.listdir(frames_dir):
+                    os.remove(os.path.join(frames_dir, name))
+                cmd = [ffmpeg_path] + self._decode_args("") + input_args
+                process = self._run_process(cmd + output_args)
         if process.returncode != 0:
             raise RuntimeError(f"Frame extraction failed: {process.stderr}")
 
+    def _hwaccel(self, ffmpeg_path: str) -> str:
+        """
+        Returns the hardware decoder selected by the `hwaccel` setting, or "".
+
+        "auto" uses the decoder probed for this machine (see the `decoding`
+        module), which is probed the first time a video is extracted.
+        """
+        hwaccel = self.settings.get("hwaccel", HWACCEL_AUTO)
+        if hwaccel == HWACCEL_AUTO:
+            return best_hwaccel(ffmpeg_path, default_cache_path())
+        return "" if hwaccel in ("", HWACCEL_NONE) else hwaccel
+
+    def _decode_args(self, hwaccel: str) -> List[str]:
+        """Returns the FFmpeg input options of the decoder."""
+        # In CPU mode, FFmpeg shares the cores with the upscaler processes
+        if self.cpu_plan:
+            threads = self.cpu_plan.threads
+        else:
+            threads = self.settings.get("decode_threads", 0)
+        return decode_args(hwaccel, threads)
+
+    def _extract_sample_frames(
+        self, video_path: str, frames_dir: str, count: int, duration: float
+    ):
+        """
+        Extracts `count` evenly spaced frames from a video.
+
+        Each frame is grabbed with a separate fast-seeking FFmpeg call, so only
+        the few GOPs around the sample points are decoded.
+        """
+        ffmpeg_path = self._get_ffmpeg_path()
+        for i in range(count):
+            if self.is_cancelled:
+                break
+            position = duration * (i + 0.5) / count
+            cmd = [
+                ffmpeg_path,
+                "-ss",
+                f"{position:.3f}",
+                "-i",
+                video_path,
+                "-frames:v",
+                "1",
+                "-pix_fmt",
+                "rgb24",
+            ]
+            cmd += self._frame_png_args()
+            cmd.append(os.path.join(frames_dir, f"frame_{i + 1:06d}.png"))
+            process = self._run_process(cmd)
+            if process.returncode != 0:
+                raise RuntimeError(f"Frame extraction failed: {process.stderr}")
+
+    def _frame_png_args(self) -> List[str]:
+        """Returns the FFmpeg options of the PNG encoding of extracted frames."""
+        if self.frame_compression is None:
+            return []
+        return ["-compression_level", str(self.frame_compression)]
+
     def _upscale_frames(self, frames_dir: str, upscaled_dir: str):
-        """Upscales a directory of frames using Real-ESRGAN."""
+        """
+        Upscales a directory of frames using Real-ESRGAN.
+
+        Every frame ends up in `upscaled_dir`, even if the upscaler keeps failing
+        on it (see `_upscale_frame`), so the reassembled video never has gaps. The
+        outcome of each troubled frame is recorded in `self.frame_report`.
+        """
         frame_files = sorted([f for f in os.listdir(frames_dir) if f.endswith(".png")])
         if not frame_files:
             raise RuntimeError("No frames were extracted from the video")
@@ -249,63 +885,205 @@ class UpscaleWorker(QRunnable):
         realesrgan_path = self._find_realesrgan_executable()
         if not realesrgan_path:
             raise FileNotFoundError("Real-ESRGAN executable not found")
+        self._ensure_model(realesrgan_path)
+        self.upscaled_pixels = total_frames * self._image_pixels(
+            os.path.join(frames_dir, frame_files[0])
+        )
+
+        self.frame_report = {"total": total_frames, "frames": {}}
 
-        for i, frame_file in enumerate(frame_files):
+        def upscale(frame_file: str) -> str:
             if self.is_cancelled:
-                break
-            input_path = os.path.join(frames_dir, frame_file)
-            output_path = os.path.join(upscaled_dir, frame_file)
-            cmd = [
+                return FRAME_LOST
+            return self._upscale_frame(
                 realesrgan_path,
-                "-i",
-                input_path,
-                "-o",
-                output_path,
-                "-n",
-                self.settings.get("model", "realesr-animevideov3-x4"),
-            ]
-            if self.settings.get("use_gpu", True):
-                cmd.extend(["-g", "0"])
-            if self.settings.get("tile_size"):
-                cmd.extend(["-t", str(self.settings["tile_size"])])
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+                os.path.join(frames_dir, frame_file),
+                os.path.join(upscaled_dir, frame_file),
             )
-            if process.returncode != 0:
-                self.signals.log.emit(f"Warning: Frame {frame_file} failed to upscale")
-            progress = int((i + 1) / total_frames * 100)
-            self.signals.progress.emit(progress)
 
-    def _reassemble_video(
-        self, upscaled_dir: str, output_path: str, original_video: str
+        # In CPU mode, every process slot upscales a frame at the same time;
+        # the outcomes are still handled in frame order
+        parallel = self.cpu_plan.processes if self.cpu_plan else 1
+        executor = ThreadPoolExecutor(max_workers=parallel)
+        try:
+            self._handle_frame_outcomes(
+                frame_files, upscaled_dir, executor.map(upscale, frame_files)
+            )
+        finally:
+            executor.shutdown(wait=True)
+
+        if self.frame_report["frames"]:
+            self.signals.log.emit(self._format_frame_report())
+
+    def _handle_frame_outcomes(
+        self, frame_files: List[str], upscaled_dir: str, outcomes: Iterator[str]
     ):
-        """Reassembles a video from a directory of frames using FFmpeg."""
-        ffmpeg_path = self._get_ffmpeg_path()
-        temp_audio = os.path.join(os.path.dirname(output_path), "temp_audio.aac")
-        audio_cmd = [
-            ffmpeg_path,
+        """
+        Records the outcomes of upscaled frames, in frame order.
+
+        Lost frames are replaced with a copy of the previous frame, or of the
+        next one for lost frames at the start of the video.
+
+        Raises:
+            RuntimeError: If no frame could be upscaled.
+        """
+
+        def record(frame_file: str, outcome: str):
+            if outcome != FRAME_OK:
+                self.frame_report["frames"][frame_file] = outcome
+                self.signals.log.emit(f"Warning: Frame {frame_file} {outcome}")
+
+        total_frames = len(frame_files)
+        previous_output = None
+        leading_lost: List[str] = []
+        for i, (frame_file, outcome) in enumerate(zip(frame_files, outcomes)):
+            if self.is_cancelled:
+                break
+            output_path = os.path.join(upscaled_dir, frame_file)
+            if outcome == FRAME_LOST and previous_output:
+                # Repeat the previous frame so the frame count is preserved
+                shutil.copyfile(previous_output, output_path)
+                outcome = FRAME_DUPLICATED
+            if outcome == FRAME_LOST:
+                leading_lost.append(frame_file)
+            else:
+                record(frame_file, outcome)
+            if os.path.isfile(output_path):
+                previous_output = output_path
+                for lost_file in leading_lost:
+                    shutil.copyfile(output_path, os.path.join(upscaled_dir, lost_file))
+                    record(lost_file, FRAME_DUPLICATED_NEXT)
+                leading_lost = []
+            self._report_progress(i + 1, total_frames, previous_output)
+
+        if leading_lost and not self.is_cancelled:
+            raise RuntimeError("No frame of the video could be upscaled")
+
+    def _upscale_frame(
+        self,
+        realesrgan_path: str,
+        input_path: str,
+        output_path: str,
+        model: Optional[str] = None,
+    ) -> str:
+        """
+        Upscales a single frame, escalating through fallbacks on failure.
+
+        The frame is first retried with exponential backoff using the configured
+        settings. If it keeps failing, it is tried with a smaller tile size, then
+        in CPU mode (unless it already ran there), and finally replaced with a
+        plain resized copy.
+
+        Returns:
+            One of the `FRAME_*` outcome constants.
+        """
+        model = model or self.model
+        tile_size = self.settings.get("tile_size")
+        # Real-ESRGAN's ncnn builds select the CPU with GPU id -1
+        gpu_id = "-1" if self.cpu_plan else "0"
+        retries = self.settings.get("frame_retries", 2)
+        backoff = self.settings.get("retry_backoff", 0.5)
+
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+            if self._run_frame_upscale(
+                realesrgan_path, input_path, output_path, model, tile_size, gpu_id
+            ):
+                return FRAME_OK if attempt == 0 else FRAME_RETRIED
+            if self.is_cancelled:
+                return FRAME_LOST
+
+        smaller_tile = max(32, (tile_size or 256) // 2)
+        if self._run_frame_upscale(
+            realesrgan_path, input_path, output_path, model, smaller_tile, gpu_id
+        ):
+            return FRAME_SMALLER_TILE
+        if not self.cpu_plan and self._run_frame_upscale(
+            realesrgan_path, input_path, output_path, model, smaller_tile, "-1"
+        ):
+            return FRAME_CPU
+        if self._resize_frame(input_path, output_path):
+            return FRAME_RESIZED
+        return FRAME_LOST
+
+    def _run_frame_upscale(
+        self,
+        realesrgan_path: str,
+        input_path: str,
+        output_path: str,
+        model: str,
+        tile_size: Optional[int],
+        gpu_id: Optional[str],
+    ) -> bool:
+        """Runs Real-ESRGAN on one frame and returns True if it produced output."""
+        cmd = [realesrgan_path, "-i", input_path, "-o", output_path, "-n", model]
+        cmd.extend(["-s", str(self.scale)])
+        if gpu_id is not None:
+            cmd.extend(["-g", gpu_id])
+        if gpu_id == "-1" and self.cpu_plan:
+            cmd.extend(upscaler_thread_args(self.cpu_plan))
+        if tile_size:
+            cmd.extend(["-t", str(tile_size)])
+        with self._cpu_slot():
+            process = self._run_process(cmd)
+        return process.returncode == 0 and os.path.isfile(output_path)
+
+    def _resize_frame(self, input_path: str, output_path: str) -> bool:
+        """Writes a plain resized copy of a frame as a last-resort substitute."""
+        scale = self.scale
+        cmd = [
+            self._get_ffmpeg_path(),
+            "-y",
             "-i",
-            original_video,
-            "-vn",
-            "-acodec",
-            "copy",
-            temp_audio,
+            input_path,
+            "-vf",
+            f"scale=iw*{scale}:ih*{scale}:flags=lanczos",
+            output_path,
         ]
-        subprocess.run(
-            audio_cmd,
-            capture_output=True,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+        process = self._run_process(cmd)
+        return process.returncode == 0 and os.path.isfile(output_path)
+
+    def _format_frame_report(self) -> str:
+        """Summarizes the frames that needed retries or fallbacks."""
+        outcomes: Dict[str, int] = {}
+        for outcome in self.frame_report["frames"].values():
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        details = ", ".join(f"{count} {outcome}" for outcome, count in outcomes.items())
+        return (
+            f"Frame failure summary: {len(self.frame_report['frames'])} of "
+            f"{self.frame_report['total']} frames needed recovery ({details})"
         )
+
+    def _reassemble_video(
+        self, upscaled_dir: str, output_path: str, original_video: str
+    ):
+        """
+        Reassembles a video from a directory of frames using FFmpeg.
+
+        The frames are encoded at the rate they were extracted at, and the
+        audio streams of the original video, if it has any, are added.
+        """
+        ffmpeg_path = self._get_ffmpeg_path()
         reassemble_cmd = [
             ffmpeg_path,
             "-framerate",
-            str(self.settings.get("fps", 24)),
+            self._output_rate(),
             "-i",
             os.path.join(upscaled_dir, "frame_%06d.png"),
             "-i",
-            temp_audio,
+            original_video,
+            "-map",
+            "0:v:0",
+            "-map",
+            "1:a?",
+        ]
+        if self.scale_plan and self.scale_plan.output_height:
+            # Resize to the target height as part of the encode
+            reassemble_cmd.extend(
+                ["-vf", f"scale=-2:{self.scale_plan.output_height}:flags=lanczos"]
+            )
+        reassemble_cmd += ffmpeg_thread_args(self.cpu_plan) + [
             "-c:v",
             "libx264",
             "-c:a",
@@ -316,59 +1094,248 @@ class UpscaleWorker(QRunnable):
             str(self.settings.get("quality", 18)),
             output_path,
         ]
-        process = subprocess.run(
-            reassemble_cmd,
-            capture_output=True,
-            text=True,
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
-        )
-        try:
-            os.remove(temp_audio)
-        except:
-            pass
+        with self._cpu_slot():
+            process = self._run_process(reassemble_cmd)
         if process.returncode != 0:
             raise RuntimeError(f"Video reassembly failed: {process.stderr}")
 
+    def _output_rate(self) -> str:
+        """
+        Returns the frame rate of the extracted frames and the output video.
+
+        That is the rate restored by the field filter, if one is applied, or
+        the `fps` setting. Without an `fps` setting (0), the source keeps its
+        own rate, so its frames are extracted as they are.
+        """
+        rate = self.frame_rate or self.settings.get("fps") or self.source_rate
+        return str(rate or DEFAULT_FPS)
+
     def _find_realesrgan_executable(self) -> Optional[str]:
         """Finds the Real-ESRGAN executable."""
-        possible_names = [
-            "realesrgan-ncnn-vulkan",
-            "realesrgan-ncnn-vulkan.exe",
-            "realsr-esrgan",
-            "realsr-esrgan.exe",
-        ]
-        search_paths = [".", "bin", os.path.join(os.getcwd(), "bin")]
-        for path in search_paths:
-            for name in possible_names:
-                full_path = os.path.join(path, name)
-                if os.path.isfile(full_path):
-                    return full_path
-        for name in possible_names:
-            if shutil.which(name):
-                return shutil.which(name)
-        return None
+        return find_realesrgan_executable()
 
     def _get_ffmpeg_path(self) -> str:
         """Gets the path to the FFmpeg executable."""
-        bin_ffmpeg = os.path.join("bin", "ffmpeg.exe" if os.name == "nt" else "ffmpeg")
-        if os.path.isfile(bin_ffmpeg):
-            return bin_ffmpeg
-        ffmpeg_path = shutil.which("ffmpeg")
-        if ffmpeg_path:
-            return ffmpeg_path
-        raise FileNotFoundError(
-            "FFmpeg not found. Please ensure ffmpeg is in the bin folder or in PATH."
+        return get_ffmpeg_path()
+
+    @contextmanager
+    def _stage(self, name: str):
+        """Adds the time spent in the enclosed block to the timing of a stage."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.stage_timings[name] = (
+                self.stage_timings.get(name, 0.0) + time.time() - start
+            )
+
+    @contextmanager
+    def _cpu_slot(self):
+        """
+        Holds one of the CPU mode's process slots while the enclosed block runs.
+
+        Does nothing in GPU mode. Waiting for a slot stops when the worker is
+        cancelled, since cancelled workers start no more processes.
+        """
+        slots = self.cpu_slots
+        acquired = False
+        if slots is not None:
+            while not acquired and not self.is_cancelled:
+                acquired = slots.acquire(timeout=0.2)
+        try:
+            yield
+        finally:
+            if acquired:
+                slots.release()
+
+    def _report_progress(self, done: int, total: int, latest: Optional[str] = None):
+        """Reports progress without queueing a GUI event when a callback is set."""
+        if self.progress_callback:
+            self.progress_callback(done, total, latest)
+        else:
+            self.signals.progress.emit(int(done / total * 100))
+
+    def _log_cancelled(self):
+        """Logs that the job stopped because it was cancelled."""
+        self.signals.log.emit(f"Cancelled: {os.path.basename(self.file_path)}")
+
+    def _run_process(self, cmd: List[str]) -> subprocess.CompletedProcess:
+        """
+        Runs a child process and waits for it, keeping it cancellable.
+
+        The process is started in its own process group and tracked for the
+        lifetime of the call, so `cancel` can stop it (and anything it spawned)
+        from another thread at any time.
+        """
+        if self.is_cancelled:
+            return subprocess.CompletedProcess(cmd, -1, "", "Cancelled")
+        if os.name == "nt":
+            group_kwargs = {
+                "creationflags": subprocess.CREATE_NO_WINDOW
+                | subprocess.CREATE_NEW_PROCESS_GROUP
+            }
+        else:
+            group_kwargs = {"start_new_session": True}
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            **group_kwargs,
         )
+        with self._process_lock:
+            self._processes.add(process)
+            self.current_process = process
+        try:
+            # cancel() may have run between the check above and registration
+            if self.is_cancelled:
+                _signal_process_tree(process, force=True)
+            stdout, stderr = process.communicate()
+        finally:
+            with self._process_lock:
+                self._processes.discard(process)
+                if self.current_process is process:
+                    self.current_process = None
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
 
     def cancel(self):
-        """Cancels the current upscaling process."""
+        """
+        Cancels the current upscaling process without blocking the caller.
+
+        All tracked child processes are asked to terminate right away; any that
+        are still alive after `CANCEL_GRACE_PERIOD` seconds are killed.
+        """
         self.is_cancelled = True
-        if self.current_process:
-            try:
-                self.current_process.terminate()
-                self.current_process.wait(timeout=5)
-            except:
-                try:
-                    self.current_process.kill()
-                except:
-                    pass
+        with self._process_lock:
+            processes = set(self._processes)
+            if self.current_process:
+                processes.add(self.current_process)
+        for process in processes:
+            _signal_process_tree(process, force=False)
+        if processes:
+            timer = threading.Timer(
+                CANCEL_GRACE_PERIOD, self._kill_processes, args=(processes,)
+            )
+            timer.daemon = True
+            timer.start()
+
+    def _kill_processes(self, processes):
+        """Kills the processes that did not exit after being terminated."""
+        for process in processes:
+            if process.poll() is None:
+                _signal_process_tree(process, force=True)
+
+
+class PreviewWorker(UpscaleWorker):
+    """
+    A worker that upscales a short time range or a few sample frames of a file.
+
+    It goes through the same extraction and frame upscaling path as
+    `UpscaleWorker`, so the measured per-frame time can be used to project the
+    duration of the full job. The result is a dictionary holding the
+    before/after frame pairs, the timing figures and the temporary directory,
+    which the receiver is responsible for removing.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        settings: Dict[str, Any],
+        start: float = 0.0,
+        duration: Optional[float] = None,
+        samples: int = 0,
+    ):
+        """
+        Initializes the preview worker.
+
+        Args:
+            file_path: The path to the input file.
+            settings: A dictionary of upscaling settings.
+            start: The start of the preview range in seconds.
+            duration: The length of the preview range in seconds.
+            samples: If non-zero, extract this many evenly spaced frames instead
+                of a time range.
+        """
+        super().__init__(file_path, "", settings)
+        self.start = start
+        self.duration = duration
+        self.samples = samples
+        self.temp_dir = None
+
+    def run(self):
+        """The main entry point for the worker thread."""
+        try:
+            self._preview()
+        except Exception as e:
+            self._remove_temp_dir()
+            if not self.is_cancelled:
+                self.signals.error.emit(f"Preview error: {str(e)}")
+        finally:
+            self.signals.finished.emit()
+
+    def _preview(self):
+        """Extracts, upscales and times the preview frames."""
+        self.temp_dir = tempfile.mkdtemp(prefix="anime_upscaler_preview_")
+        frames_dir = os.path.join(self.temp_dir, "frames")
+        upscaled_dir = os.path.join(self.temp_dir, "upscaled")
+        os.makedirs(frames_dir, exist_ok=True)
+        os.makedirs(upscaled_dir, exist_ok=True)
+
+        total_frames = 1
+        if is_video(self.file_path):
+            info = probe_video(self.file_path)
+            self._plan_scale(info.get("height", 0))
+            # Preview and project the frames the full job will process
+            self._choose_rate(info)
+            total_frames = self._output_frames(info)
+            if self.samples:
+                self.signals.log.emit(f"Extracting {self.samples} sample frames...")
+                self._extract_sample_frames(
+                    self.file_path, frames_dir, self.samples, info["duration"]
+                )
+            else:
+                self.signals.log.emit(
+                    f"Extracting preview range at {self.start:.1f}s..."
+                )
+                self._extract_frames(
+                    self.file_path, frames_dir, self.start, self.duration
+                )
+        else:
+            self._plan_scale(QImageReader(self.file_path).size().height())
+            # FFmpeg reads stills too, which keeps images on the frame path
+            self._extract_frames(self.file_path, frames_dir)
+
+        if self.is_cancelled:
+            self._remove_temp_dir()
+            return
+
+        frame_files = sorted(f for f in os.listdir(frames_dir) if f.endswith(".png"))
+        self.signals.log.emit(f"Upscaling {len(frame_files)} preview frames...")
+        started = time.time()
+        self._upscale_frames(frames_dir, upscaled_dir)
+        elapsed = time.time() - started
+
+        if self.is_cancelled:
+            self._remove_temp_dir()
+            return
+
+        seconds_per_frame = elapsed / len(frame_files)
+        self.signals.result.emit(
+            {
+                "temp_dir": self.temp_dir,
+                "frames": [
+                    (os.path.join(frames_dir, f), os.path.join(upscaled_dir, f))
+                    for f in frame_files
+                ],
+                "seconds_per_frame": seconds_per_frame,
+                "total_frames": total_frames,
+                "projected_seconds": seconds_per_frame * total_frames,
+            }
+        )
+
+    def _remove_temp_dir(self):
+        """Removes the preview's temporary directory, if any."""
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
@@ -8,17 +8,257 @@ Repository: https://github.com/uikraft-hub/sharpify-gui
 
 import sys
 import os
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QIcon
-from app.main_window import AnimeUpscalerGUI
+import time
+import signal
+import argparse
 
+# Startup phases are timed from here (see `run_startup_benchmark`)
+STARTED = time.perf_counter()
+# How long it may take from here until the window is shown
+STARTUP_BUDGET = 0.5
 
-def main():
+
+def parse_args(argv):
     """
-    Main application entry point.
-    Initializes the QApplication and main window.
+    Parses the command line arguments.
+
+    Unknown arguments are returned separately so they can be passed on to Qt.
     """
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(
+        description="Upscale anime images and videos with Real-ESRGAN."
+    )
+    parser.add_argument(
+        "--watch",
+        metavar="FOLDER",
+        help="run headless and upscale files as they land in FOLDER",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="run headless and accept jobs through the local HTTP API",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="port of the HTTP API on localhost (default: 8765)",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="FOLDER",
+        help="output folder for --watch mode (and the default for --serve)",
+    )
+    parser.add_argument(
+        "--action",
+        choices=["move", "tag"],
+        help="move processed inputs into subfolders, or tag them in place",
+    )
+    parser.add_argument(
+        "--settle",
+        type=int,
+        metavar="SECONDS",
+        help="seconds a file must stay unchanged before it is processed",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="only poll the folder, without file system notifications",
+    )
+    parser.add_argument(
+        "--model",
+        metavar="NAME",
+        help="with --watch or --serve, the Real-ESRGAN model to use, or 'auto' "
+        "for the fastest installed model matching --model-type and --scale",
+    )
+    parser.add_argument(
+        "--model-type",
+        choices=["anime", "general", "video"],
+        help="the model type for --model auto",
+    )
+    parser.add_argument(
+        "--scale",
+        type=int,
+        choices=[2, 3, 4],
+        help="the model scale for --model auto",
+    )
+    parser.add_argument(
+        "--cpu",
+        action="store_true",
+        help="upscale on the CPU instead of the GPU (with --watch, --serve or --worker)",
+    )
+    parser.add_argument(
+        "--cpu-processes",
+        type=int,
+        metavar="N",
+        help="with --cpu, the number of upscaler processes (default: from the cores)",
+    )
+    parser.add_argument(
+        "--cpu-threads",
+        type=int,
+        metavar="N",
+        help="with --cpu, the threads of each upscaler process (default: from the cores)",
+    )
+    parser.add_argument(
+        "--distribute",
+        metavar="SHARED_FOLDER",
+        help="with --watch or --serve, have video frames upscaled by workers "
+        "through SHARED_FOLDER",
+    )
+    parser.add_argument(
+        "--worker",
+        metavar="SHARED_FOLDER",
+        help="run as a distributed rendering worker for the jobs in SHARED_FOLDER",
+    )
+    parser.add_argument(
+        "--benchmark-encoders",
+        metavar="IMAGE",
+        help="encode IMAGE with the presets of every output format and compare "
+        "file sizes and encode times",
+    )
+    parser.add_argument(
+        "--probe-decoders",
+        action="store_true",
+        help="time FFmpeg's software and hardware video decoders, and remember "
+        "the fastest for frame extraction",
+    )
+    parser.add_argument(
+        "--benchmark-startup",
+        action="store_true",
+        help="start the GUI, print how long each startup phase took, and exit",
+    )
+    args, qt_args = parser.parse_known_args(argv[1:])
+    if args.watch and not args.output:
+        parser.error("--watch requires --output")
+    if (args.model_type or args.scale) and args.model != "auto":
+        parser.error("--model-type and --scale require --model auto")
+    if (args.cpu_processes or args.cpu_threads) and not args.cpu:
+        parser.error("--cpu-processes and --cpu-threads require --cpu")
+    return args, argv[:1] + qt_args
+
+
+def cpu_settings(args) -> dict:
+    """Returns the settings that select the CPU mode from the command line."""
+    return {
+        "use_gpu": False,
+        "cpu_processes": args.cpu_processes or 0,
+        "cpu_threads": args.cpu_threads or 0,
+    }
+
+
+def run_headless(args, qt_args) -> int:
+    """Runs the watch-folder mode and/or the HTTP API without a GUI."""
+    from PyQt6.QtCore import QCoreApplication, QSettings, QStandardPaths
+    from app.headless import run_headless as run
+    from app.ui_utils import read_advanced_settings, find_missing_dependencies
+
+    app = QCoreApplication(qt_args)
+    app.setApplicationName("sharpify-gui")
+    app.setOrganizationName("UKR-PROJECTS")
+
+    errors = find_missing_dependencies()
+    if errors:
+        print("Missing dependencies:\n" + "\n".join(f"• {e}" for e in errors))
+        return 1
+
+    settings = read_advanced_settings(QSettings("AnimeUpscaler", "Settings"))
+    if args.action:
+        settings["watch_action"] = args.action
+    if args.settle is not None:
+        settings["watch_settle"] = args.settle
+    if args.model:
+        settings["model"] = args.model
+        settings["model_type"] = args.model_type or ""
+        settings["scale"] = args.scale or 0
+    if args.cpu:
+        settings.update(cpu_settings(args))
+    if args.distribute:
+        settings["distributed_dir"] = args.distribute
+    log_file = None
+    if settings["log_to_file"]:
+        log_dir = QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.AppDataLocation
+        )
+        log_file = os.path.join(log_dir, "logs", "headless.log")
+    return run(
+        args.watch,
+        args.output,
+        settings,
+        use_notifications=not args.poll,
+        log_file=log_file,
+        api_port=args.port if args.serve else None,
+    )
+
+
+def run_worker(args) -> int:
+    """Runs a distributed rendering worker until interrupted."""
+    from app.distributed import DistributedWorker
+    from app.ui_utils import find_missing_dependencies
+
+    errors = find_missing_dependencies()
+    if errors:
+        print("Missing dependencies:\n" + "\n".join(f"• {e}" for e in errors))
+        return 1
+
+    # The device is a property of this machine, not of the job
+    settings = cpu_settings(args) if args.cpu else {"use_gpu": True}
+    worker = DistributedWorker(args.worker, settings=settings)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: worker.stop())
+    worker.run()
+    return 0
+
+
+def run_encoder_benchmark(image_path: str) -> int:
+    """Prints the size and encode time of every output format preset for an image."""
+    from app.encoding import benchmark_encoders
+
+    if not os.path.isfile(image_path):
+        print(f"Image not found: {image_path}")
+        return 1
+    print(f"{'Format':<8}{'Settings':<24}{'Size':>12}{'Encode':>10}")
+    for row in benchmark_encoders(image_path):
+        if "error" in row:
+            result = f"  failed: {row['error']}"
+        else:
+            size = f"{row['size'] / 1024:,.0f} KB"
+            result = f"{size:>12}{row['seconds'] * 1000:>8.0f} ms"
+        print(f"{row['format']:<8}{row['label']:<24}{result}")
+    return 0
+
+
+def run_decoder_probe() -> int:
+    """Probes the video decoders again, caches the fastest and prints their times."""
+    from PyQt6.QtCore import QCoreApplication
+    from app.decoding import default_cache_path, probe_decoder, save_decoder
+    from app.media import get_ffmpeg_path
+
+    # Resolve the same application data folder as the GUI
+    QCoreApplication.setApplicationName("sharpify-gui")
+    QCoreApplication.setOrganizationName("UKR-PROJECTS")
+    try:
+        ffmpeg_path = get_ffmpeg_path()
+    except FileNotFoundError as e:
+        print(str(e))
+        return 1
+    result = probe_decoder(ffmpeg_path)
+    if not result["timings"]:
+        print("FFmpeg could not encode or decode the sample clip")
+        return 1
+    save_decoder(default_cache_path(), ffmpeg_path, result)
+    print(f"{'Decoder':<12}{'Decode':>10}")
+    for name, seconds in result["timings"].items():
+        timing = f"{seconds * 1000:>7.0f} ms" if seconds is not None else "    failed"
+        print(f"{name:<12}{timing}")
+    print(f"Frames will be decoded with: {result['hwaccel'] or 'software'}")
+    return 0
+
+
+def create_application(qt_args):
+    """Creates the QApplication of the GUI."""
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtGui import QIcon
+
+    app = QApplication(qt_args)
     app.setApplicationName("sharpify-gui")
     app.setApplicationVersion("1.0.0")
     app.setOrganizationName("UKR-PROJECTS")
@@ -26,7 +266,86 @@ def main():
     icon_path = "favicon.ico"
     if os.path.exists(icon_path):
         app.setWindowIcon(QIcon(icon_path))
+    return app
+
+
+def run_startup_benchmark(qt_args) -> int:
+    """
+    Starts the GUI as usual and prints when each startup phase finished.
+
+    The window is closed once the background dependency check is done. An
+    interrupted batch is not offered for resuming.
+
+    Returns:
+        1 if the window was not shown within `STARTUP_BUDGET`, otherwise 0.
+    """
+    marks = [("Command line parsed", time.perf_counter())]
+    import PyQt6.QtWidgets  # noqa: F401
+
+    marks.append(("Qt imported", time.perf_counter()))
+    from app.main_window import AnimeUpscalerGUI
+
+    marks.append(("Application modules imported", time.perf_counter()))
+    app = create_application(qt_args)
+    # The modal resume prompt would wait for the user inside the measurement,
+    # and answering it would change the batch manifest
+    window = AnimeUpscalerGUI(offer_resume=False)
+    marks.append(("Window created", time.perf_counter()))
+
+    checked = []
+
+    def on_checked(errors):
+        checked.append(time.perf_counter())
+        app.quit()
+
+    window.dependencies.finished.connect(on_checked)
+    window.show()
+    app.processEvents()
+    shown = time.perf_counter()
+    marks.append(("Window shown", shown))
+    if not checked:
+        app.exec()
+    window.close()
+    # The check runs in the background, so it may finish before the window is shown
+    marks.append(("Dependencies checked", checked[0]))
+    marks.sort(key=lambda mark: mark[1])
+
+    print(f"{'Phase':<32}{'At':>10}{'Took':>10}")
+    previous = STARTED
+    for phase, at in marks:
+        print(
+            f"{phase:<32}{(at - STARTED) * 1000:>7.0f} ms{(at - previous) * 1000:>7.0f} ms"
+        )
+        previous = at
+    within = shown - STARTED <= STARTUP_BUDGET
+    print(
+        f"Window shown {(shown - STARTED) * 1000:.0f} ms after start "
+        f"({'within' if within else 'over'} the {STARTUP_BUDGET * 1000:.0f} ms budget)"
+    )
+    return 0 if within else 1
+
+
+def main():
+    """
+    Main application entry point.
+    Initializes the QApplication and main window, or runs headless with --watch
+    or --serve, or as a distributed rendering worker with --worker.
+    """
+    args, qt_args = parse_args(sys.argv)
+    if args.benchmark_encoders:
+        sys.exit(run_encoder_benchmark(args.benchmark_encoders))
+    if args.probe_decoders:
+        sys.exit(run_decoder_probe())
+    if args.benchmark_startup:
+        sys.exit(run_startup_benchmark(qt_args))
+    if args.worker:
+        sys.exit(run_worker(args))
+    if args.watch or args.serve:
+        sys.exit(run_headless(args, qt_args))
+
+    from app.main_window import AnimeUpscalerGUI
 
+    app = create_application(qt_args)
     window = AnimeUpscalerGUI()
     window.show()
 
@@ -0,0 +1,189 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import threading
+import time
+import http.client
+from unittest.mock import patch
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from PyQt6.QtCore import QCoreApplication, QRunnable
+from app.api_server import JobApiServer
+from app.engine import UpscaleEngine
+from app.workers import WorkerSignals
+
+
+class FakeWorker(QRunnable):
+    """A worker that runs until it is cancelled."""
+
+    def __init__(self, file_path, output_path, settings):
+        """Initializes the fake worker."""
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.is_cancelled = False
+        self.progress_callback = None
+        self.stage_timings = {"upscale": 0.0}
+
+    def run(self):
+        """Waits until the worker is cancelled."""
+        while not self.is_cancelled:
+            time.sleep(0.01)
+        self.signals.finished.emit()
+
+    def cancel(self):
+        """Cancels the worker."""
+        self.is_cancelled = True
+
+
+class TestJobApiServer(unittest.TestCase):
+    """Tests for the JobApiServer class."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application object needed for queued signals."""
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Start a server on a free localhost port with fake workers."""
+        patcher = patch("app.engine.UpscaleWorker", FakeWorker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.temp_dir.name, "a.png")
+        with open(self.input_path, "wb") as f:
+            f.write(b"image")
+        self.engine = UpscaleEngine()
+        self.server = JobApiServer(
+            self.engine,
+            lambda: {"model": "realesr-animevideov3-x4", "format": "png"},
+            lambda: self.temp_dir.name,
+            port=0,
+        )
+        self.server.start()
+
+    def tearDown(self):
+        """Stop the server and the workers."""
+        self.engine.cancel_all()
+        self.engine.thread_pool.waitForDone(2000)
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def run_in_thread(self, fn):
+        """Runs a blocking client call while processing Qt events."""
+        result = {}
+
+        def target():
+            try:
+                result["value"] = fn()
+            except Exception as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        deadline = time.time() + 5
+        while thread.is_alive() and time.time() < deadline:
+            self.app.processEvents()
+            time.sleep(0.005)
+        thread.join(1)
+        if "error" in result:
+            raise result["error"]
+        return result["value"]
+
+    def request(self, method, path, body=None, headers=None):
+        """Sends a request and returns the status and the decoded JSON body."""
+
+        def send():
+            connection = http.client.HTTPConnection("127.0.0.1", self.server.port)
+            request_headers = {"Content-Type": "application/json"}
+            request_headers.update(headers or {})
+            data = json.dumps(body).encode("utf-8") if body is not None else None
+            connection.request(method, path, data, request_headers)
+            response = connection.getresponse()
+            status, payload = response.status, json.loads(response.read())
+            connection.close()
+            return status, payload
+
+        return self.run_in_thread(send)
+
+    def test_submit_status_and_cancel(self):
+        """Test the life cycle of a job submitted over HTTP."""
+        status, data = self.request(
+            "POST", "/jobs", {"files": [self.input_path], "priority": 2}
+        )
+        self.assertEqual(status, 201)
+        job = data["jobs"][0]
+        self.assertEqual(job["state"], "running")
+        self.assertEqual(job["priority"], 2)
+        self.assertTrue(job["output"].endswith("a_upscaled_x4.png"))
+
+        status, data = self.request("GET", f"/jobs/{job['id']}")
+        self.assertEqual((status, data["file"]), (200, self.input_path))
+        status, data = self.request("GET", "/status")
+        self.assertEqual(data["jobs"], {"running": 1})
+
+        status, data = self.request("DELETE", f"/jobs/{job['id']}")
+        self.assertEqual(status, 200)
+        deadline = time.time() + 5
+        while self.engine.workers and time.time() < deadline:
+            self.app.processEvents()
+        status, data = self.request("GET", f"/jobs/{job['id']}")
+        self.assertEqual(data["state"], "cancelled")
+        self.assertIn("upscale", data["timings"])
+
+        status, data = self.request("DELETE", f"/jobs/{job['id']}")
+        self.assertEqual(status, 409)
+
+    def test_rejects_invalid_requests(self):
+        """Test that invalid submissions and foreign hosts are rejected."""
+        status, _ = self.request("POST", "/jobs", {"files": ["relative.png"]})
+        self.assertEqual(status, 400)
+        status, data = self.request(
+            "POST", "/jobs", {"files": [self.input_path], "settings": {"bogus": 1}}
+        )
+        self.assertEqual(status, 400)
+        self.assertIn("bogus", data["error"])
+        status, _ = self.request(
+            "POST",
+            "/jobs",
+            {"files": [self.input_path]},
+            {"Content-Type": "text/plain"},
+        )
+        self.assertEqual(status, 415)
+        for length in ("abc", "-1"):
+            status, data = self.request(
+                "POST", "/jobs", headers={"Content-Length": length}
+            )
+            self.assertEqual(status, 400)
+            self.assertIn("Content-Length", data["error"])
+        status, _ = self.request("GET", "/jobs", headers={"Host": "evil.example"})
+        self.assertEqual(status, 403)
+        status, _ = self.request("GET", "/jobs/unknown")
+        self.assertEqual(status, 404)
+        self.assertEqual(self.engine.scheduler.jobs, {})
+
+    def test_event_stream(self):
+        """Test that job changes are streamed as server-sent events."""
+        connection = http.client.HTTPConnection(
+            "127.0.0.1", self.server.port, timeout=5
+        )
+        connection.request("GET", "/events")
+        response = self.run_in_thread(connection.getresponse)
+        self.assertEqual(response.getheader("Content-Type"), "text/event-stream")
+        self.run_in_thread(lambda: [response.readline() for _ in range(4)])
+
+        self.request("POST", "/jobs", {"files": [self.input_path]})
+        lines = self.run_in_thread(lambda: [response.readline() for _ in range(3)])
+        connection.close()
+
+        self.assertEqual(lines[1], b"event: job\n")
+        event = json.loads(lines[2][len(b"data: ") :])
+        self.assertEqual(event["file"], self.input_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import time
+import threading
+import subprocess
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.cpu import CpuPlan, plan_cpu
+from app.workers import UpscaleWorker
+
+
+class TestCpuMode(unittest.TestCase):
+    """Tests for the CPU execution mode."""
+
+    def test_plan_cpu(self):
+        """Test that the cores are split into processes and threads."""
+        self.assertEqual(plan_cpu({}, cores=4), CpuPlan(4, 1))
+        self.assertEqual(plan_cpu({}, cores=32), CpuPlan(8, 4))
+        self.assertEqual(plan_cpu({"cpu_threads": 4}, cores=16), CpuPlan(4, 4))
+        self.assertEqual(plan_cpu({"cpu_processes": 3}, cores=16), CpuPlan(3, 5))
+        # More threads than cores still runs one process
+        self.assertEqual(plan_cpu({"cpu_threads": 8}, cores=4), CpuPlan(1, 8))
+
+    @patch("app.workers.UpscaleWorker._get_available_models", return_value=["m-x4"])
+    @patch("app.workers.UpscaleWorker._find_models_directory", return_value="models")
+    @patch("os.path.isfile", return_value=True)
+    @patch("os.listdir")
+    def test_frames_run_in_parallel_slots(
+        self, mock_listdir, mock_isfile, mock_models_dir, mock_models
+    ):
+        """Test that frames run on the CPU in parallel, never above the slots."""
+        frames = [f"frame_{i:06d}.png" for i in range(1, 13)]
+        mock_listdir.return_value = frames
+        worker = UpscaleWorker(
+            "in.mp4",
+            "out.mp4",
+            {"model": "m-x4", "use_gpu": False, "cpu_processes": 3, "cpu_threads": 2},
+        )
+        worker.signals = MagicMock()
+        commands = []
+        running = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def run(cmd):
+            with lock:
+                commands.append(cmd)
+                running.append(cmd)
+                peak[0] = max(peak[0], len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(cmd)
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        with patch.object(
+            worker, "_find_realesrgan_executable", return_value="realesrgan"
+        ), patch.object(worker, "_run_process", side_effect=run), patch.object(
+            worker, "_image_pixels", return_value=100
+        ):
+            worker._upscale_frames("frames", "upscaled")
+
+        self.assertEqual(len(commands), len(frames))
+        self.assertEqual(peak[0], 3)
+        cmd = commands[0]
+        self.assertEqual(cmd[cmd.index("-g") + 1], "-1")
+        self.assertEqual(cmd[cmd.index("-j") + 1], "1:2:1")
+        self.assertEqual(worker.frame_report["frames"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app import decoding
+from app.decoding import load_decoder, probe_decoder, save_decoder
+from app.workers import UpscaleWorker
+
+
+class TestDecoding(unittest.TestCase):
+    """Tests for the selection of the video decoder."""
+
+    def setUp(self):
+        """Create a temporary directory with a fake FFmpeg executable."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.ffmpeg = os.path.join(self.temp_dir, "ffmpeg")
+        with open(self.ffmpeg, "w") as f:
+            f.write("ffmpeg")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    @patch("app.decoding._make_sample", return_value=True)
+    @patch("app.decoding.list_hwaccels", return_value=["vdpau", "cuda", "vaapi"])
+    def test_probe_picks_clearly_faster_decoder(self, mock_list, mock_sample):
+        """Test that a hardware decoder must work and beat the CPU to be chosen."""
+        cases = [
+            ({"": 1.0, "cuda": 0.4, "vaapi": 0.3}, "vaapi"),
+            # Barely faster than the CPU is not worth the risk
+            ({"": 1.0, "cuda": 0.95, "vaapi": None}, ""),
+            ({"": 1.0, "cuda": None, "vaapi": None}, ""),
+        ]
+        for times, expected in cases:
+            with self.subTest(expected=expected), patch(
+                "app.decoding._time_decode",
+                side_effect=lambda ffmpeg, sample, hwaccel: times[hwaccel],
+            ):
+                result = probe_decoder(self.ffmpeg)
+
+                self.assertEqual(result["hwaccel"], expected)
+                # Methods that are not candidates are never tried
+                self.assertEqual(set(result["timings"]), {"software", "cuda", "vaapi"})
+
+    def test_cache_is_tied_to_the_executable(self):
+        """Test that a cached result is dropped when FFmpeg is replaced."""
+        cache_path = os.path.join(self.temp_dir, "data", "decoder.json")
+        result = {"hwaccel": "cuda", "timings": {"software": 1.0, "cuda": 0.4}}
+        save_decoder(cache_path, self.ffmpeg, result)
+
+        self.assertEqual(load_decoder(cache_path, self.ffmpeg), result)
+
+        with open(self.ffmpeg, "a") as f:
+            f.write(" 7.1")
+        self.assertIsNone(load_decoder(cache_path, self.ffmpeg))
+
+    @patch("app.workers.UpscaleWorker._get_ffmpeg_path", return_value="ffmpeg")
+    @patch("app.workers.UpscaleWorker._run_process")
+    def test_worker_falls_back_to_software_decoding(self, mock_run, mock_ffmpeg):
+        """Test that a video the hardware decoder fails on is decoded in software."""
+        mock_run.side_effect = lambda cmd: subprocess.CompletedProcess(
+            cmd, 1 if "-hwaccel" in cmd else 0, "", ""
+        )
+        settings = {"hwaccel": "auto", "decode_threads": 4}
+        worker = UpscaleWorker("in.mkv", "out.mp4", settings)
+        worker.signals = MagicMock()
+        frames_dir = os.path.join(self.temp_dir, "frames")
+        os.makedirs(frames_dir)
+
+        with patch.dict(decoding._probed, {"ffmpeg": "cuda"}):
+            worker._extract_frames("in.mkv", frames_dir)
+
+        first, second = [c.args[0] for c in mock_run.call_args_list]
+        self.assertEqual(first[1:5], ["-hwaccel", "cuda", "-threads", "4"])
+        self.assertEqual(second[1:4], ["-threads", "4", "-i"])
+        self.assertEqual(second[second.index("-sws_flags") + 1], "fast_bilinear")
+        worker.signals.log.emit.assert_called_once_with(
+            "Warning: Hardware decoding (cuda) failed, decoding in software"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
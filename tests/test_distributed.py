@@ -0,0 +1,267 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from unittest.mock import patch
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.distributed import (
+    WorkQueue,
+    DistributedWorker,
+    DistributedUpscaleWorker,
+    UNITS_DIR,
+    FRAMES_DIR,
+    UPSCALED_DIR,
+    JOB_RUNNING,
+    JOB_FINISHED,
+    PENDING,
+    CLAIMED,
+    DONE,
+    FAILED,
+    read_job,
+    write_job,
+)
+from app.workers import FRAME_OK, FRAME_DUPLICATED, FRAME_DUPLICATED_NEXT
+
+
+class CopyWorker(DistributedWorker):
+    """A worker that "upscales" frames by copying them."""
+
+    def __init__(self, *args, fail_frames=(), log=lambda message: None, **kwargs):
+        super().__init__(*args, log=log, **kwargs)
+        self.fail_frames = fail_frames
+        self.prepared = 0
+
+    def _prepare_upscaler(self, upscaler):
+        self.prepared += 1
+        return "copy"
+
+    def _upscale_frame(self, upscaler, realesrgan_path, input_path, output_path):
+        if os.path.basename(input_path) in self.fail_frames:
+            raise RuntimeError("GPU lost")
+        upscaler.signals.log.emit(f"Copied {os.path.basename(input_path)}")
+        shutil.copyfile(input_path, output_path)
+        return FRAME_OK
+
+
+def run_copy_worker(shared_dir):
+    """Entry point of the worker processes."""
+    CopyWorker(shared_dir).run(stop_when_idle=True)
+
+
+class TestWorkQueue(unittest.TestCase):
+    """Tests for the WorkQueue class."""
+
+    def setUp(self):
+        """Set up a queue in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.queue = WorkQueue(self.temp_dir.name)
+
+    def tearDown(self):
+        """Remove the queue."""
+        self.temp_dir.cleanup()
+
+    def test_units_are_claimed_once(self):
+        """Test that every unit goes to exactly one of several workers."""
+        for i in range(3):
+            self.queue.publish(f"unit_{i}", [f"frame_{i}.png"])
+        other = WorkQueue(self.temp_dir.name)
+
+        claimed = [
+            self.queue.claim("a")["id"],
+            other.claim("b")["id"],
+            self.queue.claim("a")["id"],
+        ]
+
+        self.assertEqual(sorted(claimed), ["unit_0", "unit_1", "unit_2"])
+        self.assertIsNone(other.claim("b"))
+        self.assertEqual(self.queue.read(CLAIMED, "unit_1")["worker"], "b")
+
+    def test_expired_lease_is_reclaimed(self):
+        """Test that a unit whose lease is not renewed goes back to pending."""
+        self.queue.publish("unit_0", ["frame_0.png"])
+        self.queue.claim("dead")
+        claimed_path = os.path.join(self.temp_dir.name, CLAIMED, "unit_0.json")
+        os.utime(claimed_path, (1, 1))
+
+        self.assertEqual(self.queue.reclaim_expired(60, now=1000), [])
+        # A renewal restarts the lease
+        self.assertTrue(self.queue.renew("unit_0"))
+        self.assertEqual(self.queue.reclaim_expired(60, now=1050), [])
+        self.assertEqual(self.queue.reclaim_expired(60, now=1100), [])
+        self.assertEqual(self.queue.reclaim_expired(60, now=1110), ["unit_0"])
+
+        # The late worker can neither renew nor complete the unit
+        self.assertFalse(self.queue.renew("unit_0"))
+        self.assertFalse(self.queue.complete("unit_0"))
+        self.assertEqual(self.queue.units(PENDING), ["unit_0"])
+        self.assertEqual(self.queue.read(PENDING, "unit_0")["attempts"], 1)
+
+    def test_unit_fails_after_max_attempts(self):
+        """Test that a unit that keeps failing is given up."""
+        self.queue.publish("unit_0", ["frame_0.png"])
+
+        self.queue.claim("a")
+        self.assertEqual(self.queue.release("unit_0"), PENDING)
+        self.queue.claim("a")
+        self.assertEqual(self.queue.release("unit_0", "crashed", 2), PENDING)
+        self.queue.claim("a")
+        self.assertEqual(self.queue.release("unit_0", "crashed", 2), FAILED)
+
+        unit = self.queue.read(FAILED, "unit_0")
+        self.assertEqual((unit["attempts"], unit["error"]), (2, "crashed"))
+
+
+class TestDistributedRendering(unittest.TestCase):
+    """Tests for the coordinator and workers sharing a folder."""
+
+    def setUp(self):
+        """Set up a shared folder."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.shared_dir = self.temp_dir.name
+
+    def tearDown(self):
+        """Remove the shared folder."""
+        self.temp_dir.cleanup()
+
+    def create_frames(self, job_dir, count):
+        """Writes numbered fake frames into a job directory."""
+        frames_dir = os.path.join(job_dir, FRAMES_DIR)
+        upscaled_dir = os.path.join(job_dir, UPSCALED_DIR)
+        os.makedirs(frames_dir)
+        os.makedirs(upscaled_dir)
+        for i in range(1, count + 1):
+            with open(os.path.join(frames_dir, f"frame_{i:06d}.png"), "w") as f:
+                f.write(str(i))
+        return frames_dir, upscaled_dir
+
+    @patch("app.distributed.COORDINATOR_POLL_INTERVAL", 0.01)
+    def test_coordinator_waits_for_workers(self):
+        """Test that the coordinator collects the frames of a worker and fills gaps."""
+        coordinator = DistributedUpscaleWorker(
+            "video.mp4",
+            "out.mp4",
+            {"distributed_dir": self.shared_dir, "distributed_unit_size": 2},
+        )
+        progress = []
+        coordinator.progress_callback = lambda done, total, latest: progress.append(
+            (done, total)
+        )
+        job_dir = coordinator._create_work_dir()
+        frames_dir, upscaled_dir = self.create_frames(job_dir, 6)
+        # Frame 4 fails on every attempt, so its unit (frames 3 and 4) fails
+        worker = CopyWorker(
+            self.shared_dir, poll_interval=0.01, fail_frames=["frame_000004.png"]
+        )
+        thread = threading.Thread(target=worker.run)
+        thread.start()
+        try:
+            coordinator._upscale_frames(frames_dir, upscaled_dir)
+        finally:
+            worker.stop()
+            thread.join()
+
+        self.assertEqual(read_job(job_dir)["status"], JOB_FINISHED)
+        self.assertEqual(progress[-1], (4, 6))
+        contents = []
+        for i in range(1, 7):
+            with open(os.path.join(upscaled_dir, f"frame_{i:06d}.png")) as f:
+                contents.append(f.read())
+        self.assertEqual(contents, ["1", "2", "3", "3", "5", "6"])
+        self.assertEqual(
+            coordinator.frame_report["frames"],
+            {"frame_000004.png": FRAME_DUPLICATED},
+        )
+
+    def test_worker_logs_frames_and_prepares_once_per_unit(self):
+        """Test that the frame threads' messages reach the log without an event loop."""
+        job_dir = os.path.join(self.shared_dir, "job_1")
+        frames_dir, _ = self.create_frames(job_dir, 4)
+        queue = WorkQueue(os.path.join(job_dir, UNITS_DIR))
+        queue.publish("unit_000000", sorted(os.listdir(frames_dir)))
+        write_job(
+            job_dir,
+            {"file": "video.mp4", "settings": {}, "status": JOB_RUNNING},
+        )
+        messages = []
+        worker = CopyWorker(
+            self.shared_dir,
+            poll_interval=0.01,
+            log=messages.append,
+            settings={"use_gpu": False, "cpu_processes": 2, "cpu_threads": 1},
+        )
+
+        worker.run(stop_when_idle=True)
+
+        self.assertEqual(worker.prepared, 1)
+        for i in range(1, 5):
+            self.assertIn(f"Copied frame_{i:06d}.png", messages)
+        self.assertEqual(queue.units(DONE), ["unit_000000"])
+
+    def test_missing_first_frames_are_filled_from_the_next_frame(self):
+        """Test that frames missing at the start of a video copy the first delivered one."""
+        coordinator = DistributedUpscaleWorker("video.mp4", "out.mp4", {})
+        coordinator.frame_report = {"total": 4, "frames": {}}
+        frames_dir, upscaled_dir = self.create_frames(self.shared_dir, 4)
+        frames = sorted(os.listdir(frames_dir))
+        shutil.copyfile(
+            os.path.join(frames_dir, frames[2]), os.path.join(upscaled_dir, frames[2])
+        )
+
+        coordinator._fill_missing_frames(frames, upscaled_dir)
+
+        contents = []
+        for frame in frames:
+            with open(os.path.join(upscaled_dir, frame)) as f:
+                contents.append(f.read())
+        self.assertEqual(contents, ["3", "3", "3", "3"])
+        self.assertEqual(
+            coordinator.frame_report["frames"],
+            {
+                frames[0]: FRAME_DUPLICATED_NEXT,
+                frames[1]: FRAME_DUPLICATED_NEXT,
+                frames[3]: FRAME_DUPLICATED,
+            },
+        )
+
+    def test_local_worker_processes(self):
+        """Test that several worker processes share the units of a job."""
+        job_dir = os.path.join(self.shared_dir, "job_1")
+        frames_dir, upscaled_dir = self.create_frames(job_dir, 40)
+        queue = WorkQueue(os.path.join(job_dir, UNITS_DIR))
+        frames = sorted(os.listdir(frames_dir))
+        for i in range(0, 40, 4):
+            queue.publish(f"unit_{i // 4:06d}", frames[i : i + 4])
+        write_job(
+            job_dir,
+            {"file": "video.mp4", "settings": {}, "status": JOB_RUNNING},
+        )
+
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(target=run_copy_worker, args=(self.shared_dir,))
+            for _ in range(3)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+
+        self.assertEqual(len(queue.units(DONE)), 10)
+        self.assertEqual(queue.units(PENDING) + queue.units(CLAIMED), [])
+        self.assertEqual(sorted(os.listdir(upscaled_dir)), frames)
+        for unit_id in queue.units(DONE):
+            with open(os.path.join(job_dir, UNITS_DIR, DONE, f"{unit_id}.json")) as f:
+                self.assertTrue(json.load(f)["worker"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from PyQt6.QtGui import QColorSpace, QImage, QImageWriter
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.encoding import encoder_args, encode_command, needs_encoder
+from app.metadata import ImageMetadata, copy_metadata, read_metadata, write_metadata
+
+# A minimal little-endian TIFF structure with an empty IFD
+EXIF = b"II*\x00\x08\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+
+
+class TestEncoding(unittest.TestCase):
+    """Tests for the output encoder settings and the metadata copying."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.color_space = QColorSpace(QColorSpace.NamedColorSpace.DisplayP3)
+        self.icc = bytes(self.color_space.iccProfile())
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def save_image(self, name: str) -> str:
+        """Saves a small image without metadata and returns its path."""
+        path = os.path.join(self.temp_dir, name)
+        image = QImage(16, 8, QImage.Format.Format_RGB32)
+        image.fill(0xFF3366CC)
+        self.assertTrue(image.save(path))
+        return path
+
+    def test_encoder_selection(self):
+        """Test that FFmpeg only encodes when the defaults are not enough."""
+        self.assertFalse(needs_encoder({"format": "jpg"}))
+        self.assertFalse(needs_encoder({"format": "png", "png_compression": -1}))
+        self.assertTrue(needs_encoder({"format": "jpg", "jpeg_quality": 85}))
+        self.assertTrue(needs_encoder({"format": "webp", "webp_lossless": True}))
+        self.assertTrue(needs_encoder({"format": "tiff"}))
+
+        self.assertEqual(encoder_args("jpg", {"jpeg_quality": 100}), ["-q:v", "2"])
+        self.assertEqual(
+            encoder_args("webp", {"webp_lossless": True, "webp_effort": 6}),
+            ["-c:v", "libwebp", "-lossless", "1", "-compression_level", "6"],
+        )
+        cmd = encode_command("in.png", "out.jpeg", {}, 1080, "ffmpeg")
+        self.assertEqual(
+            cmd,
+            [
+                "ffmpeg",
+                "-y",
+                "-i",
+                "in.png",
+                "-vf",
+                "scale=-1:1080:flags=lanczos",
+                "-q:v",
+                "3",
+                "out.jpeg",
+            ],
+        )
+
+    def test_metadata_round_trip(self):
+        """Test that EXIF data and ICC profiles are spliced into every format."""
+        formats = ["jpg", "png"]
+        if b"webp" in [bytes(f) for f in QImageWriter.supportedImageFormats()]:
+            formats.append("webp")
+        for fmt in formats:
+            with self.subTest(fmt=fmt):
+                path = self.save_image(f"image.{fmt}")
+                self.assertEqual(read_metadata(path), ImageMetadata())
+
+                self.assertTrue(write_metadata(path, ImageMetadata(EXIF, self.icc)))
+
+                self.assertEqual(read_metadata(path), ImageMetadata(EXIF, self.icc))
+                image = QImage(path)
+                self.assertFalse(image.isNull())
+                self.assertEqual(image.size().width(), 16)
+                self.assertEqual(image.colorSpace(), self.color_space)
+                # Metadata the output already has is left alone
+                self.assertFalse(write_metadata(path, ImageMetadata(EXIF, self.icc)))
+
+    def test_copy_metadata_from_source(self):
+        """Test that a source's metadata reaches an output of another format."""
+        source = self.save_image("source.jpg")
+        write_metadata(source, ImageMetadata(EXIF, self.icc))
+        output = self.save_image("output.png")
+
+        self.assertTrue(copy_metadata(source, output))
+
+        self.assertEqual(read_metadata(output), ImageMetadata(EXIF, self.icc))
+        # Sources without metadata, or in other formats, change nothing
+        bmp = self.save_image("source.bmp")
+        self.assertFalse(copy_metadata(bmp, self.save_image("plain.png")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from PyQt6.QtCore import QCoreApplication, QRunnable
+from app.engine import UpscaleEngine
+from app.governor import Footprint
+from app.scheduler import Job, DONE, PAUSED, QUEUED, ORDER_SHORTEST
+from app.workers import WorkerSignals
+
+
+class FakeWorker(QRunnable):
+    """A worker that finishes right away."""
+
+    def __init__(self, file_path, output_path, settings):
+        """Initializes the fake worker."""
+        super().__init__()
+        self.signals = WorkerSignals()
+        self.is_cancelled = False
+        self.progress_callback = None
+        self.cpu_plan = None
+        self.model = ""
+        self.upscaled_pixels = 0
+        self.stage_timings = {"upscale": 0.0}
+
+    def run(self):
+        """Finishes without doing anything."""
+        self.signals.finished.emit()
+
+    def cancel(self):
+        """Cancels the worker."""
+        self.is_cancelled = True
+
+
+class TestUpscaleEngine(unittest.TestCase):
+    """Tests for the UpscaleEngine class."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application object needed for queued signals."""
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Create an engine with fake workers and a few input files."""
+        patcher = patch("app.engine.UpscaleWorker", FakeWorker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.engine = UpscaleEngine()
+        self.engine.model_speeds_path = None
+        self.finished = []
+        self.engine.batch_finished.connect(lambda: self.finished.append(True))
+
+    def make_file(self, name, size=1):
+        """Creates an input file of the given size."""
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+        return path
+
+    def wait_for(self, condition):
+        """Processes Qt events until the condition holds."""
+        deadline = time.time() + 5
+        while not condition() and time.time() < deadline:
+            self.app.processEvents()
+            time.sleep(0.005)
+        self.assertTrue(condition())
+
+    def test_resumed_job_runs_after_the_rest_finished(self):
+        """Test that a paused job keeps the batch open and runs when resumed."""
+        settings = {"model": "realesr-animevideov3-x4"}
+        first = self.engine.submit(self.make_file("a.png"), "a_out.png", settings)
+        second = self.engine.submit(self.make_file("b.png"), "b_out.png", settings)
+        self.engine.pause(second.job_id)
+
+        self.engine.start()
+        self.wait_for(lambda: first.state == DONE)
+        self.wait_for(lambda: not self.engine.workers)
+
+        self.assertEqual(second.state, PAUSED)
+        self.assertTrue(self.engine.running)
+        self.assertEqual(self.finished, [])
+
+        self.engine.resume(second.job_id)
+        self.wait_for(lambda: self.finished)
+
+        self.assertEqual(second.state, DONE)
+        self.assertFalse(self.engine.running)
+
+    def test_jobs_cancelled_before_starting_complete_the_progress(self):
+        """Test that the overall progress reaches 100% when a waiting job is cancelled."""
+        for cancel in (self.engine.cancel, lambda job_id: self.engine.cancel_all()):
+            settings = {"model": "realesr-animevideov3-x4"}
+            first = self.engine.submit(self.make_file("a.png"), "a_out.png", settings)
+            second = self.engine.submit(self.make_file("b.png"), "b_out.png", settings)
+            self.engine.pause(second.job_id)
+
+            self.engine.start()
+            self.wait_for(lambda: first.state == DONE and not self.engine.workers)
+            self.assertEqual(self.engine.progress.snapshot()["overall"], 50)
+
+            cancel(second.job_id)
+            self.wait_for(lambda: not self.engine.running)
+            self.assertEqual(self.engine.progress.snapshot()["overall"], 100)
+            self.engine.clear()
+
+    def test_image_batch_stops_growing_at_the_disk_limit(self):
+        """Test that a batch only takes the images whose summed disk space fits."""
+        self.engine.governor.max_memory = 0
+        self.engine.governor.max_disk = 100
+        self.engine.governor.max_load = 0
+        self.engine.scheduler.lane_limits["image"] = 1
+        video = Job("video", self.make_file("v.mkv"), "v_out.mkv", {})
+        video.footprint = Footprint(0, 50)
+        self.engine.scheduler.add(video)
+        settings = {"image_batch_size": 10}
+        for name in "abcd":
+            job = Job(name, self.make_file(f"{name}.png"), f"{name}_out.png", settings)
+            job.footprint = Footprint(0, 20)
+            self.engine.scheduler.add(job)
+        self.engine.scheduler.next_jobs()
+
+        batch = self.engine._take_batch(self.engine.scheduler.get("a"))
+
+        self.assertEqual([job.job_id for job in batch], ["a", "b"])
+        self.assertEqual(batch[0].footprint, Footprint(0, 40))
+        self.assertEqual(self.engine.scheduler.get("c").state, QUEUED)
+
+    def test_files_are_probed_in_the_background(self):
+        """Test that submitting does not probe, and the probes reorder the queue."""
+        gui_thread = threading.get_ident()
+        probe_threads = set()
+        pixels = {"long.mkv": 1000, "short.mkv": 10}
+
+        def probe(file_path):
+            probe_threads.add(threading.get_ident())
+            frames = pixels[os.path.basename(file_path)]
+            return {"frames": frames, "width": 1, "height": 1}
+
+        # The long video is the smaller file, so it comes first until probed
+        self.engine.scheduler.order = ORDER_SHORTEST
+        with patch("app.engine.probe_file", side_effect=probe):
+            long = self.engine.submit(self.make_file("long.mkv", 1), "l.mkv", {})
+            short = self.engine.submit(self.make_file("short.mkv", 2), "s.mkv", {})
+            self.assertIsNone(long.info)
+            self.assertLess(long.cost, short.cost)
+
+            self.wait_for(lambda: long.info and short.info)
+
+        self.assertNotIn(gui_thread, probe_threads)
+        self.assertEqual((long.cost, short.cost), (1000.0, 10.0))
+        started = self.engine.scheduler.next_jobs()
+        self.assertEqual([job.job_id for job in started], [short.job_id])
+
+
+if __name__ == "__main__":
+    unittest.main()
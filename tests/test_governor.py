@@ -0,0 +1,98 @@
+import unittest
+import os
+import sys
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.governor import GB, Footprint, ResourceGovernor, estimate_footprint
+from app.scheduler import Job, JobScheduler, QUEUED, RUNNING
+
+
+def make_job(job_id, path, memory=0, disk=0):
+    """Creates a job with a given footprint."""
+    job = Job(job_id, path, f"out/{path}", {})
+    job.footprint = Footprint(memory, disk)
+    return job
+
+
+class TestResourceGovernor(unittest.TestCase):
+    """Tests for the footprint estimates and the admission of jobs."""
+
+    def setUp(self):
+        """Set up a governor on a machine with 16 GB RAM and 100 GB temp space."""
+        self.load = 0.5
+        self.governor = ResourceGovernor(
+            memory_probe=lambda: 16 * GB,
+            disk_probe=lambda: 100 * GB,
+            load_probe=lambda: self.load,
+        )
+        self.governor.configure({})
+
+    def test_estimate_footprint(self):
+        """Test that videos need temp disk for their frames, plain images do not."""
+        settings = {"model": "realesr-animevideov3-x4"}
+        info = {"width": 1920, "height": 1080, "frames": 1000}
+
+        video = estimate_footprint("clip.mp4", settings, info)
+        image = estimate_footprint("photo.png", settings, info)
+        distributed = estimate_footprint(
+            "clip.mp4", dict(settings, distributed_dir="/shared"), info
+        )
+
+        # 1000 extracted and 1000 upscaled frames at 17 raw pixels' worth each
+        self.assertGreater(video.disk, 1000 * 1920 * 1080 * 3 * 17 * 0.4)
+        self.assertEqual(image.disk, 0)
+        self.assertEqual(distributed.disk, 0)
+        self.assertGreater(image.memory, 1920 * 1080 * 3 * 16)
+        # Unknown sizes only count the process itself
+        self.assertEqual(estimate_footprint("clip.mp4", settings, {}).disk, 0)
+
+    def test_default_limits(self):
+        """Test that unset limits are derived from the machine."""
+        self.assertEqual(self.governor.max_memory, 12 * GB)
+        self.assertEqual(self.governor.max_disk, 90 * GB)
+        self.governor.configure({"max_memory_gb": 4, "max_load": 0})
+        self.assertEqual(self.governor.max_memory, 4 * GB)
+        self.assertEqual(self.governor.max_load, 0)
+
+    def test_admit_reasons(self):
+        """Test that a job waits while memory, disk or load are exhausted."""
+        running = [make_job("1", "a.mp4", memory=8 * GB, disk=60 * GB)]
+
+        self.assertIsNone(self.governor.admit(make_job("2", "b.png", GB), running))
+        reason = self.governor.admit(make_job("3", "c.png", memory=6 * GB), running)
+        self.assertTrue(reason.startswith("Waiting for memory"))
+        reason = self.governor.admit(make_job("4", "d.mp4", disk=40 * GB), running)
+        self.assertTrue(reason.startswith("Waiting for temp disk space"))
+        self.load = 3.0
+        reason = self.governor.admit(make_job("5", "e.png"), running)
+        self.assertTrue(reason.startswith("Waiting for system load"))
+        # A job that is too large on its own still runs when nothing else does
+        self.assertIsNone(self.governor.admit(make_job("6", "f.mp4", 64 * GB), []))
+
+    def test_waiting_job_holds_its_lane(self):
+        """Test that a held back job keeps its place and blocks its lane only."""
+        scheduler = JobScheduler({"image": 3, "video": 1})
+        scheduler.add(make_job("1", "big.png", memory=10 * GB))
+        scheduler.add(make_job("2", "huge.png", memory=10 * GB))
+        scheduler.add(make_job("3", "small.png", memory=GB))
+        scheduler.add(make_job("4", "clip.mp4", memory=GB))
+
+        started = scheduler.next_jobs(self.governor.admit)
+
+        self.assertEqual([job.job_id for job in started], ["1", "4"])
+        self.assertIn("memory", scheduler.get("2").waiting)
+        self.assertEqual(scheduler.get("3").state, QUEUED)
+        self.assertIsNone(scheduler.get("3").waiting)
+
+        scheduler.finish("1", "done")
+        started = scheduler.next_jobs(self.governor.admit)
+        self.assertEqual([job.job_id for job in started], ["2", "3"])
+        self.assertEqual(scheduler.get("2").state, RUNNING)
+        self.assertIsNone(scheduler.get("2").waiting)
+
+
+if __name__ == "__main__":
+    unittest.main()
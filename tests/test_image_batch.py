@@ -0,0 +1,97 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.image_batch import ImageBatchWorker
+from app.scheduler import Job, JobScheduler, RUNNING, QUEUED
+
+
+class TestImageBatch(unittest.TestCase):
+    """Tests for the image batch mode."""
+
+    def setUp(self):
+        """Create a temporary directory with two images of the same name."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.items = []
+        for folder in ("first", "second", "third"):
+            os.makedirs(os.path.join(self.temp_dir, folder))
+            source = os.path.join(self.temp_dir, folder, "image.png")
+            with open(source, "wb") as f:
+                f.write(folder.encode())
+            output = os.path.join(self.temp_dir, "out", folder, "image_upscaled_x4.jpg")
+            self.items.append((source, output))
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_batch_runs_once_and_maps_outputs(self):
+        """Test that one call upscales the batch and outputs reach their names."""
+        worker = ImageBatchWorker(self.items, {"model": "m-x4", "format": "jpg"})
+        worker.signals = MagicMock()
+        worker.models = MagicMock()
+        worker.models.resolve.return_value = ("m-x4", None)
+        commands = []
+
+        def run(cmd):
+            commands.append(cmd)
+            input_dir = cmd[cmd.index("-i") + 1]
+            output_dir = cmd[cmd.index("-o") + 1]
+            # The third image fails inside Real-ESRGAN
+            for name in sorted(os.listdir(input_dir))[:2]:
+                with open(os.path.join(input_dir, name), "rb") as source:
+                    data = source.read()
+                stem = os.path.splitext(name)[0]
+                with open(os.path.join(output_dir, f"{stem}.jpg"), "wb") as f:
+                    f.write(data + b" upscaled")
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        with patch.object(
+            worker, "_find_realesrgan_executable", return_value="realesrgan"
+        ), patch.object(worker, "_run_process", side_effect=run), patch.object(
+            worker, "_image_pixels", return_value=100
+        ):
+            worker.run()
+
+        self.assertEqual(len(commands), 1)
+        self.assertEqual(commands[0][commands[0].index("-f") + 1], "jpg")
+        for folder, (_, output) in zip(("first", "second"), self.items):
+            with open(output, "rb") as f:
+                self.assertEqual(f.read(), folder.encode() + b" upscaled")
+        outcomes = [c.args for c in worker.signals.file_finished.emit.call_args_list]
+        self.assertEqual(outcomes[:2], [(0, ""), (1, "")])
+        self.assertEqual(outcomes[2][0], 2)
+        self.assertIn("no output", outcomes[2][1])
+        self.assertEqual(worker.upscaled_pixels, 300)
+        worker.signals.error.emit.assert_not_called()
+
+    def test_batch_takes_one_lane_slot(self):
+        """Test that a batch of matching images takes a single slot of its lane."""
+        scheduler = JobScheduler({"image": 1, "video": 1})
+        for job_id, path in enumerate(["a.png", "b.png", "c.jpg", "d.png"]):
+            settings = {"format": "png", "target_height": 720 if path == "c.jpg" else 0}
+            scheduler.add(Job(str(job_id), path, f"out/{path}", settings))
+
+        lead = scheduler.next_jobs()[0]
+        batch = scheduler.take_batch(
+            lead, 10, lambda other: other.settings == lead.settings
+        )
+
+        self.assertEqual([job.job_id for job in batch], ["0", "1", "3"])
+        self.assertTrue(all(job.state == RUNNING for job in batch))
+        self.assertEqual(scheduler.get("2").state, QUEUED)
+        self.assertEqual(scheduler.slots_used("image"), 1)
+        scheduler.lane_limits["image"] = 2
+        self.assertEqual([job.job_id for job in scheduler.next_jobs()], ["2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
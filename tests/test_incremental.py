@@ -0,0 +1,104 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.incremental import (
+    check_output,
+    plan_batch,
+    write_record,
+    sidecar_path,
+    REASON_NEW,
+    REASON_NO_RECORD,
+    REASON_SOURCE_CHANGED,
+    REASON_SETTINGS_CHANGED,
+    REASON_OUTPUT_CHANGED,
+)
+
+
+class TestIncremental(unittest.TestCase):
+    """Tests for the incremental mode helpers."""
+
+    def setUp(self):
+        """Set up a source file with a finished output and its record."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.settings = {"model": "realesr-animevideov3-x4", "format": "png"}
+        self.source = self.write("a.png", b"source")
+        self.output = self.write("a_upscaled_x4.png", b"upscaled output")
+        write_record(self.source, self.output, self.settings)
+
+    def tearDown(self):
+        """Remove the temporary folder."""
+        self.temp_dir.cleanup()
+
+    def write(self, name, data):
+        """Writes a file into the temporary folder and returns its path."""
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_unchanged_file_is_up_to_date(self):
+        """Test that an unchanged source with the same settings is skipped."""
+        self.assertIsNone(check_output(self.source, self.output, self.settings))
+        # Settings that do not affect the output do not invalidate it
+        settings = dict(self.settings, image_concurrency=4)
+        self.assertIsNone(check_output(self.source, self.output, settings))
+
+    def test_changes_are_detected(self):
+        """Test the reasons reported for outputs that are out of date."""
+        settings = dict(self.settings, model="realesrgan-x4plus")
+        self.assertEqual(
+            check_output(self.source, self.output, settings), REASON_SETTINGS_CHANGED
+        )
+
+        self.write("a.png", b"new source data")
+        self.assertEqual(
+            check_output(self.source, self.output, self.settings),
+            REASON_SOURCE_CHANGED,
+        )
+
+        self.write("a_upscaled_x4.png", b"truncated")
+        self.assertEqual(
+            check_output(self.source, self.output, self.settings),
+            REASON_OUTPUT_CHANGED,
+        )
+
+        os.remove(sidecar_path(self.output))
+        self.assertEqual(
+            check_output(self.source, self.output, self.settings), REASON_NO_RECORD
+        )
+
+    def test_touched_file_with_hash_comparison(self):
+        """Test that a touched but unchanged source is only skipped when hashing."""
+        settings = dict(self.settings, incremental_compare="hash")
+        write_record(self.source, self.output, settings)
+        stat = os.stat(self.source)
+        os.utime(self.source, (stat.st_atime, stat.st_mtime + 60))
+
+        self.assertIsNone(check_output(self.source, self.output, settings))
+        self.assertEqual(
+            check_output(self.source, self.output, self.settings),
+            REASON_SOURCE_CHANGED,
+        )
+
+    def test_plan_batch(self):
+        """Test that a batch is split into files to process and to skip."""
+        new_source = self.write("b.png", b"other")
+        new_output = os.path.join(self.temp_dir.name, "b_upscaled_x4.png")
+
+        process, skip, reasons = plan_batch(
+            [(self.source, self.output), (new_source, new_output)], self.settings
+        )
+
+        self.assertEqual(process, [(new_source, new_output)])
+        self.assertEqual(skip, [(self.source, self.output)])
+        self.assertEqual(reasons, {REASON_NEW: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import os
+import sys
+import subprocess
+from fractions import Fraction
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.interlace import (
+    FIELD_DEINTERLACE,
+    FIELD_IVTC,
+    FIELD_OFF,
+    IVTC_FILTER,
+    detect_field_mode,
+    filtered_rate,
+    parse_idet,
+)
+from app.workers import UpscaleWorker
+
+
+def idet_log(tff: int, progressive: int, repeated: int, frames: int = 120) -> str:
+    """Returns the log output of FFmpeg's interlace detection."""
+    # FFmpeg logs an empty report while it sets up the filters
+    empty = (
+        "[Parsed_idet_0 @ 0x1] Repeated Fields: Neither:     0 Top:     0 "
+        "Bottom:     0\n"
+        "[Parsed_idet_0 @ 0x1] Multi frame detection: TFF:     0 BFF:     0 "
+        "Progressive:     0 Undetermined:     0\n"
+    )
+    top = repeated // 2
+    return empty + (
+        f"[Parsed_idet_0 @ 0x2] Repeated Fields: Neither: {frames - repeated:5d} "
+        f"Top: {top:5d} Bottom: {repeated - top:5d}\n"
+        f"[Parsed_idet_0 @ 0x2] Single frame detection: TFF: {tff:5d} BFF:     0 "
+        f"Progressive: {progressive:5d} Undetermined:     0\n"
+        f"[Parsed_idet_0 @ 0x2] Multi frame detection: TFF: {tff:5d} BFF:     0 "
+        f"Progressive: {progressive:5d} Undetermined:     0\n"
+    )
+
+
+class TestInterlace(unittest.TestCase):
+    """Tests for the detection and filtering of interlaced videos."""
+
+    def test_detection_classifies_sources(self):
+        """Test that telecined, interlaced and progressive sources are told apart."""
+        self.assertEqual(parse_idet(idet_log(118, 2, 48)).repeated, 48)
+        cases = [
+            # A 3:2 pulldown repeats a field in two of every five frames
+            (idet_log(118, 2, 48), FIELD_IVTC),
+            (idet_log(120, 0, 0), FIELD_DEINTERLACE),
+            (idet_log(3, 117, 0), FIELD_OFF),
+            ("Invalid data found when processing input", FIELD_OFF),
+        ]
+        for log, expected in cases:
+            with self.subTest(expected=expected):
+                commands = []
+
+                def run(cmd):
+                    commands.append(cmd)
+                    return subprocess.CompletedProcess(cmd, 0, "", log)
+
+                mode = detect_field_mode("in.mp4", 100.0, "ffmpeg", run)
+
+                self.assertEqual(mode, expected)
+                # The windows are spread over the video
+                starts = [cmd[cmd.index("-ss") + 1] for cmd in commands]
+                self.assertEqual(starts, ["25.000", "50.000", "75.000"])
+
+    def test_filtered_rate(self):
+        """Test that inverse telecine restores the film rate."""
+        self.assertEqual(filtered_rate(FIELD_IVTC, 30000 / 1001), Fraction(24000, 1001))
+        self.assertEqual(filtered_rate(FIELD_IVTC, 0), Fraction(24000, 1001))
+        self.assertEqual(filtered_rate(FIELD_DEINTERLACE, 25.0), 25)
+        self.assertIsNone(filtered_rate(FIELD_DEINTERLACE, 0))
+
+    @patch("app.workers.UpscaleWorker._get_ffmpeg_path", return_value="ffmpeg")
+    @patch("app.workers.UpscaleWorker._run_process")
+    def test_worker_extracts_and_reassembles_restored_frames(
+        self, mock_run, mock_ffmpeg_path
+    ):
+        """Test that the worker filters the extraction and keeps the film rate."""
+        mock_run.side_effect = lambda cmd: subprocess.CompletedProcess(
+            cmd, 0, "", idet_log(118, 2, 48)
+        )
+        worker = UpscaleWorker(
+            "in.mp4", "out.mp4", {"field_mode": "auto", "hwaccel": "none"}
+        )
+        worker.signals = MagicMock()
+
+        worker._choose_field_mode({"duration": 60.0, "fps": 30000 / 1001})
+        worker._extract_frames("in.mp4", "frames")
+        worker._reassemble_video("upscaled", "out/out.mp4", "in.mp4")
+
+        extract_cmd = mock_run.call_args_list[-2].args[0]
+        self.assertEqual(extract_cmd[extract_cmd.index("-vf") + 1], IVTC_FILTER)
+        self.assertIn("passthrough", extract_cmd)
+        reassemble_cmd = mock_run.call_args_list[-1].args[0]
+        self.assertEqual(
+            reassemble_cmd[reassemble_cmd.index("-framerate") + 1], "24000/1001"
+        )
+        worker.signals.log.emit.assert_any_call(
+            "Telecined source detected; applying inverse telecine"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.log_sink import LogSink, infer_level, DEBUG, INFO, WARNING, ERROR
+
+
+class TestLogSink(unittest.TestCase):
+    """Tests for the LogSink class."""
+
+    def setUp(self):
+        """Set up a sink that writes to a temporary log file."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.temp_dir.name, "logs", "upscaler.log")
+        self.sink = LogSink(self.log_file, max_lines=10)
+        self.flushed = []
+        self.sink.flushed.connect(self.flushed.append)
+
+    def tearDown(self):
+        """Close the sink and remove the temporary directory."""
+        self.sink.close()
+        self.temp_dir.cleanup()
+
+    def test_infer_level(self):
+        """Test that message prefixes map to log levels."""
+        self.assertEqual(infer_level("❌ Error: boom"), ERROR)
+        self.assertEqual(infer_level("Warning: Frame failed"), WARNING)
+        self.assertEqual(infer_level("Command: ffmpeg -i x"), DEBUG)
+        self.assertEqual(infer_level("Processing: a.png"), INFO)
+
+    def test_messages_from_threads_are_coalesced(self):
+        """Test that many messages from several threads flush as one block."""
+        threads = [
+            threading.Thread(
+                target=lambda n=n: [
+                    self.sink.write(f"job {n} line {i}") for i in range(5)
+                ]
+            )
+            for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.sink.flush()
+
+        self.assertEqual(len(self.flushed), 1)
+        self.assertEqual(len(self.flushed[0].splitlines()), 20)
+
+    def test_history_is_capped_and_filtered(self):
+        """Test that the history is a ring buffer and honours the level."""
+        for i in range(15):
+            self.sink.write(f"Command: step {i}")
+        self.sink.write("Warning: disk almost full")
+
+        self.sink.flush()
+
+        self.assertEqual(
+            self.flushed[0].splitlines()[-1][11:], "Warning: disk almost full"
+        )
+        self.assertEqual(len(self.sink.set_level(DEBUG).splitlines()), 10)
+
+    def test_save_reads_full_log_file(self):
+        """Test that saving exports the log file, not just the visible history."""
+        for i in range(15):
+            self.sink.write(f"line {i}")
+        output = os.path.join(self.temp_dir.name, "saved.txt")
+
+        self.sink.save_to(output)
+
+        with open(output, encoding="utf-8") as f:
+            saved = f.read().splitlines()
+        self.assertEqual(len(saved), 15)
+        self.assertTrue(saved[0].endswith("line 0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
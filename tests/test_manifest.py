@@ -0,0 +1,104 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.manifest import (
+    BatchManifest,
+    settings_hash,
+    BATCH_COMPLETED,
+)
+from app.scheduler import QUEUED, RUNNING, DONE, FAILED
+
+
+class TestBatchManifest(unittest.TestCase):
+    """Tests for the BatchManifest class."""
+
+    def setUp(self):
+        """Set up a manifest in a temporary folder."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "batches.db")
+        self.manifest = BatchManifest(self.db_path)
+        self.settings = {"model": "realesr-animevideov3-x4", "format": "png"}
+
+    def tearDown(self):
+        """Close the manifest and remove the temporary folder."""
+        self.manifest.close()
+        self.temp_dir.cleanup()
+
+    def write(self, name, data=b"data"):
+        """Writes a file into the temporary folder and returns its path."""
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_settings_hash_ignores_scheduling(self):
+        """Test that only settings affecting the output change the hash."""
+        changed = dict(self.settings, image_concurrency=4)
+        self.assertEqual(settings_hash(self.settings), settings_hash(changed))
+        changed = dict(self.settings, model="realesrgan-x4plus")
+        self.assertNotEqual(settings_hash(self.settings), settings_hash(changed))
+
+    def test_settings_hash_covers_encoder_settings(self):
+        """Test that encoder and metadata settings count once they are set."""
+        original = settings_hash(self.settings)
+        # Their unset values keep the hashes of older records
+        unset = dict(
+            self.settings, png_compression=-1, webp_effort=-1, copy_metadata=True
+        )
+        self.assertEqual(settings_hash(unset), original)
+        for key, value in (
+            ("png_compression", 0),
+            ("webp_effort", 6),
+            ("copy_metadata", False),
+        ):
+            with self.subTest(key=key):
+                changed = dict(unset, **{key: value})
+                self.assertNotEqual(settings_hash(changed), original)
+
+    def test_interrupted_batch_survives_reopen(self):
+        """Test that a batch that never finished is found after reopening."""
+        batch_id = self.manifest.create_batch("out", self.settings)
+        done = self.manifest.add_item(batch_id, "a.png", "out/a.png", {}, QUEUED)
+        self.manifest.add_item(batch_id, "b.png", "out/b.png", {}, QUEUED)
+        self.manifest.mark_started(done, RUNNING)
+        self.manifest.close()
+
+        self.manifest = BatchManifest(self.db_path)
+        batch = self.manifest.interrupted_batch()
+
+        self.assertEqual(batch["id"], batch_id)
+        self.assertEqual(batch["settings"], self.settings)
+        items = self.manifest.items(batch_id)
+        self.assertEqual([item["status"] for item in items], [RUNNING, QUEUED])
+        self.assertIsNotNone(items[0]["started_at"])
+
+        self.manifest.finish_batch(batch_id, BATCH_COMPLETED)
+        self.assertIsNone(self.manifest.interrupted_batch())
+
+    def test_is_complete_checks_output(self):
+        """Test that only finished items with an unchanged output are complete."""
+        batch_id = self.manifest.create_batch("out", self.settings)
+        output = self.write("a_upscaled_x4.png")
+        ok = self.manifest.add_item(batch_id, "a.png", output, {}, QUEUED)
+        failed = self.manifest.add_item(batch_id, "b.png", output, {}, QUEUED)
+        self.manifest.mark_finished(ok, DONE)
+        self.manifest.mark_finished(failed, FAILED, "boom")
+
+        items = self.manifest.items(batch_id)
+        self.assertTrue(self.manifest.is_complete(items[0]))
+        self.assertFalse(self.manifest.is_complete(items[1]))
+        self.assertEqual(items[1]["error"], "boom")
+
+        # A truncated or replaced output no longer counts as complete
+        self.write("a_upscaled_x4.png", b"partial output")
+        self.assertFalse(self.manifest.is_complete(items[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
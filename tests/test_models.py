@@ -0,0 +1,120 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.models import ModelRegistry, MODEL_ANIME, MODEL_GENERAL, MODEL_VIDEO
+from app.workers import UpscaleWorker
+
+INSTALLED = [
+    "realesr-animevideov3-x2",
+    "realesr-animevideov3-x4",
+    "realesrgan-x4plus",
+    "realesrgan-x4plus-anime",
+]
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Tests for the model registry and the automatic model selection."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.speeds_path = os.path.join(self.temp_dir.name, "speeds.json")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def test_scan_indexes_scale_and_type(self):
+        """Test that only complete models are indexed, with their scale and type."""
+        for name in INSTALLED:
+            for ext in (".param", ".bin"):
+                open(os.path.join(self.temp_dir.name, name + ext), "w").close()
+        # A model without weights is not usable
+        open(os.path.join(self.temp_dir.name, "broken-x4.param"), "w").close()
+
+        registry = ModelRegistry(self.temp_dir.name)
+
+        self.assertEqual(sorted(registry.names()), sorted(INSTALLED))
+        self.assertEqual(registry.get("realesr-animevideov3-x2").scale, 2)
+        self.assertEqual(registry.get("realesr-animevideov3-x2").kind, MODEL_VIDEO)
+        self.assertEqual(registry.get("realesrgan-x4plus-anime").kind, MODEL_ANIME)
+        self.assertEqual(registry.get("realesrgan-x4plus").kind, MODEL_GENERAL)
+
+    def test_select_fastest(self):
+        """Test that the fastest model of a type and scale is selected."""
+        registry = ModelRegistry("models", INSTALLED, self.speeds_path)
+
+        self.assertEqual(registry.select(MODEL_VIDEO, 2), "realesr-animevideov3-x2")
+        self.assertIsNone(registry.select(MODEL_ANIME, 2))
+        # Unmeasured, the compact video model is estimated to be the fastest x4
+        self.assertEqual(registry.select(scale=4), "realesr-animevideov3-x4")
+
+        # Measurements override the estimate and are kept between sessions
+        registry.record_speed("realesrgan-x4plus-anime", 1.0, 10_000_000)
+        registry.record_speed("realesr-animevideov3-x4", 20.0, 10_000_000)
+        reloaded = ModelRegistry("models", INSTALLED, self.speeds_path)
+        self.assertEqual(reloaded.get("realesrgan-x4plus-anime").speed, 0.1)
+        self.assertEqual(reloaded.select(scale=4), "realesrgan-x4plus-anime")
+
+    def test_resolve_once(self):
+        """Test that a missing model is replaced once, with a single note."""
+        registry = ModelRegistry("models", INSTALLED)
+
+        name, note = registry.resolve("realesr-animevideov3-x3")
+        self.assertEqual(name, "realesr-animevideov3-x2")
+        self.assertIn("not found", note)
+        self.assertEqual(
+            registry.resolve("realesr-animevideov3-x3"),
+            ("realesr-animevideov3-x2", None),
+        )
+        self.assertEqual(
+            registry.resolve("realesrgan-x4plus"), ("realesrgan-x4plus", None)
+        )
+        with self.assertRaises(ValueError):
+            registry.resolve("auto", MODEL_ANIME, 2)
+        with self.assertRaises(FileNotFoundError):
+            ModelRegistry("models", []).resolve("realesrgan-x4plus")
+
+    @patch("app.workers.UpscaleWorker._find_models_directory")
+    def test_worker_uses_batch_registry(self, mock_find_models):
+        """Test that a worker selects its model from the engine's registry."""
+        worker = UpscaleWorker(
+            "in.png", "out.png", {"model": "auto", "model_type": "video", "scale": 2}
+        )
+        worker.signals = MagicMock()
+        worker.models = ModelRegistry("models", INSTALLED)
+
+        worker._ensure_model("realesrgan")
+
+        mock_find_models.assert_not_called()
+        self.assertEqual(worker.model, "realesr-animevideov3-x2")
+        self.assertEqual(worker.scale, 2)
+        worker.signals.log.emit.assert_called_once_with(
+            "Selected model 'realesr-animevideov3-x2' as the fastest video x2 model"
+        )
+
+    def test_worker_warns_when_the_fallback_changes_the_scale(self):
+        """Test that a fallback model of another scale is logged next to the name."""
+        worker = UpscaleWorker("in.png", "out.png", {"model": "realesrgan-x3plus"})
+        worker.signals = MagicMock()
+        worker.models = ModelRegistry("models", ["realesr-animevideov3-x2"])
+
+        worker._ensure_model("realesrgan")
+
+        self.assertEqual(worker.scale, 2)
+        messages = [c.args[0] for c in worker.signals.log.emit.call_args_list]
+        self.assertIn(
+            "Warning: 'realesr-animevideov3-x2' upscales x2, but outputs are named x3",
+            messages,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
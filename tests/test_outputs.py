@@ -0,0 +1,137 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.outputs import (
+    LAYOUT_MIRROR,
+    OutputNamer,
+    build_output_path,
+    is_partial,
+    partial_path,
+    prepare_output,
+    publish_output,
+)
+from app.incremental import write_record
+from app.ui_utils import get_files_from_directory
+
+
+class TestOutputs(unittest.TestCase):
+    """Tests for the naming and writing of outputs."""
+
+    def setUp(self):
+        """Create a temporary output folder."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings = {"model": "realesr-animevideov3-x4"}
+
+    def tearDown(self):
+        """Remove the temporary output folder."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_collisions_are_resolved_deterministically(self):
+        """Test that sources with the same name get distinct, stable outputs."""
+        sources = [
+            (os.path.join("src", "b", "ep01.mkv"), None),
+            (os.path.join("src", "a", "ep01.mkv"), None),
+            (os.path.join("src", "a", "ep02.mkv"), None),
+        ]
+
+        first = OutputNamer().plan(sources, "out", self.settings)
+        second = OutputNamer().plan(reversed(sources), "out", self.settings)
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            first,
+            {
+                sources[1][0]: os.path.join("out", "ep01_upscaled_x4.mkv"),
+                sources[0][0]: os.path.join("out", "ep01_upscaled_x4_2.mkv"),
+                sources[2][0]: os.path.join("out", "ep02_upscaled_x4.mkv"),
+            },
+        )
+        # A source keeps its output when it is claimed again
+        namer = OutputNamer()
+        namer.plan(sources, "out", self.settings)
+        self.assertEqual(
+            namer.claim(sources[0][0], "out", self.settings),
+            os.path.join("out", "ep01_upscaled_x4_2.mkv"),
+        )
+
+    def test_outputs_of_earlier_batches_are_kept(self):
+        """Test that a separate batch does not overwrite another source's output."""
+        sources = []
+        for folder in ("a", "b"):
+            os.makedirs(os.path.join(self.temp_dir, folder))
+            sources.append(os.path.join(self.temp_dir, folder, "ep01.mkv"))
+            with open(sources[-1], "w") as f:
+                f.write(folder)
+        out = os.path.join(self.temp_dir, "out")
+        os.makedirs(out)
+
+        # The first batch publishes its output with its record
+        first = OutputNamer().claim(sources[0], out, self.settings)
+        with open(first, "w") as f:
+            f.write("upscaled")
+        write_record(sources[0], first, self.settings)
+
+        second = OutputNamer().claim(sources[1], out, self.settings)
+
+        self.assertEqual(first, os.path.join(out, "ep01_upscaled_x4.mkv"))
+        self.assertEqual(second, os.path.join(out, "ep01_upscaled_x4_2.mkv"))
+        # The first source still maps to its own output in later batches
+        self.assertEqual(OutputNamer().claim(sources[0], out, self.settings), first)
+
+    def test_mirror_layout_keeps_source_folders(self):
+        """Test that the mirror layout recreates the folders below the source root."""
+        settings = dict(self.settings, output_layout=LAYOUT_MIRROR)
+        root = os.path.join("src", "show")
+
+        self.assertEqual(
+            build_output_path(
+                os.path.join(root, "s1", "ep01.mkv"), "out", settings, root
+            ),
+            os.path.join("out", "s1", "ep01_upscaled_x4.mkv"),
+        )
+        self.assertEqual(
+            build_output_path(os.path.join(root, "ep01.mkv"), "out", settings, root),
+            os.path.join("out", "ep01_upscaled_x4.mkv"),
+        )
+        # Files added on their own, and the flat layout, use the output folder
+        self.assertEqual(
+            build_output_path(os.path.join(root, "s1", "ep01.mkv"), "out", settings),
+            os.path.join("out", "ep01_upscaled_x4.mkv"),
+        )
+        self.assertEqual(
+            build_output_path(
+                os.path.join(root, "s1", "ep01.mkv"), "out", self.settings, root
+            ),
+            os.path.join("out", "ep01_upscaled_x4.mkv"),
+        )
+
+    def test_outputs_appear_only_when_complete(self):
+        """Test that outputs are written under a partial name and then moved."""
+        output_path = os.path.join(self.temp_dir, "s1", "ep01_upscaled_x4.mkv")
+        os.makedirs(os.path.dirname(output_path))
+        # A partial file left behind by a crashed job
+        with open(partial_path(output_path), "w") as f:
+            f.write("trunc")
+
+        partial = prepare_output(output_path)
+
+        self.assertFalse(os.path.exists(partial))
+        self.assertTrue(is_partial(partial))
+        self.assertEqual(os.path.splitext(partial)[1], ".mkv")
+        with open(partial, "w") as f:
+            f.write("complete")
+        self.assertEqual(get_files_from_directory(self.temp_dir), [])
+        publish_output(output_path)
+        self.assertFalse(os.path.exists(partial))
+        self.assertEqual(get_files_from_directory(self.temp_dir), [output_path])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import os
+import sys
+import threading
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.progress import ProgressAggregator
+
+
+class TestProgressAggregator(unittest.TestCase):
+    """Tests for the ProgressAggregator class."""
+
+    def setUp(self):
+        """Set up an aggregator tracking a batch of four jobs."""
+        self.aggregator = ProgressAggregator()
+        self.aggregator.reset(4)
+        self.snapshots = []
+        self.aggregator.updated.connect(self.snapshots.append)
+
+    def tearDown(self):
+        """Stop the aggregator's timer."""
+        self.aggregator.stop()
+
+    def test_reports_from_threads_become_one_snapshot(self):
+        """Test that many per-frame reports result in a single combined update."""
+        self.aggregator.start_job("1", "a.mkv")
+        self.aggregator.start_job("2", "b.mkv")
+        threads = [
+            threading.Thread(
+                target=lambda job_id=job_id: [
+                    self.aggregator.report(job_id, i, 100) for i in range(51)
+                ]
+            )
+            for job_id in ("1", "2")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.aggregator.tick()
+
+        self.assertEqual(len(self.snapshots), 1)
+        snapshot = self.snapshots[0]
+        self.assertEqual(snapshot["jobs"]["1"]["percent"], 50)
+        self.assertEqual(snapshot["overall"], 25)
+        self.assertIsNotNone(snapshot["eta"])
+
+    def test_finished_jobs_count_towards_overall_progress(self):
+        """Test that completed jobs leave the active list and advance the total."""
+        self.aggregator.start_job("1", "a.png")
+        self.aggregator.finish_job("1")
+        self.aggregator.finish_job("2")
+
+        snapshot = self.aggregator.snapshot()
+
+        self.assertEqual(snapshot["jobs"], {})
+        self.assertEqual(snapshot["overall"], 50)
+
+    def test_report_for_unknown_job_is_ignored(self):
+        """Test that late reports from a finished job are dropped."""
+        self.aggregator.report("missing", 5, 10)
+
+        self.assertEqual(self.aggregator.snapshot()["jobs"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import os
+import sys
+import subprocess
+from unittest.mock import patch, MagicMock
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.scaling import model_scale, scale_variants, plan_scale, ScalePlan
+from app.outputs import build_output_path, partial_path
+from app.workers import UpscaleWorker
+
+ANIME_MODELS = [
+    "realesr-animevideov3-x2",
+    "realesr-animevideov3-x3",
+    "realesr-animevideov3-x4",
+    "realesrgan-x4plus",
+]
+
+
+class TestScaling(unittest.TestCase):
+    """Tests for planning the scale of a target resolution."""
+
+    def test_model_scale_and_variants(self):
+        """Test that scales are read from model names and variants are found."""
+        self.assertEqual(model_scale("realesr-animevideov3-x2"), 2)
+        self.assertEqual(model_scale("realesrgan-x4plus-anime"), 4)
+        self.assertEqual(
+            scale_variants("realesr-animevideov3-x4", ANIME_MODELS),
+            {
+                2: "realesr-animevideov3-x2",
+                3: "realesr-animevideov3-x3",
+                4: "realesr-animevideov3-x4",
+            },
+        )
+        self.assertEqual(
+            scale_variants("realesrgan-x4plus", ANIME_MODELS),
+            {4: "realesrgan-x4plus"},
+        )
+
+    def test_plan_picks_cheapest_scale(self):
+        """Test that the smallest scale reaching the target is used."""
+        variants = scale_variants("realesr-animevideov3-x4", ANIME_MODELS)
+
+        self.assertEqual(
+            plan_scale(1080, 1440, variants),
+            ScalePlan("realesr-animevideov3-x2", 2, None, 1440),
+        )
+        self.assertEqual(
+            plan_scale(720, 2160, variants),
+            ScalePlan("realesr-animevideov3-x3", 3, None, None),
+        )
+        # Only a 4x model: upscale 4x and resize down while encoding
+        self.assertEqual(
+            plan_scale(1080, 1440, {4: "realesrgan-x4plus"}),
+            ScalePlan("realesrgan-x4plus", 4, None, 1440),
+        )
+
+    def test_plan_pre_downscale(self):
+        """Test that over-sized sources are downscaled to what the model needs."""
+        variants = scale_variants("realesr-animevideov3-x4", ANIME_MODELS)
+
+        self.assertEqual(
+            plan_scale(1080, 1440, variants, pre_downscale=True),
+            ScalePlan("realesr-animevideov3-x2", 2, 720, None),
+        )
+        # Nothing to gain when the source is not over-sized
+        self.assertEqual(
+            plan_scale(480, 1440, variants, pre_downscale=True),
+            ScalePlan("realesr-animevideov3-x3", 3, None, None),
+        )
+
+    def test_output_name_reflects_scale(self):
+        """Test that output file names carry the actual scale."""
+        settings = {"model": "realesr-animevideov3-x2", "format": "png"}
+        self.assertEqual(
+            build_output_path("/in/a.jpg", "/out", settings),
+            os.path.join("/out", "a_upscaled_x2.png"),
+        )
+        settings["target_height"] = 1440
+        self.assertEqual(
+            build_output_path("/in/b.mp4", "/out", settings),
+            os.path.join("/out", "b_upscaled_1440p.mp4"),
+        )
+
+    @patch("app.workers.QImageReader")
+    @patch("app.workers.UpscaleWorker._get_available_models", return_value=ANIME_MODELS)
+    @patch("app.workers.UpscaleWorker._find_models_directory", return_value="models")
+    @patch(
+        "app.workers.UpscaleWorker._find_realesrgan_executable",
+        return_value="realesrgan",
+    )
+    @patch("app.workers.UpscaleWorker._get_ffmpeg_path", return_value="ffmpeg")
+    @patch("os.path.exists", return_value=True)
+    def test_image_resized_while_encoding(
+        self, mock_exists, mock_ffmpeg, mock_exe, mock_models_dir, mock_models, reader
+    ):
+        """Test that an image is upscaled 2x and resized to the target when encoded."""
+        reader.return_value.size.return_value.isValid.return_value = True
+        reader.return_value.size.return_value.height.return_value = 1080
+        worker = UpscaleWorker(
+            "in.png",
+            "out.jpg",
+            {
+                "model": "realesr-animevideov3-x4",
+                "format": "jpg",
+                "target_height": 1440,
+            },
+        )
+        worker.signals = MagicMock()
+        commands = []
+
+        def run(cmd):
+            commands.append(cmd)
+            return subprocess.CompletedProcess(cmd, 0, "", "")
+
+        with patch.object(worker, "_run_process", side_effect=run), patch(
+            "app.workers.needs_tiling", return_value=None
+        ), patch.object(worker, "_record_output"), patch("app.workers.publish_output"):
+            worker.run()
+
+        worker.signals.error.emit.assert_not_called()
+        upscale, encode = commands
+        self.assertEqual(upscale[upscale.index("-n") + 1], "realesr-animevideov3-x2")
+        self.assertEqual(upscale[upscale.index("-s") + 1], "2")
+        self.assertEqual(upscale[upscale.index("-f") + 1], "png")
+        self.assertIn("scale=-1:1440:flags=lanczos", encode)
+        self.assertEqual(encode[-1], partial_path("out.jpg"))
+
+
+if __name__ == "__main__":
+    unittest.main()
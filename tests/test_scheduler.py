@@ -0,0 +1,106 @@
+import unittest
+import os
+import sys
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.scheduler import (
+    Job,
+    JobScheduler,
+    ORDER_SHORTEST,
+    QUEUED,
+    PAUSED,
+    RUNNING,
+    DONE,
+    CANCELLED,
+)
+
+
+class TestJobScheduler(unittest.TestCase):
+    """Tests for the JobScheduler class."""
+
+    def setUp(self):
+        """Set up a scheduler with one slot per lane."""
+        self.scheduler = JobScheduler({"image": 1, "video": 1})
+
+    def add(self, job_id, path, cost=0.0, priority=0):
+        """Adds a job to the scheduler."""
+        return self.scheduler.add(
+            Job(job_id, path, f"out/{path}", {}, priority=priority, cost=cost)
+        )
+
+    def test_lanes_run_independently(self):
+        """Test that a video does not block images queued behind it."""
+        self.add("1", "long.mkv", cost=1000)
+        self.add("2", "a.png")
+        self.add("3", "b.png")
+
+        started = self.scheduler.next_jobs()
+
+        self.assertEqual([job.job_id for job in started], ["2", "1"])
+        self.assertEqual(self.scheduler.get("3").state, QUEUED)
+
+    def test_shortest_first_and_priority(self):
+        """Test that priority wins over cost, and cost over queue order."""
+        self.scheduler.order = ORDER_SHORTEST
+        self.add("1", "big.png", cost=500)
+        self.add("2", "small.png", cost=10)
+        self.add("3", "urgent.png", cost=900, priority=1)
+
+        order = []
+        while not self.scheduler.is_idle():
+            for job in self.scheduler.next_jobs():
+                order.append(job.job_id)
+                self.scheduler.finish(job.job_id, DONE)
+
+        self.assertEqual(order, ["3", "2", "1"])
+
+    def test_pause_resume_and_reorder(self):
+        """Test that paused jobs are skipped and reordering changes the queue."""
+        self.add("1", "a.png")
+        self.add("2", "b.png")
+        self.add("3", "c.png")
+        self.scheduler.pause("1")
+        self.scheduler.reorder(["3", "2"])
+
+        started = self.scheduler.next_jobs()
+        self.assertEqual([job.job_id for job in started], ["3"])
+        self.assertEqual(self.scheduler.get("1").state, PAUSED)
+
+        # A resumed job keeps its original queue position
+        self.scheduler.resume("1")
+        self.scheduler.finish("3", DONE)
+        self.assertEqual(self.scheduler.next_jobs()[0].job_id, "1")
+
+    def test_paused_jobs_keep_the_batch_open(self):
+        """Test that a paused job is still run once it is resumed."""
+        self.add("1", "a.png")
+        self.add("2", "b.png")
+        self.scheduler.pause("2")
+
+        for job in self.scheduler.next_jobs():
+            self.scheduler.finish(job.job_id, DONE)
+        self.assertEqual(self.scheduler.next_jobs(), [])
+        self.assertFalse(self.scheduler.is_idle())
+
+        self.scheduler.resume("2")
+        self.assertEqual([job.job_id for job in self.scheduler.next_jobs()], ["2"])
+        self.scheduler.finish("2", DONE)
+        self.assertTrue(self.scheduler.is_idle())
+
+    def test_cancel_pending(self):
+        """Test that cancelling leaves running jobs alone."""
+        self.add("1", "a.png")
+        self.add("2", "b.png")
+        self.scheduler.next_jobs()
+
+        self.scheduler.cancel_pending()
+
+        self.assertEqual(self.scheduler.get("1").state, RUNNING)
+        self.assertEqual(self.scheduler.get("2").state, CANCELLED)
+
+
+if __name__ == "__main__":
+    unittest.main()
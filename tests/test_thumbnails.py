@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QSize, QTimer
+from PyQt6.QtGui import QImage, QColor
+from app.thumbnails import ThumbnailLoader
+
+
+class TestThumbnailLoader(unittest.TestCase):
+    """Tests for the ThumbnailLoader class."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application object needed for queued signals."""
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Write a large test image and set up a loader with a tiny cache."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for name in ("a.png", "b.png", "c.png"):
+            image = QImage(1600, 900, QImage.Format.Format_RGB32)
+            image.fill(QColor("red"))
+            path = os.path.join(self.temp_dir.name, name)
+            image.save(path)
+            self.paths.append(path)
+        self.loader = ThumbnailLoader(QSize(160, 90), cache_size=2)
+        self.loaded = []
+        self.loader.loaded.connect(
+            lambda path, image: self.loaded.append((path, image))
+        )
+
+    def tearDown(self):
+        """Remove the temporary images."""
+        self.temp_dir.cleanup()
+
+    def wait_for(self, count):
+        """Runs the event loop until `count` thumbnails were loaded."""
+        loop = QEventLoop()
+        timer = QTimer()
+        timer.timeout.connect(
+            lambda: loop.quit() if len(self.loaded) >= count else None
+        )
+        timer.start(10)
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec()
+
+    def test_thumbnail_is_downscaled_in_background(self):
+        """Test that a large image is delivered at thumbnail size."""
+        self.loader.request(self.paths[0])
+        self.wait_for(1)
+
+        path, image = self.loaded[0]
+        self.assertEqual(path, self.paths[0])
+        self.assertEqual((image.width(), image.height()), (160, 90))
+
+    def test_only_latest_pending_request_is_loaded(self):
+        """Test that requests arriving during a decode collapse into the newest."""
+        for path in self.paths:
+            self.loader.request(path)
+        self.wait_for(2)
+
+        self.assertEqual([p for p, _ in self.loaded], [self.paths[0], self.paths[2]])
+
+    def test_cached_thumbnail_is_emitted_immediately(self):
+        """Test that a cached thumbnail needs no background decode."""
+        self.loader.request(self.paths[0])
+        self.wait_for(1)
+
+        self.loader.request(self.paths[0])
+
+        self.assertEqual(len(self.loaded), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage, QColor
+from app.tiling import tile_starts, PngStreamWriter
+from app.workers import UpscaleWorker, FRAME_OK
+
+
+def make_image(width, height, alpha=False):
+    """Creates an image with a distinct color (and opacity) at every pixel."""
+    if alpha:
+        image = QImage(width, height, QImage.Format.Format_RGBA8888)
+    else:
+        image = QImage(width, height, QImage.Format.Format_RGB888)
+    for y in range(height):
+        for x in range(width):
+            color = QColor(x % 256, y % 256, (x * 7 + y * 3) % 256)
+            if alpha:
+                color.setAlpha(128 + (x + y) % 128)
+            image.setPixelColor(x, y, color)
+    return image
+
+
+def raw_rows(image, channels=3):
+    """Returns the RGB24 (or RGBA) pixels of an image without line padding."""
+    if channels == 4:
+        image = image.convertToFormat(QImage.Format.Format_RGBA8888)
+    else:
+        image = image.convertToFormat(QImage.Format.Format_RGB888)
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    data = bytes(bits)
+    stride, row_size = image.bytesPerLine(), image.width() * channels
+    return b"".join(
+        data[y * stride : y * stride + row_size] for y in range(image.height())
+    )
+
+
+class TestTiling(unittest.TestCase):
+    """Tests for the tiling of large images."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.temp_dir.cleanup()
+
+    def test_tile_starts(self):
+        """Test that tiles cover the whole length with at least the overlap."""
+        self.assertEqual(tile_starts(100, 512, 32), [0])
+        self.assertEqual(tile_starts(1000, 512, 32), [0, 480, 488])
+        self.assertEqual(tile_starts(992, 512, 32), [0, 480])
+
+    def test_png_stream_writer(self):
+        """Test that a PNG written row by row decodes to the same pixels."""
+        image = make_image(37, 21)
+        path = os.path.join(self.temp_dir.name, "out.png")
+        data = raw_rows(image)
+        with PngStreamWriter(path, 37, 21) as writer:
+            for y in range(21):
+                writer.write_row(data[y * 37 * 3 : (y + 1) * 37 * 3])
+
+        self.assertEqual(raw_rows(QImage(path)), data)
+
+    def upscale_tiled(self, source):
+        """Upscales an image 2x in tiles; returns the output and the expected image."""
+        input_path = os.path.join(self.temp_dir.name, "in.png")
+        source.save(input_path)
+        output_path = os.path.join(self.temp_dir.name, "out.png")
+        worker = UpscaleWorker(
+            input_path, output_path, {"tiling_tile_size": 128, "tiling_workers": 3}
+        )
+
+        def decode_raw(image_path, raw_path, width, height, channels):
+            with open(raw_path, "wb") as f:
+                f.write(raw_rows(source, channels))
+
+        def upscale_tile(realesrgan_path, input_path, output_path, model=None):
+            tile = QImage(input_path)
+            tile.scaled(
+                tile.width() * 2,
+                tile.height() * 2,
+                Qt.AspectRatioMode.IgnoreAspectRatio,
+                Qt.TransformationMode.FastTransformation,
+            ).save(output_path)
+            return FRAME_OK
+
+        with patch.object(worker, "_decode_raw", side_effect=decode_raw), patch.object(
+            worker, "_upscale_frame", side_effect=upscale_tile
+        ):
+            worker._upscale_image_tiled(
+                "realesrgan", input_path, output_path, source.width(), source.height()
+            )
+
+        self.assertFalse(os.path.exists(output_path + ".part"))
+        expected = source.scaled(
+            source.width() * 2,
+            source.height() * 2,
+            Qt.AspectRatioMode.IgnoreAspectRatio,
+            Qt.TransformationMode.FastTransformation,
+        )
+        return QImage(output_path), expected
+
+    def test_stitched_image_has_no_seams(self):
+        """Test that a tiled upscale matches upscaling the whole image."""
+        output, expected = self.upscale_tiled(make_image(300, 170))
+
+        self.assertFalse(output.hasAlphaChannel())
+        result, expected = raw_rows(output), raw_rows(expected)
+        self.assertEqual(len(result), len(expected))
+        # Overlapping tiles hold the same pixels, so blending may only round
+        # (twice where four tiles meet)
+        self.assertLessEqual(max(abs(a - b) for a, b in zip(result, expected)), 2)
+
+    def test_transparency_is_kept(self):
+        """Test that a tiled upscale keeps the alpha channel of the source."""
+        output, expected = self.upscale_tiled(make_image(300, 170, alpha=True))
+
+        self.assertTrue(output.hasAlphaChannel())
+        result, expected = raw_rows(output, 4), raw_rows(expected, 4)
+        self.assertEqual(len(result), len(expected))
+        # Blending is done on premultiplied pixels, which rounds the colours of
+        # translucent pixels a little more
+        self.assertLessEqual(max(abs(a - b) for a, b in zip(result, expected)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+from app.ui_utils import DependencyChecker
+
+
+class TestDependencyChecker(unittest.TestCase):
+    """Tests for the background dependency check."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application object needed for queued signals."""
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def test_check_runs_in_background(self):
+        """Test that the tools are looked for off the calling thread."""
+        threads = []
+
+        def find():
+            threads.append(threading.current_thread())
+            return ["FFmpeg not found."]
+
+        checker = DependencyChecker()
+        results = []
+        checker.finished.connect(results.append)
+        loop = QEventLoop()
+        checker.finished.connect(loop.quit)
+        QTimer.singleShot(5000, loop.quit)
+        with patch("app.ui_utils.find_missing_dependencies", side_effect=find):
+            checker.start()
+            # The result is only known once the check has finished
+            self.assertIsNone(checker.missing)
+            loop.exec()
+
+            self.assertEqual(results, [["FFmpeg not found."]])
+            self.assertIsNot(threads[0], threading.current_thread())
+            self.assertEqual(checker.missing, ["FFmpeg not found."])
+
+        with patch("app.ui_utils.find_missing_dependencies", return_value=[]):
+            self.assertEqual(checker.check_now(), [])
+        self.assertEqual(results[-1], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,257 @@
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import time
+from typing import Any, Dict, List
+from unittest.mock import MagicMock
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from app.media import _find_tool
+from app.models import DEFAULT_MODEL
+from app.workers import UpscaleWorker
+
+FFMPEG = _find_tool("ffmpeg")
+FFPROBE = _find_tool("ffprobe")
+
+# Set to a file path to append the timing and disk usage of every run to it,
+# one JSON object per line
+REPORT_ENV = "GOLDEN_REPORT"
+
+WIDTH, HEIGHT = 64, 48
+SCALE = 4
+# The output may differ from the source by up to a frame, plus the padding of
+# the last AAC packet
+DURATION_TOLERANCE = 0.1
+
+# Stands in for Real-ESRGAN: a plain, deterministic nearest-neighbour resize
+STUB_UPSCALER = """#!{python}
+import subprocess
+import sys
+
+args = sys.argv[1:]
+
+
+def option(flag):
+    return args[args.index(flag) + 1]
+
+
+scale = option("-s")
+cmd = [{ffmpeg!r}, "-v", "error", "-y", "-i", option("-i")]
+cmd += ["-vf", f"scale=iw*{{scale}}:ih*{{scale}}:flags=neighbor", option("-o")]
+sys.exit(subprocess.run(cmd).returncode)
+"""
+
+
+def directory_size(path: str) -> int:
+    """Returns the total size of the files below a directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def probe_streams(path: str) -> Dict[str, Any]:
+    """Probes the streams of a video with FFprobe, counting its video frames."""
+    entries = (
+        "format=duration:stream=codec_type,codec_name,width,height,pix_fmt,"
+        "duration,r_frame_rate,nb_read_frames"
+    )
+    cmd = [FFPROBE, "-v", "error", "-count_frames", "-show_entries", entries]
+    cmd += ["-of", "json", path]
+    process = subprocess.run(cmd, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"Probing {path} failed: {process.stderr}")
+    return json.loads(process.stdout)
+
+
+class MeasuredWorker(UpscaleWorker):
+    """An upscale worker that uses the stub upscaler and measures its disk use."""
+
+    upscaler_path = ""
+
+    def _find_realesrgan_executable(self):
+        return self.upscaler_path
+
+    def _create_work_dir(self) -> str:
+        self.work_dir = super()._create_work_dir()
+        return self.work_dir
+
+    def _reassemble_video(self, upscaled_dir, output_path, original_video):
+        # The extracted and the upscaled frames are all on disk at this point
+        self.peak_disk = directory_size(self.work_dir)
+        super()._reassemble_video(upscaled_dir, output_path, original_video)
+
+
+@unittest.skipUnless(FFMPEG and FFPROBE, "FFmpeg and FFprobe are required")
+@unittest.skipIf(os.name == "nt", "The stub upscaler is a Python script")
+class TestVideoPipeline(unittest.TestCase):
+    """
+    Golden-output tests that run generated videos through the real worker.
+
+    Only Real-ESRGAN is replaced, by a stub that resizes the frames, so every
+    FFmpeg stage runs as in production. The outputs are checked for frame
+    count, duration, audio sync and stream layout.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the stub upscaler and its models directory."""
+        cls.temp_dir = tempfile.mkdtemp(prefix="golden_")
+        upscaler_dir = os.path.join(cls.temp_dir, "upscaler")
+        os.makedirs(os.path.join(upscaler_dir, "models"))
+        for ext in (".param", ".bin"):
+            path = os.path.join(upscaler_dir, "models", DEFAULT_MODEL + ext)
+            open(path, "w").close()
+        MeasuredWorker.upscaler_path = os.path.join(upscaler_dir, "realesrgan")
+        with open(MeasuredWorker.upscaler_path, "w") as f:
+            f.write(STUB_UPSCALER.format(python=sys.executable, ffmpeg=FFMPEG))
+        os.chmod(MeasuredWorker.upscaler_path, 0o755)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the generated videos and outputs."""
+        shutil.rmtree(cls.temp_dir)
+
+    def make_source(self, name: str, args: List[str]) -> str:
+        """Generates a source video from FFmpeg test sources."""
+        path = os.path.join(self.temp_dir, name)
+        cmd = [FFMPEG, "-v", "error", "-y"] + args + [path]
+        process = subprocess.run(cmd, capture_output=True, text=True)
+        self.assertEqual(process.returncode, 0, process.stderr)
+        return path
+
+    def upscale(self, source: str, fps: int = 0) -> Dict[str, Any]:
+        """
+        Upscales a video with the worker, records the run and probes the output.
+
+        Without `fps`, the video keeps the frame rate of its source.
+        """
+        name = os.path.splitext(os.path.basename(source))[0]
+        output = os.path.join(self.temp_dir, f"{name}_upscaled.mp4")
+        settings = {"fps": fps, "quality": 18, "hwaccel": "none"}
+        worker = MeasuredWorker(source, output, settings)
+        worker.signals = MagicMock()
+
+        started = time.perf_counter()
+        worker.run()
+        seconds = time.perf_counter() - started
+
+        errors = [call.args[0] for call in worker.signals.error.emit.call_args_list]
+        self.assertEqual(errors, [])
+        self.record(
+            {
+                "case": name,
+                "seconds": round(seconds, 3),
+                "stages": {k: round(v, 3) for k, v in worker.stage_timings.items()},
+                "peak_work_bytes": worker.peak_disk,
+                "output_bytes": os.path.getsize(output),
+            }
+        )
+        return probe_streams(output)
+
+    def record(self, run: Dict[str, Any]):
+        """Appends the measurements of a run to the report, if one is kept."""
+        report = os.environ.get(REPORT_ENV)
+        if report:
+            with open(report, "a", encoding="utf-8") as f:
+                f.write(json.dumps(run) + "\n")
+
+    def assert_output(self, probe: Dict[str, Any], frames: int, audio_streams: int):
+        """Checks the frames, duration and stream layout of an upscaled video."""
+        streams = probe["streams"]
+        self.assertEqual(
+            [s["codec_type"] for s in streams], ["video"] + ["audio"] * audio_streams
+        )
+        video = streams[0]
+        self.assertEqual(video["codec_name"], "h264")
+        self.assertEqual(video["pix_fmt"], "yuv420p")
+        self.assertEqual(
+            (video["width"], video["height"]), (WIDTH * SCALE, HEIGHT * SCALE)
+        )
+        self.assertEqual(int(video["nb_read_frames"]), frames)
+        video_duration = float(video["duration"])
+        for audio in streams[1:]:
+            # The audio still lines up with the video
+            self.assertAlmostEqual(
+                float(audio["duration"]), video_duration, delta=DURATION_TOLERANCE
+            )
+        return video_duration
+
+    def test_constant_frame_rate_with_audio(self):
+        """Test that a video keeps its frames, duration and audio."""
+        source = self.make_source(
+            "cfr_audio.mp4",
+            ["-f", "lavfi", "-i", f"testsrc2=s={WIDTH}x{HEIGHT}:r=24:d=2"]
+            + ["-f", "lavfi", "-i", "sine=frequency=440:duration=2"]
+            + ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac"],
+        )
+
+        duration = self.assert_output(self.upscale(source, 24), 48, 1)
+
+        self.assertAlmostEqual(duration, 2.0, delta=DURATION_TOLERANCE)
+
+    def test_source_frame_rate_is_kept(self):
+        """Test that a video keeps its own frame rate and every frame by default."""
+        source = self.make_source(
+            "cfr_30.mp4",
+            ["-f", "lavfi", "-i", f"testsrc2=s={WIDTH}x{HEIGHT}:r=30:d=2"]
+            + ["-f", "lavfi", "-i", "sine=frequency=440:duration=2"]
+            + ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac"],
+        )
+
+        probe = self.upscale(source)
+        duration = self.assert_output(probe, 60, 1)
+
+        self.assertEqual(probe["streams"][0]["r_frame_rate"], "30/1")
+        self.assertAlmostEqual(duration, 2.0, delta=DURATION_TOLERANCE)
+
+    def test_video_without_audio(self):
+        """Test that a video without audio is upscaled, at the output rate."""
+        source = self.make_source(
+            "no_audio.mkv",
+            ["-f", "lavfi", "-i", f"testsrc2=s={WIDTH}x{HEIGHT}:r=30000/1001:d=2"]
+            + ["-c:v", "libx264", "-pix_fmt", "yuv420p"],
+        )
+
+        duration = self.assert_output(self.upscale(source, 15), 30, 0)
+
+        self.assertAlmostEqual(duration, 2.0, delta=DURATION_TOLERANCE)
+
+    def test_variable_frame_rate(self):
+        """Test that a variable frame rate video keeps its duration and sync."""
+        # A second at 24 fps, then two seconds with most frames dropped
+        source = self.make_source(
+            "vfr_audio.mkv",
+            ["-f", "lavfi", "-i", f"testsrc2=s={WIDTH}x{HEIGHT}:r=24:d=3"]
+            + ["-f", "lavfi", "-i", "sine=frequency=440:duration=3"]
+            + ["-vf", "select='lt(t,1)+not(mod(n,5))'", "-fps_mode", "vfr"]
+            + ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac"],
+        )
+
+        duration = self.assert_output(self.upscale(source, 24), 72, 1)
+
+        self.assertAlmostEqual(duration, 3.0, delta=DURATION_TOLERANCE)
+
+    def test_audio_tracks_are_kept(self):
+        """Test that every audio track of the source ends up in the output."""
+        source = self.make_source(
+            "two_tracks.mkv",
+            ["-f", "lavfi", "-i", f"testsrc2=s={WIDTH}x{HEIGHT}:r=24:d=1"]
+            + ["-f", "lavfi", "-i", "sine=frequency=440:duration=1"]
+            + ["-f", "lavfi", "-i", "sine=frequency=880:duration=1"]
+            + ["-map", "0", "-map", "1", "-map", "2"]
+            + ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "libopus"],
+        )
+
+        self.assert_output(self.upscale(source, 24), 24, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
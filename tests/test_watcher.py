@@ -0,0 +1,116 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+# Add the src directory to the Python path to allow for 'from app...' imports
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from PyQt6.QtCore import QCoreApplication
+from app.watcher import FolderWatcher, ACTION_MOVE, ACTION_TAG
+
+
+class TestFolderWatcher(unittest.TestCase):
+    """Tests for the FolderWatcher class."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the application object needed by Qt objects."""
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        """Set up a watched folder with a fake clock."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self.temp_dir.name
+        self.now = 1000.0
+        patcher = patch("app.watcher.time.time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.ready = []
+
+    def tearDown(self):
+        """Remove the watched folder."""
+        self.temp_dir.cleanup()
+
+    def create_watcher(self, action=ACTION_MOVE):
+        """Creates a polling-only watcher with a 5 second settle time."""
+        watcher = FolderWatcher(
+            self.folder, action=action, settle_time=5, use_notifications=False
+        )
+        watcher.file_ready.connect(self.ready.append)
+        return watcher
+
+    def write(self, name, data=b"data"):
+        """Writes a file into the watched folder and returns its path."""
+        path = os.path.join(self.folder, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "ab") as f:
+            f.write(data)
+        return path
+
+    def test_file_is_reported_after_settling(self):
+        """Test that a growing file is only reported once its size is stable."""
+        watcher = self.create_watcher()
+        path = self.write("clip.mp4")
+        self.write("notes.txt")
+        watcher.poll()
+
+        self.now += 3
+        self.write("clip.mp4", b"more data")
+        watcher.poll()
+        self.now += 3
+        watcher.poll()
+        self.assertEqual(self.ready, [])
+
+        self.now += 3
+        watcher.poll()
+        watcher.poll()
+        self.assertEqual(self.ready, [path])
+
+    def test_move_processed_inputs(self):
+        """Test that processed inputs are moved and never reported again."""
+        watcher = self.create_watcher()
+        path = self.write(os.path.join("sub", "a.png"))
+        self.write(os.path.join("processed", "sub", "a.png"))
+        watcher.poll()
+        self.now += 5
+        watcher.poll()
+
+        new_path = watcher.mark_processed(path, True)
+
+        self.assertEqual(
+            new_path, os.path.join(self.folder, "processed", "sub", "a_1.png")
+        )
+        self.assertFalse(os.path.exists(path))
+        self.now += 10
+        watcher.poll()
+        self.assertEqual(self.ready, [path])
+
+    def test_tag_processed_inputs(self):
+        """Test that tagged inputs are skipped until they change."""
+        watcher = self.create_watcher(ACTION_TAG)
+        path = self.write("a.png")
+        watcher.poll()
+        self.now += 5
+        watcher.poll()
+        watcher.mark_processed(path, True)
+
+        # The tag survives a restart
+        watcher = self.create_watcher(ACTION_TAG)
+        self.ready.clear()
+        watcher.poll()
+        self.now += 5
+        watcher.poll()
+        self.assertEqual(self.ready, [])
+
+        self.write("a.png", b"replaced")
+        watcher.poll()
+        self.now += 5
+        watcher.poll()
+        self.assertEqual(self.ready, [path])
+
+
+if __name__ == "__main__":
+    unittest.main()
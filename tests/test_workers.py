@@ -1,13 +1,27 @@
 import unittest
 import os
 import sys
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
 from unittest.mock import patch, MagicMock, call
 
 # Add the src directory to the Python path to allow for 'from app...' imports
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, os.path.join(project_root, "src"))
 
-from app.workers import UpscaleWorker
+from app.workers import (
+    UpscaleWorker,
+    PreviewWorker,
+    FRAME_OK,
+    FRAME_RESIZED,
+    FRAME_DUPLICATED,
+    FRAME_DUPLICATED_NEXT,
+    FRAME_LOST,
+)
+from app.outputs import partial_path
 
 
 class TestUpscaleWorker(unittest.TestCase):
@@ -23,6 +37,7 @@ class TestUpscaleWorker(unittest.TestCase):
             "tile_size": 0,
             "fps": 30,
             "quality": 23,
+            "hwaccel": "none",
         }
         # We instantiate the worker but will call run() inside patched contexts
         self.worker = UpscaleWorker(
@@ -41,9 +56,22 @@ class TestUpscaleWorker(unittest.TestCase):
         "app.workers.UpscaleWorker._find_models_directory",
         return_value="path/to/models",
     )
+    @patch(
+        "app.workers.UpscaleWorker._get_available_models",
+        return_value=["realesrgan-x4plus"],
+    )
     @patch("os.path.exists", return_value=True)
+    @patch("app.workers.prepare_output", side_effect=partial_path)
+    @patch("app.workers.publish_output")
     def test_upscale_image_success(
-        self, mock_exists, mock_find_models, mock_find_exe, mock_popen
+        self,
+        mock_publish,
+        mock_prepare,
+        mock_exists,
+        mock_models,
+        mock_find_models,
+        mock_find_exe,
+        mock_popen,
     ):
         """Test the successful upscaling of an image."""
         # Arrange
@@ -58,6 +86,9 @@ class TestUpscaleWorker(unittest.TestCase):
 
         # Assert
         mock_popen.assert_called_once()
+        # The image is written under a partial name and then moved into place
+        self.assertIn(partial_path("dummy/output.png"), mock_popen.call_args.args[0])
+        mock_publish.assert_called_once_with("dummy/output.png")
         self.mock_signals.log.emit.assert_any_call("✓ Completed: output.png")
         self.mock_signals.result.emit.assert_called_once_with("dummy/output.png")
         self.mock_signals.error.emit.assert_not_called()
@@ -78,41 +109,56 @@ class TestUpscaleWorker(unittest.TestCase):
         )
         self.mock_signals.finished.emit.assert_called_once()
 
-    @patch("app.workers.subprocess.run")
+    @patch("app.workers.subprocess.Popen")
     @patch(
         "app.workers.UpscaleWorker._find_realesrgan_executable",
         return_value="path/to/realesrgan",
     )
+    @patch(
+        "app.workers.UpscaleWorker._find_models_directory",
+        return_value="path/to/models",
+    )
+    @patch(
+        "app.workers.UpscaleWorker._get_available_models",
+        return_value=["realesrgan-x4plus"],
+    )
     @patch("app.workers.UpscaleWorker._get_ffmpeg_path", return_value="path/to/ffmpeg")
     @patch("tempfile.mkdtemp", return_value="dummy/temp")
     @patch("os.makedirs")
     @patch("os.listdir", return_value=["frame_000001.png"])
+    @patch("os.path.isfile", return_value=True)
     @patch("shutil.rmtree")
+    @patch("app.workers.prepare_output", side_effect=partial_path)
+    @patch("app.workers.publish_output")
     def test_upscale_video_success(
         self,
+        mock_publish,
+        mock_prepare,
         mock_rmtree,
+        mock_isfile,
         mock_listdir,
         mock_makedirs,
         mock_mkdtemp,
         mock_ffmpeg_path,
+        mock_models,
+        mock_find_models,
         mock_find_exe,
-        mock_sub_run,
+        mock_popen,
     ):
         """Test the successful upscaling of a video."""
         # Arrange
         mock_process = MagicMock()
         mock_process.returncode = 0
-        mock_process.stderr = ""
-        mock_sub_run.return_value = mock_process
+        mock_process.communicate.return_value = ("", "")
+        mock_popen.return_value = mock_process
         self.worker.file_path = "dummy/input.mp4"
 
         # Act
         self.worker.run()
 
         # Assert
-        self.assertEqual(
-            mock_sub_run.call_count, 4
-        )  # extract, upscale, audio, reassemble
+        self.assertEqual(mock_popen.call_count, 3)  # extract, upscale, reassemble
+        mock_publish.assert_called_once_with("dummy/output.png")
         self.mock_signals.log.emit.assert_any_call(
             "✓ Video upscaling completed: output.png"
         )
@@ -139,7 +185,86 @@ class TestUpscaleWorker(unittest.TestCase):
         )
         self.mock_signals.finished.emit.assert_called_once()
 
-    def test_cancel_process(self):
+    @patch("app.workers.UpscaleWorker._run_process")
+    @patch("app.workers.UpscaleWorker._get_ffmpeg_path", return_value="path/to/ffmpeg")
+    def test_extracted_frames_are_stored_uncompressed(self, mock_ffmpeg, mock_run):
+        """Test that frames handed to the upscaler skip PNG compression."""
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+
+        self.worker._extract_frames("dummy/input.mp4", "dummy/frames")
+        self.worker._extract_sample_frames("dummy/input.mp4", "dummy/frames", 1, 10.0)
+
+        for extract in mock_run.call_args_list:
+            cmd = extract.args[0]
+            self.assertEqual(cmd[cmd.index("-compression_level") + 1], "0")
+            self.assertTrue(cmd[-1].endswith(".png"))
+
+    @patch("app.workers.time.sleep")
+    @patch("app.workers.UpscaleWorker._run_process")
+    @patch("app.workers.UpscaleWorker._get_ffmpeg_path", return_value="path/to/ffmpeg")
+    @patch("os.path.isfile", return_value=True)
+    def test_upscale_frame_falls_back_to_resize(
+        self, mock_isfile, mock_ffmpeg_path, mock_sub_run, mock_sleep
+    ):
+        """Test that a persistently failing frame is retried, then resized."""
+        # Arrange: every Real-ESRGAN call fails, the FFmpeg resize succeeds
+        mock_sub_run.side_effect = lambda cmd: MagicMock(
+            returncode=0 if cmd[0] == "path/to/ffmpeg" else 1
+        )
+        self.worker.settings["tile_size"] = 400
+
+        # Act
+        outcome = self.worker._upscale_frame(
+            "path/to/realesrgan", "frames/f.png", "upscaled/f.png"
+        )
+
+        # Assert: 3 attempts, smaller tile, CPU mode, then the resize
+        self.assertEqual(outcome, FRAME_RESIZED)
+        commands = [c.args[0] for c in mock_sub_run.call_args_list]
+        self.assertEqual(len(commands), 6)
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertIn("200", commands[3])
+        self.assertEqual(commands[4][commands[4].index("-g") + 1], "-1")
+        self.assertEqual(commands[5][0], "path/to/ffmpeg")
+
+    def test_lost_first_frames_are_filled_from_the_next_frame(self):
+        """Test that lost frames at the start of a video copy the first good frame."""
+        with tempfile.TemporaryDirectory() as upscaled_dir:
+            frames = [f"frame_{i:06d}.png" for i in range(1, 5)]
+            outcomes = [FRAME_LOST, FRAME_LOST, FRAME_OK, FRAME_LOST]
+            with open(os.path.join(upscaled_dir, frames[2]), "w") as f:
+                f.write("3")
+            self.worker.frame_report = {"total": len(frames), "frames": {}}
+
+            self.worker._handle_frame_outcomes(frames, upscaled_dir, iter(outcomes))
+
+            contents = []
+            for frame in frames:
+                with open(os.path.join(upscaled_dir, frame)) as f:
+                    contents.append(f.read())
+            self.assertEqual(contents, ["3", "3", "3", "3"])
+            self.assertEqual(
+                self.worker.frame_report["frames"],
+                {
+                    frames[0]: FRAME_DUPLICATED_NEXT,
+                    frames[1]: FRAME_DUPLICATED_NEXT,
+                    frames[3]: FRAME_DUPLICATED,
+                },
+            )
+
+    def test_video_fails_when_every_frame_is_lost(self):
+        """Test that a video without a single upscaled frame fails."""
+        with tempfile.TemporaryDirectory() as upscaled_dir:
+            frames = ["frame_000001.png", "frame_000002.png"]
+            self.worker.frame_report = {"total": len(frames), "frames": {}}
+
+            with self.assertRaises(RuntimeError):
+                self.worker._handle_frame_outcomes(
+                    frames, upscaled_dir, iter([FRAME_LOST, FRAME_LOST])
+                )
+
+    @patch("app.workers._signal_process_tree")
+    def test_cancel_process(self, mock_signal):
         """Test the cancellation of the upscaling process."""
         # Arrange
         mock_process = MagicMock()
@@ -151,7 +276,86 @@ class TestUpscaleWorker(unittest.TestCase):
 
         # Assert
         self.assertTrue(self.worker.is_cancelled)
-        mock_process.terminate.assert_called_once()
+        mock_signal.assert_called_once_with(mock_process, force=False)
+
+    @unittest.skipIf(os.name == "nt", "process groups are POSIX-only")
+    def test_cancel_stops_running_process_group(self):
+        """Test that cancel stops a tracked child process within the grace period."""
+        # Arrange: a child that ignores nothing and would run for a minute
+        cmd = [sys.executable, "-c", "import time; time.sleep(60)"]
+        timer = threading.Timer(0.2, self.worker.cancel)
+        timer.start()
+
+        # Act
+        started = time.time()
+        process = self.worker._run_process(cmd)
+
+        # Assert
+        self.assertLess(time.time() - started, 1.0)
+        self.assertNotEqual(process.returncode, 0)
+        self.assertIsNone(self.worker.current_process)
+
+
+class TestPreviewWorker(unittest.TestCase):
+    """Tests for the PreviewWorker class."""
+
+    @patch("app.workers.UpscaleWorker._upscale_frames")
+    @patch("app.workers.UpscaleWorker._extract_sample_frames")
+    @patch(
+        "app.workers.probe_video",
+        return_value={"frames": 240, "duration": 10.0, "fps": 24.0},
+    )
+    def test_preview_projects_full_job(self, mock_probe, mock_extract, mock_upscale):
+        """Test that sample frames are upscaled and the full job is projected."""
+
+        # Arrange
+        def extract(video_path, frames_dir, count, duration):
+            for i in range(count):
+                open(os.path.join(frames_dir, f"frame_{i + 1:06d}.png"), "w").close()
+
+        mock_extract.side_effect = extract
+        worker = PreviewWorker("dummy/input.mp4", {}, samples=3)
+        worker.signals = MagicMock()
+
+        # Act
+        worker.run()
+
+        # Assert
+        mock_extract.assert_called_once()
+        self.assertEqual(mock_extract.call_args[0][2], 3)
+        result = worker.signals.result.emit.call_args[0][0]
+        self.assertEqual(len(result["frames"]), 3)
+        self.assertEqual(result["total_frames"], 240)
+        self.assertAlmostEqual(
+            result["projected_seconds"], result["seconds_per_frame"] * 240
+        )
+        self.assertTrue(os.path.isdir(result["temp_dir"]))
+        shutil.rmtree(result["temp_dir"])
+        worker.signals.error.emit.assert_not_called()
+
+    @patch("app.workers.UpscaleWorker._upscale_frames")
+    @patch("app.workers.UpscaleWorker._extract_sample_frames")
+    @patch(
+        "app.workers.probe_video",
+        return_value={"frames": 600, "duration": 10.0, "fps": 60.0},
+    )
+    def test_preview_projects_output_rate(self, mock_probe, mock_extract, mock_upscale):
+        """Test that the projection counts the frames at the rate the job uses."""
+
+        def extract(video_path, frames_dir, count, duration):
+            open(os.path.join(frames_dir, "frame_000001.png"), "w").close()
+
+        mock_extract.side_effect = extract
+        for settings, expected in (({}, 600), ({"fps": 24}, 240)):
+            with self.subTest(settings=settings):
+                worker = PreviewWorker("dummy/input.mp4", settings, samples=1)
+                worker.signals = MagicMock()
+
+                worker.run()
+
+                result = worker.signals.result.emit.call_args[0][0]
+                self.assertEqual(result["total_frames"], expected)
+                shutil.rmtree(result["temp_dir"])
 
 
 if __name__ == "__main__":